@@ -0,0 +1,133 @@
+"""
+Latency from receiving an Alertmanager request, to writing the first finding of each alert to the sinks.
+
+Sends Alertmanager requests of many alerts, for a small set of pods and nodes, through ``Web.process_alert_event``
+and the alerts queue workers. Kubernetes reads take READ_LATENCY_SEC. The playbook actions are instant, so the sink
+write is right after the alert event is built.
+Compares reading the resources of every alert separately, with the alert resources batching.
+
+Run with:
+    poetry run python benchmarks/alert_batch_latency.py
+"""
+
+import statistics
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+from hikaru.model.rel_1_26 import Node, ObjectMeta
+
+from robusta.integrations.kubernetes.custom_models import RobustaDeployment, RobustaPod
+from robusta.integrations.prometheus.trigger import AlertEventBuilder
+from robusta.runner.web import Web
+from robusta.utils.task_queue import QueueMetrics, TaskQueue
+
+REQUESTS = 5
+ALERTS_PER_REQUEST = 100
+PODS = 20
+NODES = 5
+READ_LATENCY_SEC = 0.02
+NUM_EVENT_THREADS = 20
+
+
+class FakeEventHandler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.done = threading.Semaphore(0)
+
+    def handle_trigger(self, trigger_event):
+        AlertEventBuilder.build_event(trigger_event, {})
+        with self.lock:
+            self.latencies.append(time.time() - trigger_event.received_at)
+        self.done.release()
+
+    def get_telemetry(self):
+        return mock.MagicMock()
+
+    def get_relabel_config(self):
+        return []
+
+
+def alerts_request(request_index: int) -> dict:
+    alerts = []
+    for index in range(ALERTS_PER_REQUEST):
+        alerts.append(
+            {
+                "status": "firing",
+                "labels": {
+                    "alertname": "KubePodCrashLooping",
+                    "namespace": "default",
+                    "pod": f"pod-{index % PODS}",
+                    "deployment": f"deployment-{index % PODS}",
+                    "node": f"node-{index % NODES}",
+                },
+                "annotations": {},
+                "startsAt": "2026-08-03T10:00:00Z",
+                "endsAt": "0001-01-01T00:00:00Z",
+                "generatorURL": "",
+                "fingerprint": f"{request_index}-{index}",
+            }
+        )
+    return {
+        "receiver": "robusta",
+        "status": "firing",
+        "alerts": alerts,
+        "externalURL": "",
+        "groupKey": "",
+        "version": "4",
+    }
+
+
+def run(batching: bool, metrics: QueueMetrics):
+    reads = Counter()
+    reads_lock = threading.Lock()
+
+    def reader(kind: str):
+        def read(self, name: str, namespace: str = None):
+            with reads_lock:
+                reads[kind] += 1
+            time.sleep(READ_LATENCY_SEC)
+            return RobustaPod(metadata=ObjectMeta(name=name, namespace=namespace))
+
+        return read
+
+    handler = FakeEventHandler()
+    queue = TaskQueue(name=f"alerts_queue_{batching}", num_workers=NUM_EVENT_THREADS, metrics=metrics)
+    with mock.patch.object(RobustaPod, "read", reader("pod")), mock.patch.object(
+        RobustaDeployment, "read", reader("deployment")
+    ), mock.patch.object(Node, "read", reader("node")), mock.patch.object(
+        Web, "alerts_queue", queue, create=True
+    ), mock.patch.object(
+        Web, "event_handler", handler, create=True
+    ), mock.patch(
+        "robusta.runner.web.ALERT_RESOURCE_BATCHING", batching
+    ):
+        Web.processed_alerts_cache.clear()
+        for request_index in range(REQUESTS):
+            Web.process_alert_event(alerts_request(request_index))
+        for _ in range(REQUESTS * ALERTS_PER_REQUEST):
+            handler.done.acquire()
+
+    latencies = sorted(handler.latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{'batched' if batching else 'per alert':>9} | {statistics.median(latencies) * 1000:>8.0f} | "
+        f"{p99 * 1000:>8.0f} | {sum(reads.values()):>6}"
+    )
+
+
+def main():
+    print(
+        f"{REQUESTS} requests of {ALERTS_PER_REQUEST} alerts, {PODS} pods and deployments, {NODES} nodes, "
+        f"{READ_LATENCY_SEC * 1000:.0f}ms per read, {NUM_EVENT_THREADS} alert workers"
+    )
+    print(f"{'mode':>9} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'reads':>6}")
+    metrics = QueueMetrics()
+    for batching in [False, True]:
+        run(batching, metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Time to build and render the svg of a Prometheus chart, for long time ranges.
+
+Builds charts of Prometheus matrix results with ``build_chart_from_prometheus_result``, and renders them. Compares
+plotting every point of every series, with plotting the downsampled series, and with rendering a chart that was
+already rendered.
+
+Run with:
+    poetry run python benchmarks/chart_rendering.py
+"""
+
+import time
+from unittest import mock
+
+import numpy as np
+from prometrix import PrometheusQueryResult
+
+from robusta.core.model.env_vars import FLOAT_PRECISION_LIMIT
+from robusta.core.playbooks.prometheus_enrichment_utils import build_chart_from_prometheus_result
+from robusta.core.reporting.chart_rendering import CachedXY
+
+RUNS = 3
+START = 1_780_000_000
+
+
+def matrix_result(series_count: int, points: int, step: int) -> PrometheusQueryResult:
+    rng = np.random.default_rng(series_count * points)
+    timestamps = START + np.arange(points) * step
+    result = []
+    for index in range(series_count):
+        values = np.abs(np.cumsum(rng.normal(0, 0.01, points))) + rng.uniform(0, 1)
+        result.append(
+            {
+                "metric": {"pod": f"pod-{index}", "namespace": "default"},
+                "values": [[int(ts), str(value)] for ts, value in zip(timestamps, values)],
+            }
+        )
+    return PrometheusQueryResult({"resultType": "matrix", "result": result})
+
+
+def plot_every_point(series: dict, max_y_value: float):
+    values = []
+    for idx, timestamp in enumerate(series["timestamps"]):
+        val = round(float(series["values"][idx]), FLOAT_PRECISION_LIMIT)
+        values.append((timestamp, val))
+        max_y_value = max(max_y_value, val)
+    return values, max_y_value
+
+
+def render(result: PrometheusQueryResult, clear_cache: bool) -> (float, int):
+    if clear_cache:
+        CachedXY.render_cache.clear()
+    start = time.perf_counter()
+    svg = build_chart_from_prometheus_result(result, chart_title="CPU usage").render()
+    return time.perf_counter() - start, len(svg)
+
+
+def run(name: str, series_count: int, points: int, step: int):
+    result = matrix_result(series_count, points, step)
+    timings = {}
+    with mock.patch("robusta.core.playbooks.prometheus_enrichment_utils.plot_values", plot_every_point):
+        timings["every point"] = min(render(result, clear_cache=True) for _ in range(RUNS))
+    timings["downsampled"] = min(render(result, clear_cache=True) for _ in range(RUNS))
+    timings["cached"] = min(render(result, clear_cache=False) for _ in range(RUNS))
+    for mode, (seconds, size) in timings.items():
+        print(f"{name:>22} | {mode:>11} | {seconds * 1000:>9.0f} | {size / 1024:>8.0f}")
+
+
+def main():
+    print(f"best of {RUNS} runs, svg only")
+    print(f"{'chart':>22} | {'mode':>11} | {'time (ms)':>9} | {'svg (KB)':>8}")
+    run("1 series, 1 day", 1, 1440, 60)
+    run("5 series, 1 week", 5, 2016, 300)
+    run("20 series, 1 week", 20, 2016, 300)
+    run("20 series, 3000 points", 20, 3000, 60)
+
+
+if __name__ == "__main__":
+    main()
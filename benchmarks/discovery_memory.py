@@ -0,0 +1,267 @@
+"""
+Discovery peak memory, on a synthetic cluster with 50k pods.
+
+Compares the "process" discovery mode, that returns a single DiscoveryResults from the discovery process, with the
+"stream" mode, that sends the results in chunks of compact rows while listing.
+Each mode runs in a fresh interpreter. The runner side keeps a services cache, and diffs the discovered services
+against it, like the Robusta sink does.
+
+Run with:
+    poetry run python benchmarks/discovery_memory.py
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from unittest import mock
+
+from kubernetes import client
+from kubernetes.client import (
+    Configuration,
+    V1Container,
+    V1ContainerPort,
+    V1Deployment,
+    V1DeploymentSpec,
+    V1DeploymentStatus,
+    V1EnvVar,
+    V1Job,
+    V1JobSpec,
+    V1JobStatus,
+    V1LabelSelector,
+    V1ListMeta,
+    V1Namespace,
+    V1Node,
+    V1NodeSpec,
+    V1NodeStatus,
+    V1ObjectMeta,
+    V1OwnerReference,
+    V1Pod,
+    V1PodSpec,
+    V1PodStatus,
+    V1PodTemplateSpec,
+    V1ReplicaSet,
+    V1ReplicaSetSpec,
+    V1ResourceRequirements,
+)
+
+PODS = 50_000
+DEPLOYMENTS = 5_000
+NODES = 200
+JOBS = 1_000
+NAMESPACES = 100
+UNOWNED_PODS_EVERY = 10  # every 10th pod has no owner, and is reported as a service
+BATCH_SIZE = 5_000
+
+config = Configuration()
+
+
+def meta(name: str, index: int, owned: bool = False, labels=None) -> V1ObjectMeta:
+    owners = [V1OwnerReference(api_version="apps/v1", kind="ReplicaSet", name="rs", uid="uid")] if owned else None
+    return V1ObjectMeta(
+        name=name,
+        namespace=f"ns-{index % NAMESPACES}",
+        labels=labels or {"app": f"app-{index % DEPLOYMENTS}", "team": "platform"},
+        annotations={"owner": "platform"},
+        owner_references=owners,
+        resource_version=str(index + 1),
+        local_vars_configuration=config,
+    )
+
+
+def container(index: int) -> V1Container:
+    return V1Container(
+        name="main",
+        image=f"registry.example.com/app-{index % DEPLOYMENTS}:1.0.{index % 7}",
+        env=[V1EnvVar(name=f"VAR_{i}", value=f"value-{i}", local_vars_configuration=config) for i in range(5)],
+        ports=[V1ContainerPort(container_port=8080, local_vars_configuration=config)],
+        resources=V1ResourceRequirements(
+            requests={"cpu": "100m", "memory": "128Mi"},
+            limits={"memory": "256Mi"},
+            local_vars_configuration=config,
+        ),
+        local_vars_configuration=config,
+    )
+
+
+def make_pod(index: int) -> V1Pod:
+    labels = {"job-name": f"job-{index % JOBS}"} if index % 50 == 1 else None
+    return V1Pod(
+        metadata=meta(f"pod-{index}", index, owned=index % UNOWNED_PODS_EVERY != 0, labels=labels),
+        spec=V1PodSpec(
+            node_name=f"node-{index % NODES}", containers=[container(index)], local_vars_configuration=config
+        ),
+        status=V1PodStatus(phase="Running", conditions=[], local_vars_configuration=config),
+        local_vars_configuration=config,
+    )
+
+
+def make_deployment(index: int) -> V1Deployment:
+    return V1Deployment(
+        metadata=meta(f"deployment-{index}", index),
+        spec=V1DeploymentSpec(
+            replicas=3,
+            selector=V1LabelSelector(match_labels={"app": f"app-{index}"}, local_vars_configuration=config),
+            template=V1PodTemplateSpec(
+                spec=V1PodSpec(containers=[container(index)], local_vars_configuration=config),
+                local_vars_configuration=config,
+            ),
+            local_vars_configuration=config,
+        ),
+        status=V1DeploymentStatus(ready_replicas=3, local_vars_configuration=config),
+        local_vars_configuration=config,
+    )
+
+
+def make_replica_set(index: int) -> V1ReplicaSet:
+    return V1ReplicaSet(
+        metadata=meta(f"deployment-{index}-rs", index, owned=True),
+        spec=V1ReplicaSetSpec(
+            replicas=3,
+            selector=V1LabelSelector(match_labels={"app": f"app-{index}"}, local_vars_configuration=config),
+            local_vars_configuration=config,
+        ),
+        local_vars_configuration=config,
+    )
+
+
+def make_job(index: int) -> V1Job:
+    return V1Job(
+        metadata=meta(f"job-{index}", index),
+        spec=V1JobSpec(
+            backoff_limit=6,
+            selector=V1LabelSelector(match_labels={"job-name": f"job-{index}"}, local_vars_configuration=config),
+            template=V1PodTemplateSpec(
+                spec=V1PodSpec(containers=[container(index)], local_vars_configuration=config),
+                local_vars_configuration=config,
+            ),
+            local_vars_configuration=config,
+        ),
+        status=V1JobStatus(active=1, local_vars_configuration=config),
+        local_vars_configuration=config,
+    )
+
+
+def make_node(index: int) -> V1Node:
+    return V1Node(
+        metadata=V1ObjectMeta(name=f"node-{index}", resource_version="1", local_vars_configuration=config),
+        spec=V1NodeSpec(local_vars_configuration=config),
+        status=V1NodeStatus(
+            capacity={"cpu": "16", "memory": "64Gi"},
+            allocatable={"cpu": "15", "memory": "60Gi"},
+            local_vars_configuration=config,
+        ),
+        local_vars_configuration=config,
+    )
+
+
+def pager(make, count: int):
+    """
+    A fake list function, that creates the objects of the requested page only
+    """
+
+    def list_page(self, limit=None, _continue=None, **kwargs):
+        start = int(_continue or 0)
+        end = min(start + (limit or count), count)
+        response = mock.MagicMock()
+        response.items = [make(index) for index in range(start, end)]
+        response.metadata = V1ListMeta(_continue=str(end) if end < count else None)
+        return response
+
+    return list_page
+
+
+def fake_cluster(stack: ExitStack):
+    fakes = [
+        (client.CoreV1Api, "list_pod_for_all_namespaces", pager(make_pod, PODS)),
+        (client.AppsV1Api, "list_deployment_for_all_namespaces", pager(make_deployment, DEPLOYMENTS)),
+        (client.AppsV1Api, "list_replica_set_for_all_namespaces", pager(make_replica_set, DEPLOYMENTS)),
+        (client.AppsV1Api, "list_stateful_set_for_all_namespaces", pager(make_deployment, 0)),
+        (client.AppsV1Api, "list_daemon_set_for_all_namespaces", pager(make_deployment, 0)),
+        (client.BatchV1Api, "list_job_for_all_namespaces", pager(make_job, JOBS)),
+        (client.CoreV1Api, "list_node", pager(make_node, NODES)),
+        (
+            client.CoreV1Api,
+            "list_namespace",
+            pager(lambda index: V1Namespace(metadata=V1ObjectMeta(name=f"ns-{index}")), NAMESPACES),
+        ),
+    ]
+    for cls, method, fake in fakes:
+        stack.enter_context(mock.patch.object(cls, method, fake))
+    stack.enter_context(mock.patch("robusta.core.discovery.discovery.DISCOVERY_BATCH_SIZE", BATCH_SIZE))
+    stack.enter_context(mock.patch("robusta.core.discovery.discovery.DISABLE_HELM_MONITORING", True))
+
+
+def run_mode(mode: str):
+    from robusta.core.discovery.discovery import Discovery
+    from robusta.core.discovery.discovery_stream import DiscoveryChunkKind
+
+    with ExitStack() as stack:
+        fake_cluster(stack)
+        # the runner services cache, loaded from the platform db
+        services_cache = {}
+        for index in range(DEPLOYMENTS):
+            service = Discovery.create_service_info(make_deployment(index), "Deployment")
+            services_cache[service.get_service_key()] = service
+        for index in range(0, PODS, UNOWNED_PODS_EVERY):
+            service = Discovery.create_service_info(make_pod(index), "Pod")
+            services_cache[service.get_service_key()] = service
+        cache_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        start_time = time.perf_counter()
+        changed = 0
+        if mode == "process":
+            results = Discovery.discover_resources()
+            for service in results.services:
+                changed += services_cache.get(service.get_service_key()) != service
+            executor = Discovery.executor
+        else:
+            for kind, chunk in Discovery.stream_resources():
+                if kind == DiscoveryChunkKind.SERVICES:
+                    for row in chunk:
+                        changed += services_cache.get(row.key) != row.to_model()
+            executor = Discovery.stream_executor
+        duration = time.perf_counter() - start_time
+        executor.shutdown()  # wait for the discovery process, to collect its peak memory
+
+    print(
+        json.dumps(
+            {
+                "duration": duration,
+                "changed": changed,
+                "cache_rss_kb": cache_rss,
+                "parent_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                "child_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+            }
+        )
+    )
+
+
+def main():
+    print(
+        f"{PODS} pods, {DEPLOYMENTS} deployments and replicasets, {JOBS} jobs, {NODES} nodes, "
+        f"{PODS // UNOWNED_PODS_EVERY} pod services, batch size {BATCH_SIZE}"
+    )
+    print(
+        f"{'mode':>8} | {'time (s)':>8} | {'runner peak (MB)':>16} | {'over cache (MB)':>15} | {'process peak (MB)':>17}"
+    )
+    for mode in ["process", "stream"]:
+        output = subprocess.run(
+            [sys.executable, __file__, mode], check=True, capture_output=True, text=True
+        ).stdout.splitlines()[-1]
+        result = json.loads(output)
+        assert result["changed"] == 0
+        print(
+            f"{mode:>8} | {result['duration']:>8.1f} | {result['parent_rss_kb'] / 1024:>16.0f} | "
+            f"{(result['parent_rss_kb'] - result['cache_rss_kb']) / 1024:>15.0f} | "
+            f"{result['child_rss_kb'] / 1024:>17.0f}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run_mode(sys.argv[1])
+    else:
+        main()
@@ -0,0 +1,100 @@
+"""
+Time of preparing large log FileBlocks for sinks, with the previous FileBlock and the current one.
+
+For each log size: truncating the log for a Slack sink (to the default max_log_file_limit_kb of 1000), and building
+the file objects of SINKS Robusta sinks, that zip and base64 encode the same block. The previous FileBlock decoded
+and split the whole log to truncate it, and zipped and encoded the block again for every sink.
+
+Run with:
+    poetry run python benchmarks/file_block_sinks.py
+"""
+
+import base64
+import gzip
+import time
+from typing import List
+
+from robusta.core.reporting.blocks import FileBlock
+from robusta.core.sinks.robusta.dal.model_conversion import ModelConversion
+
+SIZES_MB = [10, 50, 200]
+SINKS = 2
+SLACK_LIMIT_BYTES = 1000 * 1000
+
+LINES = "".join(
+    f"2024-01-01T10:00:{i % 60:02d}Z INFO request {i} served in {i % 500}ms by worker-{i % 7}\n" for i in range(1000)
+).encode()
+
+
+def previous_truncate_content(block: FileBlock, max_file_size_bytes: int) -> bytes:
+    """
+    The previous FileBlock.truncate_content
+    """
+    if not block.is_text_file():
+        return block.contents
+
+    decoded_content = block.contents.decode("utf-8")
+    content_length = len(decoded_content)
+
+    if content_length <= max_file_size_bytes:
+        return block.contents
+
+    lines = decoded_content.splitlines()
+    byte_length_newline = len("\n".encode("utf-8"))
+
+    truncated_lines: List[str] = []
+    for idx, line in enumerate(lines):
+        line_content_length = len(line) + byte_length_newline
+
+        content_length -= line_content_length
+        if content_length <= max_file_size_bytes:
+            truncated_lines = lines[idx + 1 :]
+            break
+
+    return "\n".join(truncated_lines).encode("utf-8")
+
+
+def previous_file_object(block: FileBlock) -> dict:
+    """
+    The previous FileBlock.zipped and ModelConversion.get_file_object
+    """
+    zipped = block.copy(update={"contents": gzip.compress(block.contents), "filename": block.filename + ".gz"})
+    return {
+        "type": ModelConversion.get_file_type(zipped.filename),
+        "data": str(base64.b64encode(zipped.contents)),
+    }
+
+
+def unzipped(file_object: dict) -> bytes:
+    return gzip.decompress(base64.b64decode(file_object["data"][2:-1]))
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"slack truncation to {SLACK_LIMIT_BYTES} bytes, and file objects for {SINKS} robusta sinks")
+    print(f"{'size (MB)':>9} | {'truncate before (ms)':>20} | {'after':>7} | {'sinks before (s)':>16} | {'after':>7}")
+    for size_mb in SIZES_MB:
+        contents = LINES * (size_mb * 1024 * 1024 // len(LINES))
+
+        block = FileBlock("pod.log", contents)
+        truncate_before = timed(lambda: previous_truncate_content(block, SLACK_LIMIT_BYTES))
+        truncate_after = timed(lambda: block.truncated_view(SLACK_LIMIT_BYTES))
+
+        sinks_before = timed(lambda: [previous_file_object(block) for _ in range(SINKS)])
+        sinks_after = timed(lambda: [ModelConversion.get_file_object(block.zipped()) for _ in range(SINKS)])
+
+        # the gzip headers have the time of compression
+        assert unzipped(previous_file_object(block)) == unzipped(ModelConversion.get_file_object(block.zipped()))
+        print(
+            f"{size_mb:>9} | {truncate_before * 1000:>20.1f} | {truncate_after * 1000:>7.3f} | {sinks_before:>16.2f} | "
+            f"{sinks_after:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Bytes allocated when fanning a finding out to a growing number of sinks.
+
+Compares the old per sink ``copy.deepcopy(finding)`` with ``Finding.sink_view()``.
+
+Run with:
+    poetry run python benchmarks/finding_fanout.py
+"""
+
+import copy
+import os
+import tracemalloc
+from typing import Callable
+
+from robusta.api import FileBlock, Finding, MarkdownBlock, TableBlock
+
+LOG_SIZE_BYTES = 2 * 1024 * 1024
+TABLE_ROWS = 500
+
+
+def build_finding() -> Finding:
+    finding = Finding(title="Crashing pod", aggregation_key="CrashLoopBackoff")
+    log_lines = [f"2024-01-01T00:00:00Z INFO line {i} {os.urandom(16).hex()}" for i in range(LOG_SIZE_BYTES // 80)]
+    finding.add_enrichment([FileBlock("pod.log", "\n".join(log_lines).encode())])
+    finding.add_enrichment(
+        [
+            TableBlock(
+                rows=[[f"event-{i}", "Warning", "BackOff", "Back-off restarting"] for i in range(TABLE_ROWS)],
+                headers=["name", "type", "reason", "message"],
+            )
+        ]
+    )
+    finding.add_enrichment([MarkdownBlock("*Pod* crashed " * 50)])
+    return finding
+
+
+def measure(finding: Finding, sinks_count: int, fan_out: Callable[[Finding], Finding]) -> int:
+    tracemalloc.start()
+    views = [fan_out(finding) for _ in range(sinks_count)]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del views
+    return peak
+
+
+def main():
+    finding = build_finding()
+    print(f"{'sinks':>5} | {'deepcopy (bytes)':>18} | {'sink_view (bytes)':>18}")
+    for sinks_count in [1, 2, 4, 6, 8, 16]:
+        deep = measure(finding, sinks_count, copy.deepcopy)
+        view = measure(finding, sinks_count, Finding.sink_view)
+        print(f"{sinks_count:>5} | {deep:>18,} | {view:>18,}")
+
+
+if __name__ == "__main__":
+    main()
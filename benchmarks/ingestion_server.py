@@ -0,0 +1,130 @@
+"""
+Load test for the runner ingestion routes.
+
+Sends AlertManager webhooks to the Flask development server, and to the async ingestion server, from concurrent
+keep-alive connections, and reports the requests per second and latency percentiles.
+The events are enqueued to a dummy queue, so only the web server overhead is measured.
+
+Run with:
+    poetry run python benchmarks/ingestion_server.py
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import List
+from unittest import mock
+
+from werkzeug.serving import make_server
+
+from robusta.runner.async_web import AsyncIngestionServer
+from robusta.runner.web import Web, app
+
+CONNECTIONS = 32
+REQUESTS_PER_CONNECTION = 200
+ALERTS_PER_REQUEST = 5
+FLASK_PORT = 18001
+ASYNC_PORT = 18002
+
+
+class DummyQueue:
+    def add_task(self, func, *args, **kwargs):
+        pass
+
+
+def build_request_body() -> bytes:
+    alert = {
+        "status": "firing",
+        "labels": {"alertname": "KubePodCrashLooping", "namespace": "default", "pod": "web-1", "severity": "warning"},
+        "annotations": {"description": "Pod default/web-1 is crash looping"},
+        "startsAt": "2024-01-01T00:00:00Z",
+        "endsAt": "0001-01-01T00:00:00Z",
+        "generatorURL": "http://prometheus/graph",
+        "fingerprint": "",
+    }
+    alerts = []
+    for i in range(ALERTS_PER_REQUEST):
+        alerts.append(dict(alert, fingerprint=f"{i:016x}"))
+    event = {
+        "receiver": "robusta",
+        "status": "firing",
+        "alerts": alerts,
+        "groupLabels": {},
+        "commonLabels": {},
+        "commonAnnotations": {},
+        "externalURL": "http://alertmanager",
+        "version": "4",
+        "groupKey": "{}",
+    }
+    return json.dumps(event).encode()
+
+
+async def send_requests(port: int, body: bytes, latencies: List[float]):
+    request = (
+        f"POST /api/alerts HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+    reader = writer = None
+    for _ in range(REQUESTS_PER_CONNECTION):
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        start_time = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        await reader.readline()
+        content_length, close = 0, False
+        while True:
+            line = (await reader.readline()).strip().lower()
+            if not line:
+                break
+            if line.startswith(b"content-length:"):
+                content_length = int(line.split(b":")[1])
+            elif line == b"connection: close":
+                close = True
+        await reader.readexactly(content_length)
+        latencies.append(time.perf_counter() - start_time)
+        if close:
+            writer.close()
+            writer = None
+    if writer:
+        writer.close()
+
+
+async def load(port: int, body: bytes) -> List[float]:
+    latencies: List[float] = []
+    await asyncio.gather(*[send_requests(port, body, latencies) for _ in range(CONNECTIONS)])
+    return latencies
+
+
+def report(name: str, port: int, body: bytes):
+    start_time = time.perf_counter()
+    latencies = sorted(asyncio.run(load(port, body)))
+    duration = time.perf_counter() - start_time
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{name:>6} | {len(latencies) / duration:>10,.0f} | {p50:>8.2f} | {p99:>8.2f}")
+
+
+def main():
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    body = build_request_body()
+    Web.alerts_queue = DummyQueue()
+    Web.event_handler = mock.MagicMock()
+
+    flask_server = make_server("127.0.0.1", FLASK_PORT, app, threaded=True)
+    threading.Thread(target=flask_server.serve_forever, daemon=True).start()
+    async_server = AsyncIngestionServer(app)
+    threading.Thread(target=async_server.run, args=("127.0.0.1", ASYNC_PORT), daemon=True).start()
+    time.sleep(1)
+
+    print(f"{CONNECTIONS} connections, {REQUESTS_PER_CONNECTION} requests each, {ALERTS_PER_REQUEST} alerts per request")
+    print(f"{'server':>6} | {'req/sec':>10} | {'p50 (ms)':>8} | {'p99 (ms)':>8}")
+    report("flask", FLASK_PORT, body)
+    report("async", ASYNC_PORT, body)
+    flask_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
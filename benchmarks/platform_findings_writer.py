@@ -0,0 +1,93 @@
+"""
+Platform findings persistence, against an in-process fake PostgREST server.
+
+Compares a request per evidence and issue row with the batched ``FindingsWriteBuffer``.
+The fake server adds a fixed latency to each request, to simulate the round trip to the platform.
+
+Run with:
+    poetry run python benchmarks/platform_findings_writer.py
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+from postgrest import SyncPostgrestClient
+from postgrest.types import ReturnMethod
+
+from robusta.core.sinks.robusta.dal.findings_writer import FindingsWriteBuffer
+
+FINDINGS = 200
+EVIDENCE_PER_FINDING = 8
+REQUEST_LATENCY_SEC = 0.02
+PORT = 18003
+
+
+class FakePostgrestHandler(BaseHTTPRequestHandler):
+    requests = 0
+    rows = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(REQUEST_LATENCY_SEC)
+        with FakePostgrestHandler.lock:
+            FakePostgrestHandler.requests += 1
+            FakePostgrestHandler.rows += len(body) if isinstance(body, list) else 1
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def build_rows(finding_index: int) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    evidence = [
+        {"issue_id": str(finding_index), "file_type": "structured_data", "data": "x" * 2000, "title": f"evidence {i}"}
+        for i in range(EVIDENCE_PER_FINDING)
+    ]
+    return evidence, {"id": str(finding_index), "title": "Crashing pod", "aggregation_key": "CrashLoopBackoff"}
+
+
+def run(name: str, persist, done=lambda: None):
+    FakePostgrestHandler.requests = FakePostgrestHandler.rows = 0
+    start_time = time.perf_counter()
+    for i in range(FINDINGS):
+        persist(*build_rows(i))
+    persist_time = time.perf_counter() - start_time
+    done()
+    total_time = time.perf_counter() - start_time
+    print(
+        f"{name:>8} | {persist_time * 1000 / FINDINGS:>12.2f} | {total_time:>9.2f} | "
+        f"{FakePostgrestHandler.requests:>8} | {FakePostgrestHandler.rows:>6}"
+    )
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", PORT), FakePostgrestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = SyncPostgrestClient(f"http://127.0.0.1:{PORT}")
+
+    def insert(table: str, rows):
+        client.table(table).insert(rows, returning=ReturnMethod.minimal, default_to_null=False).execute()
+
+    def persist_per_row(evidence, issue):
+        for row in evidence:
+            insert("Evidence", row)
+        insert("Issues", issue)
+
+    writer = FindingsWriteBuffer("benchmark", insert, "Evidence", "Issues")
+
+    print(f"{FINDINGS} findings, {EVIDENCE_PER_FINDING} evidence rows each, {REQUEST_LATENCY_SEC * 1000:.0f}ms latency")
+    print(f"{'mode':>8} | {'ms / finding':>12} | {'total (s)':>9} | {'requests':>8} | {'rows':>6}")
+    run("per row", persist_per_row)
+    run("batched", writer.add, lambda: writer.flush())
+    writer.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Peak memory and time of fetching large pod logs with filtering and redaction.
+
+Compares the previous get_logs, that read the whole log body, decoded it, and ran re.findall and one re.sub per
+redaction pattern over all of it, with the streaming sanitize_log_chunks. The api server is faked by a response that
+streams a synthetic log of LOG_MB megabytes in chunks. Peak memory is measured with tracemalloc, in a separate run
+from the time.
+
+Run with:
+    poetry run python benchmarks/pod_logs_memory.py
+"""
+
+import re
+import time
+import tracemalloc
+
+from robusta.core.model.base_params import NamedRegexPattern
+from robusta.integrations.kubernetes.api_client_utils import POD_LOGS_CHUNK_SIZE
+from robusta.integrations.kubernetes.pod_logs import sanitize_log_chunks
+
+LOG_MB = 100
+PATTERNS = [
+    NamedRegexPattern(name="email", regex=r"[\w.]+@[\w.]+"),
+    NamedRegexPattern(name="card", regex=r"(\d{4}-){3}\d{4}"),
+]
+FILTER_REGEX = r"ERROR.*"
+
+LINES = "".join(
+    f"2024-01-01T10:00:{i % 60:02d}Z {'ERROR' if i % 10 == 0 else 'INFO'} request {i} served for user{i}@example.com "
+    f"card=4111-1111-1111-{i % 10000:04d} in {i % 500}ms\n"
+    for i in range(2000)
+).encode()
+CHUNK = (LINES * (POD_LOGS_CHUNK_SIZE // len(LINES) + 1))[:POD_LOGS_CHUNK_SIZE]
+
+
+def log_chunks():
+    # the same chunk over and over, so the fake response doesn't hold memory of its own
+    for _ in range(LOG_MB * 1024 * 1024 // POD_LOGS_CHUNK_SIZE):
+        yield CHUNK
+
+
+def previous_get_logs(filter_regex, regex_replacer_patterns) -> bytes:
+    """
+    The previous get_logs, with named replacements, and the FileBlock encoding of its result
+    """
+    pods_logs = b"".join(log_chunks()).decode("utf-8")  # read_namespaced_pod_log(...).data.decode("utf-8")
+    if pods_logs and filter_regex:
+        regex = re.compile(filter_regex)
+        pods_logs = "\n".join(re.findall(regex, pods_logs))
+    if pods_logs and regex_replacer_patterns:
+        for replacer in regex_replacer_patterns:
+            pods_logs = re.sub(replacer.regex, f"[{replacer.name.upper()}]", pods_logs)
+    return pods_logs.encode()
+
+
+def streaming_get_logs(filter_regex, regex_replacer_patterns) -> bytes:
+    return sanitize_log_chunks(
+        log_chunks(), filter_regex, regex_replacer_patterns, named_replacement=True, max_bytes=LOG_MB * 1024 * 1024
+    )
+
+
+def measure(func, filter_regex, patterns):
+    start = time.perf_counter()
+    result = func(filter_regex, patterns)
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = func(filter_regex, patterns)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    print(f"{LOG_MB} MB of logs, in chunks of {POD_LOGS_CHUNK_SIZE // 1024} KB")
+    print(f"{'case':>14} | {'reader':>9} | {'time (s)':>8} | {'peak (MB)':>9} | {'output (MB)':>11}")
+    for case, filter_regex, patterns in [
+        ("redact", None, PATTERNS),
+        ("filter+redact", FILTER_REGEX, PATTERNS),
+    ]:
+        results = []
+        for name, func in [("previous", previous_get_logs), ("streaming", streaming_get_logs)]:
+            elapsed, peak, result = measure(func, filter_regex, patterns)
+            results.append(result)
+            print(
+                f"{case:>14} | {name:>9} | {elapsed:>8.2f} | {peak / 1024 / 1024:>9.1f} | "
+                f"{len(result) / 1024 / 1024:>11.1f}"
+            )
+        assert results[0] == results[1]
+
+
+if __name__ == "__main__":
+    main()
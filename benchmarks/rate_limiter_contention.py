@@ -0,0 +1,124 @@
+"""
+Throughput of RateLimiter.mark_and_test, from 16 worker threads.
+
+Each thread marks crash-loop events of its own pods. Compares the previous limiter, of one global lock and a map
+that is never evicted, with the sharded limiter. The locks are wrapped to count the acquisitions that had to wait for
+another thread, and the total time spent waiting.
+
+Run with:
+    poetry run python benchmarks/rate_limiter_contention.py
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from robusta.utils.rate_limiter import ShardedRateLimiter
+
+NUM_THREADS = 16
+OPERATIONS_PER_THREAD = 50000
+PODS_PER_THREAD = 2000
+PERIOD_SECONDS = 3600
+
+
+class CountingLock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.contended = 0
+        self.wait_sec = 0.0
+
+    def __enter__(self):
+        if not self.lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self.lock.acquire()
+            # updated while holding the lock
+            self.contended += 1
+            self.wait_sec += time.perf_counter() - start
+
+    def __exit__(self, *args):
+        self.lock.release()
+
+
+class GlobalLockRateLimiter:
+    """
+    The previous RateLimiter
+    """
+
+    def __init__(self):
+        self.limiter_lock = CountingLock()
+        self.limiter_map = defaultdict(None)
+
+    def mark_and_test(self, operation: str, id: str, period_seconds: int) -> bool:
+        with self.limiter_lock:
+            limiter_key = operation + id
+            last_run = self.limiter_map.get(limiter_key)
+            curr_seconds = datetime.utcnow().timestamp()
+            if last_run:
+                if curr_seconds - last_run > period_seconds:
+                    self.limiter_map[limiter_key] = curr_seconds
+                    logging.debug(f"rate limited operation is allowed because enough time has passed: {limiter_key}")
+                    return True
+                else:
+                    logging.debug(f"rate limited operation is NOT allowed: {limiter_key}")
+                    return False
+            else:
+                logging.debug(f"rate limited operation is allowed because it is the first time: {limiter_key}")
+                self.limiter_map[limiter_key] = curr_seconds
+                return True
+
+    def __len__(self):
+        return len(self.limiter_map)
+
+
+def run(name: str, limiter, locks):
+    start_barrier = threading.Barrier(NUM_THREADS + 1)
+    allowed = [0] * NUM_THREADS
+
+    def worker(thread_index: int):
+        start_barrier.wait()
+        for i in range(OPERATIONS_PER_THREAD):
+            pod = f"default:pod-{thread_index}-{i % PODS_PER_THREAD}"
+            if limiter.mark_and_test("PodCrashLoopTrigger_playbook", pod, PERIOD_SECONDS):
+                allowed[thread_index] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(NUM_THREADS)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    operations = NUM_THREADS * OPERATIONS_PER_THREAD
+    contended = sum(lock.contended for lock in locks)
+    wait_sec = sum(lock.wait_sec for lock in locks)
+    print(
+        f"{name:>11} | {elapsed:>8.2f} | {operations / elapsed / 1000:>8.0f} | {contended / operations * 100:>11.2f} | "
+        f"{wait_sec:>8.2f} | {sum(allowed):>7} | {len(limiter):>6}"
+    )
+
+
+def sharded(num_shards: int):
+    limiter = ShardedRateLimiter(num_shards=num_shards)
+    for shard in limiter.shards:
+        shard.lock = CountingLock()
+    return limiter, [shard.lock for shard in limiter.shards]
+
+
+def main():
+    print(f"{NUM_THREADS} threads, {OPERATIONS_PER_THREAD} operations per thread, {PODS_PER_THREAD} pods per thread")
+    print(
+        f"{'limiter':>11} | {'time (s)':>8} | {'kops/sec':>8} | {'contended %':>11} | {'wait (s)':>8} | "
+        f"{'allowed':>7} | {'keys':>6}"
+    )
+    global_lock = GlobalLockRateLimiter()
+    run("global lock", global_lock, [global_lock.limiter_lock])
+    run("1 shard", *sharded(1))
+    run("16 shards", *sharded(16))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Import time of the runner startup, from ``python -X importtime``.
+
+Each scenario is imported in a fresh interpreter. The report has the total import time of each scenario, and the
+packages that take most of it (the self time of all their modules).
+Scenarios:
+    runner:        the runner modules, without any sink or action
+    all sinks:     runner, with every sink implementation imported (all the sink SDKs)
+    eager actions: runner, with every module of the default playbooks imported, as when loading without a manifest
+    lazy actions:  runner, with the default playbooks manifest loaded, and only the modules of the actions used by the
+                   helm chart default playbooks imported
+
+Run with:
+    poetry run python benchmarks/runner_startup_imports.py
+"""
+
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import yaml
+
+from robusta.core.playbooks.actions_manifest import build_manifest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLAYBOOKS_PACKAGE = "robusta_playbooks"
+RUNS = 3
+TOP_PACKAGES = 8
+
+RUNNER_IMPORTS = "import robusta.runner.main"
+ALL_SINKS_IMPORTS = """
+from robusta.core.sinks.sink_factory import SinkFactory
+for sink_config_class in SinkFactory._SinkFactory__sink_config_mapping:
+    SinkFactory.get_sink_class(sink_config_class.construct())
+"""
+EAGER_ACTIONS_IMPORTS = f"""
+import importlib, pkgutil
+package = importlib.import_module("{PLAYBOOKS_PACKAGE}")
+for _, module_name, _ in pkgutil.walk_packages(path=package.__path__, prefix="{PLAYBOOKS_PACKAGE}."):
+    importlib.import_module(module_name)
+"""
+LAZY_ACTIONS_IMPORTS = """
+import importlib
+from robusta.core.playbooks.actions_manifest import get_package_hash
+get_package_hash("{package}")
+for module_name in {modules}:
+    importlib.import_module(module_name)
+"""
+
+
+def default_actions_modules() -> List[str]:
+    with open(os.path.join(ROOT, "helm", "robusta", "values.yaml")) as values_file:
+        values = yaml.safe_load(values_file)
+    action_names = set()
+    for playbooks_key in ["priorityBuiltinPlaybooks", "builtinPlaybooks"]:
+        for playbook in values.get(playbooks_key) or []:
+            for playbook_action in playbook.get("actions", []):
+                action_names.update(playbook_action.keys())
+
+    manifest = build_manifest(PLAYBOOKS_PACKAGE)["actions"]
+    return sorted({manifest[name]["module"] for name in action_names if name in manifest})
+
+
+def import_times(code: str) -> List[Tuple[str, int]]:
+    """
+    The (module, self time in microseconds) of every module imported by the code
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(ROOT, "src"), os.path.join(ROOT, "playbooks")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, module_name = line[len("import time:") :].split("|")
+        times.append((module_name.strip(), int(self_time)))
+    return times
+
+
+def top_packages(times: List[Tuple[str, int]]) -> Dict[str, int]:
+    packages = defaultdict(int)
+    for module_name, self_time in times:
+        parts = module_name.split(".")
+        # robusta is split by its sub packages, to see which parts of robusta are slow
+        packages[".".join(parts[:3] if parts[0] == "robusta" else parts[:1])] += self_time
+    return dict(sorted(packages.items(), key=lambda item: -item[1])[:TOP_PACKAGES])
+
+
+def main():
+    modules = default_actions_modules()
+    scenarios = {
+        "runner": RUNNER_IMPORTS,
+        "all sinks": RUNNER_IMPORTS + ALL_SINKS_IMPORTS,
+        "eager actions": RUNNER_IMPORTS + EAGER_ACTIONS_IMPORTS,
+        "lazy actions": RUNNER_IMPORTS + LAZY_ACTIONS_IMPORTS.format(package=PLAYBOOKS_PACKAGE, modules=modules),
+    }
+    print(f"best of {RUNS} runs. lazy actions imports {len(modules)} modules of {PLAYBOOKS_PACKAGE}")
+    print(f"{'scenario':>14} | {'import (ms)':>11} | {'modules':>7}")
+    reports = {}
+    for name, code in scenarios.items():
+        runs = [import_times(code) for _ in range(RUNS)]
+        best = min(runs, key=lambda times: sum(self_time for _, self_time in times))
+        reports[name] = best
+        print(f"{name:>14} | {sum(self_time for _, self_time in best) / 1000:>11.0f} | {len(best):>7}")
+
+    for name, times in reports.items():
+        print(f"\n{name}, slowest packages (ms):")
+        for package, self_time in top_packages(times).items():
+            print(f"    {package:<40} {self_time / 1000:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
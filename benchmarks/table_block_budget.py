@@ -0,0 +1,92 @@
+"""
+Time of rendering large TableBlocks to markdown within the Slack block size limit.
+
+Compares the previous row fitting, that rendered the whole table and then binary searched the number of rows that fit
+by rendering every candidate with tabulate, with the current one, that computes the length of the table of every row
+count from cells measured once, and renders only the rows that fit. Both must produce the same markdown.
+
+Run with:
+    poetry run python benchmarks/table_block_budget.py
+"""
+
+import time
+from typing import List
+
+from tabulate import tabulate
+
+from robusta.core.model.env_vars import PRINTED_TABLE_MAX_WIDTH
+from robusta.core.reporting.blocks import BLOCK_SIZE_LIMIT, TableBlock
+
+ROW_COUNTS = [1000, 10000]
+REPEATS = 3
+HEADERS = ["label:site", "label:component", "Fired", "Resolved"]
+
+
+def table_block(num_rows: int) -> TableBlock:
+    rows = [
+        [f"ats.betting.betcatcher.validation.impl.Validator{i:05d}Foo", f"component-{i % 13}", str(i), str(i % 7)]
+        for i in range(num_rows)
+    ]
+    return TableBlock(rows=rows, headers=HEADERS)
+
+
+def previous_render_within_budget(block: TableBlock, rows: List[List[str]], col_max_width: List[int], max_chars: int):
+    """
+    The previous TableBlock.__render_within_budget, after the rows and column widths are computed
+    """
+
+    def render(subset: List[List[str]]) -> str:
+        if not subset:
+            return tabulate(subset, headers=block.headers, tablefmt="presto")
+        return tabulate(subset, headers=block.headers, tablefmt="presto", maxcolwidths=col_max_width)
+
+    full = render(rows)
+    if len(full) <= max_chars:
+        return full
+
+    best = None
+    low, high = 0, len(rows)
+    while low <= high:
+        mid = (low + high) // 2
+        candidate = render(rows[:mid])
+        if mid < len(rows):
+            candidate = f"{candidate}\n{TableBlock.default_omission_note(rows[mid:])}"
+        if len(candidate) <= max_chars:
+            best = candidate
+            low = mid + 1
+        else:
+            high = mid - 1
+    return best
+
+
+def previous_to_markdown(block: TableBlock) -> str:
+    rows = [list(map(str, row)) for row in block.render_rows()]
+    col_max_width = block._TableBlock__calc_max_width(block.headers, rows, PRINTED_TABLE_MAX_WIDTH)
+    # the budget of to_markdown for a table without a name
+    contents = previous_render_within_budget(block, rows, col_max_width, BLOCK_SIZE_LIMIT - 1 - len("```\n\n```"))
+    return f"```\n{contents}\n```"
+
+
+def timed(func) -> float:
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    print(f"to_markdown of {len(HEADERS)} column tables, within {BLOCK_SIZE_LIMIT} chars, best of {REPEATS}")
+    print(f"{'rows':>6} | {'previous (ms)':>13} | {'current (ms)':>12}")
+    for num_rows in ROW_COUNTS:
+        block = table_block(num_rows)
+        assert previous_to_markdown(block) == block.to_markdown().text
+        previous = timed(lambda: previous_to_markdown(block))
+        current = timed(lambda: block.to_markdown())
+        print(f"{num_rows:>6} | {previous * 1000:>13.1f} | {current * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
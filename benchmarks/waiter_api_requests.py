@@ -0,0 +1,121 @@
+"""
+Api requests and latency of concurrent waits for pods, with polling and with the shared watch.
+
+Runs WAITS concurrent ``wait_for_pod_status`` calls for pods of the same namespace, like concurrent debugger pods.
+Each pod succeeds at a different time, up to MAX_COMPLETION_SEC. The api server is faked: polling reads return the
+pod phase by the time, and the watch streams the pod changes when they happen.
+
+Run with:
+    poetry run python benchmarks/waiter_api_requests.py
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from kubernetes.client import V1ListMeta, V1ObjectMeta, V1Pod, V1PodList, V1PodStatus
+
+from robusta.integrations.kubernetes import api_client_utils, waiters
+from robusta.integrations.kubernetes.waiters import POD, KubernetesWaiters, WaitedKind, waiter_api_requests
+
+WAITS = 50
+MAX_COMPLETION_SEC = 3.0
+POLL_INTERVAL_SEC = 0.2
+
+
+def make_pod(name: str, phase: str, resource_version: str = "1") -> V1Pod:
+    return V1Pod(
+        metadata=V1ObjectMeta(name=name, namespace="robusta", resource_version=resource_version),
+        status=V1PodStatus(phase=phase),
+    )
+
+
+class FakeCluster:
+    def __init__(self):
+        self.start = time.time()
+        self.completion = {f"debugger-{i}": MAX_COMPLETION_SEC * (i + 1) / WAITS for i in range(WAITS)}
+
+    def phase(self, name: str) -> str:
+        return "Succeeded" if time.time() - self.start >= self.completion[name] else "Pending"
+
+    def read_namespaced_pod_status(self, name: str, namespace: str) -> V1Pod:
+        return make_pod(name, self.phase(name))
+
+    def list_namespaced_pod(self, namespace: str, **kwargs) -> V1PodList:
+        return V1PodList(
+            items=[make_pod(name, self.phase(name)) for name in self.completion],
+            metadata=V1ListMeta(resource_version="1"),
+        )
+
+    def watch(self):
+        cluster = self
+
+        class FakeWatch:
+            def __init__(self):
+                self.stopped = False
+
+            def stop(self):
+                self.stopped = True
+
+            def stream(self, func, resource_version=None, **kwargs):
+                func(watch=True)  # counted as the watch request
+                for name, completion in sorted(cluster.completion.items(), key=lambda item: item[1]):
+                    time.sleep(max(cluster.start + completion - time.time(), 0))
+                    if self.stopped:
+                        return
+                    yield {"type": "MODIFIED", "object": make_pod(name, "Succeeded", "2")}
+                while not self.stopped:
+                    time.sleep(0.01)
+
+        return FakeWatch
+
+
+def requests_count() -> int:
+    return int(
+        sum(
+            sample.value
+            for metric in waiter_api_requests.collect()
+            for sample in metric.samples
+            if sample.name.endswith("_total")
+        )
+    )
+
+
+def run(mode: str):
+    cluster = FakeCluster()
+    kind = WaitedKind("Pod", lambda: cluster.list_namespaced_pod, POD.convert)
+    core_v1 = mock.MagicMock()
+    core_v1.read_namespaced_pod_status.side_effect = cluster.read_namespaced_pod_status
+    requests_before = requests_count()
+
+    def wait(name: str) -> float:
+        result = api_client_utils.wait_for_pod_status(name, "robusta", "Succeeded", 60, POLL_INTERVAL_SEC)
+        assert result == "Succeeded"
+        return time.time() - cluster.start - cluster.completion[name]
+
+    with mock.patch.object(api_client_utils, "WATCH_BASED_WAITERS", mode == "watch"), mock.patch.object(
+        api_client_utils.core_v1_api, "CoreV1Api", return_value=core_v1
+    ), mock.patch.object(waiters, "POD", kind), mock.patch.object(
+        waiters, "kubernetes_waiters", KubernetesWaiters()
+    ), mock.patch(
+        "robusta.core.discovery.informer.watch.Watch", cluster.watch()
+    ):
+        with ThreadPoolExecutor(max_workers=WAITS) as executor:
+            latencies = list(executor.map(wait, cluster.completion))
+
+    print(
+        f"{mode:>5} | {requests_count() - requests_before:>8} | {statistics.mean(latencies) * 1000:>16.0f} | "
+        f"{max(latencies) * 1000:>15.0f}"
+    )
+
+
+def main():
+    print(f"{WAITS} concurrent pod waits, completed within {MAX_COMPLETION_SEC}s, polled every {POLL_INTERVAL_SEC}s")
+    print(f"{'mode':>5} | {'requests':>8} | {'mean delay (ms)':>16} | {'max delay (ms)':>15}")
+    run("poll")
+    run("watch")
+
+
+if __name__ == "__main__":
+    main()
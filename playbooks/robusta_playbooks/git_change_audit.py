@@ -17,6 +17,8 @@ from robusta.api import (
 import base64
 import logging
 
+from robusta.core.model.env_vars import GIT_AUDIT_WRITE_BEHIND
+
 
 class GitAuditParams(ActionParams):
     """
@@ -91,11 +93,15 @@ def git_change_audit(event: KubernetesAnyChangeEvent, action_params: GitAuditPar
         namespace = event.obj.metadata.namespace or "None"
         path = f"{git_safe_name(action_params.cluster_name)}/{git_safe_name(namespace)}"
 
+        # in write behind mode, the changes are committed and pushed in batches, in the background
+        delete = git_repo.delete_later if GIT_AUDIT_WRITE_BEHIND else git_repo.delete_push
+        commit = git_repo.commit_later if GIT_AUDIT_WRITE_BEHIND else git_repo.commit_push
+
         if event.operation == K8sOperationType.DELETE:
-            git_repo.delete_push(path, name, f"Delete {path}/{name}", action_params.cluster_name)
+            delete(path, name, f"Delete {path}/{name}", action_params.cluster_name)
         elif event.operation == K8sOperationType.CREATE:
             obj_yaml = hikaru.get_yaml(event.obj.spec)
-            git_repo.commit_push(
+            commit(
                 obj_yaml,
                 path,
                 name,
@@ -105,7 +111,7 @@ def git_change_audit(event: KubernetesAnyChangeEvent, action_params: GitAuditPar
         else:  # update
             old_spec = event.old_obj.spec if event.old_obj else None
             if obj_diff(event.obj.spec, old_spec, action_params.ignored_changes):  # we have a change in the spec
-                git_repo.commit_push(
+                commit(
                     hikaru.get_yaml(event.obj.spec),
                     path,
                     name,
@@ -122,7 +122,7 @@ def alert_handling_job(event: PrometheusKubernetesAlert, params: JobParams):
                 job.to_dict(), cls=RobustaJob
             )  # temporary workaround for https://github.com/haxsaw/hikaru/issues/15
             pod = job.get_single_pod()
-            event.add_enrichment([FileBlock("job-runner-logs.txt", pod.get_logs())])
+            event.add_enrichment([FileBlock("job-runner-logs.txt", pod.get_logs_bytes())])
         except Exception as e:
             if str(e) != "Failed to reach wait condition":
                 warning_msg = f"Error running Job: {e}"
@@ -232,7 +232,7 @@ def job_pod_enricher(event: JobEvent, params: JobPodEnricherParams):
         regex_replacement_style = (
             RegexReplacementStyle[params.regex_replacement_style] if params.regex_replacement_style else None
         )
-        log_data = pod.get_logs(
+        log_data = pod.get_logs_bytes(
             regex_replacer_patterns=params.regex_replacer_patterns,
             regex_replacement_style=regex_replacement_style,
             filter_regex=params.filter_regex,
@@ -240,7 +240,7 @@ def job_pod_enricher(event: JobEvent, params: JobPodEnricherParams):
         )
         if log_data:
             event.add_enrichment(
-                [FileBlock(filename=f"{pod.metadata.name}.log", contents=log_data.encode())],
+                [FileBlock(filename=f"{pod.metadata.name}.log", contents=log_data)],
             )
 
 
@@ -217,6 +217,7 @@ from robusta.integrations.kubernetes.api_client_utils import (
     parse_kubernetes_datetime_to_ms,
     parse_kubernetes_datetime_with_ms,
     prepare_pod_command,
+    stream_pod_logs,
     to_kubernetes_name,
     upload_file,
     wait_for_pod_status,
@@ -309,6 +310,7 @@ from robusta.integrations.prometheus.utils import (
     HolmesDiscovery,
     PrometheusDiscovery,
     ServiceDiscovery,
+    check_prometheus_connection,
     get_prometheus_connect,
 )
 from robusta.integrations.resource_analysis.cpu_analyzer import CpuAnalyzer
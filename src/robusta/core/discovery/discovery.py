@@ -1,10 +1,12 @@
 import logging
+import multiprocessing
 import os
+import queue
 import threading
 import time
 from collections import defaultdict
 from concurrent.futures.process import BrokenProcessPool, ProcessPoolExecutor
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 import dpath.util
 import prometheus_client
 from hikaru.model.rel_1_26 import (
@@ -33,6 +35,7 @@ from kubernetes.client import (
     V1Pod,
     V1PodList,
     V1PodTemplateSpec,
+    V1ReplicaSet,
     V1ReplicaSetList,
     V1StatefulSet,
     V1StatefulSetList,
@@ -41,6 +44,7 @@ from kubernetes.client import (
 from pydantic import BaseModel
 
 from robusta.core.discovery import utils
+from robusta.core.discovery.discovery_stream import ROW_TYPES, DiscoveryChunkKind
 from robusta.core.model.cluster_status import ClusterStats
 from robusta.core.model.env_vars import (
     ARGO_ROLLOUTS,
@@ -49,6 +53,7 @@ from robusta.core.model.env_vars import (
     DISCOVERY_MAX_BATCHES,
     DISCOVERY_POD_OWNED_PODS,
     DISCOVERY_PROCESS_TIMEOUT_SEC,
+    DISCOVERY_STREAM_MAX_CHUNKS,
     IS_OPENSHIFT,
     OPENSHIFT_GROUPS,
     CUSTOM_CRD
@@ -109,6 +114,10 @@ class ResourceAccessForbiddenError(Exception):
 
 class Discovery:
     executor = ProcessPoolExecutor(max_workers=1)  # always 1 discovery process
+    # streaming discovery process, created on first use. Results are sent back over the results queue
+    stream_executor: Optional[ProcessPoolExecutor] = None
+    results_queue: Optional[multiprocessing.Queue] = None
+    stream_id = 0
     stacktrace_thread_active = False
     out_of_memory_detected = False
 
@@ -202,6 +211,20 @@ class Discovery:
             ),
         )
 
+    @staticmethod
+    def create_service_info(
+        obj: Union[V1Deployment, V1DaemonSet, V1StatefulSet, V1Pod, V1ReplicaSet], kind: str
+    ) -> ServiceInfo:
+        return Discovery.__create_service_info(
+            obj.metadata,
+            kind,
+            extract_containers(obj),
+            extract_volumes(obj),
+            extract_total_pods(obj),
+            extract_ready_pods(obj),
+            is_helm_release=is_release_managed_by_helm(annotations=obj.metadata.annotations, labels=obj.metadata.labels),
+        )
+
     @staticmethod
     def count_resources(kind, api_group, version):
         if not api_group:
@@ -288,203 +311,259 @@ class Discovery:
 
 
     @staticmethod
-    def discovery_process() -> DiscoveryResults:
-        create_monkey_patches()
-        Discovery.stacktrace_thread_active = True
-        threading.Thread(target=Discovery.stack_dump_on_signal, daemon=True).start()
-        pods_metadata: List[V1ObjectMeta] = []
-        node_requests = defaultdict(list)  # map between node name, to request of pods running on it
+    def discover_custom_services() -> List[ServiceInfo]:
+        """
+        Discover services of custom resources: custom CRDs, OpenShift DeploymentConfigs and Argo Rollouts
+        """
         active_services: List[ServiceInfo] = []
-        openshift_groups: List[OpenshiftGroup] = []
-        continue_ref: Optional[str] = None
-        # discover micro services
+        for cls_name in CUSTOM_CRD:
+            if (cls := CRDS_map.get(cls_name)) is None:
+                continue
 
-        try:
-            for cls_name in CUSTOM_CRD:
-                if (cls := CRDS_map.get(cls_name)) is None:
-                    continue
+            continue_ref: Optional[str] = None
+            for _ in range(DISCOVERY_MAX_BATCHES):
+                try:
+                    crd_res = client.CustomObjectsApi().list_cluster_custom_object(
+                        group=cls.group,
+                        version=cls.version,
+                        plural=cls.plural,
+                        limit=DISCOVERY_BATCH_SIZE,
+                        _continue=continue_ref,
+                    )
+                except Exception:
+                    logging.exception(msg=f"Failed to list {cls.name} from api.")
+                    break
 
-                for _ in range(DISCOVERY_MAX_BATCHES):
+                for crd in crd_res.get("items", []):
                     try:
-                        crd_res = client.CustomObjectsApi().list_cluster_custom_object(
-                            group=cls.group,
-                            version=cls.version,
-                            plural=cls.plural,
-                            limit=DISCOVERY_BATCH_SIZE,
-                            _continue=continue_ref,
+                        meta = DictToK8sObj(crd.get("metadata"), V1ObjectMeta)
+                        active_services.extend(
+                            [
+                                Discovery.__create_service_info(
+                                    meta=meta,
+                                    kind=cls.name,
+                                    containers=[],
+                                    volumes=[],
+                                    total_pods=dpath.util.get(crd, cls.total_pods_path, default=0),
+                                    ready_pods=dpath.util.get(crd, cls.ready_pods_path, default=0),
+                                    is_helm_release=is_release_managed_by_helm(
+                                        annotations=meta.annotations, labels=meta.labels
+                                    ),
+                                )
+                            ]
                         )
                     except Exception:
-                        logging.exception(msg=f"Failed to list {cls.name} from api.")
-                        break
-
-                    for crd in crd_res.get("items", []):
-                        try:
-                            meta = DictToK8sObj(crd.get("metadata"), V1ObjectMeta)
-                            active_services.extend(
-                                [
-                                    Discovery.__create_service_info(
-                                        meta=meta,
-                                        kind=cls.name,
-                                        containers=[],
-                                        volumes=[],
-                                        total_pods=dpath.util.get(crd, cls.total_pods_path, default=0),
-                                        ready_pods=dpath.util.get(crd, cls.ready_pods_path, default=0),
-                                        is_helm_release=is_release_managed_by_helm(
-                                            annotations=meta.annotations, labels=meta.labels
-                                        ),
-                                    )
-                                ]
-                            )
-                        except Exception:
-                            logging.exception(msg=f"Failed to parse {cls.name} {crd}")
-                            continue
+                        logging.exception(msg=f"Failed to parse {cls.name} {crd}")
+                        continue
+
+                continue_ref = crd_res.get("metadata", {}).get("continue")
+                if not continue_ref:
+                    break
 
-                    continue_ref = crd_res.get("metadata", {}).get("continue")
-                    if not continue_ref:
-                        break
+        continue_ref = None
+        if IS_OPENSHIFT:
+            for _ in range(DISCOVERY_MAX_BATCHES):
+                try:
+                    deployconfigs_res = client.CustomObjectsApi().list_cluster_custom_object(
+                        group=DeploymentConfig.group,
+                        version=DeploymentConfig.version,
+                        plural=DeploymentConfig.plural,
+                        limit=DISCOVERY_BATCH_SIZE,
+                        _continue=continue_ref,
+                    )
+                except Exception:
+                    logging.exception(msg="Failed to list Deployment configs from api.")
+                    break
 
-            if IS_OPENSHIFT:
-                for _ in range(DISCOVERY_MAX_BATCHES):
+                for dc in deployconfigs_res.get("items", []):
                     try:
-                        deployconfigs_res = client.CustomObjectsApi().list_cluster_custom_object(
-                            group=DeploymentConfig.group,
-                            version=DeploymentConfig.version,
-                            plural=DeploymentConfig.plural,
-                            limit=DISCOVERY_BATCH_SIZE,
-                            _continue=continue_ref,
+                        meta = DictToK8sObj(dc.get("metadata"), V1ObjectMeta)
+                        spec = dc.get("spec", {})
+                        template = DictToK8sObj(spec.get("template"), V1PodTemplateSpec)
+
+                        active_services.extend(
+                            [
+                                Discovery.__create_service_info(
+                                    meta=meta,
+                                    kind="DeploymentConfig",
+                                    containers=template.spec.containers,
+                                    volumes=template.spec.volumes,
+                                    total_pods=spec.get("replicas", 1),
+                                    ready_pods=dc.get("status", {}).get("readyReplicas", 0),
+                                    is_helm_release=is_release_managed_by_helm(
+                                        annotations=meta.annotations, labels=meta.labels
+                                    ),
+                                )
+                            ]
                         )
                     except Exception:
-                        logging.exception(msg="Failed to list Deployment configs from api.")
-                        break
-
-                    for dc in deployconfigs_res.get("items", []):
-                        try:
-                            meta = DictToK8sObj(dc.get("metadata"), V1ObjectMeta)
-                            spec = dc.get("spec", {})
-                            template = DictToK8sObj(spec.get("template"), V1PodTemplateSpec)
-
-                            active_services.extend(
-                                [
-                                    Discovery.__create_service_info(
-                                        meta=meta,
-                                        kind="DeploymentConfig",
-                                        containers=template.spec.containers,
-                                        volumes=template.spec.volumes,
-                                        total_pods=spec.get("replicas", 1),
-                                        ready_pods=dc.get("status", {}).get("readyReplicas", 0),
-                                        is_helm_release=is_release_managed_by_helm(
-                                            annotations=meta.annotations, labels=meta.labels
-                                        ),
-                                    )
-                                ]
-                            )
-                        except Exception:
-                            logging.exception(msg=f"Failed to parse Deployment config/n {dc}")
-                            continue
+                        logging.exception(msg=f"Failed to parse Deployment config/n {dc}")
+                        continue
 
-                    continue_ref = deployconfigs_res.get("metadata", {}).get("continue")
-                    if not continue_ref:
-                        break
+                continue_ref = deployconfigs_res.get("metadata", {}).get("continue")
+                if not continue_ref:
+                    break
 
-            if OPENSHIFT_GROUPS:
-                groupname_to_namespaces = defaultdict(list)
+        continue_ref = None
+        if ARGO_ROLLOUTS:
+            for _ in range(DISCOVERY_MAX_BATCHES):
                 try:
-                    role_bindings = client.RbacAuthorizationV1Api().list_role_binding_for_all_namespaces()
-                    for role_binding in role_bindings.items:
-                        ns = role_binding.metadata.namespace
+                    rollouts_res = client.CustomObjectsApi().list_cluster_custom_object(
+                        group=Rollout.group,
+                        version=Rollout.version,
+                        plural=Rollout.plural,
+                        limit=DISCOVERY_BATCH_SIZE,
+                        _continue=continue_ref,
+                    )
+                except Exception:
+                    logging.exception(msg="Failed to list Argo Rollouts from api.")
+                    break
 
-                        if not role_binding.subjects:
-                            logging.info(f"Skipping role binding: {role_binding.metadata.name} in ns: {role_binding.metadata.namespace}")
-                            continue
+                for ro in rollouts_res.get("items", []):
+                    try:
+                        meta = DictToK8sObj(ro.get("metadata"), V1ObjectMeta)
+                        spec = ro.get("spec", {})
+                        template = DictToK8sObj(spec.get("template"), V1PodTemplateSpec)
+                        status = ro.get("status", {})
+
+                        active_services.extend(
+                            [
+                                Discovery.__create_service_info(
+                                    meta=meta,
+                                    kind=Rollout.kind,
+                                    containers=template.spec.containers if template else [],
+                                    volumes=template.spec.volumes if template else [],
+                                    total_pods=status.get("replicas", 1),
+                                    ready_pods=status.get("readyReplicas", 0),
+                                    is_helm_release=is_release_managed_by_helm(
+                                        annotations=meta.annotations, labels=meta.labels
+                                    ),
+                                )
+                            ]
+                        )
+                    except Exception:
+                        logging.exception(msg=f"Failed to parse Rollout/n {ro}")
+                        continue
+
+                continue_ref = rollouts_res.get("metadata", {}).get("continue")
+                if not continue_ref:
+                    break
+
+        return active_services
+
+    @staticmethod
+    def discover_openshift_groups() -> List[OpenshiftGroup]:
+        openshift_groups: List[OpenshiftGroup] = []
+        continue_ref: Optional[str] = None
+        if OPENSHIFT_GROUPS:
+            groupname_to_namespaces = defaultdict(list)
+            try:
+                role_bindings = client.RbacAuthorizationV1Api().list_role_binding_for_all_namespaces()
+                for role_binding in role_bindings.items:
+                    ns = role_binding.metadata.namespace
+
+                    if not role_binding.subjects:
+                        logging.info(f"Skipping role binding: {role_binding.metadata.name} in ns: {role_binding.metadata.namespace}")
+                        continue
+
+                    for subject in role_binding.subjects:
+                        if subject.kind == "Group":
+                            groupname_to_namespaces[subject.name].append(ns)
 
-                        for subject in role_binding.subjects:
-                            if subject.kind == "Group":
-                                groupname_to_namespaces[subject.name].append(ns)
+            except Exception:
+                logging.exception(msg="Failed to build Openshift rolebinding to groups map.")
 
+            for _ in range(DISCOVERY_MAX_BATCHES):
+                try:
+                    os_groups = client.CustomObjectsApi().list_cluster_custom_object(
+                        group="user.openshift.io",
+                        version="v1",
+                        plural="groups",
+                        limit=DISCOVERY_BATCH_SIZE,
+                        _continue=continue_ref,
+                    )
                 except Exception:
-                    logging.exception(msg="Failed to build Openshift rolebinding to groups map.")
+                    logging.exception(msg="Failed to list Openshift groups from api.")
+                    break
 
-                for _ in range(DISCOVERY_MAX_BATCHES):
+                for os_group in os_groups.get("items", []):
                     try:
-                        os_groups = client.CustomObjectsApi().list_cluster_custom_object(
-                            group="user.openshift.io",
-                            version="v1",
-                            plural="groups",
-                            limit=DISCOVERY_BATCH_SIZE,
-                            _continue=continue_ref,
+                        meta = os_group.get("metadata", {})
+                        name = meta.get("name")
+                        openshift_groups.extend(
+                            [
+                                OpenshiftGroup(
+                                    name=name,
+                                    users=os_group.get("users", []) or [],
+                                    namespaces=groupname_to_namespaces.get(name, []),
+                                    labels=meta.get("labels"),
+                                    annotations=meta.get("annotations"),
+                                    resource_version=meta.get("resourceVersion"),
+                                )
+                            ]
                         )
                     except Exception:
-                        logging.exception(msg="Failed to list Openshift groups from api.")
-                        break
-
-                    for os_group in os_groups.get("items", []):
-                        try:
-                            meta = os_group.get("metadata", {})
-                            name = meta.get("name")
-                            openshift_groups.extend(
-                                [
-                                    OpenshiftGroup(
-                                        name=name,
-                                        users=os_group.get("users", []) or [],
-                                        namespaces=groupname_to_namespaces.get(name, []),
-                                        labels=meta.get("labels"),
-                                        annotations=meta.get("annotations"),
-                                        resource_version=meta.get("resourceVersion"),
-                                    )
-                                ]
-                            )
-                        except Exception:
-                            logging.exception(msg=f"Failed to parse Openshift Group/n {os_group}")
-                            continue
+                        logging.exception(msg=f"Failed to parse Openshift Group/n {os_group}")
+                        continue
+
+                continue_ref = os_groups.get("metadata", {}).get("continue")
+                if not continue_ref:
+                    break
+
+        return openshift_groups
+
+    @staticmethod
+    def discover_helm_releases() -> List[HelmRelease]:
+        helm_releases_map: dict[str, HelmRelease] = {}
+        # discover helm state
+        try:
+            continue_ref: Optional[str] = None
+            for _ in range(DISCOVERY_MAX_BATCHES):
+                secrets = client.CoreV1Api().list_secret_for_all_namespaces(
+                    label_selector="owner=helm", _continue=continue_ref
+                )
+                if not secrets.items:
+                    break
+
+                for secret_item in secrets.items:
+                    release_data = secret_item.data.get("release", None)
+                    if not release_data:
+                        continue
 
-                    continue_ref = os_groups.get("metadata", {}).get("continue")
-                    if not continue_ref:
-                        break
-            # rollouts.
-            continue_ref = None
-            if ARGO_ROLLOUTS:
-                for _ in range(DISCOVERY_MAX_BATCHES):
                     try:
-                        rollouts_res = client.CustomObjectsApi().list_cluster_custom_object(
-                            group=Rollout.group,
-                            version=Rollout.version,
-                            plural=Rollout.plural,
-                            limit=DISCOVERY_BATCH_SIZE,
-                            _continue=continue_ref,
-                        )
-                    except Exception:
-                        logging.exception(msg="Failed to list Argo Rollouts from api.")
-                        break
-
-                    for ro in rollouts_res.get("items", []):
-                        try:
-                            meta = DictToK8sObj(ro.get("metadata"), V1ObjectMeta)
-                            spec = ro.get("spec", {})
-                            template = DictToK8sObj(spec.get("template"), V1PodTemplateSpec)
-                            status = ro.get("status", {})
-
-                            active_services.extend(
-                                [
-                                    Discovery.__create_service_info(
-                                        meta=meta,
-                                        kind=Rollout.kind,
-                                        containers=template.spec.containers if template else [],
-                                        volumes=template.spec.volumes if template else [],
-                                        total_pods=status.get("replicas", 1),
-                                        ready_pods=status.get("readyReplicas", 0),
-                                        is_helm_release=is_release_managed_by_helm(
-                                            annotations=meta.annotations, labels=meta.labels
-                                        ),
-                                    )
-                                ]
-                            )
-                        except Exception:
-                            logging.exception(msg=f"Failed to parse Rollout/n {ro}")
-                            continue
+                        decoded_release_row = HelmRelease.from_api_server(secret_item.data["release"])
+                        # we use map here to deduplicate and pick only the latest release data
+                        helm_releases_map[decoded_release_row.get_service_key()] = decoded_release_row
+                    except Exception as e:
+                        logging.error(f"an error occurred while decoding helm releases: {e}")
 
-                    continue_ref = rollouts_res.get("metadata", {}).get("continue")
-                    if not continue_ref:
-                        break
+                continue_ref = secrets.metadata._continue
+                if not continue_ref:
+                    break
+
+        except Exception as e:
+            logging.error(
+                "Failed to run periodic helm discovery",
+                exc_info=True,
+            )
+            raise e
+
+        return list(helm_releases_map.values())
+
+    @staticmethod
+    def discover_in_chunks() -> Iterator[Tuple[DiscoveryChunkKind, Any]]:
+        """
+        List the cluster resources, and yield them in chunks, one chunk for each listed page.
+        Only compact pod data is kept between pages, for matching pods to nodes and jobs
+        """
+        node_requests = defaultdict(list)  # map between node name, to request of pods running on it
+        # map between namespace, to the name and labels of the pods in it
+        namespace_pods: Dict[str, List[Tuple[str, Dict[str, str]]]] = defaultdict(list)
+        # discover micro services
+
+        try:
+            yield DiscoveryChunkKind.SERVICES, Discovery.discover_custom_services()
+            yield DiscoveryChunkKind.OPENSHIFT_GROUPS, Discovery.discover_openshift_groups()
 
             # discover deployments
             # using k8s api `continue` to load in batches
@@ -493,22 +572,9 @@ class Discovery:
                 deployments: V1DeploymentList = client.AppsV1Api().list_deployment_for_all_namespaces(
                     limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
                 )
-                active_services.extend(
-                    [
-                        Discovery.__create_service_info(
-                            deployment.metadata,
-                            "Deployment",
-                            extract_containers(deployment),
-                            extract_volumes(deployment),
-                            extract_total_pods(deployment),
-                            extract_ready_pods(deployment),
-                            is_helm_release=is_release_managed_by_helm(
-                                annotations=deployment.metadata.annotations, labels=deployment.metadata.labels
-                            ),
-                        )
-                        for deployment in deployments.items
-                    ]
-                )
+                yield DiscoveryChunkKind.SERVICES, [
+                    Discovery.create_service_info(deployment, "Deployment") for deployment in deployments.items
+                ]
                 continue_ref = deployments.metadata._continue
                 if not continue_ref:
                     break
@@ -519,22 +585,9 @@ class Discovery:
                 statefulsets: V1StatefulSetList = client.AppsV1Api().list_stateful_set_for_all_namespaces(
                     limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
                 )
-                active_services.extend(
-                    [
-                        Discovery.__create_service_info(
-                            statefulset.metadata,
-                            "StatefulSet",
-                            extract_containers(statefulset),
-                            extract_volumes(statefulset),
-                            extract_total_pods(statefulset),
-                            extract_ready_pods(statefulset),
-                            is_helm_release=is_release_managed_by_helm(
-                                annotations=statefulset.metadata.annotations, labels=statefulset.metadata.labels
-                            ),
-                        )
-                        for statefulset in statefulsets.items
-                    ]
-                )
+                yield DiscoveryChunkKind.SERVICES, [
+                    Discovery.create_service_info(statefulset, "StatefulSet") for statefulset in statefulsets.items
+                ]
                 continue_ref = statefulsets.metadata._continue
                 if not continue_ref:
                     break
@@ -545,22 +598,9 @@ class Discovery:
                 daemonsets: V1DaemonSetList = client.AppsV1Api().list_daemon_set_for_all_namespaces(
                     limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
                 )
-                active_services.extend(
-                    [
-                        Discovery.__create_service_info(
-                            daemonset.metadata,
-                            "DaemonSet",
-                            extract_containers(daemonset),
-                            extract_volumes(daemonset),
-                            extract_total_pods(daemonset),
-                            extract_ready_pods(daemonset),
-                            is_helm_release=is_release_managed_by_helm(
-                                annotations=daemonset.metadata.annotations, labels=daemonset.metadata.labels
-                            ),
-                        )
-                        for daemonset in daemonsets.items
-                    ]
-                )
+                yield DiscoveryChunkKind.SERVICES, [
+                    Discovery.create_service_info(daemonset, "DaemonSet") for daemonset in daemonsets.items
+                ]
                 continue_ref = daemonsets.metadata._continue
                 if not continue_ref:
                     break
@@ -571,23 +611,11 @@ class Discovery:
                 replicasets: V1ReplicaSetList = client.AppsV1Api().list_replica_set_for_all_namespaces(
                     limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
                 )
-                active_services.extend(
-                    [
-                        Discovery.__create_service_info(
-                            replicaset.metadata,
-                            "ReplicaSet",
-                            extract_containers(replicaset),
-                            extract_volumes(replicaset),
-                            extract_total_pods(replicaset),
-                            extract_ready_pods(replicaset),
-                            is_helm_release=is_release_managed_by_helm(
-                                annotations=replicaset.metadata.annotations, labels=replicaset.metadata.labels
-                            ),
-                        )
-                        for replicaset in replicasets.items
-                        if not replicaset.metadata.owner_references and replicaset.spec.replicas > 0
-                    ]
-                )
+                yield DiscoveryChunkKind.SERVICES, [
+                    Discovery.create_service_info(replicaset, "ReplicaSet")
+                    for replicaset in replicasets.items
+                    if not replicaset.metadata.owner_references and replicaset.spec.replicas > 0
+                ]
                 continue_ref = replicasets.metadata._continue
                 if not continue_ref:
                     break
@@ -599,22 +627,11 @@ class Discovery:
                 pods: V1PodList = client.CoreV1Api().list_pod_for_all_namespaces(
                     limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref
                 )
+                pod_services: List[ServiceInfo] = []
                 for pod in pods.items:
-                    pods_metadata.append(pod.metadata)
+                    namespace_pods[pod.metadata.namespace].append((pod.metadata.name, pod.metadata.labels or {}))
                     if should_report_pod(pod):
-                        active_services.append(
-                            Discovery.__create_service_info(
-                                pod.metadata,
-                                "Pod",
-                                extract_containers(pod),
-                                extract_volumes(pod),
-                                extract_total_pods(pod),
-                                extract_ready_pods(pod),
-                                is_helm_release=is_release_managed_by_helm(
-                                    annotations=pod.metadata.annotations, labels=pod.metadata.labels
-                                ),
-                            )
-                        )
+                        pod_services.append(Discovery.create_service_info(pod, "Pod"))
 
                     pod_status = pod.status.phase
                     if pod_status in ["Running", "Unknown", "Pending"] and pod.spec.node_name:
@@ -622,10 +639,13 @@ class Discovery:
                     if pod_status == "Running":
                         pods_running_count += 1
 
+                yield DiscoveryChunkKind.SERVICES, pod_services
                 continue_ref = pods.metadata._continue
                 if not continue_ref:
                     break
 
+            yield DiscoveryChunkKind.PODS_RUNNING_COUNT, pods_running_count
+
         except Exception as e:
             logging.error(
                 "Failed to run periodic service discovery",
@@ -643,9 +663,11 @@ class Discovery:
                 exc_info=True,
             )
             raise e
+        yield DiscoveryChunkKind.NODES, nodes
+        yield DiscoveryChunkKind.NODE_REQUESTS, node_requests
+        del node_requests
 
         # discover jobs
-        active_jobs: List[JobInfo] = []
         try:
             continue_ref: Optional[str] = None
             for _ in range(DISCOVERY_MAX_BATCHES):
@@ -665,6 +687,7 @@ class Discovery:
                             continue
                     raise
 
+                jobs: List[JobInfo] = []
                 for job in current_jobs.items:
                     job_pods = []
                     job_labels = {}
@@ -677,16 +700,14 @@ class Discovery:
 
                     if job_labels:  # add job pods only if we found a valid selector
                         job_pods = [
-                            pod_meta.name
-                            for pod_meta in pods_metadata
-                            if (
-                                (job.metadata.namespace == pod_meta.namespace)
-                                and (job_labels.items() <= (pod_meta.labels or {}).items())
-                            )
+                            pod_name
+                            for pod_name, pod_labels in namespace_pods.get(job.metadata.namespace, [])
+                            if job_labels.items() <= pod_labels.items()
                         ]
 
-                    active_jobs.append(JobInfo.from_api_server(job, job_pods))
+                    jobs.append(JobInfo.from_api_server(job, job_pods))
 
+                yield DiscoveryChunkKind.JOBS, jobs
                 continue_ref = current_jobs.metadata._continue
                 if not continue_ref:
                     break
@@ -697,41 +718,10 @@ class Discovery:
                 exc_info=True,
             )
             raise e
+        del namespace_pods
 
-        helm_releases_map: dict[str, HelmRelease] = {}
         if not DISABLE_HELM_MONITORING:
-            # discover helm state
-            try:
-                continue_ref: Optional[str] = None
-                for _ in range(DISCOVERY_MAX_BATCHES):
-                    secrets = client.CoreV1Api().list_secret_for_all_namespaces(
-                        label_selector="owner=helm", _continue=continue_ref
-                    )
-                    if not secrets.items:
-                        break
-
-                    for secret_item in secrets.items:
-                        release_data = secret_item.data.get("release", None)
-                        if not release_data:
-                            continue
-
-                        try:
-                            decoded_release_row = HelmRelease.from_api_server(secret_item.data["release"])
-                            # we use map here to deduplicate and pick only the latest release data
-                            helm_releases_map[decoded_release_row.get_service_key()] = decoded_release_row
-                        except Exception as e:
-                            logging.error(f"an error occurred while decoding helm releases: {e}")
-
-                    continue_ref = secrets.metadata._continue
-                    if not continue_ref:
-                        break
-
-            except Exception as e:
-                logging.error(
-                    "Failed to run periodic helm discovery",
-                    exc_info=True,
-                )
-                raise e
+            yield DiscoveryChunkKind.HELM_RELEASES, Discovery.discover_helm_releases()
 
         # discover namespaces
         try:
@@ -744,18 +734,46 @@ class Discovery:
                 exc_info=True,
             )
             raise e
+        yield DiscoveryChunkKind.NAMESPACES, namespaces
+
+    @staticmethod
+    def discovery_process() -> DiscoveryResults:
+        create_monkey_patches()
+        Discovery.stacktrace_thread_active = True
+        threading.Thread(target=Discovery.stack_dump_on_signal, daemon=True).start()
+        results = DiscoveryResults()
+        for kind, chunk in Discovery.discover_in_chunks():
+            if kind in (DiscoveryChunkKind.SERVICES, DiscoveryChunkKind.JOBS):
+                getattr(results, kind.value).extend(chunk)
+            else:
+                setattr(results, kind.value, chunk)
         Discovery.stacktrace_thread_active = False
+        return results
 
-        return DiscoveryResults(
-            services=active_services,
-            nodes=nodes,
-            node_requests=node_requests,
-            jobs=active_jobs,
-            namespaces=namespaces,
-            helm_releases=list(helm_releases_map.values()),
-            pods_running_count=pods_running_count,
-            openshift_groups=openshift_groups,
-        )
+    @staticmethod
+    def set_results_queue(results_queue: multiprocessing.Queue):
+        Discovery.results_queue = results_queue
+
+    @staticmethod
+    def discovery_stream_process(stream_id: int):
+        """
+        Run the discovery, and send the results to the parent process in chunks of compact rows.
+        The results queue is bounded, so the process waits for the parent to consume the chunks
+        """
+        create_monkey_patches()
+        Discovery.stacktrace_thread_active = True
+        threading.Thread(target=Discovery.stack_dump_on_signal, daemon=True).start()
+        try:
+            for kind, chunk in Discovery.discover_in_chunks():
+                if kind == DiscoveryChunkKind.NODE_REQUESTS:  # not used by the parent
+                    continue
+                if kind in ROW_TYPES:
+                    chunk = [ROW_TYPES[kind].from_model(model) for model in chunk]
+                # don't block forever if the parent stopped reading this stream
+                Discovery.results_queue.put((stream_id, kind, chunk), timeout=DISCOVERY_PROCESS_TIMEOUT_SEC)
+            Discovery.results_queue.put((stream_id, DiscoveryChunkKind.DONE, None), timeout=DISCOVERY_PROCESS_TIMEOUT_SEC)
+        finally:
+            Discovery.stacktrace_thread_active = False
 
     @staticmethod
     @discovery_errors_count.count_exceptions()
@@ -777,6 +795,56 @@ class Discovery:
             logging.info("Initialized new discovery pool")
             raise e
 
+    @staticmethod
+    def __create_stream_executor():
+        Discovery.results_queue = multiprocessing.Queue(maxsize=DISCOVERY_STREAM_MAX_CHUNKS)
+        Discovery.stream_executor = ProcessPoolExecutor(
+            max_workers=1, initializer=Discovery.set_results_queue, initargs=(Discovery.results_queue,)
+        )
+
+    @staticmethod
+    def stream_resources() -> Iterator[Tuple[DiscoveryChunkKind, Any]]:
+        """
+        Run the discovery process, and yield the discovered resources in chunks, as they are received.
+        Services, nodes and jobs chunks are lists of DiscoveryRow. Other chunks are the DiscoveryResults field values
+        """
+        start_time = time.time()
+        if Discovery.stream_executor is None:
+            Discovery.__create_stream_executor()
+        Discovery.stream_id += 1
+        stream_id = Discovery.stream_id
+        try:
+            future = Discovery.stream_executor.submit(Discovery.discovery_stream_process, stream_id)
+            while True:
+                remaining_time = start_time + DISCOVERY_PROCESS_TIMEOUT_SEC - time.time()
+                if remaining_time <= 0:
+                    raise TimeoutError("Discovery process timed out")
+                try:
+                    chunk_stream_id, kind, chunk = Discovery.results_queue.get(timeout=min(remaining_time, 1))
+                except queue.Empty:
+                    if future.done():
+                        future.result()  # raises the discovery process error, if it failed
+                    continue
+
+                if chunk_stream_id != stream_id:  # left over from a previous stream, that wasn't fully read
+                    continue
+                if kind == DiscoveryChunkKind.DONE:
+                    break
+                yield kind, chunk
+
+            discovery_process_time.observe(time.time() - start_time)
+        except Exception as e:
+            discovery_errors_count.inc()
+            logging.error("Discovery process internal error")
+            if isinstance(e, BrokenProcessPool):
+                Discovery.out_of_memory_detected = True
+                logging.error("The discovery process was killed, likely due to an Out of Memory error. Refer to the following documentation to increase the available memory for the pod robusta-runner: https://docs.robusta.dev/master/help.html")
+
+            Discovery.stream_executor.shutdown(wait=False, cancel_futures=True)
+            Discovery.__create_stream_executor()
+            logging.info("Initialized new streaming discovery pool")
+            raise e
+
     @staticmethod
     def discover_stats() -> ClusterStats:
         deploy_count = -1
@@ -0,0 +1,77 @@
+from enum import Enum
+from typing import Dict, Type
+
+from pydantic import BaseModel
+
+from robusta.core.model.jobs import JobInfo
+from robusta.core.model.nodes import NodeInfo
+from robusta.core.model.services import ServiceInfo
+
+
+class DiscoveryChunkKind(str, Enum):
+    # values are the matching DiscoveryResults fields
+    SERVICES = "services"
+    NODES = "nodes"
+    NODE_REQUESTS = "node_requests"
+    JOBS = "jobs"
+    NAMESPACES = "namespaces"
+    HELM_RELEASES = "helm_releases"
+    PODS_RUNNING_COUNT = "pods_running_count"
+    OPENSHIFT_GROUPS = "openshift_groups"
+    DONE = "done"
+
+
+class DiscoveryRow:
+    """
+    A discovered resource, sent from the discovery process.
+
+    The model is kept as its json, which is much smaller than the pydantic model, both in memory and pickled.
+    The model is parsed only when it's compared with the published resources
+    """
+
+    __slots__ = ("key", "data")
+    model_class: Type[BaseModel]
+
+    def __init__(self, key: str, data: str):
+        self.key = key
+        self.data = data
+
+    def __reduce__(self):
+        return self.__class__, (self.key, self.data)
+
+    @classmethod
+    def get_key(cls, model) -> str:
+        return model.get_service_key()
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "DiscoveryRow":
+        return cls(cls.get_key(model), model.json())
+
+    def to_model(self):
+        return self.model_class.parse_raw(self.data)
+
+
+class ServiceRow(DiscoveryRow):
+    __slots__ = ()
+    model_class = ServiceInfo
+
+
+class JobRow(DiscoveryRow):
+    __slots__ = ()
+    model_class = JobInfo
+
+
+class NodeRow(DiscoveryRow):
+    __slots__ = ()
+    model_class = NodeInfo
+
+    @classmethod
+    def get_key(cls, model: NodeInfo) -> str:
+        return model.name
+
+
+ROW_TYPES: Dict[DiscoveryChunkKind, Type[DiscoveryRow]] = {
+    DiscoveryChunkKind.SERVICES: ServiceRow,
+    DiscoveryChunkKind.JOBS: JobRow,
+    DiscoveryChunkKind.NODES: NodeRow,
+}
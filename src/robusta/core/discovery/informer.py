@@ -0,0 +1,390 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+import prometheus_client
+from kubernetes import client, watch
+from kubernetes.client import V1Job, V1Pod, V1ReplicaSet
+from kubernetes.client.exceptions import ApiException
+from pydantic import BaseModel
+
+from robusta.core.discovery import utils
+from robusta.core.discovery.discovery import Discovery, should_report_pod
+from robusta.core.model.env_vars import DISCOVERY_BATCH_SIZE, DISCOVERY_MAX_BATCHES, DISCOVERY_WATCH_TIMEOUT_SEC
+from robusta.core.model.jobs import SERVICE_TYPE_JOB, JobInfo
+from robusta.core.model.namespaces import NamespaceInfo
+from robusta.core.model.nodes import NodeInfo
+from robusta.core.model.pods import PodResources
+from robusta.core.model.services import ServiceInfo
+
+informer_events = prometheus_client.Counter(
+    "discovery_informer_events", "Number of watch events received by discovery informers", labelnames=("kind", "type")
+)
+informer_relists = prometheus_client.Counter(
+    "discovery_informer_relists", "Number of full lists done by discovery informers", labelnames=("kind", "reason")
+)
+
+# Called with the informer lock held, with the object key, the previous row and the new row.
+# A missing row (created or deleted object) is None
+ChangeHandler = Callable[[str, Optional[Any], Optional[Any]], None]
+
+
+def object_key(obj) -> str:
+    return f"{obj.metadata.namespace}/{obj.metadata.name}" if obj.metadata.namespace else obj.metadata.name
+
+
+class ResourceInformer:
+    """
+    Keeps a local store of a single resource kind, in sync with the api server.
+
+    The resources are listed once, and then watched from the list resourceVersion.
+    When the watch resourceVersion is too old (410 Gone), the resources are listed again, and the differences
+    between the old and the new store are reported as changes.
+    Objects are converted to rows when received, so the full api objects are not kept in memory.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        list_func: Callable,
+        convert: Callable[[Any], Any],
+        on_change: ChangeHandler,
+        lock: threading.RLock,
+    ):
+        self.kind = kind
+        self.list_func = list_func
+        self.convert = convert
+        self.on_change = on_change
+        self.lock = lock
+        self.store: Dict[str, Any] = {}
+        self.resource_version: Optional[str] = None
+        self.synced = threading.Event()
+        self.active = False
+        self.watch: Optional[watch.Watch] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.active = True
+        self.thread = threading.Thread(target=self.__run, name=f"informer-{self.kind}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.active = False
+        if self.watch:
+            self.watch.stop()
+
+    def __run(self):
+        error_delay = 1
+        while self.active:
+            try:
+                if self.resource_version is None:
+                    self.relist()
+                self.__watch()
+                error_delay = 1
+            except ApiException as e:
+                if e.status == 410:  # resource version too old
+                    logging.info(f"{self.kind} watch expired, listing again")
+                    informer_relists.labels(self.kind, "gone").inc()
+                    self.resource_version = None
+                    continue
+                logging.error(f"{self.kind} informer failed. Retrying in {error_delay} seconds", exc_info=True)
+                time.sleep(error_delay)
+                error_delay = min(error_delay * 2, 60)
+            except Exception:
+                logging.error(f"{self.kind} informer failed. Retrying in {error_delay} seconds", exc_info=True)
+                time.sleep(error_delay)
+                error_delay = min(error_delay * 2, 60)
+
+    def relist(self):
+        store: Dict[str, Any] = {}
+        continue_ref: Optional[str] = None
+        resource_version = None
+        for _ in range(DISCOVERY_MAX_BATCHES):
+            resources = self.list_func(limit=DISCOVERY_BATCH_SIZE, _continue=continue_ref)
+            for obj in resources.items:
+                store[object_key(obj)] = self.convert(obj)
+            resource_version = resources.metadata.resource_version
+            continue_ref = resources.metadata._continue
+            if not continue_ref:
+                break
+
+        informer_relists.labels(self.kind, "sync").inc()
+        with self.lock:
+            old_store = self.store
+            self.store = store
+            for key, old_row in old_store.items():
+                if key not in store:
+                    self.on_change(key, old_row, None)
+            for key, row in store.items():
+                old_row = old_store.get(key)
+                if old_row != row:
+                    self.on_change(key, old_row, row)
+            self.resource_version = resource_version
+
+        self.synced.set()
+
+    def __watch(self):
+        self.watch = watch.Watch()
+        for event in self.watch.stream(
+            self.list_func,
+            resource_version=self.resource_version,
+            timeout_seconds=DISCOVERY_WATCH_TIMEOUT_SEC,
+            allow_watch_bookmarks=True,
+        ):
+            event_type = event["type"]
+            informer_events.labels(self.kind, event_type).inc()
+            if event_type == "BOOKMARK":
+                self.resource_version = event["raw_object"]["metadata"]["resourceVersion"]
+                continue
+
+            obj = event["object"]
+            key = object_key(obj)
+            row = self.convert(obj) if event_type != "DELETED" else None
+            with self.lock:
+                if event_type == "DELETED":
+                    old_row = self.store.pop(key, None)
+                else:
+                    old_row = self.store.get(key)
+                    self.store[key] = row
+                if old_row != row:
+                    self.on_change(key, old_row, row)
+                self.resource_version = obj.metadata.resource_version
+
+            if not self.active:
+                break
+
+
+# service types discovered by the informers. Other service types (custom resources) are listed on each discovery
+WATCHED_SERVICE_TYPES = {"Deployment", "StatefulSet", "DaemonSet", "ReplicaSet", "Pod"}
+
+
+class PodRow(NamedTuple):
+    namespace: str
+    name: str
+    labels: Dict[str, str]
+    node_name: Optional[str]
+    requests: Optional[PodResources]  # only for pods that are counted on their node
+    running: bool
+    service: Optional[ServiceInfo]  # only for reported pods
+
+
+class JobRow(NamedTuple):
+    info: JobInfo  # without the job pods
+    selector: Dict[str, str]
+
+
+class IncrementalDiscoveryResults(BaseModel):
+    services: List[ServiceInfo] = []
+    deleted_services: List[str] = []
+    nodes: List[NodeInfo] = []
+    deleted_nodes: List[str] = []
+    jobs: List[JobInfo] = []
+    deleted_jobs: List[str] = []
+    namespaces: List[NamespaceInfo] = []
+    pods_running_count: int = 0
+
+
+class IncrementalDiscovery:
+    """
+    Watch based discovery.
+
+    Services, nodes, jobs and namespaces are kept up to date by informers. Each collect returns the resources that
+    changed since the previous collect, so only the changes are published.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.services: Dict[str, ServiceInfo] = {}
+        self.changed_services: Set[str] = set()
+        self.node_pods: Dict[str, Dict[str, PodResources]] = defaultdict(dict)  # node name -> pod key -> requests
+        self.changed_nodes: Set[str] = set()
+        self.namespace_pods: Dict[str, Dict[str, Dict[str, str]]] = defaultdict(dict)  # namespace -> pod -> labels
+        self.namespace_jobs: Dict[str, Set[str]] = defaultdict(set)  # namespace -> job keys
+        self.changed_jobs: Set[str] = set()
+        self.pods_running_count = 0
+
+        apps_api = client.AppsV1Api()
+        core_api = client.CoreV1Api()
+        self.workload_informers = [
+            ResourceInformer(
+                "Deployment",
+                apps_api.list_deployment_for_all_namespaces,
+                lambda deployment: Discovery.create_service_info(deployment, "Deployment"),
+                self.__on_service_change,
+                self.lock,
+            ),
+            ResourceInformer(
+                "StatefulSet",
+                apps_api.list_stateful_set_for_all_namespaces,
+                lambda statefulset: Discovery.create_service_info(statefulset, "StatefulSet"),
+                self.__on_service_change,
+                self.lock,
+            ),
+            ResourceInformer(
+                "DaemonSet",
+                apps_api.list_daemon_set_for_all_namespaces,
+                lambda daemonset: Discovery.create_service_info(daemonset, "DaemonSet"),
+                self.__on_service_change,
+                self.lock,
+            ),
+            ResourceInformer(
+                "ReplicaSet",
+                apps_api.list_replica_set_for_all_namespaces,
+                self.__to_replica_set_service,
+                self.__on_service_change,
+                self.lock,
+            ),
+        ]
+        self.pods = ResourceInformer(
+            "Pod", core_api.list_pod_for_all_namespaces, self.__to_pod_row, self.__on_pod_change, self.lock
+        )
+        self.nodes = ResourceInformer("Node", core_api.list_node, lambda node: node, self.__on_node_change, self.lock)
+        self.jobs = ResourceInformer(
+            "Job",
+            client.BatchV1Api().list_job_for_all_namespaces,
+            self.__to_job_row,
+            self.__on_job_change,
+            self.lock,
+        )
+        self.namespaces = ResourceInformer(
+            "Namespace", core_api.list_namespace, NamespaceInfo.from_api_server, lambda *args: None, self.lock
+        )
+
+    def informers(self) -> List[ResourceInformer]:
+        return self.workload_informers + [self.pods, self.nodes, self.jobs, self.namespaces]
+
+    def start(self):
+        for informer in self.informers():
+            informer.start()
+
+    def stop(self):
+        for informer in self.informers():
+            informer.stop()
+
+    def wait_for_sync(self, timeout: float) -> bool:
+        end_time = time.time() + timeout
+        return all(informer.synced.wait(max(end_time - time.time(), 0)) for informer in self.informers())
+
+    def collect(self, full: bool) -> IncrementalDiscoveryResults:
+        """
+        Return the changes since the previous collect. When full is set, all the current resources are returned
+        """
+        with self.lock:
+            if full:
+                service_keys = list(self.services.keys())
+                node_names = list(self.nodes.store.keys())
+                job_keys = list(self.jobs.store.keys())
+            else:
+                service_keys = self.changed_services
+                node_names = self.changed_nodes
+                job_keys = self.changed_jobs
+
+            results = IncrementalDiscoveryResults(
+                services=[self.services[key] for key in service_keys if key in self.services],
+                deleted_services=[key for key in service_keys if key not in self.services],
+                nodes=[self.__node_info(name) for name in node_names if name in self.nodes.store],
+                deleted_nodes=[name for name in node_names if name not in self.nodes.store],
+                jobs=[self.__job_info(key) for key in job_keys if key in self.jobs.store],
+                deleted_jobs=[self.__job_service_key(key) for key in job_keys if key not in self.jobs.store],
+                namespaces=list(self.namespaces.store.values()),
+                pods_running_count=self.pods_running_count,
+            )
+            self.changed_services = set()
+            self.changed_nodes = set()
+            self.changed_jobs = set()
+            return results
+
+    @staticmethod
+    def __to_replica_set_service(replicaset: V1ReplicaSet) -> Optional[ServiceInfo]:
+        if replicaset.metadata.owner_references or not replicaset.spec.replicas:
+            return None
+        return Discovery.create_service_info(replicaset, "ReplicaSet")
+
+    @staticmethod
+    def __to_pod_row(pod: V1Pod) -> PodRow:
+        phase = pod.status.phase if pod.status else None
+        counted_on_node = phase in ["Running", "Unknown", "Pending"] and pod.spec.node_name
+        return PodRow(
+            namespace=pod.metadata.namespace,
+            name=pod.metadata.name,
+            labels=pod.metadata.labels or {},
+            node_name=pod.spec.node_name,
+            requests=utils.k8s_pod_requests(pod) if counted_on_node else None,
+            running=phase == "Running",
+            service=Discovery.create_service_info(pod, "Pod") if should_report_pod(pod) else None,
+        )
+
+    @staticmethod
+    def __to_job_row(job: V1Job) -> JobRow:
+        selector = {}
+        if job.spec.selector:
+            selector = job.spec.selector.match_labels or {}
+        elif job.metadata.labels and job.metadata.labels.get("job-name"):
+            selector = {"job-name": job.metadata.labels["job-name"]}
+        return JobRow(info=JobInfo.from_api_server(job, []), selector=selector)
+
+    @staticmethod
+    def __job_service_key(job_key: str) -> str:
+        namespace, name = job_key.split("/", 1)
+        return f"{namespace}/{SERVICE_TYPE_JOB}/{name}"
+
+    def __node_info(self, node_name: str) -> NodeInfo:
+        return utils.from_api_server_node(self.nodes.store[node_name], list(self.node_pods.get(node_name, {}).values()))
+
+    def __job_info(self, job_key: str) -> JobInfo:
+        row: JobRow = self.jobs.store[job_key]
+        pods = []
+        if row.selector:  # add job pods only if we found a valid selector
+            pods = sorted(
+                name
+                for name, labels in self.namespace_pods.get(row.info.namespace, {}).items()
+                if row.selector.items() <= labels.items()
+            )
+        return row.info.copy(update={"job_data": row.info.job_data.copy(update={"pods": pods})})
+
+    def __on_service_change(self, key: str, old: Optional[ServiceInfo], new: Optional[ServiceInfo]):
+        if old is not None:
+            self.services.pop(old.get_service_key(), None)
+            self.changed_services.add(old.get_service_key())
+        if new is not None:
+            self.services[new.get_service_key()] = new
+            self.changed_services.add(new.get_service_key())
+
+    def __on_pod_change(self, key: str, old: Optional[PodRow], new: Optional[PodRow]):
+        self.__on_service_change(key, old.service if old else None, new.service if new else None)
+        labels_changed = old is None or new is None or old.labels != new.labels
+        if old is not None:
+            if old.requests is not None:
+                self.node_pods[old.node_name].pop(key, None)
+                self.changed_nodes.add(old.node_name)
+            self.pods_running_count -= old.running
+            if labels_changed:
+                self.namespace_pods[old.namespace].pop(old.name, None)
+                self.__on_job_pods_change(old)
+        if new is not None:
+            if new.requests is not None:
+                self.node_pods[new.node_name][key] = new.requests
+                self.changed_nodes.add(new.node_name)
+            self.pods_running_count += new.running
+            if labels_changed:
+                self.namespace_pods[new.namespace][new.name] = new.labels
+                self.__on_job_pods_change(new)
+
+    def __on_job_pods_change(self, pod: PodRow):
+        for job_key in self.namespace_jobs.get(pod.namespace, ()):
+            row: Optional[JobRow] = self.jobs.store.get(job_key)
+            if row and row.selector and row.selector.items() <= pod.labels.items():
+                self.changed_jobs.add(job_key)
+
+    def __on_node_change(self, key: str, old, new):
+        self.changed_nodes.add(key)
+
+    def __on_job_change(self, key: str, old: Optional[JobRow], new: Optional[JobRow]):
+        namespace = key.split("/", 1)[0]
+        if new is None:
+            self.namespace_jobs[namespace].discard(key)
+        else:
+            self.namespace_jobs[namespace].add(key)
+        self.changed_jobs.add(key)
@@ -19,6 +19,12 @@ DEFAULT_PLAYBOOKS_PIP_INSTALL = load_bool("DEFAULT_PLAYBOOKS_PIP_INSTALL", False
 CUSTOM_PLAYBOOKS_ROOT = os.path.join(PLAYBOOKS_ROOT, "storage")
 CUSTOM_SSH_HOST_KEYS = os.environ.get("CUSTOM_SSH_HOST_KEYS", "")
 
+# on config reloads, playbook packages with unchanged sources are not installed and imported again
+PLAYBOOKS_INCREMENTAL_RELOAD = load_bool("PLAYBOOKS_INCREMENTAL_RELOAD", True)
+# actions of packages with an up to date actions manifest are registered from the manifest, and their modules are
+# imported on first use
+LAZY_ACTIONS_LOADING = load_bool("LAZY_ACTIONS_LOADING", False)
+
 PLAYBOOKS_CONFIG_FILE_PATH = os.environ.get("PLAYBOOKS_CONFIG_FILE_PATH")
 
 INSTALLATION_NAMESPACE = os.environ.get("INSTALLATION_NAMESPACE", "robusta")
@@ -28,19 +34,51 @@ DISCOVERY_CHECK_THRESHOLD_SEC = int(os.environ.get("DISCOVERY_CHECK_THRESHOLD_SE
 DISCOVERY_PROCESS_TIMEOUT_SEC = int(os.environ.get("DISCOVERY_PROCESS_TIMEOUT_SEC", 60 * 120))  # 120 min
 DISCOVERY_WATCHDOG_CHECK_SEC = int(os.environ.get("DISCOVERY_WATCHDOG_CHECK_SEC", 15 * 120))  # 15 min
 SUPABASE_TIMEOUT_SECONDS = int(os.environ.get("SUPABASE_TIMEOUT_SECONDS", 60))
+# Findings are written to the platform in the background, in multi-row inserts
+SUPABASE_BATCH_WRITES = load_bool("SUPABASE_BATCH_WRITES", True)
+SUPABASE_BATCH_MAX_ROWS = int(os.environ.get("SUPABASE_BATCH_MAX_ROWS", 100))
+SUPABASE_BATCH_MAX_DELAY_SEC = float(os.environ.get("SUPABASE_BATCH_MAX_DELAY_SEC", 1))
+SUPABASE_BATCH_MAX_BACKLOG_ROWS = int(os.environ.get("SUPABASE_BATCH_MAX_BACKLOG_ROWS", 5000))
+SUPABASE_BATCH_MAX_RETRIES = int(os.environ.get("SUPABASE_BATCH_MAX_RETRIES", 3))
+SUPABASE_BATCH_RETRY_BACKOFF_SEC = float(os.environ.get("SUPABASE_BATCH_RETRY_BACKOFF_SEC", 1))
 GRAFANA_RENDERER_URL = os.environ.get("GRAFANA_RENDERER_URL", "http://127.0.0.1:8281/render")
 RESOURCE_UPDATES_CACHE_TTL_SEC = os.environ.get("RESOURCE_UPDATES_CACHE_TTL_SEC", 120)
 INTERNAL_PLAYBOOKS_ROOT = os.environ.get("INTERNAL_PLAYBOOKS_ROOT", "/app/src/robusta/core/playbooks/internal")
 DEFAULT_TIMEZONE = pytz.timezone(os.environ.get("DEFAULT_TIMEZONE", "UTC"))
 NUM_EVENT_THREADS = int(os.environ.get("NUM_EVENT_THREADS", 20))
 INCOMING_EVENTS_QUEUE_MAX_SIZE = int(os.environ.get("INCOMING_EVENTS_QUEUE_MAX_SIZE", 500))
+COALESCE_K8S_UPDATE_EVENTS = load_bool("COALESCE_K8S_UPDATE_EVENTS", False)
+# max number of scheduled playbooks running concurrently
+SCHEDULER_MAX_WORKERS = int(os.environ.get("SCHEDULER_MAX_WORKERS", 10))
+# scheduled jobs state changes are written to the ConfigMap in batches, at most once per this delay
+SCHEDULER_DAL_FLUSH_DELAY_SEC = float(os.environ.get("SCHEDULER_DAL_FLUSH_DELAY_SEC", 1))
+
+# Per sink delivery queues. Findings are written to each sink by its own workers, off the event workers
+SINK_DELIVERY_ASYNC = load_bool("SINK_DELIVERY_ASYNC", True)
+SINK_DELIVERY_WORKERS = int(os.environ.get("SINK_DELIVERY_WORKERS", 1))
+SINK_DELIVERY_QUEUE_MAX_SIZE = int(os.environ.get("SINK_DELIVERY_QUEUE_MAX_SIZE", 500))
+SINK_DELIVERY_OVERFLOW_POLICY = os.environ.get("SINK_DELIVERY_OVERFLOW_POLICY", "block")
+SINK_DELIVERY_BLOCK_TIMEOUT_SEC = float(os.environ.get("SINK_DELIVERY_BLOCK_TIMEOUT_SEC", 30))
+SINK_DELIVERY_SPILL_DIR = os.environ.get("SINK_DELIVERY_SPILL_DIR", "/tmp/robusta-sinks-spill")
+# On shutdown, the runner waits that long for the queued findings to be written to the sinks
+SINK_DELIVERY_SHUTDOWN_TIMEOUT_SEC = float(os.environ.get("SINK_DELIVERY_SHUTDOWN_TIMEOUT_SEC", 10))
 
 FLOAT_PRECISION_LIMIT = int(os.environ.get("FLOAT_PRECISION_LIMIT", 11))
+# chart series are downsampled to this number of points before plotting, keeping the min and max points
+CHART_MAX_POINTS_PER_SERIES = int(os.environ.get("CHART_MAX_POINTS_PER_SERIES", 600))
+CHART_RENDER_CACHE_MAX_BYTES = int(os.environ.get("CHART_RENDER_CACHE_MAX_BYTES", 50 * 1024 * 1024))
 
 PROMETHEUS_REQUEST_TIMEOUT_SECONDS = float(os.environ.get("PROMETHEUS_REQUEST_TIMEOUT_SECONDS", 90.0))
 PROMETHEUS_ENABLED = os.environ.get("PROMETHEUS_ENABLED", "false").lower() == "true"
 MANAGED_CONFIGURATION_ENABLED = os.environ.get("MANAGED_CONFIGURATION_ENABLED", "false").lower() == "true"
 PROMETHEUS_SSL_ENABLED = os.environ.get("PROMETHEUS_SSL_ENABLED", "false").lower() == "true"
+# prometheus clients are reused, and their connection is checked in the background every interval
+PROMETHEUS_HEALTH_CHECK_INTERVAL_SEC = int(os.environ.get("PROMETHEUS_HEALTH_CHECK_INTERVAL_SEC", 30))
+PROMETHEUS_CLIENT_IDLE_TIMEOUT_SEC = int(os.environ.get("PROMETHEUS_CLIENT_IDLE_TIMEOUT_SEC", 600))
+PROMETHEUS_CLIENTS_MAX_SIZE = int(os.environ.get("PROMETHEUS_CLIENTS_MAX_SIZE", 10))
+# query_range results are cached for a short time. The cache size is the total number of samples of the results
+PROMETHEUS_QUERY_CACHE_TTL_SEC = int(os.environ.get("PROMETHEUS_QUERY_CACHE_TTL_SEC", 30))
+PROMETHEUS_QUERY_CACHE_MAX_SAMPLES = int(os.environ.get("PROMETHEUS_QUERY_CACHE_MAX_SAMPLES", 500_000))
 
 INCOMING_REQUEST_TIME_WINDOW_SECONDS = int(os.environ.get("INCOMING_REQUEST_TIME_WINDOW_SECONDS", 3600))
 
@@ -49,6 +87,14 @@ RELAY_EXTERNAL_ACTIONS_URL = os.environ.get(
 )
 
 GIT_MAX_RETRIES = int(os.environ.get("GIT_MAX_RETRIES", 100))
+# Git audit changes are written to the working tree, and committed and pushed in batches by a background flusher
+GIT_AUDIT_WRITE_BEHIND = load_bool("GIT_AUDIT_WRITE_BEHIND", False)
+GIT_AUDIT_FLUSH_MAX_CHANGES = int(os.environ.get("GIT_AUDIT_FLUSH_MAX_CHANGES", 200))
+GIT_AUDIT_FLUSH_MAX_DELAY_SEC = float(os.environ.get("GIT_AUDIT_FLUSH_MAX_DELAY_SEC", 10))
+# On config reload and shutdown, the pending changes are pushed with fewer retries, and abandoned after
+# GIT_AUDIT_STOP_TIMEOUT_SEC
+GIT_AUDIT_STOP_TIMEOUT_SEC = float(os.environ.get("GIT_AUDIT_STOP_TIMEOUT_SEC", 30))
+GIT_AUDIT_STOP_MAX_RETRIES = int(os.environ.get("GIT_AUDIT_STOP_MAX_RETRIES", 3))
 
 PRINTED_TABLE_MAX_WIDTH = int(os.environ.get("PRINTED_TABLE_MAX_WIDTH", 70))
 
@@ -71,10 +117,23 @@ RUNNER_SERVICE_ACCOUNT = os.environ.get("RUNNER_SERVICE_ACCOUNT", f"{RELEASE_NAM
 
 TELEMETRY_PERIODIC_SEC = int(os.environ.get("TELEMETRY_PERIODIC_SEC", 60 * 60 * 24))  # 24H
 
+# The rate limiter of the triggers and actions is split to that many shards, each with its own lock
+RATE_LIMITER_SHARDS = int(os.environ.get("RATE_LIMITER_SHARDS", 16))
+# Above that many keys, the least recently used keys are dropped, even before their rate limit period is over
+RATE_LIMITER_MAX_KEYS = int(os.environ.get("RATE_LIMITER_MAX_KEYS", 100000))
+
 SLACK_REQUEST_TIMEOUT = int(os.environ.get("SLACK_REQUEST_TIMEOUT", 90))
 SLACK_RATE_LIMIT_RETRIES = int(os.environ.get("SLACK_RATE_LIMIT_RETRIES", 2))
 SLACK_TABLE_COLUMNS_LIMIT = int(os.environ.get("SLACK_TABLE_COLUMNS_LIMIT", 3))
 SLACK_FORWARD_URL = os.environ.get("SLACK_FORWARD_URL")  # forward endpoint "https://api.robusta.dev/slack/"
+# Send Slack requests from per channel queues, on the scheduler workers, within Slack's rate limits. Otherwise,
+# rate limited requests are retried on the calling thread
+SLACK_RATE_SCHEDULER = load_bool("SLACK_RATE_SCHEDULER", True)
+SLACK_RATE_SCHEDULER_WORKERS = int(os.environ.get("SLACK_RATE_SCHEDULER_WORKERS", 4))
+# Above that many queued requests for a channel, senders wait for their requests to be sent
+SLACK_RATE_SCHEDULER_MAX_QUEUE = int(os.environ.get("SLACK_RATE_SCHEDULER_MAX_QUEUE", 100))
+# Send the findings queued for the same channel as one digest message
+SLACK_COLLAPSE_BURSTS = load_bool("SLACK_COLLAPSE_BURSTS", False)
 DISCORD_TABLE_COLUMNS_LIMIT = int(os.environ.get("DISCORD_TABLE_COLUMNS_LIMIT", 4))
 RSA_KEYS_PATH = os.environ.get("RSA_KEYS_PATH", "/etc/robusta/auth")
 
@@ -91,6 +150,11 @@ SERVICE_CACHE_MAX_SIZE = int(os.environ.get("SERVICE_CACHE_MAX_SIZE", 1000))
 
 PORT = int(os.environ.get("PORT", 5000))  # PORT
 RUNNER_BIND_ADDR = os.environ.get("RUNNER_BIND_ADDR", "0.0.0.0")  # Listen address for runner
+# "flask" - Flask built-in server. "async" - asyncio server for the ingestion routes, other routes are served by Flask
+INGESTION_SERVER_MODE = os.environ.get("INGESTION_SERVER_MODE", "flask").lower()
+INGESTION_PARSER_THREADS = int(os.environ.get("INGESTION_PARSER_THREADS", 4))
+INGESTION_MAX_BODY_BYTES = int(os.environ.get("INGESTION_MAX_BODY_BYTES", 50 * 1024 * 1024))
+INGESTION_KEEP_ALIVE_TIMEOUT_SEC = int(os.environ.get("INGESTION_KEEP_ALIVE_TIMEOUT_SEC", 75))
 
 # additional certificate to verify, base64 encoded.
 ADDITIONAL_CERTIFICATE: str = os.environ.get("CERTIFICATE", "")
@@ -98,6 +162,32 @@ ADDITIONAL_CERTIFICATE: str = os.environ.get("CERTIFICATE", "")
 DISCOVERY_MAX_BATCHES = int(os.environ.get("DISCOVERY_MAX_BATCHES", 25))
 DISCOVERY_BATCH_SIZE = int(os.environ.get("DISCOVERY_BATCH_SIZE", 30000))
 DISCOVERY_POD_OWNED_PODS = load_bool("DISCOVERY_POD_OWNED_PODS", False)
+# "process" - periodic full listing in a subprocess. "stream" - same, with the results sent back in chunks while
+# listing. "watch" - list once, and follow the changes with watches
+DISCOVERY_MODE = os.environ.get("DISCOVERY_MODE", "process")
+# max number of result chunks waiting for the runner, before the streaming discovery process waits
+DISCOVERY_STREAM_MAX_CHUNKS = int(os.environ.get("DISCOVERY_STREAM_MAX_CHUNKS", 4))
+DISCOVERY_WATCH_TIMEOUT_SEC = int(os.environ.get("DISCOVERY_WATCH_TIMEOUT_SEC", 300))
+
+# serve the kubernetes resources of prometheus alerts from a watched in-memory cache, instead of reading them per alert
+OBJECT_CACHE_ENABLED = load_bool("OBJECT_CACHE_ENABLED", False)
+OBJECT_CACHE_TTL_SEC = int(os.environ.get("OBJECT_CACHE_TTL_SEC", 60))
+OBJECT_CACHE_MAX_SIZE = int(os.environ.get("OBJECT_CACHE_MAX_SIZE", 5000))
+# wait for pods and jobs with a watch per kind and namespace, shared by all the waits, instead of polling each object
+WATCH_BASED_WAITERS = load_bool("WATCH_BASED_WAITERS", True)
+# a waiters watch is stopped when no one waited on it for that long
+WAITER_WATCH_IDLE_SEC = int(os.environ.get("WAITER_WATCH_IDLE_SEC", 300))
+# waits fall back to polling when the watch isn't listed by then
+WAITER_SYNC_TIMEOUT_SEC = int(os.environ.get("WAITER_SYNC_TIMEOUT_SEC", 10))
+# keep the debugger pods of exec_in_debugger_pod and exec_on_node running, and lease them again per node and image
+DEBUGGER_POD_POOL_ENABLED = load_bool("DEBUGGER_POD_POOL_ENABLED", False)
+# pooled debugger pods that were not leased for that long are deleted
+DEBUGGER_POD_POOL_IDLE_TTL_SEC = int(os.environ.get("DEBUGGER_POD_POOL_IDLE_TTL_SEC", 600))
+# the most idle debugger pods kept per node and image, more are deleted when released
+DEBUGGER_POD_POOL_MAX_IDLE_PER_KEY = int(os.environ.get("DEBUGGER_POD_POOL_MAX_IDLE_PER_KEY", 2))
+# resolve the kubernetes resources of alerts received together once, concurrently, and share them between the alerts
+ALERT_RESOURCE_BATCHING = load_bool("ALERT_RESOURCE_BATCHING", True)
+ALERT_RESOURCE_WORKERS = int(os.environ.get("ALERT_RESOURCE_WORKERS", 10))
 
 DISABLE_HELM_MONITORING = load_bool("DISABLE_HELM_MONITORING", False)
 DISABLE_FINDINGS_PERSISTENCE = load_bool("DISABLE_FINDINGS_PERSISTENCE", False)
@@ -141,6 +231,8 @@ PROCESSED_ALERTS_CACHE_MAX_SIZE = int(os.environ.get("PROCESSED_ALERTS_CACHE_MAX
 
 POD_WAIT_RETRIES = int(os.environ.get("POD_WAIT_RETRIES", 10))
 POD_WAIT_RETRIES_SECONDS = int(os.environ.get("POD_WAIT_RETRIES_SECONDS", 5))
+# pod logs are streamed, and only their last POD_LOGS_MAX_BYTES bytes (after filtering and redaction) are kept
+POD_LOGS_MAX_BYTES = int(os.environ.get("POD_LOGS_MAX_BYTES", 50_000_000))
 
 HOLMES_ENABLED = load_bool("HOLMES_ENABLED", False)
 HOLMES_ASK_SLACK_BUTTON_ENABLED = load_bool("HOLMES_ASK_SLACK_BUTTON_ENABLED", True)
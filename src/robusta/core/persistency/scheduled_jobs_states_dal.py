@@ -1,66 +1,189 @@
 import json
 import logging
-from threading import Lock
-from typing import List, Optional
+import threading
+from typing import Dict, List, Optional, Set
 
 import kubernetes
+import prometheus_client
 from hikaru.model.rel_1_26 import ObjectMeta
 
-from robusta.core.model.env_vars import INSTALLATION_NAMESPACE
+from robusta.core.model.env_vars import INSTALLATION_NAMESPACE, SCHEDULER_DAL_FLUSH_DELAY_SEC
 from robusta.core.schedule.model import ScheduledJob
 from robusta.integrations.kubernetes.autogenerated.v1.models import ConfigMap
 
 JOBS_CONFIGMAP_NAME = "scheduled-jobs"
 CONFIGMAP_NAMESPACE = INSTALLATION_NAMESPACE
+MAX_CONFLICT_RETRIES = 5
+
+scheduler_dal_flushes = prometheus_client.Counter(
+    "scheduler_dal_flushes", "Number of scheduled jobs ConfigMap writes by status", labelnames=("status",)
+)
+scheduler_dal_job_changes = prometheus_client.Counter(
+    "scheduler_dal_job_changes", "Number of scheduled jobs saved or deleted"
+)
+scheduler_dal_flushed_jobs = prometheus_client.Summary(
+    "scheduler_dal_flushed_jobs", "Number of changed scheduled jobs written in a single ConfigMap write"
+)
+scheduler_dal_written_bytes = prometheus_client.Counter(
+    "scheduler_dal_written_bytes", "Total size of the scheduled jobs ConfigMap writes (bytes)"
+)
+scheduler_dal_changed_bytes = prometheus_client.Counter(
+    "scheduler_dal_changed_bytes", "Total size of the changed scheduled jobs (bytes)"
+)
 
 
 class SchedulerDal:
-    mutex = Lock()
+    """
+    Scheduled jobs states, stored in the scheduled-jobs ConfigMap.
+
+    Reads are served from an in memory mirror of the ConfigMap.
+    Changes are applied to the mirror, and written back in batches by a background flusher, using the
+    ConfigMap resourceVersion for optimistic concurrency.
+    """
 
-    def __init__(self):
+    def __init__(self, flush_delay_sec: float = SCHEDULER_DAL_FLUSH_DELAY_SEC):
+        self.flush_delay_sec = flush_delay_sec
+        self.cond = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.jobs: Dict[str, str] = {}
+        self.dirty: Set[str] = set()  # changed or deleted job ids, not written yet
+        self.resource_version: Optional[str] = None
+        self.stopped = False
         self.__init_scheduler_dal()
+        self.flusher = threading.Thread(target=self.__flusher, name="scheduler-dal-flusher", daemon=True)
+        self.flusher.start()
 
     def __load_config_map(self) -> ConfigMap:
         return ConfigMap.readNamespacedConfigMap(JOBS_CONFIGMAP_NAME, CONFIGMAP_NAMESPACE).obj
 
     def __init_scheduler_dal(self):
         try:
-            self.__load_config_map()
+            conf_map = self.__load_config_map()
         except kubernetes.client.exceptions.ApiException as e:
             # we only want to catch exceptions because the config map doesn't exist
             if e.reason != "Not Found":
                 raise
             # job states configmap doesn't exists, create it
-            self.mutex.acquire()
-            try:
-                conf_map = ConfigMap(metadata=ObjectMeta(name=JOBS_CONFIGMAP_NAME, namespace=CONFIGMAP_NAMESPACE))
-                conf_map.createNamespacedConfigMap(conf_map.metadata.namespace)
-                logging.info(f"created jobs states configmap {JOBS_CONFIGMAP_NAME} {CONFIGMAP_NAMESPACE}")
-            finally:
-                self.mutex.release()
+            conf_map = ConfigMap(metadata=ObjectMeta(name=JOBS_CONFIGMAP_NAME, namespace=CONFIGMAP_NAMESPACE))
+            conf_map = conf_map.createNamespacedConfigMap(conf_map.metadata.namespace).obj
+            logging.info(f"created jobs states configmap {JOBS_CONFIGMAP_NAME} {CONFIGMAP_NAMESPACE}")
+
+        self.jobs = dict(conf_map.data or {})
+        self.resource_version = conf_map.metadata.resourceVersion
 
     def save_scheduled_job(self, job: ScheduledJob):
-        self.mutex.acquire()
-        try:
-            confMap = self.__load_config_map()
-            confMap.data[job.job_id] = job.json()
-            confMap.replaceNamespacedConfigMap(confMap.metadata.name, confMap.metadata.namespace)
-        finally:
-            self.mutex.release()
+        job_json = job.json()
+        with self.cond:
+            self.jobs[job.job_id] = job_json
+            self.__on_changed(job.job_id, len(job_json))
 
     def get_scheduled_job(self, job_id: str) -> Optional[ScheduledJob]:
-        state_data = self.__load_config_map().data.get(job_id)
+        with self.cond:
+            state_data = self.jobs.get(job_id)
         return ScheduledJob(**json.loads(state_data)) if state_data is not None else None
 
     def del_scheduled_job(self, job_id: str):
-        self.mutex.acquire()
-        try:
-            confMap = self.__load_config_map()
-            if confMap.data.get(job_id) is not None:
-                del confMap.data[job_id]
-                confMap.replaceNamespacedConfigMap(confMap.metadata.name, confMap.metadata.namespace)
-        finally:
-            self.mutex.release()
+        with self.cond:
+            if self.jobs.pop(job_id, None) is not None:
+                self.__on_changed(job_id, 0)
 
     def list_scheduled_jobs(self) -> List[ScheduledJob]:
-        return [self.get_scheduled_job(job_id) for job_id in self.__load_config_map().data.keys()]
+        with self.cond:
+            jobs_data = list(self.jobs.values())
+        return [ScheduledJob(**json.loads(state_data)) for state_data in jobs_data]
+
+    def __on_changed(self, job_id: str, size: int):
+        # called with the lock held
+        self.dirty.add(job_id)
+        scheduler_dal_job_changes.inc()
+        scheduler_dal_changed_bytes.inc(size)
+        self.cond.notify_all()
+
+    def flush(self):
+        """
+        Write the changed jobs to the ConfigMap
+        """
+        with self.flush_lock:
+            with self.cond:
+                if not self.dirty:
+                    return
+                changed = self.dirty
+                self.dirty = set()
+
+            try:
+                self.__write(changed)
+            except Exception:
+                with self.cond:  # keep the changes, and retry on the next flush
+                    self.dirty |= changed
+                scheduler_dal_flushes.labels("error").inc()
+                raise
+
+    def stop(self):
+        """
+        Stop the background flusher, and write the pending changes
+        """
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        self.flusher.join()
+        try:
+            self.flush()
+        except Exception:
+            logging.exception("Failed to write scheduled jobs states on shutdown")
+
+    def __write(self, changed: Set[str]):
+        for _ in range(MAX_CONFLICT_RETRIES):
+            with self.cond:
+                data = dict(self.jobs)
+                resource_version = self.resource_version
+
+            conf_map = ConfigMap(
+                metadata=ObjectMeta(
+                    name=JOBS_CONFIGMAP_NAME, namespace=CONFIGMAP_NAMESPACE, resourceVersion=resource_version
+                ),
+                data=data,
+            )
+            try:
+                written = conf_map.replaceNamespacedConfigMap(JOBS_CONFIGMAP_NAME, CONFIGMAP_NAMESPACE).obj
+            except kubernetes.client.exceptions.ApiException as e:
+                if e.status != 409:
+                    raise
+                # The ConfigMap was changed by someone else. Our changes are applied on top of the latest version
+                logging.info("Scheduled jobs ConfigMap was modified, merging changes")
+                scheduler_dal_flushes.labels("conflict").inc()
+                self.__merge_remote(changed)
+                continue
+
+            with self.cond:
+                self.resource_version = written.metadata.resourceVersion
+            scheduler_dal_flushes.labels("success").inc()
+            scheduler_dal_flushed_jobs.observe(len(changed))
+            scheduler_dal_written_bytes.inc(sum(len(job_id) + len(job) for job_id, job in data.items()))
+            return
+
+        raise Exception(f"Failed to write scheduled jobs after {MAX_CONFLICT_RETRIES} conflicts")
+
+    def __merge_remote(self, changed: Set[str]):
+        remote = self.__load_config_map()
+        with self.cond:
+            local_changes = changed | self.dirty
+            merged = {job_id: job for job_id, job in (remote.data or {}).items() if job_id not in local_changes}
+            for job_id in local_changes:
+                if job_id in self.jobs:
+                    merged[job_id] = self.jobs[job_id]
+            self.jobs = merged
+            self.resource_version = remote.metadata.resourceVersion
+
+    def __flusher(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.dirty or self.stopped)
+                # let more changes accumulate, to write them together
+                self.cond.wait_for(lambda: self.stopped, self.flush_delay_sec)
+                if self.stopped:  # the pending changes are written by stop
+                    return
+
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("Failed to write scheduled jobs states")
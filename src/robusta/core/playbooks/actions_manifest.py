@@ -0,0 +1,130 @@
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import pkgutil
+from inspect import getmembers
+from typing import Dict, List, Optional
+
+from robusta.core.playbooks.actions_registry import Action
+
+# Precomputed list of the actions of a playbooks package, so the runner can register the actions without importing
+# the package modules. A module is imported when one of its actions is first used.
+# The manifest is generated into the package directory, usually when building the runner image:
+#     python -m robusta.core.playbooks.actions_manifest robusta_playbooks
+MANIFEST_FILE_NAME = "actions_manifest.json"
+
+# build outputs and caches, that are not part of the playbook package sources
+SKIPPED_SOURCE_DIRS = {"__pycache__", ".git", "build", "dist"}
+
+ActionsManifest = Dict[str, Dict[str, Optional[str]]]
+
+
+def hash_sources(hasher, path: str):
+    """
+    Add the files under path, and their relative paths, to the hash
+    """
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_SOURCE_DIRS and not d.endswith(".egg-info"))
+        for file_name in sorted(files):
+            if file_name.endswith(".pyc") or file_name == MANIFEST_FILE_NAME:
+                continue
+            file_path = os.path.join(root, file_name)
+            hasher.update(os.path.relpath(file_path, path).encode())
+            with open(file_path, "rb") as source_file:
+                hasher.update(hashlib.sha256(source_file.read()).digest())
+
+
+def get_package_paths(package_name: str) -> List[str]:
+    # the directories of an importable package, without importing it
+    try:
+        spec = importlib.util.find_spec(package_name)
+    except Exception:
+        logging.warning(f"Could not find actions package {package_name}", exc_info=True)
+        return []
+    if spec is None or not spec.submodule_search_locations:
+        return []
+    return list(spec.submodule_search_locations)
+
+
+def get_package_hash(package_name: str) -> Optional[str]:
+    package_paths = get_package_paths(package_name)
+    if not package_paths:
+        return None
+
+    hasher = hashlib.sha256()
+    for package_path in package_paths:
+        hash_sources(hasher, package_path)
+    return hasher.hexdigest()
+
+
+def type_name(cls: Optional[type]) -> Optional[str]:
+    return f"{cls.__module__}.{cls.__qualname__}" if cls is not None else None
+
+
+def build_manifest(package_name: str) -> dict:
+    """
+    Import all the modules of the package, and list its actions. Fails if a module can't be imported
+    """
+    package = importlib.import_module(package_name)
+    actions: ActionsManifest = {}
+    for _, module_name, _ in pkgutil.walk_packages(path=package.__path__, prefix=f"{package_name}."):
+        module = importlib.import_module(module_name)
+        for action_name, action_func in getmembers(module, Action.is_action):
+            action_def = Action(action_func)
+            actions[action_name] = {
+                "module": module_name,
+                "event_type": type_name(action_def.event_type),
+                "params_type": type_name(action_def.params_type),
+            }
+
+    return {"package": package_name, "sources_hash": get_package_hash(package_name), "actions": actions}
+
+
+def write_manifest(package_name: str) -> str:
+    manifest = build_manifest(package_name)
+    manifest_path = os.path.join(get_package_paths(package_name)[0], MANIFEST_FILE_NAME)
+    with open(manifest_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    return manifest_path
+
+
+def load_manifest(package_name: str) -> Optional[ActionsManifest]:
+    """
+    The actions of the package manifest. None if the package has no manifest, or if the package sources changed
+    since the manifest was generated
+    """
+    package_paths = get_package_paths(package_name)
+    if not package_paths:
+        return None
+    manifest_path = os.path.join(package_paths[0], MANIFEST_FILE_NAME)
+    if not os.path.exists(manifest_path):
+        logging.info(f"No actions manifest for package {package_name}")
+        return None
+
+    try:
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except Exception:
+        logging.warning(f"Failed to read actions manifest {manifest_path}", exc_info=True)
+        return None
+
+    if manifest.get("sources_hash") != get_package_hash(package_name):
+        logging.warning(f"Actions manifest of package {package_name} is outdated. Ignoring it")
+        return None
+    return manifest.get("actions", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the actions manifest of playbooks packages")
+    parser.add_argument("packages", nargs="+", help="playbooks packages names")
+    args = parser.parse_args()
+    for package_name in args.packages:
+        print(f"Wrote actions manifest {write_manifest(package_name)}")
+
+
+if __name__ == "__main__":
+    main()
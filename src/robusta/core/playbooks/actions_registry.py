@@ -1,4 +1,7 @@
+import importlib
 import inspect
+import logging
+import threading
 from typing import Callable, Dict, List, Optional, Tuple, Type, cast
 
 from pydantic.main import BaseModel
@@ -87,17 +90,49 @@ class Action:
 
 class ActionsRegistry:
     _actions: Dict[str, Action] = {}
+    # action name -> module name, of actions that are imported on first use
+    _lazy_actions: Dict[str, str] = {}
+    _lazy_actions_lock = threading.Lock()
 
     def add_action(self, func: Callable):
         self._actions[func.__name__] = Action(func)
+        self._lazy_actions.pop(func.__name__, None)
+
+    def add_lazy_action(self, action_name: str, module_name: str):
+        """
+        Add an action, without importing its module. The module is imported when the action is first used
+        """
+        self._lazy_actions[action_name] = module_name
+        self._actions.pop(action_name, None)
 
     def get_action(self, action_name: str) -> Optional[Action]:
-        return self._actions.get(action_name)
+        action_def = self._actions.get(action_name)
+        if action_def is None and action_name in self._lazy_actions:
+            action_def = self.__load_lazy_action(action_name)
+        return action_def
+
+    def __load_lazy_action(self, action_name: str) -> Optional[Action]:
+        with self._lazy_actions_lock:
+            module_name = self._lazy_actions.get(action_name)
+            if module_name is None:  # loaded by another thread
+                return self._actions.get(action_name)
+
+            logging.info(f"importing actions from {module_name}")
+            try:
+                action_def = Action(getattr(importlib.import_module(module_name), action_name))
+            except Exception:
+                logging.error(f"Failed to load action {action_name} from {module_name}", exc_info=True)
+                return None
+            self._actions[action_name] = action_def
+            del self._lazy_actions[action_name]
+            return action_def
 
     def get_external_actions(
         self,
     ) -> List[Tuple[str, Type[ExecutionEventBaseParams], Optional[Type[BaseModel]]]]:
         """Should be used to prepare calling schema for each action"""
+        for action_name in list(self._lazy_actions.keys()):
+            self.get_action(action_name)
         return [
             (
                 action_def.action_name,
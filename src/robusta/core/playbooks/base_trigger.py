@@ -9,6 +9,9 @@ from robusta.utils.documented_pydantic import DocumentedModel
 
 
 class TriggerEvent(BaseModel):
+    # epoch time the runner received the event. Set only for alerts received over http
+    received_at: Optional[float] = None
+
     @abc.abstractmethod
     def get_event_name(self) -> str:
         """Return trigger event name"""
@@ -41,7 +41,7 @@ def send_crash_report(
 
     for container_status in crashed_container_statuses:
         try:
-            container_log = pod.get_logs(
+            container_log = pod.get_logs_bytes(
                 container_status.name,
                 previous=True,
                 regex_replacer_patterns=regex_replacer_patterns,
@@ -55,7 +55,7 @@ def send_crash_report(
                     f"could not fetch logs from container: {container_status.name}"
                 )
             else:
-                log_block = FileBlock(filename=f"{pod.metadata.name}.log", contents=container_log.encode())
+                log_block = FileBlock(filename=f"{pod.metadata.name}.log", contents=container_log)
 
             finding.add_enrichment([log_block],
                                    enrichment_type=EnrichmentType.text_file, title="Logs")
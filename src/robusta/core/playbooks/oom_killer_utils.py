@@ -58,7 +58,7 @@ def start_log_enrichment(
 
     log_data = ""
     for _ in range(tries - 1):
-        log_data = pod.get_logs(
+        log_data = pod.get_logs_bytes(
             container=container,
             regex_replacer_patterns=params.regex_replacer_patterns,
             regex_replacement_style=regex_replacement_style,
@@ -78,7 +78,7 @@ def start_log_enrichment(
             f"could not fetch logs from container: {container}"
         )
     else:
-        log_block = FileBlock(filename=f"{pod.metadata.name}.log", contents=log_data.encode())
+        log_block = FileBlock(filename=f"{pod.metadata.name}.log", contents=log_data)
     title = "Logs" if not title_override else title_override
     event.add_enrichment([log_block],
                          enrichment_type=EnrichmentType.text_file, title=title)
@@ -1,14 +1,16 @@
-import copy
 import logging
 import sys
+import threading
 import time
 import traceback
 from collections import defaultdict
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
 
 import prometheus_client
 from prometrix import PrometheusNotFound
 
+from robusta.core.model.env_vars import DEBUGGER_POD_POOL_ENABLED, SINK_DELIVERY_SHUTDOWN_TIMEOUT_SEC
 from robusta.core.model.events import ExecutionBaseEvent, ExecutionContext
 from robusta.core.playbooks.base_trigger import BaseTrigger, TriggerEvent
 from robusta.core.playbooks.playbook_utils import merge_global_params, to_safe_str
@@ -18,7 +20,10 @@ from robusta.core.reporting import MarkdownBlock
 from robusta.core.reporting.base import Finding
 from robusta.core.reporting.consts import SYNC_RESPONSE_SINK
 from robusta.core.sinks.robusta.dal.model_conversion import ModelConversion
+from robusta.core.sinks.sink_base import SinkBase
+from robusta.integrations.git.git_repo import GitRepoManager
 from robusta.integrations.kubernetes.base_triggers import K8sBaseTrigger
+from robusta.integrations.kubernetes.custom_models import debugger_pod_pool
 from robusta.model.alert_relabel_config import AlertRelabel
 from robusta.model.config import Registry
 from robusta.model.playbook_action import PlaybookAction
@@ -32,6 +37,16 @@ playbooks_errors_count = prometheus_client.Counter(
 playbooks_summary = prometheus_client.Summary(
     "playbooks_process_time", "Total playbooks process time (seconds)", labelnames=("source",)
 )
+playbooks_trigger_candidates = prometheus_client.Summary(
+    "playbooks_trigger_candidates",
+    "Number of playbook triggers evaluated per trigger event",
+    labelnames=("event_name",),
+)
+trigger_event_sink_latency = prometheus_client.Summary(
+    "trigger_event_sink_latency",
+    "Time from receiving a trigger event, to writing its first finding to a sink (seconds)",
+    labelnames=("event_name",),
+)
 
 
 class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
@@ -39,16 +54,19 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
         self.registry = registry
 
     def handle_trigger(self, trigger_event: TriggerEvent) -> Optional[Dict[str, Any]]:
-        playbooks = self.registry.get_playbooks().get_playbooks(trigger_event)
-        if not playbooks:  # no registered playbooks for this event type
+        candidates = self.registry.get_playbooks().get_playbooks_candidates(trigger_event)
+        playbooks_trigger_candidates.labels(trigger_event.get_event_name()).observe(
+            sum(len(triggers) for _, triggers in candidates)
+        )
+        if not candidates:  # no registered playbooks that can fire on this event
             return
 
         execution_response = None
         execution_event: Optional[ExecutionBaseEvent] = None
         sink_findings: Dict[str, List[Finding]] = defaultdict(list)
         build_context: Dict[str, Any] = {}
-        for playbook in playbooks:
-            fired_trigger = self.__get_fired_trigger(trigger_event, playbook.triggers, playbook.get_id(), build_context)
+        for playbook, triggers in candidates:
+            fired_trigger = self.__get_fired_trigger(trigger_event, triggers, playbook.get_id(), build_context)
             if fired_trigger:
                 execution_event = None
                 try:
@@ -82,7 +100,7 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
                         break
 
         if execution_event:
-            self.__handle_findings(execution_event)
+            self.__handle_findings(execution_event, self.__sink_latency_observer(trigger_event))
 
         return execution_response
 
@@ -295,9 +313,29 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
                 return trigger.get()
         return None
 
-    def __handle_findings(self, execution_event: ExecutionBaseEvent):
-        sinks_info = self.registry.get_telemetry().sinks_info
+    @staticmethod
+    def __sink_latency_observer(trigger_event: TriggerEvent) -> Optional[Callable[[], None]]:
+        # observes the latency once, when the first finding of the trigger event is written to a sink
+        if not trigger_event.received_at:
+            return None
+        lock = threading.Lock()
+        observed = False
+
+        def observe():
+            nonlocal observed
+            with lock:
+                if observed:
+                    return
+                observed = True
+            trigger_event_sink_latency.labels(trigger_event.get_event_name()).observe(
+                time.time() - trigger_event.received_at
+            )
+
+        return observe
 
+    def __handle_findings(
+        self, execution_event: ExecutionBaseEvent, on_first_delivery: Optional[Callable[[], None]] = None
+    ):
         for sink_name in execution_event.sink_findings.keys():
             if SYNC_RESPONSE_SINK == sink_name:
                 continue  # not a real sink, just container for findings that needs to be returned synchronously
@@ -312,14 +350,14 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
                     # only write the finding if is matching against the sink matchers
                     if sink.accepts(finding):
                         try:
-                            # create deep copy, so that iterating on one sink enrichments won't affect the others
-                            # Each sink has a different findings, but enrichments are shared
-                            finding_copy = copy.deepcopy(finding)
-                            sink.write_finding(finding_copy, self.registry.get_sinks().platform_enabled)
-
-                            sink_info = sinks_info[sink_name]
-                            sink_info.type = sink.__class__.__name__
-                            sink_info.findings_count += 1
+                            # Each sink gets its own view of the finding, so changing the enrichments on one sink won't
+                            # affect the others. Blocks are shared between the views, and are not copied
+                            # The sink might deliver it asynchronously. Stop is decided here, regardless of the delivery
+                            sink.deliver_finding(
+                                finding.sink_view(),
+                                self.registry.get_sinks().platform_enabled,
+                                on_delivered=partial(self.__on_finding_delivered, sink, on_first_delivery),
+                            )
                         except Exception:  # if we have an error, we should still respect stop
                             logging.exception(
                                 f"Failed to send finding {finding.aggregation_key} to sink {sink.sink_name}"
@@ -331,6 +369,13 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
                 except Exception:  # Failure to send to one sink shouldn't fail all
                     logging.error(f"Failed to publish finding to sink {sink_name}", exc_info=True)
 
+    def __on_finding_delivered(self, sink: SinkBase, on_first_delivery: Optional[Callable[[], None]]):
+        sink_info = self.registry.get_telemetry().sinks_info[sink.sink_name]
+        sink_info.type = sink.__class__.__name__
+        sink_info.findings_count += 1
+        if on_first_delivery:
+            on_first_delivery()
+
     def get_global_config(self) -> dict:
         return self.registry.get_global_config()
 
@@ -356,6 +401,12 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
         for sink in self.registry.get_sinks().get_all().values():
             sink.set_cluster_active(active)
 
+    def stop_sinks_delivery(self):
+        deadline = time.time() + SINK_DELIVERY_SHUTDOWN_TIMEOUT_SEC
+        for sink in self.registry.get_sinks().get_all().values():
+            if not sink.stop_delivery(max(0.0, deadline - time.time())):
+                logging.error(f"Timed out waiting for the queued findings of sink {sink.sink_name} to be delivered")
+
     def handle_sigint(self, sig, frame):
         logging.info("SIGINT handler called")
 
@@ -366,6 +417,16 @@ class PlaybooksEventHandlerImpl(PlaybooksEventHandler):
         if receiver is not None:
             receiver.stop()
 
+        scheduler = self.registry.get_scheduler()
+        if scheduler is not None:
+            scheduler.stop()
+
+        self.stop_sinks_delivery()
+        for robusta_sink in self.registry.get_sinks().get_robusta_sinks():
+            robusta_sink.stop_writes()
+        GitRepoManager.clear_git_repos()  # push the pending git audit changes
+        if DEBUGGER_POD_POOL_ENABLED:
+            debugger_pod_pool.stop()
         self.set_cluster_active(False)
         sys.exit(0)
 
@@ -0,0 +1,128 @@
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from robusta.core.playbooks.base_trigger import TriggerEvent
+from robusta.core.playbooks.trigger import Trigger
+from robusta.integrations.kubernetes.base_triggers import K8sBaseTrigger, K8sTriggerEvent
+from robusta.model.playbook_definition import PlaybookDefinition
+
+ANY_KIND = "Any"
+
+# (playbook position, trigger position) - used to restore the configured evaluation order
+TriggerPosition = Tuple[int, int]
+
+
+class PrefixTrie:
+    """
+    Character trie keyed by literal prefixes.
+    Looking up a value returns everything stored under any prefix of that value, including the empty prefix.
+    """
+
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: Dict[str, "PrefixTrie"] = {}
+        self.values: List = []
+
+    def get_or_create(self, prefix: Optional[str]) -> "PrefixTrie":
+        node = self
+        for char in prefix or "":
+            child = node.children.get(char)
+            if child is None:
+                child = PrefixTrie()
+                node.children[char] = child
+            node = child
+        return node
+
+    def matches(self, value: Optional[str]) -> Iterator["PrefixTrie"]:
+        node = self
+        yield node
+        if not value:
+            return
+        for char in value:
+            node = node.children.get(char)
+            if node is None:
+                return
+            yield node
+
+
+class K8sTriggersIndex:
+    """
+    Dispatch index for Kubernetes triggers, built once when the playbooks configuration is loaded.
+
+    Triggers are bucketed by kind, operation, namespace_prefix and name_prefix, so that for an incoming event only
+    triggers that can pass the K8sBaseTrigger basic matching are evaluated.
+    Any other trigger (labels, scope, change filters, trigger specific logic) is still checked by ``should_fire``
+    """
+
+    def __init__(self):
+        # (kind, operation) -> namespace prefix trie -> name prefix trie -> trigger positions
+        self.buckets: Dict[Tuple[str, Optional[str]], PrefixTrie] = defaultdict(PrefixTrie)
+        # triggers that can't be indexed. Always candidates
+        self.unindexed: List[TriggerPosition] = []
+
+    def add(self, trigger: Trigger, position: TriggerPosition):
+        base_trigger = trigger.get()
+        if not isinstance(base_trigger, K8sBaseTrigger):
+            self.unindexed.append(position)
+            return
+
+        operation = base_trigger.operation.value if base_trigger.operation else None
+        namespace_node = self.buckets[(base_trigger.kind, operation)].get_or_create(base_trigger.namespace_prefix)
+        if not namespace_node.values:
+            namespace_node.values.append(PrefixTrie())
+        name_trie: PrefixTrie = namespace_node.values[0]
+        name_trie.get_or_create(base_trigger.name_prefix).values.append(position)
+
+    def get_candidates(self, trigger_event: K8sTriggerEvent) -> List[TriggerPosition]:
+        k8s_payload = trigger_event.k8s_payload
+        meta = k8s_payload.obj.get("metadata", {})
+        namespace = meta.get("namespace", "")
+        name = meta.get("name", "")
+
+        candidates: List[TriggerPosition] = list(self.unindexed)
+        for kind in {k8s_payload.kind, ANY_KIND}:
+            for operation in (k8s_payload.operation, None):
+                namespaces_trie = self.buckets.get((kind, operation))
+                if namespaces_trie is None:
+                    continue
+                for namespace_node in namespaces_trie.matches(namespace):
+                    for name_trie in namespace_node.values:
+                        for name_node in name_trie.matches(name):
+                            candidates.extend(name_node.values)
+
+        candidates.sort()
+        return candidates
+
+
+class PlaybooksTriggerIndex:
+    """
+    Playbooks lookup for a trigger event.
+    Returns the candidate playbooks, each with only the triggers that might fire, in the configured order
+    """
+
+    def __init__(self, playbooks: List[PlaybookDefinition], event_name: str):
+        self.playbooks = playbooks
+        self.k8s_index: Optional[K8sTriggersIndex] = None
+        if event_name != K8sTriggerEvent.__name__:
+            return
+
+        self.k8s_index = K8sTriggersIndex()
+        for playbook_pos, playbook in enumerate(playbooks):
+            for trigger_pos, trigger in enumerate(playbook.triggers):
+                self.k8s_index.add(trigger, (playbook_pos, trigger_pos))
+
+    def get_candidates(self, trigger_event: TriggerEvent) -> List[Tuple[PlaybookDefinition, List[Trigger]]]:
+        if self.k8s_index is None or not isinstance(trigger_event, K8sTriggerEvent):
+            return [(playbook, playbook.triggers) for playbook in self.playbooks]
+
+        candidates: List[Tuple[PlaybookDefinition, List[Trigger]]] = []
+        last_playbook_pos = None
+        for playbook_pos, trigger_pos in self.k8s_index.get_candidates(trigger_event):
+            playbook = self.playbooks[playbook_pos]
+            if playbook_pos != last_playbook_pos:
+                candidates.append((playbook, []))
+                last_playbook_pos = playbook_pos
+            candidates[-1][1].append(playbook.triggers[trigger_pos])
+
+        return candidates
@@ -17,10 +17,17 @@ from robusta.core.model.base_params import (
     ResourceChartItemType,
     ResourceChartResourceType,
 )
-from robusta.core.model.env_vars import FLOAT_PRECISION_LIMIT, PROMETHEUS_REQUEST_TIMEOUT_SECONDS
+from robusta.core.model.env_vars import PROMETHEUS_REQUEST_TIMEOUT_SECONDS
 from robusta.core.reporting.blocks import GraphBlock, PrometheusBlock, PrometheusBlockLineData
+from robusta.core.reporting.chart_rendering import CachedXY, chart_render_key, plot_values
 from robusta.core.reporting.custom_rendering import PlotCustomCSS, charts_style
-from robusta.integrations.prometheus.utils import get_prometheus_connect
+from robusta.integrations.prometheus.query_cache import align_to_step, normalize_promql, prometheus_query_cache
+from robusta.integrations.prometheus.utils import (
+    PrometheusClientPool,
+    check_prometheus_connection,
+    get_prometheus_connect,
+    prometheus_query_time,
+)
 
 ResourceKey = Tuple[ResourceChartResourceType, ResourceChartItemType]
 ChartLabelFactory = Callable[[int], str]
@@ -87,14 +94,33 @@ def run_prometheus_query_range(
     resolution = get_resolution_from_duration(query_duration)
 
     step = step if step else str(max(query_duration.total_seconds() / resolution, 1.0))
+    starts_at, ends_at = align_to_step(starts_at, ends_at, step)
 
     prom = get_prometheus_connect(prometheus_params)
     params = {"timeout": PROMETHEUS_REQUEST_TIMEOUT_SECONDS}
-    prom.check_prometheus_connection(params)
-    result = prom.safe_custom_query_range(
-        query=promql_query, start_time=starts_at, end_time=ends_at, step=step, params=params
-    )
 
+    def query_range() -> dict:
+        check_prometheus_connection(prom, params)
+        with prometheus_query_time.labels("query_range").time():
+            return PrometheusClientPool.run_query(
+                prom,
+                lambda: prom.safe_custom_query_range(
+                    query=promql_query, start_time=starts_at, end_time=ends_at, step=step, params=params
+                ),
+            )
+
+    # the url, query string and headers identify the prometheus and its tenant
+    cache_key = (
+        prom.url,
+        prometheus_params.prometheus_url_query_string,
+        tuple(sorted((prometheus_params.prometheus_additional_headers or {}).items())),
+        tuple(sorted((prometheus_params.prometheus_additional_labels or {}).items())),
+        normalize_promql(promql_query),
+        starts_at.timestamp(),
+        ends_at.timestamp(),
+        step,
+    )
+    result = prometheus_query_cache.get(cache_key, query_range)
     return PrometheusQueryResult(data=result)
 
 
@@ -222,13 +248,7 @@ def create_chart_from_prometheus_query(
         if label == "" and chart_label_factory is not None:
             label = chart_label_factory(i)
 
-        values = []
-        for index in range(len(series["values"])):
-            timestamp = series["timestamps"][index]
-            value = round(float(series["values"][index]), FLOAT_PRECISION_LIMIT)
-            values.append((timestamp, value))
-            if value > max_y_value:
-                max_y_value = value
+        values, max_y_value = plot_values(series, max_y_value)
         min_time = min(min_time, min(series["timestamps"]))
         max_time = max(max_time, max(series["timestamps"]))
 
@@ -301,7 +321,7 @@ def create_chart_from_prometheus_query(
     config = pygal.Config()
     custom_css = PlotCustomCSS().get_css_file_path()
     config.css.append(f"file://{custom_css}")
-    chart = pygal.XY(
+    chart = CachedXY(
         config,
         show_dots=True,
         style=charts_style(graph_colors=tuple(graph_plot_color_list)),
@@ -390,6 +410,15 @@ def create_chart_from_prometheus_query(
             dots_size=p.dots_size,
             stroke=p.stroke,
         )
+    chart.render_key = chart_render_key(
+        chart.title,
+        chart_values_format,
+        include_x_axis,
+        hide_legends,
+        chart.range,
+        chart.y_labels,
+        [(p.plot, p.color, p.stroke_style, p.show_dots, p.dots_size, p.stroke) for p in plot_data_list],
+    )
     return chart, PrometheusBlock(
         data=prometheus_query_result,
         query=promql_query,
@@ -455,11 +484,7 @@ def build_chart_from_prometheus_result(
         if not label:
             label = "\n".join([v for (key, v) in series["metric"].items() if key != "job"])
 
-        values = []
-        for idx, timestamp in enumerate(series["timestamps"]):
-            val = round(float(series["values"][idx]), FLOAT_PRECISION_LIMIT)
-            values.append((timestamp, val))
-            max_y_value = max(max_y_value, val)
+        values, max_y_value = plot_values(series, max_y_value)
 
         min_time = min(min_time, min(series["timestamps"]))
         max_time = max(max_time, max(series["timestamps"]))
@@ -482,7 +507,7 @@ def build_chart_from_prometheus_result(
     graph_colors = [plot_data.color for plot_data in plot_data_list]
     graph_colors.extend(["#1e0047", "#2a0065"])
 
-    chart = pygal.XY(
+    chart = CachedXY(
         config,
         show_dots=True,
         style=charts_style(graph_colors=tuple(graph_colors)),
@@ -532,6 +557,9 @@ def build_chart_from_prometheus_result(
             dots_size=plot_data.dots_size,
             stroke=plot_data.stroke,
         )
+    chart.render_key = chart_render_key(
+        chart.title, values_format, chart.range, [(p.plot, p.color, p.stroke_style) for p in plot_data_list]
+    )
 
     return chart
 
@@ -544,8 +572,9 @@ def run_prometheus_query(prometheus_params: PrometheusParams, query: str) -> Pro
     prom = get_prometheus_connect(prometheus_params)
     query = __add_additional_labels(query, prometheus_params)
     prom_params = {"timeout": PROMETHEUS_REQUEST_TIMEOUT_SECONDS}
-    prom.check_prometheus_connection(prom_params)
-    results = prom.safe_custom_query(query=query, params=prom_params)
+    check_prometheus_connection(prom, prom_params)
+    with prometheus_query_time.labels("query").time():
+        results = PrometheusClientPool.run_query(prom, lambda: prom.safe_custom_query(query=query, params=prom_params))
     return PrometheusQueryResult(results)
 
 
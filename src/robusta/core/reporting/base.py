@@ -1,3 +1,4 @@
+import copy
 import hashlib
 import logging
 import re
@@ -151,6 +152,17 @@ class Enrichment:
     def __str__(self):
         return f"annotations: {self.annotations} Enrichment: {self.blocks} "
 
+    def sink_view(self) -> "Enrichment":
+        """
+        Returns a shallow copy of the enrichment.
+        The blocks list and annotations can be changed freely. The blocks themselves are shared, and must not be
+        changed in place
+        """
+        view = copy.copy(self)
+        view.blocks = list(self.blocks)
+        view.annotations = dict(self.annotations)
+        return view
+
 
 class FilterableScopeMatcher(BaseScopeMatcher):
     def __init__(self, data):
@@ -366,6 +378,17 @@ class Finding(Filterable):
             logging.warning("Updating a finding after it was added to the event is not allowed!")
         self.links.append(link)
 
+    def sink_view(self) -> "Finding":
+        """
+        Returns a copy of the finding for a single sink.
+        Enrichments and links are copied, so a sink can replace or reorder them without affecting other sinks.
+        Blocks are shared between all the views, and must not be changed in place (copy the block instead)
+        """
+        view = copy.copy(self)
+        view.enrichments = [enrichment.sink_view() for enrichment in self.enrichments]
+        view.links = list(self.links)
+        return view
+
     def add_video_link(self, video_link: Link, suppress_warning: bool = False) -> None:
         # For backward compatability
         video_link.type = LinkType.VIDEO
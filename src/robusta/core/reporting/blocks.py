@@ -3,6 +3,7 @@
 # 1. We use pydantic and not dataclasses so that field types are validated
 # 2. We add __init__ methods ourselves for convenience. Without our own __init__ method, something like
 #       HeaderBlock("foo") doesn't work. Only HeaderBlock(text="foo") would be allowed by pydantic.
+import base64
 import gzip
 import itertools
 import json
@@ -16,7 +17,7 @@ from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple
 import hikaru
 from hikaru import DiffDetail, DiffType
 from hikaru.model.rel_1_26 import HikaruDocumentBase
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from robusta.core.model.base_params import ChartValuesFormat
 
@@ -35,6 +36,7 @@ from robusta.core.model.pods import format_unit
 from robusta.core.reporting.base import BaseBlock
 from robusta.core.reporting.consts import ScanType
 from robusta.core.reporting.custom_rendering import render_value
+from robusta.core.reporting.table_lengths import PrestoTableLengths
 
 BLOCK_SIZE_LIMIT = 2997  # due to slack block size limit of 3000
 
@@ -79,6 +81,10 @@ class FileBlock(BaseBlock):
 
     filename: str
     contents: bytes
+    # computed on first use and shared by all the sinks of the block, with the contents and filename they were computed
+    # from, so they are computed again if those were replaced
+    _zipped: Optional[Tuple[bytes, str, "FileBlock"]] = PrivateAttr(default=None)
+    _base64: Optional[Tuple[bytes, str]] = PrivateAttr(default=None)
 
     def __init__(
         self,
@@ -100,40 +106,64 @@ class FileBlock(BaseBlock):
         return self.filename.endswith((".txt", ".log"))
 
     def zip(self):
+        zipped = self.zipped()
+        self.contents = zipped.contents
+        self.filename = zipped.filename
+        # the caches reference the original contents, that aren't needed anymore
+        self._zipped = None
+        self._base64 = None
+
+    def zipped(self) -> "FileBlock":
+        """
+        Returns a zipped copy of this block, without changing it.
+        Blocks are shared between sinks, so sinks should use this instead of zip(). The copy is computed once and
+        returned to every sink, so it shouldn't be changed either
+        """
+        if self._zipped is not None and self._zipped[0] is self.contents and self._zipped[1] == self.filename:
+            return self._zipped[2]
         try:
-            self.contents = gzip.compress(self.contents)
-            self.filename = self.filename + ".gz"
+            zipped = self.copy(update={"contents": gzip.compress(self.contents), "filename": self.filename + ".gz"})
         except Exception as exc:
             logging.error(f"Unexpected error occurred while zipping file {self.filename}")
             logging.exception(exc)
+            return self
+        zipped._zipped = None  # copied from this block
+        zipped._base64 = None
+        self._zipped = (self.contents, self.filename, zipped)
+        return zipped
 
-    def truncate_content(self, max_file_size_bytes: int) -> bytes:
+    def base64_contents(self) -> str:
         """
-        Truncates the log file by removing lines from the beginning until its size is within the given limit.
+        Returns the contents encoded as base64, computed once for all the sinks
         """
-        # we don't want to truncate other files like images
-        if not self.is_text_file():
-            return self.contents
-
-        decoded_content = self.contents.decode("utf-8")
-        content_length = len(decoded_content)
+        if self._base64 is None or self._base64[0] is not self.contents:
+            self._base64 = (self.contents, base64.b64encode(self.contents).decode("ascii"))
+        return self._base64[1]
 
-        if content_length <= max_file_size_bytes:
-            return self.contents
-
-        lines = decoded_content.splitlines()
-        byte_length_newline = len("\n".encode("utf-8"))
-
-        truncated_lines: List[str] = []
-        for idx, line in enumerate(lines):
-            line_content_length = len(line) + byte_length_newline
+    def truncated_view(self, max_file_size_bytes: int) -> memoryview:
+        """
+        Returns a view of the last whole lines of a text file that fit in max_file_size_bytes, without copying or
+        decoding the contents. Only the newline bytes after the cut are scanned, to find where the first kept line
+        starts. Other files, like images, are never truncated
+        """
+        contents = memoryview(self.contents)
+        if not self.is_text_file() or len(contents) <= max_file_size_bytes:
+            return contents
 
-            content_length -= line_content_length
-            if content_length <= max_file_size_bytes:
-                truncated_lines = lines[idx + 1 :]
-                break
+        start = len(contents) - max(max_file_size_bytes, 0)
+        if self.contents[start - 1] != ord("\n"):
+            newline = self.contents.find(b"\n", start)
+            start = newline + 1 if newline != -1 else len(contents)
+        return contents[start:]
 
-        return "\n".join(truncated_lines).encode("utf-8")
+    def truncate_content(self, max_file_size_bytes: int) -> bytes:
+        """
+        Truncates the log file by removing lines from the beginning until its size is within the given limit.
+        """
+        truncated = self.truncated_view(max_file_size_bytes)
+        if len(truncated) == len(self.contents):
+            return self.contents
+        return truncated.tobytes()
 
 
 class EmptyFileBlock(BaseBlock):
@@ -445,43 +475,70 @@ class TableBlock(BaseBlock):
     def default_omission_note(omitted_rows: List[List[str]]) -> str:
         return f"... {len(omitted_rows)} more rows not shown"
 
-    def __render_within_budget(self, max_chars: int, table_max_width: int, table_fmt: str, omission_note) -> str:
-        """Render the table, dropping whole rows to fit max_chars.
+    @staticmethod
+    def __fit_rows(rows: List[List[str]], max_chars: int, omission_note, table_length) -> Optional[int]:
+        """The largest number of whole rows that fits alongside the "N more rows" note, or None if none fit.
 
-        Values themselves are never cut - long ones wrap onto extra lines - so rows must be
-        dropped as complete units. Cutting by physical line would leave a wrapped value's
-        continuation behind and show a partial value as if it were the whole thing.
+        :param table_length: the length of the table of the first given number of rows.
         """
-        rows = self.__to_strings_rows(self.render_rows())
-        # Column widths are computed once from all rows, so dropping rows never reflows
-        # the columns and the rendered size shrinks monotonically with the row count.
-        col_max_width = self.__calc_max_width(self.headers, rows, table_max_width)
-
-        def render(subset: List[List[str]]) -> str:
-            if not subset:  # tabulate raises IndexError on maxcolwidths with no rows
-                return tabulate(subset, headers=self.headers, tablefmt=table_fmt)
-            return tabulate(subset, headers=self.headers, tablefmt=table_fmt, maxcolwidths=col_max_width)
+        if table_length(len(rows)) <= max_chars:
+            return len(rows)
 
-        full = render(rows)
-        if len(full) <= max_chars:
-            return full
-
-        # Largest number of whole rows that fits alongside the "N more rows" note.
         best = None
         low, high = 0, len(rows)
         while low <= high:
             mid = (low + high) // 2
-            candidate = render(rows[:mid])
+            length = table_length(mid)
             if mid < len(rows):
-                candidate = f"{candidate}\n{omission_note(rows[mid:])}"
-            if len(candidate) <= max_chars:
-                best = candidate
+                length += len(f"\n{omission_note(rows[mid:])}")
+            if length <= max_chars:
+                best = mid
                 low = mid + 1
             else:
                 high = mid - 1
+        return best
+
+    def __render_within_budget(self, max_chars: int, table_max_width: int, table_fmt: str, omission_note) -> str:
+        """Render the table, dropping whole rows to fit max_chars.
 
-        # Fall back to the line-based trim if not even a header-only table fits.
-        return best if best is not None else self.__trim_rows(full, max_chars)
+        Values themselves are never cut - long ones wrap onto extra lines - so rows must be
+        dropped as complete units. Cutting by physical line would leave a wrapped value's
+        continuation behind and show a partial value as if it were the whole thing.
+        """
+        rows = self.__to_strings_rows(self.render_rows())
+        # Column widths are computed once from all rows, so dropping rows never reflows
+        # the columns and the rendered size shrinks monotonically with the row count.
+        col_max_width = self.__calc_max_width(self.headers, rows, table_max_width)
+        rendered = {}
+
+        def render(count: int) -> str:
+            if count not in rendered:
+                subset = rows[:count]
+                if not subset:  # tabulate raises IndexError on maxcolwidths with no rows
+                    rendered[count] = tabulate(subset, headers=self.headers, tablefmt=table_fmt)
+                else:
+                    rendered[count] = tabulate(
+                        subset, headers=self.headers, tablefmt=table_fmt, maxcolwidths=col_max_width
+                    )
+            return rendered[count]
+
+        # Presto tables are measured for every row count from their cells, and only the fitting one is rendered.
+        lengths = PrestoTableLengths.of(rows, self.headers, col_max_width, max_chars) if table_fmt == "presto" else None
+        count = None
+        if lengths is not None:
+            count = self.__fit_rows(rows, max_chars, omission_note, lengths.length)
+            if count is not None and len(render(count)) != lengths.length(count):
+                logging.warning(f"Computed table length differs from the rendered table of {count} rows")
+                lengths = None
+        if lengths is None:
+            count = self.__fit_rows(rows, max_chars, omission_note, lambda count: len(render(count)))
+
+        if count is None:
+            # Fall back to the line-based trim if not even a header-only table fits.
+            return self.__trim_rows(render(len(rows)), max_chars)
+        if count < len(rows):
+            return f"{render(count)}\n{omission_note(rows[count:])}"
+        return render(count)
 
     @classmethod
     def __to_strings_rows(cls, rows):
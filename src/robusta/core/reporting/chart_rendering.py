@@ -0,0 +1,112 @@
+import hashlib
+import threading
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import prometheus_client
+import pygal
+from cachetools import LRUCache
+
+from robusta.core.model.env_vars import CHART_MAX_POINTS_PER_SERIES, CHART_RENDER_CACHE_MAX_BYTES, FLOAT_PRECISION_LIMIT
+
+chart_render_cache_requests = prometheus_client.Counter(
+    "chart_render_cache_requests",
+    "Number of chart renders by the render cache result (hit/miss)",
+    labelnames=("result",),
+)
+
+
+def series_arrays(series: dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The timestamps and values of a Prometheus series, as arrays. Values are rounded to FLOAT_PRECISION_LIMIT
+    """
+    timestamps = np.asarray(series["timestamps"], dtype=np.float64)
+    values = np.round(np.asarray(series["values"], dtype=np.float64), FLOAT_PRECISION_LIMIT)
+    return timestamps, values
+
+
+def max_value(values: np.ndarray, default: float) -> float:
+    # NaN values are ignored
+    values = values[~np.isnan(values)]
+    return max(default, float(values.max())) if values.size else default
+
+
+def downsample_min_max(
+    timestamps: np.ndarray, values: np.ndarray, max_points: int = CHART_MAX_POINTS_PER_SERIES
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a series to at most max_points points, for plotting.
+
+    The series is split to max_points / 2 buckets of consecutive points, and the min and max points of each bucket are
+    kept, so peaks are still visible. The first and last points are always kept
+    """
+    count = len(values)
+    buckets = max(max_points // 2, 1)
+    if count <= max_points or count <= 2:
+        return timestamps, values
+
+    bucket_size = -(-count // buckets)  # ceil
+    padding = bucket_size * buckets - count
+    # NaN values, and the padding of the last bucket, are never the min or the max, unless the whole bucket is NaN
+    for_max = np.pad(np.where(np.isnan(values), -np.inf, values), (0, padding), constant_values=-np.inf)
+    for_min = np.pad(np.where(np.isnan(values), np.inf, values), (0, padding), constant_values=np.inf)
+    offsets = np.arange(buckets) * bucket_size
+    max_indices = offsets + for_max.reshape(buckets, bucket_size).argmax(axis=1)
+    min_indices = offsets + for_min.reshape(buckets, bucket_size).argmin(axis=1)
+
+    indices = np.unique(np.concatenate(([0, count - 1], min_indices, max_indices)))
+    indices = indices[indices < count]
+    return timestamps[indices], values[indices]
+
+
+def plot_values(series: dict, max_y_value: float, max_points: int = CHART_MAX_POINTS_PER_SERIES) -> Tuple[list, float]:
+    """
+    The (timestamp, value) points to plot for a Prometheus series, and the max of max_y_value and the series values
+    """
+    timestamps, values = series_arrays(series)
+    max_y_value = max_value(values, max_y_value)
+    timestamps, values = downsample_min_max(timestamps, values, max_points)
+    return list(zip(timestamps.tolist(), values.tolist())), max_y_value
+
+
+def chart_render_key(*parts: Any) -> str:
+    key = hashlib.sha256()
+    for part in parts:
+        key.update(repr(part).encode())
+    return key.hexdigest()
+
+
+class CachedXY(pygal.XY):
+    """
+    pygal XY chart, that reuses the rendered svg of identical charts.
+
+    render_key should identify everything the chart is built from (series, lines, titles and formats). A chart
+    without a render_key is always rendered
+    """
+
+    render_cache = LRUCache(maxsize=CHART_RENDER_CACHE_MAX_BYTES, getsizeof=len)
+    render_cache_lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.render_key: Optional[str] = None
+
+    def render(self, is_unicode=False, **kwargs):
+        if self.render_key is None or kwargs:
+            return super().render(is_unicode=is_unicode, **kwargs)
+
+        key = (self.render_key, is_unicode)
+        with CachedXY.render_cache_lock:
+            svg = CachedXY.render_cache.get(key)
+        if svg is not None:
+            chart_render_cache_requests.labels("hit").inc()
+            return svg
+
+        chart_render_cache_requests.labels("miss").inc()
+        svg = super().render(is_unicode=is_unicode)
+        with CachedXY.render_cache_lock:
+            try:
+                CachedXY.render_cache[key] = svg
+            except ValueError:  # larger than the whole cache
+                pass
+        return svg
@@ -0,0 +1,168 @@
+import re
+from itertools import accumulate
+from typing import List, Optional, Sequence
+
+try:
+    import tabulate as tabulate_module
+except ImportError:
+    tabulate_module = None
+
+# Other characters, like wide characters, terminal codes or other line breaks, change how tabulate measures cells
+_UNSUPPORTED_CHARACTERS = re.compile(r"[^\x20-\x7e\n]")
+
+
+def _wrap(cell: str, width: int) -> str:
+    # textwrap keeps a cell without whitespace that fits the width as is, and most cells are like that
+    if len(cell) <= width and " " not in cell and "\n" not in cell:
+        return cell
+    return tabulate_module._wrap_text_to_colwidths([[cell]], [width])[0][0]
+
+
+class _DecimalStats:
+    """
+    Running maxima and sums of the cells of a column aligned to the decimal point, for each row count
+    """
+
+    def __init__(self, cells: List[str]):
+        decimals = [tabulate_module._afterpoint(cell) for cell in cells]
+        self.max_decimals = list(accumulate(decimals, max, initial=-1))
+        # the width without the spaces that align the decimal point
+        self.max_width = list(accumulate((len(cell) - dec for cell, dec in zip(cells, decimals)), max, initial=0))
+        # the cells of the last column are right stripped, counted relative to the end of the column
+        self.last_column_sum = list(
+            accumulate((dec - (len(cell) - len(cell.rstrip())) for cell, dec in zip(cells, decimals)), initial=0)
+        )
+
+
+class _ColumnLengths:
+    def __init__(self, header: str, cells: List[str]):
+        self.header = header
+        self.types = list(
+            accumulate(
+                (tabulate_module._type(cell, False) for cell in cells), tabulate_module._more_generic, initial=bool
+            )
+        )
+        stripped = [cell.strip() for cell in cells]
+        self.text_width = list(accumulate((max(map(len, cell.split("\n"))) for cell in stripped), max, initial=0))
+        self.text_last_column_sum = list(
+            accumulate(
+                (sum(1 + len(line.rstrip()) for line in cell.splitlines() if line.rstrip()) for cell in stripped),
+                initial=0,
+            )
+        )
+        # only the rows before the first text cell are rendered in a numeric column
+        numeric = cells[
+            : next((idx for idx, t in enumerate(self.types[1:]) if t not in (bool, int, float)), len(cells))
+        ]
+        self.decimal_stats = {}
+        if int in self.types:
+            self.decimal_stats[int] = _DecimalStats(numeric)
+        if float in self.types:
+            self.decimal_stats[float] = _DecimalStats(
+                [tabulate_module._format(cell, float, tabulate_module._DEFAULT_FLOATFMT, "", False) for cell in numeric]
+            )
+
+    def is_decimal(self, count: int) -> bool:
+        return self.types[count] in (int, float)
+
+    def width(self, count: int) -> int:
+        if self.is_decimal(count):
+            stats = self.decimal_stats[self.types[count]]
+            content = stats.max_width[count] + stats.max_decimals[count]
+        else:
+            content = self.text_width[count]
+        return max(len(self.header) + tabulate_module.MIN_PADDING, content)
+
+    def last_column_length(self, count: int, width: int) -> int:
+        """
+        The total length of the right stripped cells of the first count rows, when this column is the last
+        """
+        if self.is_decimal(count):
+            stats = self.decimal_stats[self.types[count]]
+            return count * (1 + width - stats.max_decimals[count]) + stats.last_column_sum[count]
+        return self.text_last_column_sum[count]
+
+
+class PrestoTableLengths:
+    """
+    The length of tabulate(rows[:count], headers, "presto", maxcolwidths=max_widths), for any count, without
+    rendering the rows again for each count.
+
+    The cells are wrapped and measured once. Like tabulate, each column of the first count rows is aligned by the most
+    generic type of its cells, numbers to the decimal point and other values to the left, and is as wide as its widest
+    header or cell. Both only grow with the row count, so they are kept as running maxima. The lines are right
+    stripped, so only the last column's cells change the length of each line.
+
+    Every row with a value adds at least a line to the table, so only the rows up to the one that surely makes the table
+    longer than max_length are measured. The length of tables of more rows is only known to be above max_length
+    """
+
+    def __init__(self, rows: List[List[str]], headers: Sequence[str], max_widths: List[int], max_length: int):
+        self.headers = list(headers)
+        self.max_length = max_length
+        self.measured_rows = len(rows)
+        wrapped = [[_wrap(cell, width) for cell, width in zip(row, max_widths)] for row in rows]
+        self.columns = [
+            _ColumnLengths(header, [row[idx] for row in wrapped]) for idx, header in enumerate(self.headers)
+        ]
+        # rows are split to lines only when a cell of the rendered rows has a line break
+        self.multiline = list(accumulate((any("\n" in cell for cell in row) for row in wrapped), max, initial=False))
+        self.multiline_rows_lines = list(
+            accumulate((max(len(cell.strip().splitlines()) for cell in row) for row in wrapped), initial=0)
+        )
+        self.empty_table_length = len(tabulate_module.tabulate([], headers=self.headers, tablefmt="presto"))
+
+    @staticmethod
+    def of(
+        rows: List[List[str]], headers: Sequence[str], max_widths: List[int], max_length: int
+    ) -> Optional["PrestoTableLengths"]:
+        """
+        Returns None for tables whose lengths can't be computed this way, that should be rendered to be measured
+        """
+        if tabulate_module is None or tabulate_module.PRESERVE_WHITESPACE or not headers or not rows:
+            return None
+        if any(
+            not isinstance(header, str) or "\n" in header or _UNSUPPORTED_CHARACTERS.search(header)
+            for header in headers
+        ):
+            return None
+        rows = rows[: PrestoTableLengths.__rows_longer_than(rows, headers, max_length)]
+        for row in rows:
+            if len(row) != len(headers) or any(_UNSUPPORTED_CHARACTERS.search(cell) for cell in row):
+                return None
+        try:
+            return PrestoTableLengths(rows, headers, max_widths, max_length)
+        except Exception:
+            # tables that fail to render fail the same way when rendered to be measured
+            return None
+
+    @staticmethod
+    def __rows_longer_than(rows: List[List[str]], headers: Sequence[str], max_length: int) -> int:
+        # a line is at least as wide as the headers of all the columns but the last, with their padding and separators
+        min_line_length = sum(len(header) + tabulate_module.MIN_PADDING + 3 for header in headers[:-1]) + 1
+        length = 0
+        for idx, row in enumerate(rows):
+            if any(cell.strip() for cell in row):
+                length += min_line_length
+                if length > max_length:
+                    return idx + 1
+        return len(rows)
+
+    def length(self, count: int) -> int:
+        if count == 0:
+            return self.empty_table_length
+        if count > self.measured_rows:
+            return self.max_length + 1
+
+        widths = [column.width(count) for column in self.columns]
+        header_line = "|".join(
+            f" {header.rjust(width) if column.is_decimal(count) else header.ljust(width)} "
+            for header, column, width in zip(self.headers, self.columns, widths)
+        ).rstrip()
+        separator_length = sum(widths) + 2 * len(widths) + len(widths) - 1
+
+        # every line has the full width of all the columns but the last, and their separators
+        base_length = sum(widths[:-1]) + 2 * (len(widths) - 1) + len(widths) - 1
+        data_lines = self.multiline_rows_lines[count] if self.multiline[count] else count
+        data_length = base_length * data_lines + self.columns[-1].last_column_length(count, widths[-1])
+        return len(header_line) + separator_length + data_length + data_lines + 1
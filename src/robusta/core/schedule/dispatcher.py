@@ -0,0 +1,80 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import prometheus_client
+
+scheduled_job_lateness = prometheus_client.Summary(
+    "scheduled_job_lateness",
+    "Time between the scheduled run time of a job, and the actual start of the run (seconds)",
+    labelnames=("runnable",),
+)
+scheduled_job_run_time = prometheus_client.Summary(
+    "scheduled_job_run_time", "Scheduled job run time (seconds)", labelnames=("runnable",)
+)
+
+
+class TimerHandle:
+    __slots__ = ("due_time", "func", "kwargs", "name", "cancelled")
+
+    def __init__(self, due_time: float, func: Callable, kwargs: dict, name: str):
+        self.due_time = due_time
+        self.func = func
+        self.kwargs = kwargs
+        self.name = name
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Cancel the run, if it didn't start yet. Same as threading.Timer.cancel
+        """
+        self.cancelled = True
+
+
+class TimerDispatcher:
+    """
+    Runs delayed functions, using a single dispatch thread and a bounded pool of workers.
+    Pending runs are kept in a heap ordered by their due time. Cancelled runs are dropped when they are due.
+    """
+
+    def __init__(self, max_workers: int):
+        self.heap: List[Tuple[float, int, TimerHandle]] = []
+        self.counter = itertools.count()  # keeps the heap order stable for runs with the same due time
+        self.cond = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduled-job")
+        self.dispatch_thread = threading.Thread(target=self.__dispatch, name="scheduler-dispatcher", daemon=True)
+        self.dispatch_thread.start()
+
+    def schedule(self, delay: float, func: Callable, kwargs: Optional[dict] = None, name: str = "") -> TimerHandle:
+        handle = TimerHandle(time.time() + max(delay, 0), func, kwargs or {}, name)
+        with self.cond:
+            heapq.heappush(self.heap, (handle.due_time, next(self.counter), handle))
+            if self.heap[0][2] is handle:  # new earliest run, wake the dispatcher to wait for it instead
+                self.cond.notify()
+        return handle
+
+    def __dispatch(self):
+        while True:
+            with self.cond:
+                while not self.heap or self.heap[0][0] > time.time():
+                    self.cond.wait(self.heap[0][0] - time.time() if self.heap else None)
+                _, _, handle = heapq.heappop(self.heap)
+
+            if not handle.cancelled:
+                self.executor.submit(self.__run, handle)
+
+    @staticmethod
+    def __run(handle: TimerHandle):
+        if handle.cancelled:  # cancelled while waiting for a free worker
+            return
+        start_time = time.time()
+        scheduled_job_lateness.labels(handle.name).observe(start_time - handle.due_time)
+        try:
+            handle.func(**handle.kwargs)
+        except Exception:
+            logging.exception(f"Scheduled run {handle.name} failed")
+        scheduled_job_run_time.labels(handle.name).observe(time.time() - start_time)
@@ -1,12 +1,13 @@
 import logging
 import os
-import threading
 import time
 from collections import defaultdict
 from typing import List
 from croniter import croniter
 
+from robusta.core.model.env_vars import SCHEDULER_MAX_WORKERS
 from robusta.core.persistency.scheduled_jobs_states_dal import SchedulerDal
+from robusta.core.schedule.dispatcher import TimerDispatcher
 from robusta.core.schedule.model import DynamicDelayRepeat, JobStatus, ScheduledJob, SchedulingInfo, CronScheduleRepeat
 
 # this initial delay is important for when the robusta-runner version is updated
@@ -21,12 +22,14 @@ class Scheduler:
     scheduled_jobs = defaultdict(None)
     registered_runnables = {}
     dal = None
+    dispatcher = None
 
     def register_task(self, runnable_name: str, func):
         self.registered_runnables[runnable_name] = func
 
     def init_scheduler(self):
         self.dal = SchedulerDal()
+        self.dispatcher = TimerDispatcher(max_workers=SCHEDULER_MAX_WORKERS)
         # schedule standalone tasks
         for job in self.__get_standalone_jobs():
             logging.info(f"Scheduling standalone task {job.job_id}")
@@ -51,7 +54,11 @@ class Scheduler:
 
         next_delay = self.__calc_job_delay_for_next_run(saved_job)
         logging.info(f"scheduling job {saved_job.job_id} params {saved_job.scheduling_params} will run in {next_delay}")
-        self.__schedule_job_internal(next_delay, saved_job.job_id, self.__on_task_execution, {"job": saved_job})
+        self.__schedule_job_internal(next_delay, saved_job, self.__on_task_execution, {"job": saved_job})
+
+    def stop(self):
+        if self.dal:
+            self.dal.stop()
 
     def list_scheduled_jobs(self) -> List[ScheduledJob]:
         return self.dal.list_scheduled_jobs()
@@ -94,7 +101,7 @@ class Scheduler:
             next_delay = self.__calc_job_delay_for_next_run(job)
             self.__schedule_job_internal(
                 next_delay,
-                job.job_id,
+                job,
                 self.__on_task_execution,
                 {"job": job},
             )
@@ -112,10 +119,8 @@ class Scheduler:
         del self.scheduled_jobs[job.job_id]
         logging.info(f"Scheduled job done. job_id {job.job_id} executions {job.state.exec_count}")
 
-    def __schedule_job_internal(self, delay, job_id, func, kwargs):
-        job = threading.Timer(delay, func, kwargs=kwargs)
-        self.scheduled_jobs[job_id] = job
-        job.start()
+    def __schedule_job_internal(self, delay, job: ScheduledJob, func, kwargs):
+        self.scheduled_jobs[job.job_id] = self.dispatcher.schedule(delay, func, kwargs, name=job.runnable_name)
 
     def __remove_scheduler_job(self, job_id):
         job = self.scheduled_jobs.get(job_id)
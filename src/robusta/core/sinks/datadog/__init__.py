@@ -1,2 +1,5 @@
-from robusta.core.sinks.datadog.datadog_sink import DataDogSink
 from robusta.core.sinks.datadog.datadog_sink_params import DataDogSinkConfigWrapper, DataDogSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"DataDogSink": "robusta.core.sinks.datadog.datadog_sink"})
@@ -1,2 +1,5 @@
-from robusta.core.sinks.discord.discord_sink import DiscordSink
 from robusta.core.sinks.discord.discord_sink_params import DiscordSinkConfigWrapper, DiscordSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"DiscordSink": "robusta.core.sinks.discord.discord_sink"})
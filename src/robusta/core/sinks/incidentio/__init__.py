@@ -1,2 +1,5 @@
-from robusta.core.sinks.incidentio.incidentio_sink import IncidentioSink
-from robusta.core.sinks.incidentio.incidentio_sink_params import IncidentioSinkConfigWrapper, IncidentioSinkParams
\ No newline at end of file
+from robusta.core.sinks.incidentio.incidentio_sink_params import IncidentioSinkConfigWrapper, IncidentioSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"IncidentioSink": "robusta.core.sinks.incidentio.incidentio_sink"})
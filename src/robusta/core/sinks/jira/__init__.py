@@ -1,2 +1,5 @@
-from robusta.core.sinks.jira.jira_sink import JiraSink
 from robusta.core.sinks.jira.jira_sink_params import JiraSinkConfigWrapper, JiraSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"JiraSink": "robusta.core.sinks.jira.jira_sink"})
@@ -1,2 +1,5 @@
-from robusta.core.sinks.mattermost.mattermost_sink import MattermostSink
 from robusta.core.sinks.mattermost.mattermost_sink_params import MattermostSinkConfigWrapper, MattermostSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"MattermostSink": "robusta.core.sinks.mattermost.mattermost_sink"})
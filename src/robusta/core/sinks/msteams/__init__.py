@@ -1,2 +1,5 @@
-from robusta.core.sinks.msteams.msteams_sink import MsTeamsSink
 from robusta.core.sinks.msteams.msteams_sink_params import MsTeamsSinkConfigWrapper, MsTeamsSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"MsTeamsSink": "robusta.core.sinks.msteams.msteams_sink"})
@@ -1,2 +1,5 @@
-from robusta.core.sinks.opsgenie.opsgenie_sink import OpsGenieSink
 from robusta.core.sinks.opsgenie.opsgenie_sink_params import OpsGenieSinkConfigWrapper, OpsGenieSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"OpsGenieSink": "robusta.core.sinks.opsgenie.opsgenie_sink"})
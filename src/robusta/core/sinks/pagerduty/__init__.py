@@ -1,2 +1,5 @@
-from robusta.core.sinks.pagerduty.pagerduty_sink import PagerdutySink
 from robusta.core.sinks.pagerduty.pagerduty_sink_params import PagerdutyConfigWrapper, PagerdutySinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"PagerdutySink": "robusta.core.sinks.pagerduty.pagerduty_sink"})
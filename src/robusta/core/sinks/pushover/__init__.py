@@ -1,2 +1,5 @@
-from robusta.core.sinks.pushover.pushover_sink import PushoverSink
 from robusta.core.sinks.pushover.pushover_sink_params import PushoverSinkConfigWrapper, PushoverSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"PushoverSink": "robusta.core.sinks.pushover.pushover_sink"})
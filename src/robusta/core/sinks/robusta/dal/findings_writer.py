@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import prometheus_client
+
+from robusta.core.model.env_vars import (
+    SUPABASE_BATCH_MAX_BACKLOG_ROWS,
+    SUPABASE_BATCH_MAX_DELAY_SEC,
+    SUPABASE_BATCH_MAX_RETRIES,
+    SUPABASE_BATCH_MAX_ROWS,
+    SUPABASE_BATCH_RETRY_BACKOFF_SEC,
+)
+
+Row = Dict[Any, Any]
+
+findings_flush_time = prometheus_client.Summary(
+    "platform_findings_flush_time", "Time to write a batch of rows to the platform (seconds)", labelnames=("table",)
+)
+findings_flush_batch_size = prometheus_client.Summary(
+    "platform_findings_flush_batch_size", "Number of rows in a platform write batch", labelnames=("table",)
+)
+findings_write_backlog = prometheus_client.Gauge(
+    "platform_findings_write_backlog", "Number of rows waiting to be written to the platform", labelnames=("sink",)
+)
+findings_write_errors = prometheus_client.Counter(
+    "platform_findings_write_errors", "Number of failed platform write requests", labelnames=("table",)
+)
+
+
+class PendingFinding:
+    __slots__ = ("evidence", "issue", "queued_at")
+
+    def __init__(self, evidence: List[Row], issue: Row):
+        self.evidence = evidence
+        self.issue = issue
+        self.queued_at = time.time()
+
+    def rows_count(self) -> int:
+        return len(self.evidence) + 1
+
+
+class FindingsWriteBuffer:
+    """
+    Write behind buffer for the platform findings.
+
+    The evidence and issue rows of many findings are written together, in one multi-row insert per table.
+    A batch is flushed when it reaches ``max_rows``, or when its oldest finding waited ``max_delay_sec``.
+    The evidence rows of a batch are always written before its issue rows.
+    """
+
+    def __init__(
+        self,
+        sink_name: str,
+        insert: Callable[[str, List[Row]], None],
+        evidence_table: str,
+        issues_table: str,
+        max_rows: int = SUPABASE_BATCH_MAX_ROWS,
+        max_delay_sec: float = SUPABASE_BATCH_MAX_DELAY_SEC,
+        max_backlog_rows: int = SUPABASE_BATCH_MAX_BACKLOG_ROWS,
+        max_retries: int = SUPABASE_BATCH_MAX_RETRIES,
+        retry_backoff_sec: float = SUPABASE_BATCH_RETRY_BACKOFF_SEC,
+    ):
+        self.sink_name = sink_name
+        self.insert = insert
+        self.evidence_table = evidence_table
+        self.issues_table = issues_table
+        self.max_rows = max_rows
+        self.max_delay_sec = max_delay_sec
+        self.max_backlog_rows = max_backlog_rows
+        self.max_retries = max_retries
+        self.retry_backoff_sec = retry_backoff_sec
+
+        self.pending: Deque[PendingFinding] = deque()
+        self.pending_rows = 0
+        self.flush_requested = False
+        self.in_flight = False
+        self.stopped = False
+        self.cond = threading.Condition()
+
+        findings_write_backlog.labels(sink_name).set_function(lambda: self.pending_rows)
+        self.flusher = threading.Thread(target=self.__flusher, name=f"findings-writer-{sink_name}", daemon=True)
+        self.flusher.start()
+
+    def add(self, evidence: List[Row], issue: Row):
+        pending_finding = PendingFinding(evidence, issue)
+        with self.cond:
+            # when the platform is slow, wait for room instead of growing the backlog without limit
+            self.cond.wait_for(lambda: self.pending_rows < self.max_backlog_rows or self.stopped)
+            if not self.stopped:
+                self.pending.append(pending_finding)
+                self.pending_rows += pending_finding.rows_count()
+                self.cond.notify_all()
+                return
+
+        self.__write_batch([pending_finding])  # stopped, write it synchronously
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all the pending findings are written
+        """
+        with self.cond:
+            self.flush_requested = True  # don't wait for the batch delay
+            self.cond.notify_all()
+            return self.cond.wait_for(lambda: not self.pending and not self.in_flight, timeout)
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Write the pending findings, and stop the flusher thread
+        """
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        self.flusher.join(timeout)
+
+    def __flusher(self):
+        while True:
+            with self.cond:
+                batch = self.__wait_for_batch()
+                if batch is None:
+                    return
+                self.in_flight = True
+
+            try:
+                self.__write_batch(batch)
+            finally:
+                with self.cond:
+                    self.in_flight = False
+                    self.cond.notify_all()
+
+    def __wait_for_batch(self) -> Optional[List[PendingFinding]]:
+        # called with the lock held
+        while True:
+            if self.pending:
+                wait_time = self.pending[0].queued_at + self.max_delay_sec - time.time()
+                if self.pending_rows >= self.max_rows or wait_time <= 0 or self.stopped or self.flush_requested:
+                    break
+                self.cond.wait(wait_time)
+            elif self.stopped:
+                return None
+            else:
+                self.flush_requested = False
+                self.cond.wait()
+
+        batch: List[PendingFinding] = []
+        batch_rows = 0
+        while self.pending and (not batch or batch_rows + self.pending[0].rows_count() <= self.max_rows):
+            pending_finding = self.pending.popleft()
+            batch.append(pending_finding)
+            batch_rows += pending_finding.rows_count()
+        self.pending_rows -= batch_rows
+        self.cond.notify_all()
+        return batch
+
+    def __write_batch(self, batch: List[PendingFinding]):
+        evidence = [row for pending_finding in batch for row in pending_finding.evidence]
+        if evidence:
+            self.__insert(self.evidence_table, evidence)
+        self.__insert(self.issues_table, [pending_finding.issue for pending_finding in batch])
+
+    def __insert(self, table: str, rows: List[Row]):
+        start_time = time.time()
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.insert(table, rows)
+                findings_flush_time.labels(table).observe(time.time() - start_time)
+                findings_flush_batch_size.labels(table).observe(len(rows))
+                return
+            except Exception:
+                findings_write_errors.labels(table).inc()
+                if attempt < self.max_retries:
+                    logging.warning(f"Failed to write {len(rows)} rows to {table}, retrying", exc_info=True)
+                    time.sleep(self.retry_backoff_sec * (2**attempt))
+
+        if len(rows) == 1:
+            logging.error(f"Failed to write row to {table}. Dropping it {rows[0]}")
+            return
+
+        # A single invalid row fails the whole batch. Write the rows one by one, so only the invalid rows are lost
+        logging.error(f"Failed to write {len(rows)} rows to {table}. Writing the rows one by one")
+        for row in rows:
+            try:
+                self.insert(table, [row])
+            except Exception:
+                findings_write_errors.labels(table).inc()
+                logging.exception(f"Failed to write row to {table}. Dropping it {row}")
@@ -1,4 +1,3 @@
-import base64
 import json
 import logging
 import uuid
@@ -76,7 +75,8 @@ class ModelConversion:
     def get_file_object(block: FileBlock):
         return {
             "type": ModelConversion.get_file_type(block.filename),
-            "data": str(base64.b64encode(block.contents)),
+            # the format of str() of the base64 bytes
+            "data": f"b'{block.base64_contents()}'",
         }
 
     @staticmethod
@@ -107,8 +107,7 @@ class ModelConversion:
             return
         for file in files:
             file_name = file.filename  # changes after zip
-            file.zip()
-            data_obj = ModelConversion.get_file_object(file)
+            data_obj = ModelConversion.get_file_object(file.zipped())
             data_obj["metadata"] = {
                 "file_name": file_name,
             }
@@ -116,7 +115,7 @@ class ModelConversion:
 
     @staticmethod
     def add_ai_chat_data(structured_data: List[Dict], block: HolmesChatResultsBlock):
-        metadata = block.holmes_result.metadata or {} # type: ignore
+        metadata = dict(block.holmes_result.metadata or {})  # type: ignore
         metadata["type"] = "ai_investigation_result"
         metadata["createdAt"] = datetime_to_db_str(datetime.now())
         structured_data.append(
@@ -200,13 +199,13 @@ class ModelConversion:
                     )
                 else:
                     if block.is_text_file():
-                        block.zip()
+                        block = block.zipped()
                     structured_data.append(ModelConversion.get_file_object(block))
             elif isinstance(block, EmptyFileBlock):
                 structured_data.append(ModelConversion.get_empty_file_object(block))
             elif isinstance(block, FileBlock):
                 if block.is_text_file():
-                    block.zip()
+                    block = block.zipped()
                 structured_data.append(ModelConversion.get_file_object(block))
             elif isinstance(block, HolmesResultsBlock):
                 ModelConversion.add_ai_analysis_data(structured_data, block)
@@ -18,7 +18,7 @@ from supabase.lib.client_options import ClientOptions
 
 from robusta.core.model.cluster_status import ClusterStatus
 from robusta.core.exceptions import SupabaseDnsException
-from robusta.core.model.env_vars import SUPABASE_TIMEOUT_SECONDS
+from robusta.core.model.env_vars import SUPABASE_BATCH_WRITES, SUPABASE_TIMEOUT_SECONDS
 from robusta.core.model.helm_release import HelmRelease
 from robusta.core.model.jobs import JobInfo
 from robusta.core.model.namespaces import NamespaceInfo
@@ -29,6 +29,7 @@ from robusta.core.reporting import Enrichment
 from robusta.core.reporting.base import Finding
 from robusta.core.reporting.blocks import EventsBlock, EventsRef, ScanReportBlock, ScanReportRow
 from robusta.core.reporting.consts import EnrichmentAnnotation, ScanState, ScanType
+from robusta.core.sinks.robusta.dal.findings_writer import FindingsWriteBuffer
 from robusta.core.sinks.robusta.dal.model_conversion import ModelConversion
 from robusta.core.sinks.robusta.rrm.account_resource_fetcher import AccountResourceFetcher
 from robusta.core.sinks.robusta.rrm.types import (
@@ -103,6 +104,17 @@ class SupabaseDal(AccountResourceFetcher):
         ttl = int(os.environ.get("SAAS_SESSION_TOKEN_TTL_SEC", "82800"))  # 23 hours
         self.token_cache = TTLCache(maxsize=1, ttl=ttl)
         self.lock = threading.Lock()
+        self.findings_writer: Optional[FindingsWriteBuffer] = None
+        if SUPABASE_BATCH_WRITES:
+            self.findings_writer = FindingsWriteBuffer(sink_name, self.__insert_rows, EVIDENCE_TABLE, ISSUES_TABLE)
+
+    def stop(self):
+        if self.findings_writer:
+            self.findings_writer.stop(timeout=SUPABASE_TIMEOUT_SECONDS)
+
+    def __insert_rows(self, table: str, rows: List[Dict[Any, Any]]):
+        # missing columns get the column default, like in single row inserts
+        self.client.table(table).insert(rows, returning=ReturnMethod.minimal, default_to_null=False).execute()
 
     def patch_postgrest_execute(self):
         # This is somewhat hacky.
@@ -194,6 +206,7 @@ class SupabaseDal(AccountResourceFetcher):
         if scans and not enrichments:
             return
 
+        evidence_rows = []
         for enrichment in enrichments:
             evidence = ModelConversion.to_evidence_json(
                 account_id=self.account_id,
@@ -203,20 +216,22 @@ class SupabaseDal(AccountResourceFetcher):
                 finding_id=finding.id,
                 enrichment=enrichment,
             )
+            if evidence:
+                evidence_rows.append(evidence)
 
-            if not evidence:
-                continue
+        issue = ModelConversion.to_finding_json(self.account_id, self.cluster, finding)
+        if self.findings_writer:
+            self.findings_writer.add(evidence_rows, issue)
+            return
 
+        for evidence in evidence_rows:
             try:
                 self.client.table(EVIDENCE_TABLE).insert(evidence, returning=ReturnMethod.minimal).execute()
             except Exception:
-                logging.exception(f"Failed to persist finding {finding.id} enrichment {enrichment}")
+                logging.exception(f"Failed to persist finding {finding.id} evidence {evidence.get('title')}")
 
         try:
-            self.client.table(ISSUES_TABLE).insert(
-                ModelConversion.to_finding_json(self.account_id, self.cluster, finding),
-                returning=ReturnMethod.minimal,
-            ).execute()
+            self.client.table(ISSUES_TABLE).insert(issue, returning=ReturnMethod.minimal).execute()
         except Exception:
             logging.exception(f"Failed to persist finding {finding.id}")
 
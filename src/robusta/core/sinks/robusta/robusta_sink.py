@@ -5,12 +5,14 @@ import os
 import threading
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set, Union
 
 import requests
 from hikaru.model.rel_1_26 import DaemonSet, Deployment, Job, Node, Pod, ReplicaSet, StatefulSet
 from robusta.core.model.namespaces import NamespaceMetadata, ResourceCount
 from robusta.core.discovery.discovery import DISCOVERY_STACKTRACE_TIMEOUT_S, Discovery, DiscoveryResults, ResourceAccessForbiddenError
+from robusta.core.discovery.discovery_stream import DiscoveryChunkKind
+from robusta.core.discovery.informer import WATCHED_SERVICE_TYPES, IncrementalDiscovery
 from robusta.core.discovery.top_service_resolver import TopLevelResource, TopServiceResolver
 from robusta.core.discovery.utils import from_api_server_node
 from robusta.core.model.base_params import HolmesParams
@@ -19,9 +21,12 @@ from robusta.core.model.env_vars import (
     CLUSTER_STATUS_PERIOD_SEC,
     DISABLE_DISCOVERY,
     DISABLE_FINDINGS_PERSISTENCE,
+    DISABLE_HELM_MONITORING,
     DISABLE_RESOURCE_WATCH_PERSISTENCE,
     DISCOVERY_CHECK_THRESHOLD_SEC,
+    DISCOVERY_MODE,
     DISCOVERY_PERIOD_SEC,
+    DISCOVERY_PROCESS_TIMEOUT_SEC,
     DISCOVERY_WATCHDOG_CHECK_SEC,
     HOLMES_ENABLED,
     MANAGED_CONFIGURATION_ENABLED,
@@ -121,6 +126,9 @@ class RobustaSink(SinkBase, EventHandler):
         # Some clusters have no jobs. helps differentiate between no jobs, to not initialized
         self.__jobs_cache_initialized: bool = False
         self.__helm_releases_cache: Optional[Dict[str, HelmRelease]] = None
+        # watch based discovery. Only the changes are published, after a first full publish
+        self.__incremental_discovery: Optional[IncrementalDiscovery] = None
+        self.__incremental_discovery_published: bool = False
         self.__init_service_resolver()
         self.__watchdog_thread = threading.Thread(target=self.__discovery_watchdog)
         self.__watchdog_thread.start()
@@ -152,6 +160,10 @@ class RobustaSink(SinkBase, EventHandler):
     def set_cluster_active(self, active: bool):
         self.dal.set_cluster_active(active)
 
+    def stop_writes(self):
+        # write the batched findings before the runner exits. Later findings are written right away
+        self.dal.stop()
+
     def __init_service_resolver(self):
         """
         Init service resolver from the service stored in storage.
@@ -224,9 +236,14 @@ class RobustaSink(SinkBase, EventHandler):
         self.__helm_releases_cache = None
         self.__namespaces_cache: Dict[str, NamespaceInfo] = {}
         self.__pods_running_count = 0
+        self.__incremental_discovery_published = False
 
     def stop(self):
+        super().stop()
         self.__active = False
+        if self.__incremental_discovery:
+            self.__incremental_discovery.stop()
+        self.dal.stop()
 
     def is_healthy(self) -> bool:
         if self.last_send_time == 0:
@@ -279,7 +296,12 @@ class RobustaSink(SinkBase, EventHandler):
 
             self.__discovery_metrics.on_services_updated(1)
 
-    def __publish_new_services(self, active_services: List[ServiceInfo]):
+    def __publish_new_services(self, active_services: List[ServiceInfo], deleted_keys: Optional[List[str]] = None):
+        """
+        Publish the new or changed services.
+        If deleted_keys is None, active_services are all the current services, and cached services that are missing
+        are deleted. Otherwise, active_services are only the changed services, and deleted_keys are deleted
+        """
         with self.services_publish_lock:
             # convert to map
             curr_services = {}
@@ -287,11 +309,11 @@ class RobustaSink(SinkBase, EventHandler):
                 curr_services[service.get_service_key()] = service
 
             # handle deleted services
-            cache_keys = list(self.__services_cache.keys())
+            if deleted_keys is None:
+                deleted_keys = [key for key in self.__services_cache.keys() if not curr_services.get(key)]
             updated_services: List[ServiceInfo] = []
-            for service_key in cache_keys:
-                if not curr_services.get(service_key):  # service doesn't exist any more, delete it
-                    self.__safe_delete_service(service_key)
+            for service_key in deleted_keys:  # service doesn't exist any more, delete it
+                self.__safe_delete_service(service_key)
 
             # new or changed services
             for service_key in curr_services.keys():
@@ -399,31 +421,29 @@ class RobustaSink(SinkBase, EventHandler):
         
         return updated_namespaces
 
-    def __discover_resources(self) -> DiscoveryResults:
+    def __discover_resources(self) -> Optional[DiscoveryResults]:
+        if DISCOVERY_MODE == "watch":
+            return self.__discover_resources_incremental()
+
         # discovery is using the k8s python API and not Hikaru, since it's performance is 10 times better
         try:
-            results: DiscoveryResults = Discovery.discover_resources()
+            if DISCOVERY_MODE == "stream":
+                results = self.__publish_streamed_resources()
+            else:
+                results: DiscoveryResults = Discovery.discover_resources()
+                self.__assert_services_cache_initialized()
+                self.__publish_new_services(results.services)
+                self.__assert_jobs_cache_initialized()
+                self.__publish_new_jobs(results.jobs)
 
-            self.__assert_services_cache_initialized()
-            self.__publish_new_services(results.services)
             if results.nodes:
                 self.__assert_node_cache_initialized()
                 self.__publish_new_nodes(results.nodes)
 
-            self.__assert_jobs_cache_initialized()
-            self.__publish_new_jobs(results.jobs)
-
             self.__assert_helm_releases_cache_initialized()
             self.__publish_new_helm_releases(results.helm_releases)
 
-            self.__assert_namespaces_cache_initialized()
-            namespaces = results.namespaces
-            if self.namespace_monitored_resources and (time.time() - self.last_namespace_discovery) >= self.namespace_discovery_seconds:
-                namespaces = self.__discover_custom_namespaced_resources(namespaces)
-                self.last_namespace_discovery = time.time()
-            elif self.namespace_monitored_resources:
-                namespaces = self.__add_cached_namespace_metadata(namespaces)
-            self.__publish_new_namespaces(namespaces)
+            self.__publish_discovered_namespaces(results.namespaces)
 
             self.__pods_running_count = results.pods_running_count
 
@@ -449,18 +469,123 @@ class RobustaSink(SinkBase, EventHandler):
             if Discovery.out_of_memory_detected and "ERROR_DISCOVERY_OOM" not in self.__errors:
                 self.__errors.append("ERROR_DISCOVERY_OOM")
 
-    def __publish_new_nodes(self, current_nodes: List[NodeInfo]):
+    def __publish_streamed_resources(self) -> DiscoveryResults:
+        """
+        Publish the services and jobs chunk by chunk, as they are received from the discovery process.
+        Deleted services and jobs are published after all the chunks are received.
+        Returns the other discovery results
+        """
+        self.__assert_services_cache_initialized()
+        self.__assert_jobs_cache_initialized()
+        results = DiscoveryResults()
+        service_keys: Set[str] = set()
+        job_keys: Set[str] = set()
+        for kind, chunk in Discovery.stream_resources():
+            if kind == DiscoveryChunkKind.SERVICES:
+                service_keys.update(row.key for row in chunk)
+                self.__publish_new_services([row.to_model() for row in chunk], deleted_keys=[])
+            elif kind == DiscoveryChunkKind.JOBS:
+                job_keys.update(row.key for row in chunk)
+                self.__publish_new_jobs([row.to_model() for row in chunk], deleted_keys=[])
+            elif kind == DiscoveryChunkKind.NODES:
+                results.nodes = [row.to_model() for row in chunk]
+            else:
+                setattr(results, kind.value, chunk)
+
+        self.__publish_new_services([], [key for key in self.__services_cache.keys() if key not in service_keys])
+        self.__publish_new_jobs([], [key for key in self.__jobs_cache.keys() if key not in job_keys])
+        return results
+
+    def __discover_resources_incremental(self) -> Optional[DiscoveryResults]:
+        """
+        Publish the resources changed since the previous discovery, as reported by the informers.
+        Custom resources, helm releases and Openshift groups are listed on each discovery
+        """
+        try:
+            if self.__incremental_discovery is None:
+                self.__incremental_discovery = IncrementalDiscovery()
+                self.__incremental_discovery.start()
+            if not self.__incremental_discovery.wait_for_sync(DISCOVERY_PROCESS_TIMEOUT_SEC):
+                logging.warning("Discovery informers are not synced yet")
+                return None
+
+            full = not self.__incremental_discovery_published
+            changes = self.__incremental_discovery.collect(full=full)
+            custom_services = Discovery.discover_custom_services()
+
+            self.__assert_services_cache_initialized()
+            if full:
+                self.__publish_new_services(changes.services + custom_services)
+            else:
+                self.__publish_new_services(changes.services, changes.deleted_services)
+                custom_keys = {service.get_service_key() for service in custom_services}
+                deleted_custom_keys = [
+                    key
+                    for key, service in self.__services_cache.items()
+                    if service.service_type not in WATCHED_SERVICE_TYPES and key not in custom_keys
+                ]
+                self.__publish_new_services(custom_services, deleted_custom_keys)
+
+            if changes.nodes or changes.deleted_nodes:
+                self.__assert_node_cache_initialized()
+                self.__publish_new_nodes(changes.nodes, None if full else changes.deleted_nodes)
+
+            self.__assert_jobs_cache_initialized()
+            self.__publish_new_jobs(changes.jobs, None if full else changes.deleted_jobs)
+
+            helm_releases = Discovery.discover_helm_releases() if not DISABLE_HELM_MONITORING else []
+            self.__assert_helm_releases_cache_initialized()
+            self.__publish_new_helm_releases(helm_releases)
+
+            self.__publish_discovered_namespaces(changes.namespaces)
+            self.__pods_running_count = changes.pods_running_count
+
+            openshift_groups = Discovery.discover_openshift_groups()
+            if openshift_groups:
+                self.__assert_openshift_groups_cache_initialized()
+                self.__publish_new_openshift_groups(openshift_groups)
+
+            # save the cached services for the resolver.
+            RobustaSink.__save_resolver_resources(
+                list(self.__services_cache.values()), list(self.__jobs_cache.values())
+            )
+            self.__incremental_discovery_published = True
+
+            return DiscoveryResults(
+                helm_releases=helm_releases,
+                pods_running_count=changes.pods_running_count,
+                openshift_groups=openshift_groups,
+            )
+
+        except Exception:
+            # we had an error during discovery. Reset caches to align the data with the storage
+            self.__reset_caches()
+            logging.error(
+                f"Failed to run publish incremental discovery for {self.sink_name}",
+                exc_info=True,
+            )
+
+    def __publish_discovered_namespaces(self, namespaces: List[NamespaceInfo]):
+        self.__assert_namespaces_cache_initialized()
+        if self.namespace_monitored_resources and (time.time() - self.last_namespace_discovery) >= self.namespace_discovery_seconds:
+            namespaces = self.__discover_custom_namespaced_resources(namespaces)
+            self.last_namespace_discovery = time.time()
+        elif self.namespace_monitored_resources:
+            namespaces = self.__add_cached_namespace_metadata(namespaces)
+        self.__publish_new_namespaces(namespaces)
+
+    def __publish_new_nodes(self, current_nodes: List[NodeInfo], deleted_names: Optional[List[str]] = None):
         # convert to map
         curr_nodes = {}
         for node in current_nodes:
             curr_nodes[node.name] = node
 
-        # handle deleted nodes
+        # handle deleted nodes. If deleted_names is None, current_nodes are all the nodes
         updated_nodes: List[NodeInfo] = []
-        cache_keys = list(self.__nodes_cache.keys())
-        for node_name in cache_keys:
-            if not curr_nodes.get(node_name):  # node doesn't exist anymore, delete it
-                self.__safe_delete_node(node_name)
+        if deleted_names is None:
+            deleted_names = [name for name in self.__nodes_cache.keys() if not curr_nodes.get(name)]
+        for node_name in deleted_names:  # node doesn't exist anymore, delete it
+            self.__safe_delete_node(node_name)
 
         # new or changed nodes
         for node_name in curr_nodes.keys():
@@ -499,18 +624,18 @@ class RobustaSink(SinkBase, EventHandler):
         if job_info:
             self.dal.remove_deleted_job(job_info)
 
-    def __publish_new_jobs(self, active_jobs: List[JobInfo]):
+    def __publish_new_jobs(self, active_jobs: List[JobInfo], deleted_keys: Optional[List[str]] = None):
         # convert to map
         curr_jobs = {}
         for job in active_jobs:
             curr_jobs[job.get_service_key()] = job
 
-        # handle deleted jobs
-        cache_keys = list(self.__jobs_cache.keys())
+        # handle deleted jobs. If deleted_keys is None, active_jobs are all the jobs
+        if deleted_keys is None:
+            deleted_keys = [key for key in self.__jobs_cache.keys() if not curr_jobs.get(key)]
         updated_jobs: List[JobInfo] = []
-        for job_key in cache_keys:
-            if not curr_jobs.get(job_key):  # job doesn't exist any more, delete it
-                self.__safe_delete_job(job_key)
+        for job_key in deleted_keys:  # job doesn't exist any more, delete it
+            self.__safe_delete_job(job_key)
 
         # new or changed jobs
         for job_key in curr_jobs.keys():
@@ -2,13 +2,14 @@ import threading
 import time
 from abc import abstractmethod, ABC
 from collections import defaultdict
-from typing import Any, List, Dict, Tuple, DefaultDict, Optional
+from typing import Any, Callable, List, Dict, Tuple, DefaultDict, Optional
 
 from pydantic import BaseModel, Field
 
 from robusta.core.model.k8s_operation_type import K8sOperationType
 from robusta.core.reporting.base import Finding
 from robusta.core.sinks.sink_base_params import ActivityInterval, ActivityParams, MuteInterval, SinkBaseParams
+from robusta.core.sinks.sink_delivery import SinkDeliveryQueue
 from robusta.core.sinks.timing import MuteDateInterval, TimeSlice, TimeSliceAlways
 
 
@@ -87,6 +88,11 @@ class SinkBase(ABC):
         self.grouping_summary_mode = False
         self.grouping_enabled = False
 
+        # created on the first delivered finding
+        self.delivery_queue: Optional[SinkDeliveryQueue] = None
+        self.delivery_queue_lock = threading.Lock()
+        self.delivery_stopped = False
+
         if sink_params.grouping:
             self.finding_group_lock = threading.RLock()
             self.grouping_enabled = True
@@ -180,7 +186,42 @@ class SinkBase(ABC):
         return self.account_id != account_id or self.cluster_name != cluster_name or self.signing_key != signing_key
 
     def stop(self):
-        pass
+        if self.delivery_queue:
+            self.delivery_queue.stop()
+
+    def stop_delivery(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the queued findings are written to the sink. Findings delivered after that are written right away.
+        Returns False on timeout
+        """
+        with self.delivery_queue_lock:
+            self.delivery_stopped = True
+        if not self.delivery_queue:
+            return True
+        self.delivery_queue.stop()
+        return self.delivery_queue.join(timeout)
+
+    def deliver_finding(
+        self, finding: Finding, platform_enabled: bool, on_delivered: Optional[Callable[[], None]] = None
+    ):
+        """
+        Write the finding to the sink, and then call on_delivered.
+        When async delivery is enabled, the finding is queued, and written by the sink delivery workers.
+        """
+
+        with self.delivery_queue_lock:
+            queue = None
+            if self.params.delivery.async_delivery and not self.delivery_stopped:
+                if self.delivery_queue is None:
+                    self.delivery_queue = SinkDeliveryQueue(self.sink_name, self.params.delivery, self.write_finding)
+                queue = self.delivery_queue
+
+        if queue is not None:
+            queue.put(finding, platform_enabled, on_delivered)
+            return
+        self.write_finding(finding, platform_enabled)
+        if on_delivered:
+            on_delivered()
 
     def accepts(self, finding: Finding) -> bool:
         if any(mute.is_muted_now() for mute in self.mute_date_intervals):
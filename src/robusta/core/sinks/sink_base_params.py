@@ -1,12 +1,21 @@
 import logging
 import re
 from abc import ABC, abstractmethod
+from enum import Enum
 from typing import Dict, List, Optional, Union
 
 from pydantic import BaseModel, root_validator, validator
 from pydantic.types import PositiveInt
 import pytz
 
+from robusta.core.model.env_vars import (
+    SINK_DELIVERY_ASYNC,
+    SINK_DELIVERY_BLOCK_TIMEOUT_SEC,
+    SINK_DELIVERY_OVERFLOW_POLICY,
+    SINK_DELIVERY_QUEUE_MAX_SIZE,
+    SINK_DELIVERY_SPILL_DIR,
+    SINK_DELIVERY_WORKERS,
+)
 from robusta.core.playbooks.playbook_utils import replace_env_vars_values
 from robusta.core.sinks.timing import DAY_NAMES
 from robusta.utils.scope import ScopeParams
@@ -136,6 +145,30 @@ class GroupingParams(BaseModel):
         return values
 
 
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"  # wait for room in the queue, up to block_timeout_sec. Then drop the new finding
+    DROP_OLDEST = "drop_oldest"  # drop the oldest queued finding to make room for the new one
+    SPILL_TO_DISK = "spill_to_disk"  # store findings that don't fit in the queue on disk
+
+
+class SinkDeliveryParams(BaseModel):
+    """
+    :var async_delivery: Write findings to the sink using a dedicated delivery queue and workers
+    :var workers: Number of delivery workers for this sink. Findings order is kept only with a single worker
+    :var queue_size: Max number of findings waiting for delivery
+    :var overflow_policy: What to do when the delivery queue is full. block, drop_oldest or spill_to_disk
+    :var block_timeout_sec: Max time to wait for room in the queue, when using the block policy
+    :var spill_dir: Directory for spilled findings, when using the spill_to_disk policy
+    """
+
+    async_delivery: bool = SINK_DELIVERY_ASYNC
+    workers: PositiveInt = SINK_DELIVERY_WORKERS
+    queue_size: PositiveInt = SINK_DELIVERY_QUEUE_MAX_SIZE
+    overflow_policy: OverflowPolicy = OverflowPolicy(SINK_DELIVERY_OVERFLOW_POLICY)
+    block_timeout_sec: float = SINK_DELIVERY_BLOCK_TIMEOUT_SEC
+    spill_dir: str = SINK_DELIVERY_SPILL_DIR
+
+
 class SinkBaseParams(ABC, BaseModel):
     name: str
     send_svg: bool = False
@@ -147,6 +180,7 @@ class SinkBaseParams(ABC, BaseModel):
     mute_intervals: Optional[List[MuteInterval]]
     grouping: Optional[GroupingParams]
     stop: bool = False  # Stop processing if this sink has been matched
+    delivery: SinkDeliveryParams = SinkDeliveryParams()
 
     @root_validator
     def env_values_validation(cls, values: Dict):
@@ -0,0 +1,216 @@
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import prometheus_client
+
+from robusta.core.reporting.base import Finding
+from robusta.core.sinks.sink_base_params import OverflowPolicy, SinkDeliveryParams
+
+DeliveryItem = Tuple[Finding, bool]  # finding, platform_enabled
+OnDelivered = Optional[Callable[[], None]]
+
+sink_delivery_queue_size = prometheus_client.Gauge(
+    "sink_delivery_queue_size", "Number of findings waiting for delivery to the sink", labelnames=("sink",)
+)
+sink_delivery_time = prometheus_client.Summary(
+    "sink_delivery_time", "Time to write a finding to the sink (seconds)", labelnames=("sink",)
+)
+sink_delivery_wait_time = prometheus_client.Summary(
+    "sink_delivery_wait_time", "Time a finding waited in the sink delivery queue (seconds)", labelnames=("sink",)
+)
+sink_delivery_events = prometheus_client.Counter(
+    "sink_delivery_events", "Number of sink delivery events by status", labelnames=("sink", "status")
+)
+
+
+class SinkDeliveryQueue:
+    """
+    Bounded delivery queue for a single sink, with its own worker threads.
+    A slow sink only delays its own findings, and not the event workers or the other sinks.
+
+    The spilled findings of a sink are owned by one queue at a time. A queue that replaces a stopped one, on config
+    reload, takes over its spilled findings rather than reading the spill directory it still delivers from.
+
+    on_delivered is called after the finding is written to the sink. It's kept in memory, so it isn't called for
+    findings spilled by a previous runner process
+    """
+
+    spill_owners: Dict[str, "SinkDeliveryQueue"] = {}
+    spill_owners_lock = threading.Lock()
+
+    def __init__(self, sink_name: str, params: SinkDeliveryParams, deliver: Callable[[Finding, bool], None]):
+        self.sink_name = sink_name
+        self.params = params
+        self.deliver = deliver
+        self.items: Deque[Tuple[DeliveryItem, float, OnDelivered]] = deque()
+        self.spilled: Deque[Tuple[str, OnDelivered]] = deque()
+        self.spill_dir = os.path.join(params.spill_dir, sink_name)
+        self.cond = threading.Condition()
+        self.stopped = False
+        self.in_flight = 0
+
+        if params.overflow_policy == OverflowPolicy.SPILL_TO_DISK:
+            with SinkDeliveryQueue.spill_owners_lock:
+                previous = SinkDeliveryQueue.spill_owners.get(self.spill_dir)
+                SinkDeliveryQueue.spill_owners[self.spill_dir] = self
+            if previous is not None:
+                self.spilled.extend(previous.__hand_over_spilled())
+            else:
+                self.__load_spilled()
+
+        sink_delivery_queue_size.labels(sink_name).set_function(lambda: len(self.items) + len(self.spilled))
+        self.workers: List[threading.Thread] = []
+        for i in range(params.workers):
+            worker = threading.Thread(target=self.__worker, name=f"sink-delivery-{sink_name}-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+        logging.info(
+            f"Initialized delivery queue for sink {sink_name}: {params.workers} workers. Max size {params.queue_size}. "
+            f"Overflow policy {params.overflow_policy.value}"
+        )
+
+    def put(self, finding: Finding, platform_enabled: bool, on_delivered: OnDelivered = None):
+        item: DeliveryItem = (finding, platform_enabled)
+        with self.cond:
+            if self.stopped:
+                logging.warning(f"Delivery queue for sink {self.sink_name} is stopped. Dropping {finding.title}")
+                self.__on_dropped("stopped")
+                return
+
+            if self.spilled:  # keep the findings order, until the spilled findings are delivered
+                self.__spill(item, on_delivered)
+                return
+
+            if len(self.items) >= self.params.queue_size:
+                if self.params.overflow_policy == OverflowPolicy.SPILL_TO_DISK:
+                    self.__spill(item, on_delivered)
+                    return
+                elif self.params.overflow_policy == OverflowPolicy.DROP_OLDEST:
+                    (oldest, _), _, _ = self.items.popleft()
+                    logging.warning(f"Delivery queue for sink {self.sink_name} is full. Dropping {oldest.title}")
+                    self.__on_dropped("overflow")
+                elif not self.cond.wait_for(
+                    lambda: len(self.items) < self.params.queue_size or self.stopped, self.params.block_timeout_sec
+                ):
+                    logging.warning(f"Delivery queue for sink {self.sink_name} is full. Dropping {finding.title}")
+                    self.__on_dropped("timeout")
+                    return
+                elif self.stopped:
+                    self.__on_dropped("stopped")
+                    return
+
+            self.items.append((item, time.time(), on_delivered))
+            sink_delivery_events.labels(self.sink_name, "queued").inc()
+            self.cond.notify_all()
+
+    def stop(self):
+        """
+        Stop accepting new findings. Already queued findings are still delivered, and then the workers exit
+        """
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all the queued findings are delivered
+        """
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.items and not self.spilled and not self.in_flight, timeout)
+
+    def __worker(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.items or self.spilled or self.stopped)
+                if self.items:
+                    item, queued_at, on_delivered = self.items.popleft()
+                    spilled_path = None
+                elif self.spilled:
+                    item, queued_at = None, None
+                    spilled_path, on_delivered = self.spilled.popleft()
+                else:  # stopped, and nothing left to deliver
+                    return
+                self.in_flight += 1
+                self.cond.notify_all()
+
+            try:
+                if spilled_path:
+                    item, queued_at = self.__load_spilled_item(spilled_path)
+                if item:
+                    self.__deliver(item, queued_at, on_delivered)
+            finally:
+                with self.cond:
+                    self.in_flight -= 1
+                    self.cond.notify_all()
+
+    def __deliver(self, item: DeliveryItem, queued_at: float, on_delivered: OnDelivered):
+        finding, platform_enabled = item
+        start_time = time.time()
+        sink_delivery_wait_time.labels(self.sink_name).observe(start_time - queued_at)
+        try:
+            self.deliver(finding, platform_enabled)
+            sink_delivery_events.labels(self.sink_name, "delivered").inc()
+            if on_delivered:
+                on_delivered()
+        except Exception:
+            logging.exception(f"Failed to send finding {finding.aggregation_key} to sink {self.sink_name}")
+            sink_delivery_events.labels(self.sink_name, "failed").inc()
+        sink_delivery_time.labels(self.sink_name).observe(time.time() - start_time)
+
+    def __on_dropped(self, reason: str):
+        sink_delivery_events.labels(self.sink_name, f"dropped_{reason}").inc()
+
+    def __spill(self, item: DeliveryItem, on_delivered: OnDelivered):
+        # called with the lock held
+        path = os.path.join(self.spill_dir, f"{time.time_ns():020d}-{uuid.uuid4().hex}.pickle")
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(path, "wb") as spill_file:
+                pickle.dump((item, time.time()), spill_file)
+        except Exception:
+            logging.exception(f"Failed to spill finding {item[0].title} of sink {self.sink_name} to disk")
+            self.__on_dropped("spill_error")
+            return
+        self.spilled.append((path, on_delivered))
+        sink_delivery_events.labels(self.sink_name, "spilled").inc()
+        self.cond.notify_all()
+
+    def __load_spilled(self):
+        # Findings spilled by a previous runner process are delivered as well
+        if not os.path.isdir(self.spill_dir):
+            return
+        for file_name in sorted(os.listdir(self.spill_dir)):
+            self.spilled.append((os.path.join(self.spill_dir, file_name), None))
+        if self.spilled:
+            logging.info(f"Found {len(self.spilled)} spilled findings for sink {self.sink_name}")
+
+    def __hand_over_spilled(self) -> List[Tuple[str, OnDelivered]]:
+        # the spilled findings that weren't picked by a worker yet. Those in flight are deleted once loaded
+        with self.cond:
+            spilled = list(self.spilled)
+            self.spilled.clear()
+            self.cond.notify_all()
+        if spilled:
+            logging.info(f"Handing over {len(spilled)} spilled findings of sink {self.sink_name}")
+        return spilled
+
+    def __load_spilled_item(self, path: str) -> Tuple[Optional[DeliveryItem], Optional[float]]:
+        try:
+            with open(path, "rb") as spill_file:
+                return pickle.load(spill_file)
+        except Exception:
+            logging.exception(f"Failed to load spilled finding {path} of sink {self.sink_name}")
+            self.__on_dropped("spill_error")
+            return None, None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
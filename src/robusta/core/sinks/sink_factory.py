@@ -1,70 +1,71 @@
+import importlib
 from typing import Dict, Type
 
-from robusta.core.sinks.datadog import DataDogSink, DataDogSinkConfigWrapper
-from robusta.core.sinks.discord import DiscordSink, DiscordSinkConfigWrapper
-from robusta.core.sinks.file.file_sink import FileSink
+from robusta.core.sinks.datadog.datadog_sink_params import DataDogSinkConfigWrapper
+from robusta.core.sinks.discord.discord_sink_params import DiscordSinkConfigWrapper
 from robusta.core.sinks.file.file_sink_params import FileSinkConfigWrapper
-from robusta.core.sinks.google_chat.google_chat import GoogleChatSink
 from robusta.core.sinks.google_chat.google_chat_params import GoogleChatSinkConfigWrapper
-from robusta.core.sinks.jira import JiraSink, JiraSinkConfigWrapper
-from robusta.core.sinks.kafka import KafkaSink, KafkaSinkConfigWrapper
-from robusta.core.sinks.mail.mail_sink import MailSink
+from robusta.core.sinks.jira.jira_sink_params import JiraSinkConfigWrapper
+from robusta.core.sinks.kafka.kafka_sink_params import KafkaSinkConfigWrapper
 from robusta.core.sinks.mail.mail_sink_params import MailSinkConfigWrapper
-from robusta.core.sinks.mattermost import MattermostSink, MattermostSinkConfigWrapper
-from robusta.core.sinks.msteams import MsTeamsSink, MsTeamsSinkConfigWrapper
-from robusta.core.sinks.opsgenie import OpsGenieSink, OpsGenieSinkConfigWrapper
-from robusta.core.sinks.pagerduty import PagerdutyConfigWrapper, PagerdutySink
-from robusta.core.sinks.robusta import RobustaSink, RobustaSinkConfigWrapper
-from robusta.core.sinks.rocketchat.rocketchat_sink import RocketchatSink
+from robusta.core.sinks.mattermost.mattermost_sink_params import MattermostSinkConfigWrapper
+from robusta.core.sinks.msteams.msteams_sink_params import MsTeamsSinkConfigWrapper
+from robusta.core.sinks.opsgenie.opsgenie_sink_params import OpsGenieSinkConfigWrapper
+from robusta.core.sinks.pagerduty.pagerduty_sink_params import PagerdutyConfigWrapper
+from robusta.core.sinks.robusta.robusta_sink_params import RobustaSinkConfigWrapper
 from robusta.core.sinks.rocketchat.rocketchat_sink_params import RocketchatSinkConfigWrapper
-from robusta.core.sinks.servicenow.servicenow_sink import ServiceNowSink
 from robusta.core.sinks.servicenow.servicenow_sink_params import ServiceNowSinkConfigWrapper
 from robusta.core.sinks.sink_base import SinkBase
 from robusta.core.sinks.sink_config import SinkConfigBase
-from robusta.core.sinks.slack import SlackSink, SlackSinkConfigWrapper
+from robusta.core.sinks.slack.slack_sink_params import SlackSinkConfigWrapper
 from robusta.core.sinks.slack.preview.slack_sink_preview_params import SlackSinkPreviewConfigWrapper
-from robusta.core.sinks.slack.preview.slack_sink_preview import SlackSinkPreview
-from robusta.core.sinks.telegram import TelegramSink, TelegramSinkConfigWrapper
-from robusta.core.sinks.victorops import VictoropsConfigWrapper, VictoropsSink
-from robusta.core.sinks.webex import WebexSink, WebexSinkConfigWrapper
-from robusta.core.sinks.webhook import WebhookSink, WebhookSinkConfigWrapper
-from robusta.core.sinks.yamessenger import YaMessengerSink, YaMessengerSinkConfigWrapper
-from robusta.core.sinks.pushover import PushoverSink, PushoverSinkConfigWrapper
-from robusta.core.sinks.zulip import ZulipSink, ZulipSinkConfigWrapper
-from robusta.core.sinks.incidentio.incidentio_sink import IncidentioSink
+from robusta.core.sinks.telegram.telegram_sink_params import TelegramSinkConfigWrapper
+from robusta.core.sinks.victorops.victorops_sink_params import VictoropsConfigWrapper
+from robusta.core.sinks.webex.webex_sink_params import WebexSinkConfigWrapper
+from robusta.core.sinks.webhook.webhook_sink_params import WebhookSinkConfigWrapper
+from robusta.core.sinks.yamessenger.yamessenger_sink_params import YaMessengerSinkConfigWrapper
+from robusta.core.sinks.pushover.pushover_sink_params import PushoverSinkConfigWrapper
+from robusta.core.sinks.zulip.zulip_sink_params import ZulipSinkConfigWrapper
 from robusta.core.sinks.incidentio.incidentio_sink_params import IncidentioSinkConfigWrapper
 
 class SinkFactory:
-    __sink_config_mapping: Dict[Type[SinkConfigBase], Type[SinkBase]] = {
-        SlackSinkConfigWrapper: SlackSink,
-        SlackSinkPreviewConfigWrapper: SlackSinkPreview,
-        RocketchatSinkConfigWrapper: RocketchatSink,
-        RobustaSinkConfigWrapper: RobustaSink,
-        MsTeamsSinkConfigWrapper: MsTeamsSink,
-        KafkaSinkConfigWrapper: KafkaSink,
-        DataDogSinkConfigWrapper: DataDogSink,
-        DiscordSinkConfigWrapper: DiscordSink,
-        OpsGenieSinkConfigWrapper: OpsGenieSink,
-        TelegramSinkConfigWrapper: TelegramSink,
-        WebhookSinkConfigWrapper: WebhookSink,
-        VictoropsConfigWrapper: VictoropsSink,
-        PagerdutyConfigWrapper: PagerdutySink,
-        MattermostSinkConfigWrapper: MattermostSink,
-        WebexSinkConfigWrapper: WebexSink,
-        YaMessengerSinkConfigWrapper: YaMessengerSink,
-        JiraSinkConfigWrapper: JiraSink,
-        FileSinkConfigWrapper: FileSink,
-        MailSinkConfigWrapper: MailSink,
-        PushoverSinkConfigWrapper: PushoverSink,
-        GoogleChatSinkConfigWrapper: GoogleChatSink,
-        ServiceNowSinkConfigWrapper: ServiceNowSink,
-        ZulipSinkConfigWrapper: ZulipSink,
-        IncidentioSinkConfigWrapper: IncidentioSink
+    # The sink classes are imported when a sink of that type is created, so unused sink SDKs are never imported
+    __sink_config_mapping: Dict[Type[SinkConfigBase], str] = {
+        SlackSinkConfigWrapper: "robusta.core.sinks.slack.slack_sink.SlackSink",
+        SlackSinkPreviewConfigWrapper: "robusta.core.sinks.slack.preview.slack_sink_preview.SlackSinkPreview",
+        RocketchatSinkConfigWrapper: "robusta.core.sinks.rocketchat.rocketchat_sink.RocketchatSink",
+        RobustaSinkConfigWrapper: "robusta.core.sinks.robusta.robusta_sink.RobustaSink",
+        MsTeamsSinkConfigWrapper: "robusta.core.sinks.msteams.msteams_sink.MsTeamsSink",
+        KafkaSinkConfigWrapper: "robusta.core.sinks.kafka.kafka_sink.KafkaSink",
+        DataDogSinkConfigWrapper: "robusta.core.sinks.datadog.datadog_sink.DataDogSink",
+        DiscordSinkConfigWrapper: "robusta.core.sinks.discord.discord_sink.DiscordSink",
+        OpsGenieSinkConfigWrapper: "robusta.core.sinks.opsgenie.opsgenie_sink.OpsGenieSink",
+        TelegramSinkConfigWrapper: "robusta.core.sinks.telegram.telegram_sink.TelegramSink",
+        WebhookSinkConfigWrapper: "robusta.core.sinks.webhook.webhook_sink.WebhookSink",
+        VictoropsConfigWrapper: "robusta.core.sinks.victorops.victorops_sink.VictoropsSink",
+        PagerdutyConfigWrapper: "robusta.core.sinks.pagerduty.pagerduty_sink.PagerdutySink",
+        MattermostSinkConfigWrapper: "robusta.core.sinks.mattermost.mattermost_sink.MattermostSink",
+        WebexSinkConfigWrapper: "robusta.core.sinks.webex.webex_sink.WebexSink",
+        YaMessengerSinkConfigWrapper: "robusta.core.sinks.yamessenger.yamessenger_sink.YaMessengerSink",
+        JiraSinkConfigWrapper: "robusta.core.sinks.jira.jira_sink.JiraSink",
+        FileSinkConfigWrapper: "robusta.core.sinks.file.file_sink.FileSink",
+        MailSinkConfigWrapper: "robusta.core.sinks.mail.mail_sink.MailSink",
+        PushoverSinkConfigWrapper: "robusta.core.sinks.pushover.pushover_sink.PushoverSink",
+        GoogleChatSinkConfigWrapper: "robusta.core.sinks.google_chat.google_chat.GoogleChatSink",
+        ServiceNowSinkConfigWrapper: "robusta.core.sinks.servicenow.servicenow_sink.ServiceNowSink",
+        ZulipSinkConfigWrapper: "robusta.core.sinks.zulip.zulip_sink.ZulipSink",
+        IncidentioSinkConfigWrapper: "robusta.core.sinks.incidentio.incidentio_sink.IncidentioSink"
     }
 
     @classmethod
-    def create_sink(cls, sink_config: SinkConfigBase, registry) -> SinkBase:
-        SinkClass = cls.__sink_config_mapping.get(type(sink_config))
-        if SinkClass is None:
+    def get_sink_class(cls, sink_config: SinkConfigBase) -> Type[SinkBase]:
+        sink_class_path = cls.__sink_config_mapping.get(type(sink_config))
+        if sink_class_path is None:
             raise Exception(f"Sink not supported {type(sink_config)}")
+        module_name, class_name = sink_class_path.rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+
+    @classmethod
+    def create_sink(cls, sink_config: SinkConfigBase, registry) -> SinkBase:
+        SinkClass = cls.get_sink_class(sink_config)
         return SinkClass(sink_config, registry)
@@ -1,2 +1,5 @@
-from robusta.core.sinks.telegram.telegram_sink import TelegramSink
 from robusta.core.sinks.telegram.telegram_sink_params import TelegramSinkConfigWrapper, TelegramSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"TelegramSink": "robusta.core.sinks.telegram.telegram_sink"})
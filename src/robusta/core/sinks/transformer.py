@@ -4,8 +4,6 @@ import urllib.parse
 from typing import List, Optional, Union
 
 import markdown2
-from fpdf import FPDF
-from fpdf.fonts import FontFace
 
 try:
     from tabulate import tabulate
@@ -233,6 +231,10 @@ class Transformer:
         if not isinstance(block, ScanReportBlock):
             return block
 
+        # fpdf is slow to import, and is only needed for scan reports
+        from fpdf import FPDF
+        from fpdf.fonts import FontFace
+
         accent_color = (140, 249, 209)
         headers_color = (63, 63, 63)
         table_color = (207, 215, 216)
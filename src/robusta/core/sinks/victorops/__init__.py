@@ -1,2 +1,5 @@
-from robusta.core.sinks.victorops.victorops_sink import VictoropsSink
 from robusta.core.sinks.victorops.victorops_sink_params import VictoropsConfigWrapper, VictoropsSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"VictoropsSink": "robusta.core.sinks.victorops.victorops_sink"})
@@ -1,2 +1,5 @@
-from robusta.core.sinks.webex.webex_sink import WebexSink
 from robusta.core.sinks.webex.webex_sink_params import WebexSinkConfigWrapper, WebexSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"WebexSink": "robusta.core.sinks.webex.webex_sink"})
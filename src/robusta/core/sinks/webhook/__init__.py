@@ -1,2 +1,5 @@
-from robusta.core.sinks.webhook.webhook_sink import WebhookSink
 from robusta.core.sinks.webhook.webhook_sink_params import WebhookSinkConfigWrapper, WebhookSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"WebhookSink": "robusta.core.sinks.webhook.webhook_sink"})
@@ -1,2 +1,5 @@
-from robusta.core.sinks.yamessenger.yamessenger_sink import YaMessengerSink
 from robusta.core.sinks.yamessenger.yamessenger_sink_params import YaMessengerSinkConfigWrapper, YaMessengerSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"YaMessengerSink": "robusta.core.sinks.yamessenger.yamessenger_sink"})
@@ -1,2 +1,5 @@
-from robusta.core.sinks.zulip.zulip_sink import ZulipSink
 from robusta.core.sinks.zulip.zulip_sink_params import ZulipSinkConfigWrapper, ZulipSinkParams
+from robusta.utils.lazy_import import lazy_attributes
+
+# the sink, and its SDK, are imported on first use
+__getattr__ = lazy_attributes(__name__, {"ZulipSink": "robusta.core.sinks.zulip.zulip_sink"})
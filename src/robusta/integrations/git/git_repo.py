@@ -6,10 +6,20 @@ import shutil
 import subprocess
 import textwrap
 import threading
+import time
 from collections import defaultdict, namedtuple
-from typing import Dict, List
-
-from robusta.core.model.env_vars import CUSTOM_SSH_HOST_KEYS, GIT_MAX_RETRIES
+from typing import Dict, List, Optional
+
+import prometheus_client
+
+from robusta.core.model.env_vars import (
+    CUSTOM_SSH_HOST_KEYS,
+    GIT_AUDIT_FLUSH_MAX_CHANGES,
+    GIT_AUDIT_FLUSH_MAX_DELAY_SEC,
+    GIT_AUDIT_STOP_MAX_RETRIES,
+    GIT_AUDIT_STOP_TIMEOUT_SEC,
+    GIT_MAX_RETRIES,
+)
 from robusta.integrations.git.well_known_hosts import WELL_KNOWN_HOST_KEYS
 
 GIT_DIR_NAME = "robusta-git"
@@ -21,11 +31,23 @@ GIT_SSH_PREFIX = "git@"
 GIT_HTTPS_PREFIX = "https://"
 LOCAL_PATH_URL_PREFIX = "file://"
 
+git_audit_backlog = prometheus_client.Gauge(
+    "git_audit_backlog", "Number of git audit changes waiting to be committed", labelnames=("repo",)
+)
+git_audit_commit_batch_size = prometheus_client.Summary(
+    "git_audit_commit_batch_size", "Number of git audit changes in a commit", labelnames=("repo",)
+)
+git_audit_push_time = prometheus_client.Summary(
+    "git_audit_push_time", "Time to push the git audit commits, including retries (seconds)", labelnames=("repo",)
+)
+
 
 class GitRepoManager:
 
     manager_lock = threading.Lock()
     repo_map = defaultdict(None)
+    # stopped repos whose flusher didn't exit yet, still running git in their clone
+    retiring_repos: Dict[str, "GitRepo"] = {}
     host_keys_initialized = False
 
     @classmethod
@@ -53,6 +75,11 @@ class GitRepoManager:
             repo = GitRepoManager.repo_map.get(git_repo_url)
             if repo is not None:
                 return repo
+            retiring = GitRepoManager.retiring_repos.pop(git_repo_url, None)
+            if retiring is not None and retiring.flusher.is_alive():
+                # the new clone replaces the local repo the flusher is still pushing from
+                logging.warning(f"Waiting for the previous git audit flusher of {retiring.repo_name} to exit")
+                retiring.flusher.join()
             repo = GitRepo(git_repo_url, git_key)
             GitRepoManager.repo_map[git_repo_url] = repo
             return repo
@@ -65,7 +92,16 @@ class GitRepoManager:
     @classmethod
     def clear_git_repos(cls):
         with GitRepoManager.manager_lock:
+            repos = list(GitRepoManager.repo_map.values())
             GitRepoManager.repo_map.clear()
+        # write the pending changes, before a new repo is cloned to the same path
+        deadline = time.time() + GIT_AUDIT_STOP_TIMEOUT_SEC
+        for repo in repos:
+            repo.stop(max(0.0, deadline - time.time()))
+            if repo.flusher is not None and repo.flusher.is_alive():
+                logging.error(f"Timed out pushing the pending git audit changes of {repo.repo_name}, they may be lost")
+                with GitRepoManager.manager_lock:
+                    GitRepoManager.retiring_repos[repo.git_repo_url] = repo
         cls.host_keys_initialized = False
 
 
@@ -74,10 +110,24 @@ ClusterChanges = Dict[str, List[SingleChange]]
 
 
 class GitRepo:
+    """
+    Local clone of a git repository.
+
+    Changes are either committed and pushed one by one (commit_push, delete_push), or written to the working tree
+    (commit_later, delete_later) and committed and pushed in batches by a background flusher. A batch is flushed when
+    it has ``flush_max_changes`` changes, or when its oldest change waited ``flush_max_delay_sec``
+    """
 
     initialized: bool = False
 
-    def __init__(self, git_repo_url: str, git_key: str, git_branch: str = None):
+    def __init__(
+        self,
+        git_repo_url: str,
+        git_key: str,
+        git_branch: str = None,
+        flush_max_changes: int = GIT_AUDIT_FLUSH_MAX_CHANGES,
+        flush_max_delay_sec: float = GIT_AUDIT_FLUSH_MAX_DELAY_SEC,
+    ):
         GitRepo.init()
         self.git_repo_url = git_repo_url
         self.env = os.environ.copy()
@@ -95,6 +145,19 @@ class GitRepo:
         self.repo_local_path = os.path.join(REPO_LOCAL_BASE_DIR, self.repo_name)
         self.init_repo()
 
+        self.flush_max_changes = flush_max_changes
+        self.flush_max_delay_sec = flush_max_delay_sec
+        # guards the working tree and the pending changes. Held for local git commands, and for pull --rebase, that
+        # requires a clean working tree
+        self.pending_cond = threading.Condition()
+        self.pending: List[str] = []  # the commit messages of the changes in the working tree
+        self.unflushed_since: Optional[float] = None  # when the oldest uncommitted or unpushed change was made
+        self.flush_requested = False
+        self.in_flight = False
+        self.stopped = False
+        self.stop_deadline: Optional[float] = None  # the time the last flush, after stop, must finish by
+        self.flusher: Optional[threading.Thread] = None
+
     def init_key(self, git_key):
         url_hash = hashlib.sha1(self.git_repo_url.encode("utf-8")).hexdigest()
         key_file_name = os.path.join(REPO_LOCAL_BASE_DIR, url_hash)
@@ -127,7 +190,7 @@ class GitRepo:
             raise e
         GitRepo.initialized = True
 
-    def __exec_git_cmd(self, cmd: List[str]):
+    def __exec_git_cmd(self, cmd: List[str], timeout: Optional[float] = None):
         shell = False
         if os.name == "nt":
             shell = True
@@ -139,6 +202,7 @@ class GitRepo:
             stderr=subprocess.PIPE,
             shell=shell,
             env=self.env,
+            timeout=timeout,
         )
         if result.returncode:
             logging.error(f"running command {cmd} failed with returncode={result.returncode}")
@@ -202,23 +266,38 @@ class GitRepo:
 
     def push(self):
         with self.repo_lock:
-            max_retries = GIT_MAX_RETRIES
-            while max_retries > 0:
-                try:
-                    self.__exec_git_cmd(["git", "push"])
-                    return
-                except Exception as e:
-                    max_retries -= 1
-                    if max_retries > 0:
-                        self.pull_rebase()
-                    else:
-                        GitRepoManager.remove_git_repo(self.git_repo_url)
-                        logging.error(f"Push failed {self.repo_local_path}", exc_info=True)
-                        raise e
+            try:
+                self.__push()
+            except Exception as e:
+                GitRepoManager.remove_git_repo(self.git_repo_url)
+                logging.error(f"Push failed {self.repo_local_path}", exc_info=True)
+                raise e
 
-    def pull_rebase(self):
+    def __push(self, max_retries: int = GIT_MAX_RETRIES, deadline: Optional[float] = None):
+        while True:
+            try:
+                self.__exec_git_cmd(["git", "push"], self.__time_left(deadline))
+                return
+            except Exception:
+                max_retries -= 1
+                if max_retries <= 0:
+                    raise
+                self.pull_rebase(self.__time_left(deadline))
+
+    @staticmethod
+    def __time_left(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        time_left = deadline - time.time()
+        if time_left <= 0:
+            raise TimeoutError("Timed out pushing git changes")
+        return time_left
+
+    def pull_rebase(self, timeout: Optional[float] = None):
         with self.repo_lock:
-            self.__exec_git_cmd(["git", "pull", "--rebase", "-Xtheirs"])
+            with self.pending_cond:
+                self.__commit_pending()  # rebase requires a clean working tree
+                self.__exec_git_cmd(["git", "pull", "--rebase", "-Xtheirs"], timeout)
 
     def cluster_changes(self, since_minutes: int = 20) -> ClusterChanges:
         cluster_changes = defaultdict(list)
@@ -294,3 +373,143 @@ class GitRepo:
         with self.repo_lock:
             self.delete(file_path, file_name, commit_message, cluster_name)
             self.push()
+
+    def commit_later(
+        self,
+        file_data: str,
+        file_path: str,
+        file_name,
+        commit_message: str,
+        cluster_name: str,
+    ):
+        """
+        Write the file to the working tree. It's committed and pushed by the flusher, or right away if the repo was
+        stopped
+        """
+        with self.pending_cond:
+            if not self.stopped:
+                file_local_path = os.path.join(self.repo_local_path, file_path)
+                os.makedirs(file_local_path, exist_ok=True)
+                with open(os.path.join(file_local_path, file_name), "w") as git_file:
+                    git_file.write(file_data)
+                self.__add_pending(self.__cluster_commit_msg(commit_message, cluster_name))
+                return
+        logging.warning(f"Git audit repo {self.repo_name} was stopped, pushing {file_path}/{file_name} right away")
+        self.commit_push(file_data, file_path, file_name, commit_message, cluster_name)
+
+    def delete_later(self, file_path: str, file_name, commit_message: str, cluster_name: str):
+        """
+        Delete the file from the working tree. The deletion is committed and pushed by the flusher, or right away if
+        the repo was stopped
+        """
+        with self.pending_cond:
+            if not self.stopped:
+                removed_file = os.path.join(self.repo_local_path, file_path, file_name)
+                if not os.path.exists(removed_file):  # Might have been added before the audit playbook was configured
+                    return
+                os.remove(removed_file)
+                self.__add_pending(self.__cluster_commit_msg(commit_message, cluster_name))
+                return
+        logging.warning(f"Git audit repo {self.repo_name} was stopped, pushing the deletion of {file_name} right away")
+        self.delete_push(file_path, file_name, commit_message, cluster_name)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all the pending changes are committed and pushed
+        """
+        with self.pending_cond:
+            if self.flusher is None:
+                return True
+            self.flush_requested = True  # don't wait for the batch delay
+            self.pending_cond.notify_all()
+            return self.pending_cond.wait_for(lambda: self.unflushed_since is None and not self.in_flight, timeout)
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Commit and push the pending changes, and stop the flusher thread. The last push is retried at most
+        GIT_AUDIT_STOP_MAX_RETRIES times, and is abandoned after timeout, or GIT_AUDIT_STOP_TIMEOUT_SEC if there's none.
+        Changes made after stop are committed and pushed right away
+        """
+        with self.pending_cond:
+            self.stopped = True
+            self.stop_deadline = time.time() + (GIT_AUDIT_STOP_TIMEOUT_SEC if timeout is None else timeout)
+            self.pending_cond.notify_all()
+            flusher = self.flusher
+        if flusher is not None:
+            flusher.join(timeout)
+
+    def __add_pending(self, commit_message: str):
+        # called with pending_cond held
+        self.pending.append(commit_message)
+        if self.unflushed_since is None:
+            self.unflushed_since = time.time()
+        if self.flusher is None:
+            git_audit_backlog.labels(self.repo_name).set_function(lambda: len(self.pending))
+            self.flusher = threading.Thread(target=self.__flusher, name=f"git-audit-{self.repo_name}", daemon=True)
+            self.flusher.start()
+        self.pending_cond.notify_all()
+
+    def __commit_pending(self):
+        # called with pending_cond held. Commits all the changes in the working tree, with one line per change
+        if not self.pending:
+            return
+        self.__exec_git_cmd(["git", "add", "--all"])
+        self.__exec_git_cmd(["git", "commit", "-m", "\n".join(self.pending), "--allow-empty"])
+        git_audit_commit_batch_size.labels(self.repo_name).observe(len(self.pending))
+        self.pending = []
+
+    def __flusher(self):
+        while True:
+            with self.pending_cond:
+                if not self.__wait_for_batch():
+                    return
+                self.in_flight = True
+                flushed_at = time.time()
+                stop_deadline = self.stop_deadline if self.stopped else None
+
+            try:
+                with self.repo_lock:
+                    with self.pending_cond:
+                        self.__commit_pending()
+                    start_time = time.time()
+                    if stop_deadline:  # don't hold up the config reload on a remote that can't be pushed to
+                        self.__push(GIT_AUDIT_STOP_MAX_RETRIES, stop_deadline)
+                    else:
+                        self.__push()
+                    git_audit_push_time.labels(self.repo_name).observe(time.time() - start_time)
+                with self.pending_cond:
+                    # changes made during the push are flushed with the next batch
+                    if not self.pending:
+                        self.unflushed_since = None
+                    elif self.unflushed_since < flushed_at:
+                        self.unflushed_since = flushed_at
+            except Exception:
+                logging.error(f"Failed to flush git audit changes {self.repo_local_path}", exc_info=True)
+                with self.pending_cond:
+                    self.unflushed_since = time.time()  # retry with the next batch
+                    if self.stopped:
+                        return
+            finally:
+                with self.pending_cond:
+                    self.in_flight = False
+                    self.pending_cond.notify_all()
+
+    def __wait_for_batch(self) -> bool:
+        # called with pending_cond held
+        while True:
+            if self.unflushed_since is not None:
+                wait_time = self.unflushed_since + self.flush_max_delay_sec - time.time()
+                if (
+                    len(self.pending) >= self.flush_max_changes
+                    or wait_time <= 0
+                    or self.stopped
+                    or self.flush_requested
+                ):
+                    self.flush_requested = False
+                    return True
+                self.pending_cond.wait(wait_time)
+            elif self.stopped:
+                return False
+            else:
+                self.flush_requested = False
+                self.pending_cond.wait()
@@ -7,20 +7,24 @@ import tarfile
 import tempfile
 import time
 import traceback
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
+import hikaru
 from cachetools import TTLCache, cached
 from hikaru.model.rel_1_26 import Job
 from kubernetes import config
+from kubernetes.client import ApiClient, V1Job
 from kubernetes.client.api import core_v1_api
 from kubernetes.client.rest import ApiException
 from kubernetes.stream import stream
 
-from robusta.core.model.env_vars import NAMESPACE_DATA_TTL
+from robusta.core.model.env_vars import NAMESPACE_DATA_TTL, WATCH_BASED_WAITERS
 
 
 RUNNING_STATE = "Running"
 SUCCEEDED_STATE = "Succeeded"
+COMPLETED_STATES = [SUCCEEDED_STATE, "Failed"]
+POD_LOGS_CHUNK_SIZE = 256 * 1024
 
 try:
     if os.getenv("KUBERNETES_SERVICE_HOST"):
@@ -58,27 +62,86 @@ def wait_until_job_complete(job: Job, timeout):
     """
     wait until a kubernetes Job object either succeeds or fails at least once
     """
+    # imported here, since the waiters watch imports the discovery, that imports the kubernetes models
+    from robusta.integrations.kubernetes.waiters import (
+        DELETED,
+        JOB,
+        WatchUnavailable,
+        kubernetes_waiters,
+        waiter_api_requests,
+        waiter_waits,
+    )
 
     def is_job_complete(j: Job) -> bool:
         return j.status.completionTime is not None or j.status.failed is not None
 
-    return wait_until(
-        lambda: Job.readNamespacedJob(job.metadata.name, job.metadata.namespace).obj,
-        is_job_complete,
-        timeout,
-        5,
-    )
+    def is_watched_job_complete(j: V1Job) -> bool:
+        return j.status is not None and (j.status.completion_time is not None or j.status.failed is not None)
+
+    name = job.metadata.name
+    namespace = job.metadata.namespace
+    start_time_sec = time.time()
+    if WATCH_BASED_WAITERS:
+        try:
+            v1_job = kubernetes_waiters.wait(JOB, name, namespace, is_watched_job_complete, timeout)
+        except TimeoutError:
+            raise Exception("Failed to reach wait condition")
+        except WatchUnavailable:
+            logging.warning(f"Could not watch jobs in {namespace}, polling job {name} instead")
+        else:
+            if v1_job is DELETED:
+                raise Exception("Failed to reach wait condition")
+            return hikaru.from_dict(ApiClient().sanitize_for_serialization(v1_job), cls=Job)
+
+    def read_job() -> Job:
+        waiter_api_requests.labels("Job", "poll").inc()
+        return Job.readNamespacedJob(name, namespace).obj
+
+    waiter_waits.labels("Job", "polled").inc()
+    return wait_until(read_job, is_job_complete, timeout - (time.time() - start_time_sec), 5)
 
 
-# TODO: refactor to use wait_until function
 def wait_for_pod_status(name, namespace, status: str, timeout_sec: float, backoff_wait_sec: float) -> str:
+    """
+    wait until the pod phase is status, and return it. Returns "FAIL" on timeout, or when the pod was deleted or
+    completed in another phase
+    """
+    # imported here, since the waiters watch imports the discovery, that imports the kubernetes models
+    from robusta.integrations.kubernetes.waiters import (
+        DELETED,
+        POD,
+        WatchUnavailable,
+        kubernetes_waiters,
+        waiter_api_requests,
+        waiter_waits,
+    )
+
     pod_details = f"pod status: {name} {namespace} {status} {timeout_sec}"
     logging.debug(f"waiting for {pod_details}")
 
     start_time_sec = time.time()
+    if WATCH_BASED_WAITERS:
+        try:
+            # a completed pod will not reach any other phase
+            phase = kubernetes_waiters.wait(
+                POD, name, namespace, lambda p: p == status or p in COMPLETED_STATES, timeout_sec
+            )
+            if phase == status:
+                logging.debug(f"reached {pod_details}")
+                return status
+            logging.debug(f"failed to reach {pod_details}, the pod is {'deleted' if phase is DELETED else phase}")
+            return "FAIL"
+        except TimeoutError:
+            logging.debug(f"failed to reach {pod_details}")
+            return "FAIL"
+        except WatchUnavailable:
+            logging.warning(f"Could not watch pods in {namespace}, polling {pod_details} instead")
+
+    waiter_waits.labels("Pod", "polled").inc()
+    core_v1 = core_v1_api.CoreV1Api()
     while start_time_sec + timeout_sec > time.time():
         try:
-            core_v1 = core_v1_api.CoreV1Api()
+            waiter_api_requests.labels("Pod", "poll").inc()
             resp = core_v1.read_namespaced_pod_status(name, namespace)
 
             if resp.status.phase == status:
@@ -167,6 +230,46 @@ def get_pod_logs(
     return resp
 
 
+def stream_pod_logs(
+    name,
+    namespace="default",
+    container="",
+    previous=None,
+    tail_lines=None,
+    since_seconds=None,
+    chunk_size=POD_LOGS_CHUNK_SIZE,
+) -> Optional[Iterable[bytes]]:
+    """
+    Returns the raw log chunks of the container as they are read, or None if the pod wasn't found.
+    On other errors, there are no chunks
+    """
+    try:
+        core_v1 = core_v1_api.CoreV1Api()
+        resp = core_v1.read_namespaced_pod_log(
+            name,
+            namespace,
+            container=container,
+            previous=previous,
+            tail_lines=tail_lines,
+            since_seconds=since_seconds,
+            _preload_content=False,
+        )
+    except ApiException as e:
+        if e.status == 404:
+            return None
+        logging.exception(f"failed to get pod logs {name} {namespace} {container}")
+        return []
+
+    return _read_chunks(resp, chunk_size)
+
+
+def _read_chunks(resp, chunk_size: int) -> Iterator[bytes]:
+    try:
+        yield from resp.stream(chunk_size)
+    finally:
+        resp.release_conn()
+
+
 def list_available_services(
     namespace="default",
 ):
@@ -1,6 +1,5 @@
 import logging
 import os
-import re
 import time
 from dataclasses import dataclass, field
 from enum import Enum, auto
@@ -15,6 +14,7 @@ from kubernetes.client import ApiException
 from pydantic import BaseModel
 
 from robusta.core.model.env_vars import (
+    DEBUGGER_POD_POOL_ENABLED,
     IMAGE_REGISTRY,
     INSTALLATION_NAMESPACE,
     POD_WAIT_RETRIES,
@@ -22,15 +22,18 @@ from robusta.core.model.env_vars import (
     RUNNER_SERVICE_ACCOUNT,
 )
 from robusta.integrations.kubernetes.api_client_utils import (
+    RUNNING_STATE,
     SUCCEEDED_STATE,
     exec_shell_command,
-    get_pod_logs,
     prepare_pod_command,
+    stream_pod_logs,
     to_kubernetes_name,
     upload_file,
     wait_for_pod_status,
     wait_until_job_complete,
 )
+from robusta.integrations.kubernetes.debugger_pool import DebuggerPodPool, PoolKey
+from robusta.integrations.kubernetes.pod_logs import sanitize_log_chunks
 from robusta.integrations.kubernetes.templates import get_deployment_yaml
 from robusta.utils.parsing import load_json
 
@@ -44,6 +47,7 @@ PYTHON_DEBUGGER_IMAGE_OVERRIDE = os.getenv("PYTHON_DEBUGGER_IMAGE", "debug-toolk
 # TODO: import these from the python-tools project
 PYTHON_DEBUGGER_IMAGE = f"{IMAGE_REGISTRY}/{PYTHON_DEBUGGER_IMAGE_OVERRIDE}"
 JAVA_DEBUGGER_IMAGE = f"{IMAGE_REGISTRY}/java-toolkit:v1.0.2"
+DEBUGGER_POOL_LABEL = "robusta.dev/debugger-pool"
 
 
 class Process(BaseModel):
@@ -184,38 +188,46 @@ class RobustaPod(Pod):
         regex_replacer_patterns: Optional[List["NamedRegexPattern"]] = None,
         regex_replacement_style: Optional[RegexReplacementStyle] = None,
         filter_regex: Optional[str] = None,
-    ) -> str:
+    ) -> Optional[str]:
         """
         Fetch pod logs, can replace sensitive data in the logs using a regex
         """
+        pods_logs = self.get_logs_bytes(
+            container, previous, tail_lines, regex_replacer_patterns, regex_replacement_style, filter_regex
+        )
+        return pods_logs.decode("utf-8", errors="replace") if pods_logs is not None else None
+
+    def get_logs_bytes(
+        self,
+        container=None,
+        previous=None,
+        tail_lines=None,
+        regex_replacer_patterns: Optional[List["NamedRegexPattern"]] = None,
+        regex_replacement_style: Optional[RegexReplacementStyle] = None,
+        filter_regex: Optional[str] = None,
+    ) -> Optional[bytes]:
+        """
+        Fetch pod logs as bytes, ready for a FileBlock, can replace sensitive data in the logs using a regex.
+        The logs are filtered and redacted as they are streamed, and only their last POD_LOGS_MAX_BYTES are kept
+        """
         if not container and self.spec.containers:
             container = self.spec.containers[0].name
-        pods_logs = get_pod_logs(
+        chunks = stream_pod_logs(
             self.metadata.name,
             self.metadata.namespace,
             container,
             previous,
             tail_lines,
         )
+        if chunks is None:
+            return None
 
-        if pods_logs and filter_regex:
-            regex = re.compile(filter_regex)
-            pods_logs = "\n".join(re.findall(regex, pods_logs))
-
-        if pods_logs and regex_replacer_patterns:
-            logging.info("Sanitizing log data with the provided regex patterns")
-            if regex_replacement_style == RegexReplacementStyle.NAMED:
-                for replacer in regex_replacer_patterns:
-                    pods_logs = re.sub(replacer.regex, f"[{replacer.name.upper()}]", pods_logs)
-            else:
-
-                def same_length_asterisks(match):
-                    return "*" * len((match.group(0)))
-
-                for replacer in regex_replacer_patterns:
-                    pods_logs = re.sub(replacer.regex, same_length_asterisks, pods_logs)
-
-        return pods_logs
+        return sanitize_log_chunks(
+            chunks,
+            filter_regex=filter_regex,
+            regex_replacer_patterns=regex_replacer_patterns,
+            named_replacement=regex_replacement_style == RegexReplacementStyle.NAMED,
+        )
 
     @staticmethod
     def exec_in_java_pod(
@@ -238,6 +250,7 @@ class RobustaPod(Pod):
         env: Optional[List[EnvVar]] = None,
         mount_host_root: bool = False,
         custom_annotations: Optional[Dict[str, str]] = None,
+        labels: Optional[Dict[str, str]] = None,
     ) -> "RobustaPod":
         """
         Creates a debugging pod with high privileges
@@ -256,6 +269,7 @@ class RobustaPod(Pod):
                 name=to_kubernetes_name(pod_name, "debug-"),
                 namespace=INSTALLATION_NAMESPACE,
                 annotations=custom_annotations,
+                labels=labels,
             ),
             spec=PodSpec(
                 serviceAccountName=RUNNER_SERVICE_ACCOUNT,
@@ -322,6 +336,11 @@ class RobustaPod(Pod):
         debug_image=PYTHON_DEBUGGER_IMAGE,
         custom_annotations: Optional[Dict[str, str]] = None,
     ) -> str:
+        if DEBUGGER_POD_POOL_ENABLED:
+            key = PoolKey(node_name, debug_image, tuple(sorted((custom_annotations or {}).items())))
+            with debugger_pod_pool.lease(key) as debugger:
+                return debugger.exec(cmd)
+
         debugger = RobustaPod.create_debugger_pod(
             pod_name, node_name, debug_image, custom_annotations=custom_annotations
         )
@@ -426,6 +445,38 @@ class RobustaPod(Pod):
             raise RuntimeError(f"Pod {pod_name} in namespace {namespace} is not ready after {timeout} seconds")
 
 
+def _create_pooled_debugger_pod(key: PoolKey) -> RobustaPod:
+    return RobustaPod.create_debugger_pod(
+        key.node_name,
+        key.node_name,
+        key.image,
+        custom_annotations=dict(key.annotations) or None,
+        labels={DEBUGGER_POOL_LABEL: "true"},
+    )
+
+
+def _delete_debugger_pod(debugger: RobustaPod):
+    RobustaPod.deleteNamespacedPod(debugger.metadata.name, debugger.metadata.namespace)
+
+
+def _is_debugger_pod_running(debugger: RobustaPod) -> bool:
+    try:
+        pod = RobustaPod.read(debugger.metadata.name, debugger.metadata.namespace)
+    except Exception as e:
+        logging.warning(f"failed to read the debugger pod {debugger.metadata.name}: {e}")
+        return False
+    return pod.status.phase == RUNNING_STATE and pod.metadata.deletionTimestamp is None
+
+
+def _list_pooled_debugger_pods() -> List[Pod]:
+    return PodList.listNamespacedPod(INSTALLATION_NAMESPACE, label_selector=f"{DEBUGGER_POOL_LABEL}=true").obj.items
+
+
+debugger_pod_pool = DebuggerPodPool(
+    _create_pooled_debugger_pod, _delete_debugger_pod, _is_debugger_pod_running, _list_pooled_debugger_pods
+)
+
+
 class RobustaDeployment(Deployment):
     @classmethod
     def from_image(cls: Type[T], name, image="busybox", cmd=None) -> T:
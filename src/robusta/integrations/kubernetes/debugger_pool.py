@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import prometheus_client
+
+from robusta.core.model.env_vars import DEBUGGER_POD_POOL_IDLE_TTL_SEC, DEBUGGER_POD_POOL_MAX_IDLE_PER_KEY
+
+debugger_pool_acquire_time = prometheus_client.Summary(
+    "debugger_pool_acquire_time",
+    "Time to lease a debugger pod, by the result (reused/created)",
+    labelnames=("result",),
+)
+debugger_pool_pods = prometheus_client.Gauge(
+    "debugger_pool_pods",
+    "Number of pooled debugger pods, by the state (idle/leased)",
+    labelnames=("state",),
+)
+
+
+class PoolKey(NamedTuple):
+    node_name: str
+    image: str
+    annotations: Tuple[Tuple[str, str], ...] = ()
+
+
+class IdlePod(NamedTuple):
+    pod: Any
+    released_at: float
+
+
+class DebuggerPodPool:
+    """
+    Leases long lived debugger pods, keyed by the node, image and annotations of the pod.
+
+    A lease takes an idle pod of its key that is still healthy, or creates a new pod when there is none. The pod is
+    returned to the pool when the lease ends, unless the lease failed or its key already has max_idle_per_key idle
+    pods. Pods that were idle for idle_ttl_sec are deleted. Pods left by a previous run are deleted on start, or on the
+    first lease if the pool wasn't started. Once stopped, the idle pods are deleted, and so are the pods released later
+    """
+
+    def __init__(
+        self,
+        create_pod: Callable[[PoolKey], Any],
+        delete_pod: Callable[[Any], None],
+        is_healthy: Callable[[Any], bool],
+        list_pooled_pods: Callable[[], List[Any]],
+        idle_ttl_sec: float = DEBUGGER_POD_POOL_IDLE_TTL_SEC,
+        max_idle_per_key: int = DEBUGGER_POD_POOL_MAX_IDLE_PER_KEY,
+    ):
+        self.create_pod = create_pod
+        self.delete_pod = delete_pod
+        self.is_healthy = is_healthy
+        self.list_pooled_pods = list_pooled_pods
+        self.idle_ttl_sec = idle_ttl_sec
+        self.max_idle_per_key = max_idle_per_key
+        self.lock = threading.Lock()
+        self.idle: Dict[PoolKey, List[IdlePod]] = {}
+        self.leased = 0
+        self.start_lock = threading.Lock()
+        self.reaper: Optional[threading.Thread] = None
+        self.stopped = False
+
+    @contextmanager
+    def lease(self, key: PoolKey) -> Iterator[Any]:
+        start = time.monotonic()
+        self.start()
+        pod, result = self.__acquire(key)
+        debugger_pool_acquire_time.labels(result).observe(time.monotonic() - start)
+        failed = True
+        try:
+            yield pod
+            failed = False
+        finally:
+            self.__release(key, pod, failed)
+
+    def start(self):
+        """
+        Delete the pooled pods left by a previous run, and start reaping the idle pods
+        """
+        with self.start_lock:
+            if self.reaper is not None:
+                return
+            try:
+                leftovers = self.list_pooled_pods()
+            except Exception:
+                logging.exception("failed to list the debugger pods left by a previous run")
+                leftovers = []
+            for pod in leftovers:
+                logging.info(f"deleting the debugger pod {pod.metadata.name}, left by a previous run")
+                self.__delete(pod)
+            self.reaper = threading.Thread(target=self.__reap_idle_pods, name="debugger-pool-reaper", daemon=True)
+            self.reaper.start()
+
+    def __acquire(self, key: PoolKey) -> Tuple[Any, str]:
+        with self.lock:
+            self.leased += 1
+            self.__update_gauges()
+
+        try:
+            while True:
+                with self.lock:
+                    idle = self.idle.get(key)
+                    if not idle:
+                        break
+                    candidate = idle.pop()  # the most recently released pod
+                    if not idle:
+                        del self.idle[key]
+                    self.__update_gauges()
+                if self.is_healthy(candidate.pod):
+                    return candidate.pod, "reused"
+                logging.info(f"replacing the unhealthy debugger pod {candidate.pod.metadata.name}")
+                self.__delete(candidate.pod)
+
+            return self.create_pod(key), "created"
+        except Exception:
+            with self.lock:
+                self.leased -= 1
+                self.__update_gauges()
+            raise
+
+    def __release(self, key: PoolKey, pod: Any, failed: bool):
+        with self.lock:
+            self.leased -= 1
+            keep = not failed and not self.stopped and len(self.idle.get(key, [])) < self.max_idle_per_key
+            if keep:
+                self.idle.setdefault(key, []).append(IdlePod(pod, time.monotonic()))
+            self.__update_gauges()
+        if not keep:
+            self.__delete(pod)
+
+    def reap_idle_pods(self):
+        """
+        Delete the pods that were idle for more than idle_ttl_sec
+        """
+        now = time.monotonic()
+        expired = []
+        with self.lock:
+            for key, idle in list(self.idle.items()):
+                expired.extend(idle_pod.pod for idle_pod in idle if now - idle_pod.released_at > self.idle_ttl_sec)
+                kept = [idle_pod for idle_pod in idle if now - idle_pod.released_at <= self.idle_ttl_sec]
+                if kept:
+                    self.idle[key] = kept
+                else:
+                    del self.idle[key]
+            self.__update_gauges()
+        for pod in expired:
+            logging.debug(f"deleting the idle debugger pod {pod.metadata.name}")
+            self.__delete(pod)
+
+    def stop(self):
+        """
+        Delete the idle pods. Leased pods are deleted when released
+        """
+        with self.lock:
+            self.stopped = True
+            idle = [idle_pod.pod for pods in self.idle.values() for idle_pod in pods]
+            self.idle.clear()
+            self.__update_gauges()
+        for pod in idle:
+            logging.debug(f"deleting the idle debugger pod {pod.metadata.name}")
+            self.__delete(pod)
+
+    def __reap_idle_pods(self):
+        while True:
+            time.sleep(max(self.idle_ttl_sec / 2, 1))
+            self.reap_idle_pods()
+
+    def __delete(self, pod: Any):
+        try:
+            self.delete_pod(pod)
+        except Exception:
+            logging.exception(f"failed to delete the debugger pod {pod.metadata.name}")
+
+    def __update_gauges(self):
+        # called with the lock held
+        debugger_pool_pods.labels("idle").set(sum(len(idle) for idle in self.idle.values()))
+        debugger_pool_pods.labels("leased").set(self.leased)
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+import prometheus_client
+from hikaru import HikaruDocumentBase
+from hikaru.model.rel_1_26 import DaemonSet, HorizontalPodAutoscaler, Node, StatefulSet
+from kubernetes import client
+
+from robusta.core.discovery.informer import ResourceInformer
+from robusta.core.model.env_vars import OBJECT_CACHE_MAX_SIZE, OBJECT_CACHE_TTL_SEC
+from robusta.integrations.kubernetes.custom_models import RobustaDeployment, RobustaJob, RobustaPod
+
+object_cache_requests = prometheus_client.Counter(
+    "kubernetes_object_cache_requests",
+    "Number of Kubernetes object reads served by the object cache, by result (hit/miss)",
+    labelnames=("kind", "result"),
+)
+
+
+class WatchedKind(NamedTuple):
+    kind: str
+    list_func: Callable[[], Callable]  # returns the cluster wide list function, used for the watch
+
+
+WATCHED_KINDS: Dict[Type[HikaruDocumentBase], WatchedKind] = {
+    RobustaDeployment: WatchedKind("Deployment", lambda: client.AppsV1Api().list_deployment_for_all_namespaces),
+    DaemonSet: WatchedKind("DaemonSet", lambda: client.AppsV1Api().list_daemon_set_for_all_namespaces),
+    StatefulSet: WatchedKind("StatefulSet", lambda: client.AppsV1Api().list_stateful_set_for_all_namespaces),
+    RobustaJob: WatchedKind("Job", lambda: client.BatchV1Api().list_job_for_all_namespaces),
+    RobustaPod: WatchedKind("Pod", lambda: client.CoreV1Api().list_pod_for_all_namespaces),
+    HorizontalPodAutoscaler: WatchedKind(
+        "HorizontalPodAutoscaler", lambda: client.AutoscalingV1Api().list_horizontal_pod_autoscaler_for_all_namespaces
+    ),
+    Node: WatchedKind("Node", lambda: client.CoreV1Api().list_node),
+}
+
+
+# the version of objects that aren't in the synced informer store. Never equal to a resource version
+DELETED_VERSION = ""
+
+
+class CachedObject(NamedTuple):
+    obj: HikaruDocumentBase
+    resource_version: str
+    expiration: float
+
+
+class ObjectCache:
+    """
+    Read through cache of Kubernetes objects.
+
+    Objects are read from the api server on the first request, and kept for ttl_sec.
+    An informer per kind watches the resourceVersion of every object of the kind, so a cached object that changed
+    is read again, even before it expires. The nodes informer also keeps a node IP to node name index.
+    Cached objects are returned as copies, so callers can modify them.
+    """
+
+    def __init__(self, ttl_sec: float = OBJECT_CACHE_TTL_SEC, max_size: int = OBJECT_CACHE_MAX_SIZE):
+        self.ttl_sec = ttl_sec
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.objects: OrderedDict[Tuple[str, str], CachedObject] = OrderedDict()
+        self.node_ips: Dict[str, str] = {}
+        self.informers: Dict[str, ResourceInformer] = {}
+        informer_lock = threading.RLock()
+        for watched_kind in WATCHED_KINDS.values():
+            self.informers[watched_kind.kind] = ResourceInformer(
+                watched_kind.kind,
+                watched_kind.list_func(),
+                self.__to_node_row if watched_kind.kind == "Node" else self.__to_row,
+                self.__on_node_change if watched_kind.kind == "Node" else lambda *args: None,
+                informer_lock,
+            )
+
+    def start(self):
+        for informer in self.informers.values():
+            informer.start()
+
+    def stop(self):
+        for informer in self.informers.values():
+            informer.stop()
+
+    # informer rows are the object resource version, and for nodes, the node addresses as well
+    @staticmethod
+    def __to_row(obj) -> Tuple[str, Tuple[str, ...]]:
+        return obj.metadata.resource_version, ()
+
+    @staticmethod
+    def __to_node_row(node) -> Tuple[str, Tuple[str, ...]]:
+        addresses = tuple(address.address for address in (node.status.addresses or [])) if node.status else ()
+        return node.metadata.resource_version, addresses
+
+    def __on_node_change(self, key: str, old, new):
+        if old is not None:
+            for ip in old[1]:
+                if self.node_ips.get(ip) == key:
+                    del self.node_ips[ip]
+        if new is not None:
+            for ip in new[1]:
+                self.node_ips[ip] = key
+
+    def __current_version(self, kind: str, key: str) -> Optional[str]:
+        """
+        Returns None when the version is unknown, and DELETED_VERSION when the synced informer doesn't have the object
+        """
+        informer = self.informers.get(kind)
+        if not informer or not informer.synced.is_set():
+            return None
+        row = informer.store.get(key)
+        return row[0] if row else DELETED_VERSION
+
+    def read(self, hikaru_class: Type[HikaruDocumentBase], name: str, namespace: Optional[str] = None):
+        """
+        Same as hikaru_class().read(name, namespace), served from the cache when possible
+        """
+        kind = WATCHED_KINDS[hikaru_class].kind
+        key = f"{namespace}/{name}" if namespace else name
+        current_version = self.__current_version(kind, key)
+        with self.lock:
+            if current_version == DELETED_VERSION:
+                self.objects.pop((kind, key), None)
+            cached = self.objects.get((kind, key))
+            if (
+                cached
+                and cached.expiration > time.time()
+                and (current_version is None or current_version == cached.resource_version)
+            ):
+                self.objects.move_to_end((kind, key))
+                object_cache_requests.labels(kind, "hit").inc()
+                return cached.obj.dup()
+
+        object_cache_requests.labels(kind, "miss").inc()
+        if namespace:
+            obj = hikaru_class().read(name=name, namespace=namespace)
+        else:
+            obj = hikaru_class().read(name=name)
+
+        resource_version = obj.metadata.resourceVersion
+        # don't cache an object that was already changed, while it was read
+        if self.__current_version(kind, key) in (None, resource_version):
+            with self.lock:
+                self.objects[(kind, key)] = CachedObject(obj.dup(), resource_version, time.time() + self.ttl_sec)
+                self.objects.move_to_end((kind, key))
+                while len(self.objects) > self.max_size:
+                    self.objects.popitem(last=False)
+        return obj
+
+    def is_node_index_ready(self) -> bool:
+        return self.informers["Node"].synced.is_set()
+
+    def find_node_by_ip(self, ip: str) -> Optional[Node]:
+        """
+        Find the node by one of its addresses, using the nodes index. Should be used only when the index is ready
+        """
+        node_name = self.node_ips.get(ip)
+        if not node_name:
+            logging.info(f"No node with address {ip}")
+            return None
+        return self.read(Node, node_name)
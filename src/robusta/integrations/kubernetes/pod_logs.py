@@ -0,0 +1,169 @@
+import logging
+import re
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Iterable, List, Optional
+
+from robusta.core.model.env_vars import POD_LOGS_MAX_BYTES
+
+if TYPE_CHECKING:
+    from robusta.core.model.base_params import NamedRegexPattern
+
+
+def _asterisks(match: re.Match) -> str:
+    return "*" * (match.end() - match.start())
+
+
+class LogRedactor:
+    """
+    Replaces the matches of all the patterns in one pass over the text. The spans matched by the patterns are merged
+    where they overlap, so a secret is replaced whole even when another pattern matches only the start of it. A merged
+    span is replaced by the name of the first configured pattern that matched in it
+    """
+
+    def __init__(self, patterns: List["NamedRegexPattern"], named_replacement: bool):
+        self.regexes = [re.compile(pattern.regex) for pattern in patterns]
+        self.names = [f"[{pattern.name.upper()}]" for pattern in patterns]
+        self.named_replacement = named_replacement
+
+    def redact(self, text: str) -> str:
+        if len(self.regexes) == 1:
+            return self.regexes[0].sub(self.names[0] if self.named_replacement else _asterisks, text)
+
+        spans = sorted(
+            (match.start(), match.end(), idx)
+            for idx, regex in enumerate(self.regexes)
+            for match in regex.finditer(text)
+            if match.end() > match.start()
+        )
+        if not spans:
+            return text
+
+        pieces: List[str] = []
+        position = 0
+        start, end, idx = spans[0]
+        for span_start, span_end, span_idx in spans[1:]:
+            if span_start < end:
+                end = max(end, span_end)
+                idx = min(idx, span_idx)
+                continue
+            pieces += [text[position:start], self.__replacement(start, end, idx)]
+            position = end
+            start, end, idx = span_start, span_end, span_idx
+        pieces += [text[position:start], self.__replacement(start, end, idx), text[end:]]
+        return "".join(pieces)
+
+    def __replacement(self, start: int, end: int, idx: int) -> str:
+        return self.names[idx] if self.named_replacement else "*" * (end - start)
+
+
+class TailBuffer:
+    """
+    Keeps the last max_bytes of the appended data, starting at a whole line when older data was dropped
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.pieces: Deque[bytes] = deque()
+        self.size = 0
+        self.truncated = False
+        self.last_dropped = b""
+
+    def append(self, data: bytes):
+        if not data:
+            return
+        self.pieces.append(data)
+        self.size += len(data)
+        while self.size - len(self.pieces[0]) >= self.max_bytes:
+            self.last_dropped = self.pieces.popleft()
+            self.size -= len(self.last_dropped)
+            self.truncated = True
+
+    def getvalue(self) -> bytes:
+        data = b"".join(self.pieces)
+        starts_mid_line = self.truncated and not self.last_dropped.endswith(b"\n")
+        if len(data) > self.max_bytes:
+            starts_mid_line = data[-self.max_bytes - 1 : -self.max_bytes] != b"\n"
+            data = data[-self.max_bytes :]
+            self.truncated = True
+        if starts_mid_line:
+            data = data[data.find(b"\n") + 1 :]
+        return data
+
+
+def _line_blocks(chunks: Iterable[bytes]) -> Iterable[bytes]:
+    """
+    Regroup the chunks into blocks of whole lines, so matches within a line are never split between blocks
+    """
+    pending: List[bytes] = []
+    for chunk in chunks:
+        end = chunk.rfind(b"\n") + 1
+        if not end:
+            pending.append(chunk)
+            continue
+        if pending:
+            pending.append(chunk[:end])
+            yield b"".join(pending)
+            pending = []
+        else:
+            yield chunk[:end]
+        if end < len(chunk):
+            pending.append(chunk[end:])
+    if pending:
+        yield b"".join(pending)
+
+
+def sanitize_log_chunks(
+    chunks: Iterable[bytes],
+    filter_regex: Optional[str] = None,
+    regex_replacer_patterns: Optional[List["NamedRegexPattern"]] = None,
+    named_replacement: bool = False,
+    max_bytes: int = POD_LOGS_MAX_BYTES,
+) -> bytes:
+    """
+    Filter and redact streamed logs, and return the last max_bytes of the result.
+
+    The logs are processed in blocks of whole lines, as they are streamed, so only one block and the kept tail are in
+    memory. Like filtering and redacting the whole log, filter_regex keeps only its matches, joined by newlines, and
+    the redaction patterns replace their matches in what's kept. Matches can't span more than one block, and ^ and $
+    match at the edges of each block
+    """
+    tail = TailBuffer(max_bytes)
+    if not filter_regex and not regex_replacer_patterns:
+        for chunk in chunks:
+            tail.append(chunk)
+    else:
+        process = _block_processor(filter_regex, regex_replacer_patterns, named_replacement)
+        for block in _line_blocks(chunks):
+            tail.append(process(block))
+
+    logs = tail.getvalue()
+    if tail.truncated:
+        logging.info(f"logs are larger than {max_bytes} bytes, keeping only the last {len(logs)} bytes")
+    return logs
+
+
+def _block_processor(
+    filter_regex: Optional[str], regex_replacer_patterns: Optional[List["NamedRegexPattern"]], named_replacement: bool
+) -> Callable[[bytes], bytes]:
+    regex = re.compile(filter_regex) if filter_regex else None
+    redactor = LogRedactor(regex_replacer_patterns, named_replacement) if regex_replacer_patterns else None
+    if redactor:
+        logging.info("Sanitizing log data with the provided regex patterns")
+    emitted = False
+
+    def process(block: bytes) -> bytes:
+        nonlocal emitted
+        text = block.decode("utf-8", errors="replace")
+        if regex:
+            matches = regex.findall(text)
+            if not matches:
+                return b""
+            text = "\n".join(matches)
+        if redactor:
+            text = redactor.redact(text)
+        if regex:
+            text = ("\n" if emitted else "") + text
+            emitted = True
+        return text.encode("utf-8")
+
+    return process
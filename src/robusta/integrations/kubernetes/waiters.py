@@ -0,0 +1,178 @@
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import prometheus_client
+from kubernetes import client
+
+from robusta.core.discovery.informer import ResourceInformer
+from robusta.core.model.env_vars import WAITER_SYNC_TIMEOUT_SEC, WAITER_WATCH_IDLE_SEC
+
+waiter_api_requests = prometheus_client.Counter(
+    "kubernetes_waiter_api_requests",
+    "Number of api requests sent while waiting for Kubernetes objects, by the request (poll/list/watch)",
+    labelnames=("kind", "request"),
+)
+waiter_waits = prometheus_client.Counter(
+    "kubernetes_waiter_waits",
+    "Number of waits for Kubernetes objects, by the result (reached/deleted/timeout/polled)",
+    labelnames=("kind", "result"),
+)
+
+# The result of a wait for an object that was deleted
+DELETED = object()
+
+
+class WatchUnavailable(Exception):
+    """
+    The watch was not listed in time, so the wait should fall back to polling
+    """
+
+
+class WaitedKind(NamedTuple):
+    kind: str
+    list_func: Callable[[], Callable]  # returns the namespaced list function, used for the list and the watch
+    convert: Callable[[Any], Any]  # the part of the object that waits need, kept for every object of the namespace
+
+
+POD = WaitedKind(
+    "Pod", lambda: client.CoreV1Api().list_namespaced_pod, lambda pod: pod.status.phase if pod.status else None
+)
+JOB = WaitedKind("Job", lambda: client.BatchV1Api().list_namespaced_job, lambda job: job)
+
+
+def namespaced_list_func(kind: WaitedKind, namespace: str) -> Callable:
+    list_func = kind.list_func()
+
+    # wraps keeps the docstring, that the watch finds the object type in
+    @functools.wraps(list_func)
+    def list_namespaced(*args, **kwargs):
+        waiter_api_requests.labels(kind.kind, "watch" if kwargs.get("watch") else "list").inc()
+        return list_func(namespace, *args, **kwargs)
+
+    return list_namespaced
+
+
+class Waiter(NamedTuple):
+    predicate: Callable[[Any], bool]
+    future: Future
+
+
+class NamespaceWatch:
+    """
+    A watch of one kind in one namespace, shared by all the waits for objects of the kind in the namespace
+    """
+
+    def __init__(self, kind: WaitedKind, namespace: str):
+        self.kind = kind
+        self.waiters: Dict[str, List[Waiter]] = defaultdict(list)
+        self.active_waits = 0
+        self.last_used = time.monotonic()
+        self.informer = ResourceInformer(
+            kind.kind, namespaced_list_func(kind, namespace), kind.convert, self.__on_change, threading.RLock()
+        )
+
+    def __on_change(self, key: str, old: Optional[Any], new: Optional[Any]):
+        # called with the informer lock held
+        waiters = self.waiters.get(key)
+        if not waiters:
+            return
+        if new is None:
+            resolved = waiters
+        else:
+            resolved = [waiter for waiter in waiters if waiter.predicate(new)]
+        for waiter in resolved:
+            waiters.remove(waiter)
+            waiter.future.set_result(DELETED if new is None else new)
+        if not waiters:
+            del self.waiters[key]
+
+    def wait(self, key: str, predicate: Callable[[Any], bool], timeout_sec: float) -> Any:
+        end_time = time.monotonic() + timeout_sec
+        if not self.informer.synced.wait(min(timeout_sec, WAITER_SYNC_TIMEOUT_SEC)):
+            raise WatchUnavailable()
+
+        waiter = Waiter(predicate, Future())
+        with self.informer.lock:
+            row = self.informer.store.get(key)
+            if row is not None and predicate(row):
+                return row
+            self.waiters[key].append(waiter)
+
+        try:
+            return waiter.future.result(timeout=max(end_time - time.monotonic(), 0))
+        except FutureTimeoutError:
+            with self.informer.lock:
+                if waiter in self.waiters.get(key, []):
+                    self.waiters[key].remove(waiter)
+                    if not self.waiters[key]:
+                        del self.waiters[key]
+            if waiter.future.done():  # resolved just before it was removed
+                return waiter.future.result()
+            raise TimeoutError()
+
+
+class KubernetesWaiters:
+    """
+    Waits for Kubernetes objects to reach a condition, without polling each object.
+
+    All the waits for objects of the same kind and namespace share one watch, that is listed once and then followed
+    from its resourceVersion (and listed again only when the resourceVersion is too old). Each wait is a future,
+    resolved by the first change of its object that matches its condition. Watches that no one waited on for
+    idle_sec are stopped
+    """
+
+    def __init__(self, idle_sec: float = WAITER_WATCH_IDLE_SEC):
+        self.idle_sec = idle_sec
+        self.lock = threading.Lock()
+        self.watches: Dict[Tuple[str, str], NamespaceWatch] = {}
+        self.janitor: Optional[threading.Thread] = None
+
+    def wait(self, kind: WaitedKind, name: str, namespace: str, predicate: Callable[[Any], bool], timeout_sec: float):
+        """
+        Return the converted object once predicate returns True for it, or DELETED if the object was deleted.
+        Raises TimeoutError on timeout, and WatchUnavailable if the namespace could not be watched in time
+        """
+        with self.lock:
+            watch = self.watches.get((kind.kind, namespace))
+            if watch is None:
+                watch = self.watches[(kind.kind, namespace)] = NamespaceWatch(kind, namespace)
+                watch.informer.start()
+                self.__start_janitor()
+            watch.active_waits += 1
+
+        try:
+            result = watch.wait(f"{namespace}/{name}", predicate, timeout_sec)
+            waiter_waits.labels(kind.kind, "deleted" if result is DELETED else "reached").inc()
+            return result
+        except TimeoutError:
+            waiter_waits.labels(kind.kind, "timeout").inc()
+            raise
+        finally:
+            with self.lock:
+                watch.active_waits -= 1
+                watch.last_used = time.monotonic()
+
+    def __start_janitor(self):
+        if self.janitor is None:
+            self.janitor = threading.Thread(target=self.__stop_idle_watches, name="waiters-janitor", daemon=True)
+            self.janitor.start()
+
+    def __stop_idle_watches(self):
+        while True:
+            time.sleep(max(self.idle_sec / 2, 1))
+            now = time.monotonic()
+            with self.lock:
+                for key, watch in list(self.watches.items()):
+                    if not watch.active_waits and now - watch.last_used > self.idle_sec:
+                        logging.debug(f"stopping the idle {key[0]} watch of namespace {key[1]}")
+                        watch.informer.stop()
+                        del self.watches[key]
+
+
+kubernetes_waiters = KubernetesWaiters()
@@ -0,0 +1,112 @@
+import math
+import re
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import prometheus_client
+from cachetools import TTLCache
+
+from robusta.core.model.env_vars import PROMETHEUS_QUERY_CACHE_MAX_SAMPLES, PROMETHEUS_QUERY_CACHE_TTL_SEC
+
+prometheus_query_cache_requests = prometheus_client.Counter(
+    "prometheus_query_cache_requests",
+    "Number of Prometheus queries by the query cache result (hit/miss/coalesced)",
+    labelnames=("result",),
+)
+
+# quoted strings, that are kept as is when normalizing a query
+QUOTED_PATTERN = re.compile(r"(\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'|`[^`]*`)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_promql(query: str) -> str:
+    """
+    Collapse the whitespace of the query, outside of quoted strings, so equivalent queries get the same cache key
+    """
+    parts = QUOTED_PATTERN.split(query.strip())
+    # split with a capturing group puts the quoted strings in the odd indexes
+    return "".join(part if index % 2 else WHITESPACE_PATTERN.sub(" ", part) for index, part in enumerate(parts))
+
+
+def align_to_step(starts_at: datetime, ends_at: datetime, step: str) -> Tuple[datetime, datetime]:
+    """
+    Extend the time range to whole steps, so queries of nearly the same time range are the same query.
+    Steps with units (1m) are not aligned
+    """
+    try:
+        step_seconds = float(step)
+    except ValueError:
+        return starts_at, ends_at
+    if step_seconds <= 0:
+        return starts_at, ends_at
+
+    start = math.floor(starts_at.timestamp() / step_seconds) * step_seconds
+    end = math.ceil(ends_at.timestamp() / step_seconds) * step_seconds
+    return datetime.fromtimestamp(start, tz=starts_at.tzinfo), datetime.fromtimestamp(end, tz=ends_at.tzinfo)
+
+
+def count_samples(data: dict) -> int:
+    # query_range results are a list of series, each with a list of values
+    series_list = data.get("result") if isinstance(data, dict) else None
+    if not isinstance(series_list, list):
+        return 1
+    return max(sum(len(series.get("values", [])) for series in series_list), 1)
+
+
+class PrometheusQueryCache:
+    """
+    Short lived cache of Prometheus query results.
+
+    Concurrent identical queries are sent once, and share the result. The size of the cache is the number of samples
+    of the cached results, and the least recently used results are evicted first
+    """
+
+    def __init__(
+        self, ttl_sec: float = PROMETHEUS_QUERY_CACHE_TTL_SEC, max_samples: int = PROMETHEUS_QUERY_CACHE_MAX_SAMPLES
+    ):
+        self.lock = threading.Lock()
+        self.cache: Optional[TTLCache] = None
+        if ttl_sec > 0 and max_samples > 0:
+            self.cache = TTLCache(maxsize=max_samples, ttl=ttl_sec, getsizeof=count_samples)
+        self.in_flight: Dict[Hashable, Future] = {}
+
+    def get(self, key: Hashable, query: Callable[[], dict]) -> dict:
+        with self.lock:
+            result = self.cache.get(key) if self.cache is not None else None
+            if result is not None:
+                prometheus_query_cache_requests.labels("hit").inc()
+                return result
+
+            future = self.in_flight.get(key)
+            running = future is not None
+            if running:
+                prometheus_query_cache_requests.labels("coalesced").inc()
+            else:
+                prometheus_query_cache_requests.labels("miss").inc()
+                future = self.in_flight[key] = Future()
+
+        if running:  # wait for the identical query that is already running
+            return future.result()
+
+        try:
+            result = query()
+        except BaseException as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.in_flight[key]
+            if self.cache is not None:
+                try:
+                    self.cache[key] = result
+                except ValueError:  # larger than the whole cache
+                    pass
+        future.set_result(result)
+        return result
+
+
+prometheus_query_cache = PrometheusQueryCache()
@@ -1,21 +1,34 @@
 import logging
-from typing import Any, Dict, List, NamedTuple, Optional, Type, Union
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type, Union
 
+import prometheus_client
 from hikaru.model.rel_1_26 import DaemonSet, HorizontalPodAutoscaler, Job, Node, NodeList, StatefulSet
 from pydantic.main import BaseModel
 
+from robusta.core.model.env_vars import ALERT_RESOURCE_WORKERS, OBJECT_CACHE_ENABLED
 from robusta.core.model.events import ExecutionBaseEvent
 from robusta.core.playbooks.base_trigger import BaseTrigger, TriggerEvent
 from robusta.core.reporting.base import Finding
 from robusta.integrations.helper import exact_match, prefix_match
 from robusta.integrations.kubernetes.custom_models import RobustaDeployment, RobustaJob, RobustaPod
+from robusta.integrations.kubernetes.object_cache import ObjectCache
 from robusta.integrations.prometheus.models import PrometheusAlert, PrometheusKubernetesAlert
 from robusta.utils.cluster_provider_discovery import cluster_provider
 from robusta.utils.scope import ScopeParams, BaseScopeMatcher
 
-
 ALERT_EVENT = "alert_event"
 
+alert_resource_lookups = prometheus_client.Counter(
+    "alert_resource_lookups",
+    "Number of Kubernetes resources of alerts batches, by result (read/deduplicated)",
+    labelnames=("result",),
+)
+
+ResourceKey = Tuple[str, Optional[str], str]  # attribute name, namespace, name
+
 
 class PrometheusTriggerEventScopeMatcher(BaseScopeMatcher):
     def __init__(self, data):
@@ -25,8 +38,75 @@ class PrometheusTriggerEventScopeMatcher(BaseScopeMatcher):
         return self.data
 
 
+class AlertResourceBatch:
+    """
+    The Kubernetes resources of alerts received together, in the same Alertmanager request.
+
+    The resources of all the alerts are requested when the first alert event is built. Each unique resource is read
+    once, concurrently with the others, and every alert of the batch gets its own copy of it
+    """
+
+    executor: Optional[ThreadPoolExecutor] = None
+    executor_lock = threading.Lock()
+
+    def __init__(self, alerts: List[PrometheusAlert]):
+        self.alerts = alerts
+        self.lock = threading.Lock()
+        self.lookups: Dict[ResourceKey, Future] = {}
+        self.prefetched = False
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        with cls.executor_lock:
+            if cls.executor is None:
+                cls.executor = ThreadPoolExecutor(
+                    max_workers=ALERT_RESOURCE_WORKERS, thread_name_prefix="alert-resources"
+                )
+        return cls.executor
+
+    def __lookup(self, key: ResourceKey, load: Callable[[], Any]) -> Future:
+        with self.lock:
+            future = self.lookups.get(key)
+            if future is None:
+                future = self.lookups[key] = self.get_executor().submit(load)
+                alert_resource_lookups.labels("read").inc()
+            return future
+
+    def prefetch(self):
+        with self.lock:
+            if self.prefetched:
+                return
+            self.prefetched = True
+
+        for alert in self.alerts:
+            keys = [
+                (key, partial(AlertEventBuilder.read_resource, mapping, key[2], key[1]))
+                for mapping, key in AlertEventBuilder.get_resource_lookups(alert)
+            ]
+            # the next node names are fallbacks, read only if the first isn't found
+            node_names = AlertEventBuilder.get_node_names(alert)[:1]
+            keys.extend(
+                (("node", None, node_name), partial(AlertEventBuilder.load_node, alert, node_name))
+                for node_name in node_names
+            )
+            for key, load in keys:
+                if key in self.lookups:
+                    alert_resource_lookups.labels("deduplicated").inc()
+                else:
+                    self.__lookup(key, load)
+
+    def get(self, key: ResourceKey, load: Callable[[], Any]):
+        resource = self.__lookup(key, load).result()
+        # resources are shared between the alerts, and the actions might change them
+        return resource.dup() if resource is not None and len(self.alerts) > 1 else resource
+
+
 class PrometheusTriggerEvent(TriggerEvent):
     alert: PrometheusAlert
+    resource_batch: Optional[AlertResourceBatch] = None
+
+    class Config:
+        arbitrary_types_allowed = True
 
     def get_event_name(self) -> str:
         return PrometheusTriggerEvent.__name__
@@ -130,8 +210,25 @@ class PrometheusAlertTriggers(BaseModel):
 
 
 class AlertEventBuilder:
+    object_cache: Optional[ObjectCache] = None
+    object_cache_lock = threading.Lock()
+
+    @classmethod
+    def get_object_cache(cls) -> Optional[ObjectCache]:
+        if not OBJECT_CACHE_ENABLED:
+            return None
+        with cls.object_cache_lock:
+            if cls.object_cache is None:
+                cls.object_cache = ObjectCache()
+                cls.object_cache.start()
+        return cls.object_cache
+
     @classmethod
     def __find_node_by_ip(cls, ip) -> Optional[Node]:
+        object_cache = cls.get_object_cache()
+        if object_cache and object_cache.is_node_index_ready():
+            return object_cache.find_node_by_ip(ip)
+
         nodes: NodeList = NodeList.listNode().obj
         for node in nodes.items:
             addresses = [a.address for a in node.status.addresses]
@@ -141,18 +238,57 @@ class AlertEventBuilder:
         return None
 
     @classmethod
-    def __load_node(cls, alert: PrometheusAlert, node_name: str) -> Optional[Node]:
+    def load_node(cls, alert: PrometheusAlert, node_name: str) -> Optional[Node]:
         node = None
         try:
             # sometimes we get an IP:PORT instead of the node name. handle that case
             if ":" in node_name:
                 node = cls.__find_node_by_ip(node_name.split(":")[0])
             else:
-                node = Node().read(name=node_name)
+                object_cache = cls.get_object_cache()
+                node = object_cache.read(Node, node_name) if object_cache else Node().read(name=node_name)
         except Exception as e:
             logging.info(f"Error loading Node kubernetes object {alert}. error: {e}")
         return node
 
+    @classmethod
+    def read_resource(cls, mapping: ResourceMapping, name: str, namespace: str):
+        object_cache = cls.get_object_cache()
+        if object_cache:
+            return object_cache.read(mapping.hikaru_class, name, namespace)
+        return mapping.hikaru_class().read(name=name, namespace=namespace)
+
+    @staticmethod
+    def get_resource_lookups(alert: PrometheusAlert) -> List[Tuple[ResourceMapping, ResourceKey]]:
+        labels = alert.labels
+        namespace = labels.get("namespace", "default")
+        lookups = []
+        for mapping in MAPPINGS:
+            resource_name = labels.get(mapping.prometheus_label, None)
+            if not resource_name or "kube-state-metrics" in resource_name:
+                continue
+            lookups.append((mapping, (mapping.attribute_name, namespace, resource_name)))
+        return lookups
+
+    @staticmethod
+    def get_node_names(alert: PrometheusAlert) -> List[str]:
+        """
+        Names of the alert node. The "instance" label is used only if there's no "node" label, or it wasn't found
+        """
+        labels = alert.labels
+        node_names = [labels["node"]] if labels.get("node") else []
+        instance = labels.get("instance", None)
+        job_name = labels.get("job", None)  # a prometheus "job" not a kubernetes "job" resource
+        # when the job_name is kube-state-metrics "instance" refers to the IP of kube-state-metrics not the node
+        # If the alert has pod, the 'instance' attribute contains the pod ip
+        if instance and job_name != "kube-state-metrics":
+            node_names.append(instance)
+        return node_names
+
+    @staticmethod
+    def __resolve(batch: Optional[AlertResourceBatch], key: ResourceKey, load: Callable[[], Any]):
+        return batch.get(key, load) if batch else load()
+
     @staticmethod
     def _build_event_task(
         event: PrometheusTriggerEvent, sink_findings: Dict[str, List[Finding]]
@@ -166,14 +302,16 @@ class AlertEventBuilder:
             label_namespace=labels.get("namespace", None),
         )
 
-        namespace = labels.get("namespace", "default")
+        batch = event.resource_batch
+        if batch:
+            batch.prefetch()
 
-        for mapping in MAPPINGS:
+        for mapping, key in AlertEventBuilder.get_resource_lookups(event.alert):
+            _, namespace, resource_name = key
             try:
-                resource_name = labels.get(mapping.prometheus_label, None)
-                if not resource_name or "kube-state-metrics" in resource_name:
-                    continue
-                resource = mapping.hikaru_class().read(name=resource_name, namespace=namespace)
+                resource = AlertEventBuilder.__resolve(
+                    batch, key, partial(AlertEventBuilder.read_resource, mapping, resource_name, namespace)
+                )
                 setattr(execution_event, mapping.attribute_name, resource)
                 logging.info(
                     f"Loaded k8s {mapping.prometheus_label} {resource_name} for alert {execution_event.alert_name}"
@@ -186,17 +324,13 @@ class AlertEventBuilder:
                     f"reason: {reason} status: {status}"
                 )
 
-        node_name = labels.get("node")
-        if node_name:
-            execution_event.node = AlertEventBuilder.__load_node(execution_event.alert, node_name)
-
         # we handle nodes differently than other resources
-        node_name = labels.get("instance", None)
-        job_name = labels.get("job", None)  # a prometheus "job" not a kubernetes "job" resource
-        # when the job_name is kube-state-metrics "instance" refers to the IP of kube-state-metrics not the node
-        # If the alert has pod, the 'instance' attribute contains the pod ip
-        if not execution_event.node and node_name and job_name != "kube-state-metrics":
-            execution_event.node = AlertEventBuilder.__load_node(execution_event.alert, node_name)
+        for node_name in AlertEventBuilder.get_node_names(event.alert):
+            execution_event.node = AlertEventBuilder.__resolve(
+                batch, ("node", None, node_name), partial(AlertEventBuilder.load_node, event.alert, node_name)
+            )
+            if execution_event.node:
+                break
 
         return execution_event
 
@@ -1,7 +1,11 @@
 import logging
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, TypeVar
 
+import prometheus_client
 from cachetools import TTLCache
 from prometrix import (
     AWSPrometheusConfig,
@@ -10,11 +14,20 @@ from prometrix import (
     PrometheusConfig,
     VictoriaMetricsPrometheusConfig,
 )
+from prometheus_api_client import PrometheusApiClientException
+from prometrix.auth import PrometheusAuthorization
 from prometrix.connect.custom_connect import CustomPrometheusConnect
 
 from robusta.core.exceptions import NoPrometheusUrlFound
 from robusta.core.model.base_params import PrometheusParams
-from robusta.core.model.env_vars import PROMETHEUS_SSL_ENABLED, SERVICE_CACHE_TTL_SEC
+from robusta.core.model.env_vars import (
+    PROMETHEUS_CLIENT_IDLE_TIMEOUT_SEC,
+    PROMETHEUS_CLIENTS_MAX_SIZE,
+    PROMETHEUS_HEALTH_CHECK_INTERVAL_SEC,
+    PROMETHEUS_REQUEST_TIMEOUT_SECONDS,
+    PROMETHEUS_SSL_ENABLED,
+    SERVICE_CACHE_TTL_SEC,
+)
 from robusta.utils.service_discovery import find_service_url
 
 AZURE_RESOURCE = os.environ.get("AZURE_RESOURCE", "https://prometheus.monitor.azure.com")
@@ -32,6 +45,17 @@ AWS_REGION = os.environ.get("AWS_REGION")
 AWS_ASSUME_ROLE = os.environ.get("AWS_ASSUME_ROLE")
 VICTORIA_METRICS_CONFIGURED = os.environ.get("VICTORIA_METRICS_CONFIGURED", "false").lower() == "true"
 
+T = TypeVar("T")
+
+prometheus_query_time = prometheus_client.Summary(
+    "prometheus_query_time", "Prometheus query time (seconds)", labelnames=("query_type",)
+)
+prometheus_connection_time = prometheus_client.Summary(
+    "prometheus_connection_time",
+    "Time to create a Prometheus client, or to check its connection (seconds)",
+    labelnames=("operation",),
+)
+
 
 def generate_prometheus_config(prometheus_params: PrometheusParams) -> PrometheusConfig:
     is_victoria_metrics = VICTORIA_METRICS_CONFIGURED
@@ -88,13 +112,149 @@ def generate_prometheus_config(prometheus_params: PrometheusParams) -> Prometheu
     return PrometheusConfig(**baseconfig)
 
 
-def get_prometheus_connect(prometheus_params: PrometheusParams) -> CustomPrometheusConnect:
-    # due to cli import dependency errors without prometheus package installed
-    from prometrix import get_custom_prometheus_connect
+class PooledPrometheusClient:
+    def __init__(self, prom: CustomPrometheusConnect):
+        self.prom = prom
+        self.last_used = time.time()
+        self.healthy_until = 0.0
+        self.check_lock = threading.Lock()
+
+
+class PrometheusClientPool:
+    """
+    Prometheus clients, by their effective config.
+
+    Reusing a client reuses its HTTP session, and its open connections. The connection of each client is checked in
+    the background, so queries don't need to check it first. A client is checked before the query only when the last
+    check failed, is too old, or a query of the client failed. A query rejected as unauthorized, usually because the
+    token expired since the last check, is retried once with a new token
+    """
+
+    clients: "OrderedDict[str, PooledPrometheusClient]" = OrderedDict()
+    lock = threading.Lock()
+    health_checker: Optional[threading.Thread] = None
+
+    @classmethod
+    def get_client(cls, config: PrometheusConfig) -> CustomPrometheusConnect:
+        # due to cli import dependency errors without prometheus package installed
+        from prometrix import get_custom_prometheus_connect
+
+        key = config.json()  # before creating the client, that adds the authorization headers to the config
+        with cls.lock:
+            client = cls.clients.get(key)
+            if client:
+                cls.clients.move_to_end(key)
+                client.last_used = time.time()
+                return client.prom
+
+        with prometheus_connection_time.labels("create").time():
+            prom = get_custom_prometheus_connect(config)
+
+        with cls.lock:
+            client = cls.clients.setdefault(key, PooledPrometheusClient(prom))
+            cls.clients.move_to_end(key)
+            while len(cls.clients) > PROMETHEUS_CLIENTS_MAX_SIZE:
+                cls.clients.popitem(last=False)
+            if cls.health_checker is None:
+                cls.health_checker = threading.Thread(target=cls.__check_clients_health, daemon=True)
+                cls.health_checker.start()
+        return client.prom
+
+    @classmethod
+    def __find(cls, prom: CustomPrometheusConnect) -> Optional[PooledPrometheusClient]:
+        with cls.lock:
+            return next((client for client in cls.clients.values() if client.prom is prom), None)
+
+    @staticmethod
+    def __check(client: PooledPrometheusClient, params: Optional[dict] = None):
+        try:
+            with prometheus_connection_time.labels("health_check").time():
+                client.prom.check_prometheus_connection(params)
+        except Exception:
+            client.healthy_until = 0
+            raise
+        # healthy until 2 background checks are missed
+        client.healthy_until = time.time() + 2 * PROMETHEUS_HEALTH_CHECK_INTERVAL_SEC
 
+    @classmethod
+    def check_connection(cls, prom: CustomPrometheusConnect, params: Optional[dict] = None):
+        """
+        Same as prom.check_prometheus_connection, skipped if the connection of the client was recently checked
+        """
+        client = cls.__find(prom)
+        if not client:
+            prom.check_prometheus_connection(params)
+            return
+
+        if client.healthy_until > time.time():
+            return
+        with client.check_lock:  # concurrent queries wait for a single check
+            if client.healthy_until <= time.time():
+                cls.__check(client, params)
+
+    @classmethod
+    def run_query(cls, prom: CustomPrometheusConnect, query: Callable[[], T]) -> T:
+        """
+        Run a query of the client. When it's unauthorized, renew the token and run it again, once
+        """
+        try:
+            try:
+                return query()
+            except PrometheusApiClientException as e:
+                if "Status Code 401" not in str(e) or not cls.__renew_token(prom):
+                    raise
+                logging.info(f"Prometheus query to {prom.url} was unauthorized, retrying with a new token")
+                return query()
+        except Exception:
+            cls.on_query_error(prom)
+            raise
+
+    @staticmethod
+    def __renew_token(prom: CustomPrometheusConnect) -> bool:
+        # the same renewal check_prometheus_connection does. Only tokens that expire, like Azure's, can be renewed
+        if not PrometheusAuthorization.request_new_token(prom.config):
+            return False
+        prom.headers = PrometheusAuthorization.get_authorization_headers(prom.config)
+        return True
+
+    @classmethod
+    def on_query_error(cls, prom: CustomPrometheusConnect):
+        client = cls.__find(prom)
+        if client:  # check the connection again before the next query. It also renews expired tokens
+            client.healthy_until = 0
+
+    @classmethod
+    def check_clients_health(cls):
+        with cls.lock:
+            idle_since = time.time() - PROMETHEUS_CLIENT_IDLE_TIMEOUT_SEC
+            for key in [key for key, client in cls.clients.items() if client.last_used < idle_since]:
+                del cls.clients[key]
+            clients = list(cls.clients.values())
+
+        for client in clients:
+            try:
+                with client.check_lock:
+                    cls.__check(client, {"timeout": PROMETHEUS_REQUEST_TIMEOUT_SECONDS})
+            except Exception as e:
+                logging.info(f"Prometheus connection check failed for {client.prom.url}: {e}")
+
+    @classmethod
+    def __check_clients_health(cls):
+        while True:
+            time.sleep(PROMETHEUS_HEALTH_CHECK_INTERVAL_SEC)
+            try:
+                cls.check_clients_health()
+            except Exception:
+                logging.exception("Failed to check the prometheus clients health")
+
+
+def get_prometheus_connect(prometheus_params: PrometheusParams) -> CustomPrometheusConnect:
     config = generate_prometheus_config(prometheus_params)
+    return PrometheusClientPool.get_client(config)
+
 
-    return get_custom_prometheus_connect(config)
+def check_prometheus_connection(prom: CustomPrometheusConnect, params: Optional[dict] = None):
+    PrometheusClientPool.check_connection(prom, params)
 
 
 def get_prometheus_flags(prom: CustomPrometheusConnect) -> Optional[Dict]:
@@ -4,7 +4,11 @@ from hikaru.model.rel_1_26 import Node
 
 from robusta.core.model.base_params import PrometheusParams
 from robusta.core.model.env_vars import PROMETHEUS_REQUEST_TIMEOUT_SECONDS
-from robusta.integrations.prometheus.utils import get_prometheus_connect
+from robusta.integrations.prometheus.utils import (
+    PrometheusClientPool,
+    check_prometheus_connection,
+    get_prometheus_connect,
+)
 
 
 class NodeCpuAnalyzer:
@@ -16,7 +20,7 @@ class NodeCpuAnalyzer:
         self.internal_ip = next(addr.address for addr in self.node.status.addresses if addr.type == "InternalIP")
         self.prom = get_prometheus_connect(prometheus_params)
         self.default_params = {"timeout": PROMETHEUS_REQUEST_TIMEOUT_SECONDS}
-        self.prom.check_prometheus_connection(params=self.default_params)
+        check_prometheus_connection(self.prom, params=self.default_params)
 
     def get_total_cpu_usage(self, other_method=False):
         """
@@ -53,7 +57,7 @@ class NodeCpuAnalyzer:
         :return: a dict of {[pod_name] : [cpu_usage in the 0-1 range] }
         """
         query = self._build_query_for_containerized_cpu_usage(False, normalize_by_cpu_count)
-        response = self.prom.safe_custom_query(query, params=self.default_params)
+        response = self._custom_query(query)
         result = response["result"]
         pod_value_pairs = [(r["metric"]["pod"], float(r["value"][1])) for r in result]
         pod_value_pairs = [(k, v) for (k, v) in pod_value_pairs if v >= threshold]
@@ -63,7 +67,7 @@ class NodeCpuAnalyzer:
 
     def get_per_pod_cpu_request(self):
         query = f'sum by (pod)(kube_pod_container_resource_requests_cpu_cores{{node="{self.node.metadata.name}"}})'
-        response = self.prom.safe_custom_query(query, params=self.default_params)
+        response = self._custom_query(query)
         result = response["result"]
         return dict((r["metric"]["pod"], float(r["value"][1])) for r in result)
 
@@ -71,10 +75,15 @@ class NodeCpuAnalyzer:
         """
         Runs a simple query returning a single metric and returns that metric
         """
-        response = self.prom.safe_custom_query(query, params=self.default_params)
+        response = self._custom_query(query)
         result = response["result"]
         return float(result[0]["value"][1])
 
+    def _custom_query(self, query: str) -> dict:
+        return PrometheusClientPool.run_query(
+            self.prom, lambda: self.prom.safe_custom_query(query, params=self.default_params)
+        )
+
     def _build_query_for_containerized_cpu_usage(self, total, normalized_by_cpu_count):
         if total:
             grouping = ""
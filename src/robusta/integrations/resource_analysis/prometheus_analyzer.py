@@ -4,7 +4,11 @@ from typing import Optional, Union
 
 from robusta.core.model.base_params import PrometheusParams
 from robusta.core.model.env_vars import PROMETHEUS_REQUEST_TIMEOUT_SECONDS
-from robusta.integrations.prometheus.utils import get_prometheus_connect
+from robusta.integrations.prometheus.utils import (
+    PrometheusClientPool,
+    check_prometheus_connection,
+    get_prometheus_connect,
+)
 
 
 class PrometheusAnalyzer:
@@ -12,7 +16,7 @@ class PrometheusAnalyzer:
         self.prom = get_prometheus_connect(prometheus_params)
         self.default_params = {"timeout": PROMETHEUS_REQUEST_TIMEOUT_SECONDS}
 
-        self.prom.check_prometheus_connection(params=self.default_params)
+        check_prometheus_connection(self.prom, params=self.default_params)
 
         self.prometheus_tzinfo = prometheus_tzinfo or datetime.now().astimezone().tzinfo
 
@@ -22,7 +26,9 @@ class PrometheusAnalyzer:
         return self._non_timed_query(promql_query)
 
     def _non_timed_query(self, promql_query: str) -> list:
-        response = self.prom.safe_custom_query(promql_query, self.default_params)
+        response = PrometheusClientPool.run_query(
+            self.prom, lambda: self.prom.safe_custom_query(promql_query, self.default_params)
+        )
         results = response["result"]
         return results
 
@@ -42,8 +48,11 @@ class PrometheusAnalyzer:
         end_time = datetime.now(tz=self.prometheus_tzinfo)
         start_time = end_time - duration
         step = kwargs.get("step", "1")
-        response = self.prom.safe_custom_query_range(
-            promql_query, start_time, end_time, step, {"timeout": self.default_params["timeout"]}
+        response = PrometheusClientPool.run_query(
+            self.prom,
+            lambda: self.prom.safe_custom_query_range(
+                promql_query, start_time, end_time, step, {"timeout": self.default_params["timeout"]}
+            ),
         )
         results = response["result"]
         return results
@@ -82,6 +82,9 @@ class PlaybooksSchedulerManagerImpl(PlaybooksSchedulerManager):
             standalone_task=standalone_task,
         )
 
+    def stop(self):
+        self.scheduler.stop()
+
     def update(self, playbooks: List[PlaybookDefinition]):
         playbook_ids = set(playbook.get_id() for playbook in playbooks)
         self.__unschedule_deleted_playbooks(playbook_ids)
@@ -0,0 +1,324 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import prometheus_client
+from slack_sdk.errors import SlackApiError
+
+from robusta.core.model.env_vars import (
+    SLACK_COLLAPSE_BURSTS,
+    SLACK_RATE_LIMIT_RETRIES,
+    SLACK_RATE_SCHEDULER_MAX_QUEUE,
+    SLACK_RATE_SCHEDULER_WORKERS,
+)
+
+slack_outbound_queue_depth = prometheus_client.Gauge(
+    "slack_outbound_queue_depth",
+    "Number of Slack requests waiting to be sent, by channel",
+    labelnames=("channel",),
+)
+slack_outbound_delay = prometheus_client.Summary(
+    "slack_outbound_delay",
+    "Seconds a Slack request waited in the queue before it was sent, by channel",
+    labelnames=("channel",),
+)
+slack_outbound_rate_limited = prometheus_client.Counter(
+    "slack_outbound_rate_limited",
+    "Number of Slack requests rejected with 429 (rate limited), by channel",
+    labelnames=("channel",),
+)
+slack_outbound_collapsed = prometheus_client.Counter(
+    "slack_outbound_collapsed",
+    "Number of Slack messages sent as part of a digest message, by channel",
+    labelnames=("channel",),
+)
+
+# (requests per second, burst) of each method, following Slack's rate limit tiers.
+# chat.postMessage is limited per channel, the other methods per workspace
+CHANNEL_METHOD_LIMITS = {
+    "chat_postMessage": (1.0, 3),  # 1 per second per channel, short bursts are allowed
+}
+WORKSPACE_METHOD_LIMITS = {
+    "chat_update": (50 / 60, 10),  # tier 3
+    "files_upload_v2": (100 / 60 / 2, 5),  # tier 4, and each upload is 2 api calls
+}
+# Slack rejects messages with more blocks than that
+MAX_MESSAGE_BLOCKS = 50
+MAX_DIGEST_TEXT_CHARS = 3000
+DEFAULT_RETRY_AFTER_SEC = 1.0
+WORKSPACE_CHANNEL = ""  # requests without a channel, e.g. file uploads that are only linked
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def __refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate_per_sec)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """
+        Seconds until a token is available
+        """
+        self.__refill(now)
+        return max(self.blocked_until - now, (1 - self.tokens) / self.rate_per_sec, 0.0)
+
+    def take(self, now: float):
+        self.__refill(now)
+        self.tokens -= 1
+
+    def block(self, now: float, seconds: float):
+        # Slack asked to wait, so a burst after it is not allowed either
+        self.__refill(now)
+        self.tokens = min(self.tokens, 0.0)
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class SlackRequest:
+    def __init__(self, client, method: str, channel: str, kwargs: Dict[str, Any], collapsible: bool):
+        self.client = client
+        self.method = method
+        self.channel = channel
+        self.kwargs = kwargs
+        self.collapsible = collapsible
+        self.future = Future()
+        self.queued_at = time.time()
+        self.retries = 0
+
+
+def get_retry_after(e: SlackApiError) -> Optional[float]:
+    """
+    Seconds to wait before retrying, when Slack rejected the request with 429
+    """
+    response = e.response
+    if response is None or response.status_code != 429:
+        return None
+    for name, value in (response.headers or {}).items():
+        if name.lower() == "retry-after":
+            try:
+                return float(value[0] if isinstance(value, list) else value)
+            except (TypeError, ValueError):
+                break
+    return DEFAULT_RETRY_AFTER_SEC
+
+
+def collapse(requests: List[SlackRequest]) -> Dict[str, Any]:
+    """
+    The chat_postMessage arguments of one digest message, with the content of all the requests
+    """
+    texts = [request.kwargs.get("text") or "" for request in requests]
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": f"*{len(requests)} notifications*"}}]
+    attachments = []
+    for request in requests:
+        blocks.append({"type": "divider"})
+        blocks.extend(request.kwargs.get("blocks") or [])
+        attachments.extend(request.kwargs.get("attachments") or [])
+
+    kwargs = dict(requests[0].kwargs)
+    kwargs["text"] = "\n".join(texts)[:MAX_DIGEST_TEXT_CHARS]
+    kwargs["blocks"] = blocks
+    kwargs["attachments"] = attachments or None
+    for unfurl in ["unfurl_links", "unfurl_media"]:
+        if unfurl in kwargs:
+            kwargs[unfurl] = all(request.kwargs.get(unfurl, True) for request in requests)
+    return kwargs
+
+
+def digest_blocks_count(request: SlackRequest) -> int:
+    return len(request.kwargs.get("blocks") or []) + 1  # and a divider
+
+
+class SlackRateScheduler:
+    """
+    Sends the Slack requests of a workspace from its own workers, within Slack's rate limits.
+
+    Each channel has a queue, and its requests are sent in order, one at a time. A request is sent when both the
+    token bucket of its channel and the token bucket of its method in the workspace allow it, so a burst to one channel
+    doesn't delay the other channels. Rate limited (429) requests are retried after the Retry-After of the response,
+    without blocking the caller.
+
+    Requests that no one waits for can be collapsed: queued top level messages of the same channel are sent as one
+    digest message
+    """
+
+    schedulers: Dict[str, "SlackRateScheduler"] = {}
+    schedulers_lock = threading.Lock()
+
+    def __init__(
+        self,
+        num_workers: int = SLACK_RATE_SCHEDULER_WORKERS,
+        max_queue: int = SLACK_RATE_SCHEDULER_MAX_QUEUE,
+        collapse_bursts: bool = SLACK_COLLAPSE_BURSTS,
+        max_retries: int = SLACK_RATE_LIMIT_RETRIES,
+    ):
+        self.num_workers = num_workers
+        self.max_queue = max_queue
+        self.collapse_bursts = collapse_bursts
+        self.max_retries = max_retries
+        self.cond = threading.Condition()
+        self.queues: Dict[str, Deque[SlackRequest]] = {}
+        self.busy_channels = set()
+        self.channel_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.workspace_buckets: Dict[str, TokenBucket] = {}
+        self.workers: List[threading.Thread] = []
+
+    @classmethod
+    def for_token(cls, token: str) -> "SlackRateScheduler":
+        """
+        The scheduler of the workspace of the token. Senders of the same workspace share the rate limits
+        """
+        key = hashlib.sha256(token.encode()).hexdigest()
+        with cls.schedulers_lock:
+            scheduler = cls.schedulers.get(key)
+            if scheduler is None:
+                scheduler = cls.schedulers[key] = cls()
+            return scheduler
+
+    def submit(
+        self, client, method: str, channel: Optional[str], kwargs: Dict[str, Any], collapsible: bool = False
+    ) -> Future:
+        """
+        Queue a call of client.<method>(**kwargs). The future is set with the response, or the error.
+
+        When the channel queue is full, waits for the request to be sent
+        """
+        channel = channel or WORKSPACE_CHANNEL
+        request = SlackRequest(client, method, channel, kwargs, collapsible and self.collapse_bursts)
+        with self.cond:
+            self.__start_workers()
+            queue = self.queues.setdefault(channel, deque())
+            queue.append(request)
+            queue_depth = len(queue)
+            slack_outbound_queue_depth.labels(channel).set(queue_depth)
+            self.cond.notify()
+
+        if queue_depth > self.max_queue:
+            try:
+                request.future.result()
+            except Exception:
+                pass  # the caller handles the error from the future
+        return request.future
+
+    def __start_workers(self):
+        if self.workers:
+            return
+        for index in range(self.num_workers):
+            worker = threading.Thread(target=self.__worker, name=f"SlackRateScheduler-{index}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def __buckets(self, request: SlackRequest) -> List[TokenBucket]:
+        buckets = []
+        if request.method in CHANNEL_METHOD_LIMITS:
+            key = (request.channel, request.method)
+            bucket = self.channel_buckets.get(key)
+            if bucket is None:
+                bucket = self.channel_buckets[key] = TokenBucket(*CHANNEL_METHOD_LIMITS[request.method])
+            buckets.append(bucket)
+        if request.method in WORKSPACE_METHOD_LIMITS:
+            bucket = self.workspace_buckets.get(request.method)
+            if bucket is None:
+                bucket = self.workspace_buckets[request.method] = TokenBucket(*WORKSPACE_METHOD_LIMITS[request.method])
+            buckets.append(bucket)
+        return buckets
+
+    def __next_requests(self) -> Tuple[Optional[List[SlackRequest]], float]:
+        """
+        The requests to send now, and otherwise the seconds until a request can be sent. Must hold cond
+        """
+        now = time.monotonic()
+        wait = None
+        for channel, queue in self.queues.items():
+            if not queue or channel in self.busy_channels:
+                continue
+            request = queue[0]
+            buckets = self.__buckets(request)
+            delay = max([bucket.delay(now) for bucket in buckets], default=0.0)
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            for bucket in buckets:
+                bucket.take(now)
+            requests = [queue.popleft()]
+            if request.collapsible:
+                blocks_count = digest_blocks_count(request) + 1
+                while queue and queue[0].collapsible and queue[0].method == request.method:
+                    blocks_count += digest_blocks_count(queue[0])
+                    if blocks_count > MAX_MESSAGE_BLOCKS:
+                        break
+                    requests.append(queue.popleft())
+            self.busy_channels.add(channel)
+            slack_outbound_queue_depth.labels(channel).set(len(queue))
+            return requests, 0.0
+        return None, wait
+
+    def __worker(self):
+        while True:
+            with self.cond:
+                requests, wait = self.__next_requests()
+                while requests is None:
+                    self.cond.wait(timeout=wait)
+                    requests, wait = self.__next_requests()
+            try:
+                self.__send(requests)
+            except Exception:
+                logging.exception("Slack rate scheduler failed to send a request")
+            finally:
+                with self.cond:
+                    self.busy_channels.discard(requests[0].channel)
+                    self.cond.notify_all()
+
+    def __send(self, requests: List[SlackRequest]):
+        request = requests[0]
+        sent_at = time.time()
+        for queued in requests:
+            slack_outbound_delay.labels(request.channel).observe(sent_at - queued.queued_at)
+
+        kwargs = request.kwargs
+        if len(requests) > 1:
+            kwargs = collapse(requests)
+            slack_outbound_collapsed.labels(request.channel).inc(len(requests))
+
+        try:
+            response = getattr(request.client, request.method)(**kwargs)
+        except SlackApiError as e:
+            retry_after = get_retry_after(e)
+            if retry_after is None:
+                self.__set_exception(requests, e)
+                return
+
+            slack_outbound_rate_limited.labels(request.channel).inc()
+            retry = [queued for queued in requests if queued.retries < self.max_retries]
+            self.__set_exception([queued for queued in requests if queued.retries >= self.max_retries], e)
+            with self.cond:
+                now = time.monotonic()
+                for bucket in self.__buckets(request):
+                    bucket.block(now, retry_after)
+                # back to the head of the queue, so the channel order is kept
+                queue = self.queues[request.channel]
+                for queued in reversed(retry):
+                    queued.retries += 1
+                    queue.appendleft(queued)
+                slack_outbound_queue_depth.labels(request.channel).set(len(queue))
+            return
+        except Exception as e:
+            self.__set_exception(requests, e)
+            return
+
+        for queued in requests:
+            queued.future.set_result(response)
+
+    @staticmethod
+    def __set_exception(requests: List[SlackRequest], e: Exception):
+        for request in requests:
+            request.future.set_exception(e)
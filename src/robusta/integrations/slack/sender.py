@@ -4,6 +4,7 @@ import time
 import ssl
 import tempfile
 import re
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from itertools import chain
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
@@ -21,6 +22,7 @@ from robusta.core.model.env_vars import (
     HOLMES_ASK_SLACK_BUTTON_ENABLED,
     HOLMES_ENABLED,
     SLACK_RATE_LIMIT_RETRIES,
+    SLACK_RATE_SCHEDULER,
     SLACK_REQUEST_TIMEOUT,
     SLACK_TABLE_COLUMNS_LIMIT,
     SLACK_FORWARD_URL,
@@ -52,6 +54,7 @@ from robusta.core.sinks.sink_base import KeyT
 from robusta.core.sinks.slack.slack_sink_params import SlackSinkParams
 from robusta.core.sinks.slack.preview.slack_sink_preview_params import SlackSinkPreviewParams
 from robusta.core.sinks.transformer import Transformer
+from robusta.integrations.slack.rate_scheduler import SlackRateScheduler
 
 ACTION_TRIGGER_PLAYBOOK = "trigger_playbook"
 ACTION_LINK = "link"
@@ -67,6 +70,9 @@ MENTION_PATTERN = re.compile(r"<[^>]+>")
 
 def _build_retry_handlers():
     handlers = all_builtin_retry_handlers()
+    if SLACK_RATE_SCHEDULER:
+        # rate limited requests are retried by the rate scheduler, without sleeping on the calling thread
+        return [h for h in handlers if not isinstance(h, RateLimitErrorRetryHandler)]
     return [
         RateLimitErrorRetryHandler(max_retry_count=SLACK_RATE_LIMIT_RETRIES)
         if isinstance(h, RateLimitErrorRetryHandler) else h
@@ -106,15 +112,32 @@ class SlackSender:
         self.cluster_name = cluster_name
         self.is_preview = is_preview
         self.disable_holmes_note = disable_holmes_note
+        self.rate_scheduler = SlackRateScheduler.for_token(slack_token) if SLACK_RATE_SCHEDULER else None
 
         if slack_token not in self.verified_api_tokens:
             try:
-                self.slack_client.auth_test()
+                # through the scheduler, that retries it when rate limited
+                self.__call_slack("auth_test").result()
                 self.verified_api_tokens.add(slack_token)
             except SlackApiError as e:
                 logging.error(f"Cannot connect to Slack API: {e}")
                 raise e
 
+    def __call_slack(self, method: str, collapsible: bool = False, **kwargs) -> Future:
+        """
+        Call a method of the Slack client, through the rate scheduler when it's enabled.
+        collapsible messages may be sent as part of a digest message
+        """
+        if self.rate_scheduler is not None:
+            return self.rate_scheduler.submit(self.slack_client, method, kwargs.get("channel"), kwargs, collapsible)
+
+        future = Future()
+        try:
+            future.set_result(getattr(self.slack_client, method)(**kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
     def __slack_preview_sanitize_string(self, text: str) -> str:
         """
         Properly sanitize a string for JSON by escaping newlines.
@@ -255,21 +278,22 @@ class SlackSender:
             logging.warning(f"cannot convert block of type {type(block)} to slack format block: {block}")
             return []  # no reason to crash the entire report
 
-    def _upload_temp_file(self, f, file_reference, truncated_content: bytes, filename: str) -> Optional[str]:
+    def _upload_temp_file(self, f, file_reference, truncated_content: memoryview, filename: str) -> Optional[str]:
         """Helper to upload a file-like or file path to Slack."""
         f.write(truncated_content)
         f.flush()
         f.seek(0)
 
-        result = self.slack_client.files_upload_v2(
+        result = self.__call_slack(
+            "files_upload_v2",
             title=filename,
             file_uploads=[{"file": file_reference, "filename": filename, "title": filename}],
-        )
+        ).result()
         return result["file"]["permalink"]
 
     def __upload_file_to_slack(self, block: FileBlock, max_log_file_limit_kb: int) -> Optional[str]:
         """Upload a file to Slack and return a permalink to it."""
-        truncated_content = block.truncate_content(max_file_size_bytes=max_log_file_limit_kb * 1000)
+        truncated_content = block.truncated_view(max_file_size_bytes=max_log_file_limit_kb * 1000)
         filename = block.filename
 
         try:
@@ -335,7 +359,11 @@ class SlackSender:
         channel: str,
         thread_ts: str = None,
         output_blocks: Optional[List[SlackBlock]] = None
-    ) -> str:
+    ) -> None:
+        """
+        Send the message in the background when the rate scheduler is enabled. Nothing waits for it, so the ts of the
+        message isn't returned, and send errors are logged rather than raised
+        """
         if output_blocks is None:
             output_blocks = []
         file_blocks = add_pngs_for_all_svgs([b for b in report_blocks if isinstance(b, FileBlock)])
@@ -369,30 +397,37 @@ class SlackSender:
             f"message:{message}"
         )
 
-        try:
-            if thread_ts:
-                kwargs = {"thread_ts": thread_ts}
-            else:
-                kwargs = {}
-            resp = self.slack_client.chat_postMessage(
-                channel=channel,
-                text=message,
-                blocks=output_blocks,
-                display_as_bot=True,
-                attachments=(
-                    [{"color": status.to_color_hex(), "blocks": attachment_blocks}] if attachment_blocks else None
-                ),
-                unfurl_links=unfurl,
-                unfurl_media=unfurl,
-                **kwargs,
-            )
+        if thread_ts:
+            kwargs = {"thread_ts": thread_ts}
+        else:
+            kwargs = {}
+        # Nothing waits for the message to be sent, so a burst to one channel doesn't hold the event workers.
+        # Top level messages may be collapsed to a digest message
+        future = self.__call_slack(
+            "chat_postMessage",
+            collapsible=not thread_ts,
+            channel=channel,
+            text=message,
+            blocks=output_blocks,
+            display_as_bot=True,
+            attachments=(
+                [{"color": status.to_color_hex(), "blocks": attachment_blocks}] if attachment_blocks else None
+            ),
+            unfurl_links=unfurl,
+            unfurl_media=unfurl,
+            **kwargs,
+        )
+
+        def on_sent(sent: Future):
+            if sent.exception() is not None:
+                logging.error(
+                    f"error sending message to slack\ne={sent.exception()}\ntext={message}\nchannel={channel}\nblocks={*output_blocks,}\nattachment_blocks={*attachment_blocks,}"
+                )
+                return
             # We will need channel ids for future message updates
-            self.channel_name_to_id[channel] = resp["channel"]
-            return resp["ts"]
-        except Exception as e:
-            logging.error(
-                f"error sending message to slack\ne={e}\ntext={message}\nchannel={channel}\nblocks={*output_blocks,}\nattachment_blocks={*attachment_blocks,}"
-            )
+            self.channel_name_to_id[channel] = sent.result()["channel"]
+
+        future.add_done_callback(on_sent)
 
     def __limit_labels_size(self, labels: dict, max_size: int = 1000) -> dict:
         # slack can only send 2k tokens in a callback so the labels are limited in size
@@ -583,11 +618,14 @@ class SlackSender:
 
         text = "*AI used info from alert and the following tools:*"
         for tool in tool_calls:
-            file_response = self.slack_client.files_upload_v2(content=tool.result, title=f"{tool.description}")
+            file_response = self.__call_slack(
+                "files_upload_v2", content=tool.result, title=f"{tool.description}"
+            ).result()
             permalink = file_response["file"]["permalink"]
             text += f"\n• `<{permalink}|{tool.description}>`"
 
-        self.slack_client.chat_postMessage(
+        self.__call_slack(
+            "chat_postMessage",
             channel=slack_channel,
             thread_ts=parent_thread,
             text=text,
@@ -597,7 +635,7 @@ class SlackSender:
                     "text": {"type": "mrkdwn", "text": text},
                 }
             ],
-        )
+        ).result()
 
     def send_holmes_analysis(
         self,
@@ -640,7 +678,8 @@ class SlackSender:
                 kwargs = {"thread_ts": thread_ts}
             else:
                 kwargs = {}
-            resp = self.slack_client.chat_postMessage(
+            resp = self.__call_slack(
+                "chat_postMessage",
                 channel=slack_channel,
                 text=title,
                 attachments=[
@@ -653,7 +692,7 @@ class SlackSender:
                 unfurl_links=False,
                 unfurl_media=False,
                 **kwargs,
-            )
+            ).result()
             # We will need channel ids for future message updates
             self.channel_name_to_id[slack_channel] = resp["channel"]
             if not thread_ts:  # if we're not in a threaded message, get the new message thread id
@@ -680,7 +719,11 @@ class SlackSender:
         sink_params: Union[SlackSinkParams, SlackSinkPreviewParams],
         platform_enabled: bool,
         thread_ts: str = None,
-    ) -> str:
+    ) -> None:
+        """
+        Send the finding to the Slack channel. The message may still be queued by the rate scheduler when this
+        returns, so it doesn't return the message ts
+        """
         if self.is_preview:
             try:
                 return self.__send_finding_to_slack_preview(
@@ -713,7 +756,7 @@ class SlackSender:
         sink_params: SlackSinkParams,
         platform_enabled: bool,
         thread_ts: str = None,
-    ) -> str:
+    ) -> None:
         blocks: List[BaseBlock] = []
         attachment_blocks: List[BaseBlock] = []
 
@@ -728,7 +771,7 @@ class SlackSender:
         if finding.finding_type == FindingType.AI_ANALYSIS:
             # holmes analysis message needs special handling
             self.send_holmes_analysis(finding, slack_channel, platform_enabled, thread_ts)
-            return ""  # [arik] Looks like the return value here is not used, needs to be removed
+            return
 
         status: FindingStatus = (
             FindingStatus.RESOLVED if finding.title.startswith("[RESOLVED]") else FindingStatus.FIRING
@@ -793,7 +836,7 @@ class SlackSender:
         sink_params: SlackSinkPreviewParams,
         platform_enabled: bool,
         thread_ts: str = None,
-    ) -> str:
+    ) -> None:
         blocks: List[BaseBlock] = []
         attachment_blocks: List[BaseBlock] = []
 
@@ -808,7 +851,7 @@ class SlackSender:
         if finding.finding_type == FindingType.AI_ANALYSIS:
             # holmes analysis message needs special handling
             self.send_holmes_analysis(finding, slack_channel, platform_enabled, thread_ts)
-            return ""  # [arik] Looks like the return value here is not used, needs to be removed
+            return
 
         status: FindingStatus = (
             FindingStatus.RESOLVED if finding.title.startswith("[RESOLVED]") else FindingStatus.FIRING
@@ -926,7 +969,8 @@ class SlackSender:
         contents = table_block.to_table_string(table_max_width=SUMMARY_ATTACHMENT_TABLE_WIDTH)
         file_block = FileBlock("alerts-summary.txt", contents.encode("utf-8"))
         try:
-            resp = self.slack_client.files_upload_v2(
+            resp = self.__call_slack(
+                "files_upload_v2",
                 # Without a channel the file is only linkable, not shared: the permalink opens
                 # an empty preview that other members can't read or download. Sharing it into
                 # the summary's thread rather than the channel keeps the channel readable when
@@ -936,7 +980,7 @@ class SlackSender:
                 title=file_block.filename,
                 filename=file_block.filename,
                 content=file_block.contents,
-            )
+            ).result()
             permalink = resp["file"]["permalink"]
             new_file_id = resp["file"]["id"]
         except Exception:
@@ -954,7 +998,7 @@ class SlackSender:
             return
         # Best effort - a leftover file is preferable to failing the summary update.
         try:
-            self.slack_client.files_delete(file=file_id)
+            self.__call_slack("files_delete", file=file_id).result()
         except Exception as e:
             logging.warning(f"Could not delete the superseded summary attachment: {e}")
 
@@ -1055,7 +1099,7 @@ class SlackSender:
             )
         channel_name = channel
         if msg_ts is not None:
-            method = self.slack_client.chat_update
+            method = "chat_update"
             kwargs = {"ts": msg_ts}
             # chat_update calls require channel ids (like "C123456") as opposed to channel names
             # for chat_postMessage calls.
@@ -1067,7 +1111,7 @@ class SlackSender:
                 return
             channel = self.channel_name_to_id[channel]
         else:
-            method = self.slack_client.chat_postMessage
+            method = "chat_postMessage"
             kwargs = {}
 
         attachment_permalink = None
@@ -1097,13 +1141,14 @@ class SlackSender:
             message_text = f"{message_text}\n<{attachment_permalink}|alerts-summary.txt>"
 
         try:
-            resp = method(
+            resp = self.__call_slack(
+                method,
                 channel=channel,
                 text=message_text,
                 blocks=output_blocks,
                 display_as_bot=True,
                 **kwargs,
-            )
+            ).result()
             # Updating this message later needs the channel id, and a summary-only sink never
             # sends anything else that would record it (individual alerts, which do, are only
             # sent in threaded mode). Without this the message can never be updated, and a new
@@ -1132,7 +1177,7 @@ class SlackSender:
                 return
 
             # Call Slack's chat_update method
-            resp = self.slack_client.chat_update(channel=channel, ts=ts, text=text, blocks=blocks)
+            resp = self.__call_slack("chat_update", channel=channel, ts=ts, text=text, blocks=blocks).result()
             logging.debug(f"Message updated successfully: {resp['ts']}")
             return resp["ts"]
 
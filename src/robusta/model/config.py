@@ -6,6 +6,8 @@ from robusta.core.model.env_vars import PROMETHEUS_ENABLED, RUNNER_VERSION
 from robusta.core.playbooks.actions_registry import ActionsRegistry
 from robusta.core.playbooks.base_trigger import TriggerEvent
 from robusta.core.playbooks.playbook_utils import merge_global_params
+from robusta.core.playbooks.playbooks_trigger_index import PlaybooksTriggerIndex
+from robusta.core.playbooks.trigger import Trigger
 from robusta.core.pubsub.event_emitter import EventEmitter
 from robusta.core.pubsub.event_subscriber import EventHandler
 from robusta.core.pubsub.events_pubsub import EventsPubSub
@@ -106,6 +108,9 @@ class PlaybooksRegistry:
     def get_playbooks(self, trigger_event: TriggerEvent) -> List[PlaybookDefinition]:
         return []
 
+    def get_playbooks_candidates(self, trigger_event: TriggerEvent) -> List[Tuple[PlaybookDefinition, List[Trigger]]]:
+        return []
+
     def get_default_sinks(self):
         return []
 
@@ -161,9 +166,20 @@ class PlaybooksRegistryImpl(PlaybooksRegistry):
             for event in playbooks_trigger_events:
                 self.triggers_to_playbooks[event].append(playbook_def)
 
+        # Index each event playbooks, so that only triggers that can fire are evaluated
+        self.triggers_index: Dict[str, PlaybooksTriggerIndex] = {
+            event: PlaybooksTriggerIndex(playbooks, event) for event, playbooks in self.triggers_to_playbooks.items()
+        }
+
     def get_playbooks(self, trigger_event: TriggerEvent) -> List[PlaybookDefinition]:
         return self.triggers_to_playbooks.get(trigger_event.get_event_name(), [])
 
+    def get_playbooks_candidates(self, trigger_event: TriggerEvent) -> List[Tuple[PlaybookDefinition, List[Trigger]]]:
+        triggers_index = self.triggers_index.get(trigger_event.get_event_name())
+        if not triggers_index:
+            return []
+        return triggers_index.get_candidates(trigger_event)
+
     def get_default_sinks(self) -> List[str]:
         return self.default_sinks
 
@@ -0,0 +1,313 @@
+import asyncio
+import io
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple
+
+import prometheus_client
+
+from robusta.core.model.env_vars import (
+    INGESTION_KEEP_ALIVE_TIMEOUT_SEC,
+    INGESTION_MAX_BODY_BYTES,
+    INGESTION_PARSER_THREADS,
+    NUM_EVENT_THREADS,
+)
+from robusta.runner.web import Web
+
+MAX_HEADERS = 100
+MAX_LINE_BYTES = 64 * 1024
+SUCCESS_BODY = b'{"success":true}\n'
+
+ingestion_request_time = prometheus_client.Summary(
+    "ingestion_request_time", "Async ingestion server request time (seconds)", labelnames=("route", "status")
+)
+
+Headers = List[Tuple[str, str]]
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus):
+        super().__init__(status.phrase)
+        self.status = status
+
+
+class HttpRequest:
+    def __init__(self, method: str, target: str, version: str, headers: Headers, body: bytes):
+        self.method = method
+        self.path, _, self.query = target.partition("?")
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    def get_header(self, name: str, default: str = "") -> str:
+        name = name.lower()
+        for header_name, value in self.headers:
+            if header_name.lower() == name:
+                return value
+        return default
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.get_header("connection").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class HttpResponse:
+    def __init__(self, status: int, reason: str, headers: Headers, body: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    @staticmethod
+    def from_status(status: HTTPStatus, body: bytes = b"") -> "HttpResponse":
+        return HttpResponse(status.value, status.phrase, [("Content-Type", "application/json")], body)
+
+    def serialize(self, keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {self.status} {self.reason}"]
+        for name, value in self.headers:
+            if name.lower() not in ("content-length", "connection", "transfer-encoding"):
+                lines.append(f"{name}: {value}")
+        lines.append(f"Content-Length: {len(self.body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + self.body
+
+
+class AsyncIngestionServer:
+    """
+    asyncio HTTP/1.1 server for the high volume ingestion routes (alerts, api server events and helm releases).
+
+    Request bodies are parsed and enqueued on a thread pool, so the event loop only does the network IO.
+    Connections are kept alive. Pipelined requests are read while the previous ones are processed, but are processed
+    one at a time, in order, so the events of a connection are enqueued in the order they were sent.
+    All other routes (actions, health, metrics) are served by the Flask WSGI app on a separate thread pool.
+    """
+
+    def __init__(
+        self,
+        wsgi_app: Callable,
+        parser_threads: int = INGESTION_PARSER_THREADS,
+        wsgi_threads: int = NUM_EVENT_THREADS,
+    ):
+        self.wsgi_app = wsgi_app
+        self.routes: Dict[str, Callable[[dict], None]] = {
+            "/api/alerts": Web.process_alert_event,
+            "/api/handle": Web.process_api_server_event,
+            "/api/helm-releases": Web.process_helm_releases,
+        }
+        self.parser_executor = ThreadPoolExecutor(max_workers=parser_threads, thread_name_prefix="ingestion-parser")
+        self.wsgi_executor = ThreadPoolExecutor(max_workers=wsgi_threads, thread_name_prefix="ingestion-wsgi")
+
+    def run(self, host: str, port: int):
+        logging.info(f"Starting async ingestion server on {host}:{port}")
+        asyncio.run(self.serve_forever(host, port))
+
+    async def serve_forever(self, host: str, port: int):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Responses are queued in the requests order. Each request is processed after the previous one, while the next
+        # requests are read, and the writer sends each response when it's ready
+        responses: asyncio.Queue = asyncio.Queue()
+        writer_task = asyncio.create_task(self.__write_responses(responses, writer))
+        dispatched: Optional[asyncio.Future] = None
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.__read_request(reader), INGESTION_KEEP_ALIVE_TIMEOUT_SEC)
+                except HttpError as e:
+                    await responses.put((self.__as_future(HttpResponse.from_status(e.status)), False))
+                    break
+
+                if request is None:  # connection closed by the client
+                    break
+
+                dispatched = asyncio.ensure_future(self.__dispatch(request, dispatched))
+                await responses.put((dispatched, request.keep_alive))
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            await responses.put(None)
+            await writer_task
+            writer.close()
+
+    @staticmethod
+    def __as_future(response: HttpResponse) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(response)
+        return future
+
+    @staticmethod
+    async def __write_responses(responses: asyncio.Queue, writer: asyncio.StreamWriter):
+        closed = False
+        while True:
+            item = await responses.get()
+            if item is None:
+                return
+            response_future, keep_alive = item
+            response: HttpResponse = await response_future
+            if closed:
+                continue
+            try:
+                writer.write(response.serialize(keep_alive))
+                await writer.drain()
+            except ConnectionError:
+                closed = True
+
+    @staticmethod
+    async def __read_request(reader: asyncio.StreamReader) -> Optional[HttpRequest]:
+        request_line = b"\r\n"
+        while request_line in (b"\r\n", b"\n"):  # ignore empty lines between pipelined requests
+            request_line = await AsyncIngestionServer.__read_line(reader)
+            if not request_line:
+                return None
+
+        try:
+            method, target, version = request_line.decode("latin-1").strip().split(" ")
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST)
+        if version not in ("HTTP/1.0", "HTTP/1.1"):
+            raise HttpError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED)
+
+        headers: Headers = []
+        while True:
+            line = await AsyncIngestionServer.__read_line(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+            name, sep, value = line.decode("latin-1").partition(":")
+            if not sep:
+                raise HttpError(HTTPStatus.BAD_REQUEST)
+            headers.append((name.strip(), value.strip()))
+
+        request = HttpRequest(method, target, version, headers, b"")
+        if request.get_header("transfer-encoding").lower() == "chunked":
+            request.body = await AsyncIngestionServer.__read_chunked_body(reader)
+        else:
+            try:
+                content_length = int(request.get_header("content-length", "0"))
+            except ValueError:
+                raise HttpError(HTTPStatus.BAD_REQUEST)
+            if content_length > INGESTION_MAX_BODY_BYTES:
+                raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            if content_length:
+                request.body = await reader.readexactly(content_length)
+
+        return request
+
+    @staticmethod
+    async def __read_line(reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await reader.readline()
+        except (asyncio.LimitOverrunError, ValueError):
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+    @staticmethod
+    async def __read_chunked_body(reader: asyncio.StreamReader) -> bytes:
+        body = bytearray()
+        while True:
+            size_line = await AsyncIngestionServer.__read_line(reader)
+            try:
+                chunk_size = int(size_line.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise HttpError(HTTPStatus.BAD_REQUEST)
+            if chunk_size == 0:
+                while await AsyncIngestionServer.__read_line(reader) not in (b"\r\n", b"\n", b""):  # trailers
+                    pass
+                return bytes(body)
+            if len(body) + chunk_size > INGESTION_MAX_BODY_BYTES:
+                raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            body.extend(await reader.readexactly(chunk_size))
+            await reader.readline()  # chunk CRLF
+
+    async def __dispatch(self, request: HttpRequest, previous: Optional[asyncio.Future]) -> HttpResponse:
+        if previous is not None:
+            await asyncio.wait((previous,))
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        handler = self.routes.get(request.path) if request.method == "POST" else None
+        if handler:
+            route = request.path
+            response = await loop.run_in_executor(self.parser_executor, self.__ingest, handler, request)
+        else:
+            route = "wsgi"
+            response = await loop.run_in_executor(self.wsgi_executor, self.__call_wsgi, request)
+
+        ingestion_request_time.labels(route, response.status).observe(time.time() - start_time)
+        return response
+
+    @staticmethod
+    def __ingest(handler: Callable[[dict], None], request: HttpRequest) -> HttpResponse:
+        try:
+            req_json = json.loads(request.body)
+        except ValueError:
+            logging.error(f"Failed to decode request body for {request.path}")
+            return HttpResponse.from_status(HTTPStatus.BAD_REQUEST)
+
+        try:
+            handler(req_json)
+        except Exception:
+            logging.exception(f"Failed to handle request {request.path}")
+            return HttpResponse.from_status(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        return HttpResponse.from_status(HTTPStatus.OK, SUCCESS_BODY)
+
+    def __call_wsgi(self, request: HttpRequest) -> HttpResponse:
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": request.path,
+            "QUERY_STRING": request.query,
+            "SERVER_NAME": "robusta-runner",
+            "SERVER_PORT": "",
+            "SERVER_PROTOCOL": request.version,
+            "CONTENT_TYPE": request.get_header("content-type"),
+            "CONTENT_LENGTH": str(len(request.body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(request.body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in request.headers:
+            key = "HTTP_" + name.upper().replace("-", "_")
+            if key in ("HTTP_CONTENT_TYPE", "HTTP_CONTENT_LENGTH"):
+                continue
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+        response_status: List[str] = []
+        response_headers: Headers = []
+
+        def start_response(status: str, headers: Headers, exc_info=None):
+            response_status[:] = [status]
+            response_headers[:] = headers
+
+        try:
+            result = self.wsgi_app(environ, start_response)
+            try:
+                body = b"".join(result)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+        except Exception:
+            logging.exception(f"Failed to handle request {request.method} {request.path}")
+            return HttpResponse.from_status(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        status_code, _, reason = response_status[0].partition(" ")
+        return HttpResponse(int(status_code), reason, response_headers, body)
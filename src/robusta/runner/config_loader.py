@@ -9,10 +9,12 @@ import sys
 import tarfile
 import tempfile
 import threading
+from contextlib import contextmanager
 from inspect import getmembers
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import dpath.util
+import prometheus_client
 import requests
 import toml
 import yaml
@@ -22,10 +24,13 @@ from robusta.core.model.env_vars import (
     DEFAULT_PLAYBOOKS_PIP_INSTALL,
     DEFAULT_PLAYBOOKS_ROOT,
     INTERNAL_PLAYBOOKS_ROOT,
+    LAZY_ACTIONS_LOADING,
     PLAYBOOKS_CONFIG_FILE_PATH,
+    PLAYBOOKS_INCREMENTAL_RELOAD,
     PLAYBOOKS_ROOT,
 )
 from robusta.core.model.runner_config import PlaybookRepo, RunnerConfig
+from robusta.core.playbooks.actions_manifest import get_package_hash, hash_sources, load_manifest
 from robusta.core.playbooks.actions_registry import Action, ActionsRegistry
 from robusta.core.playbooks.playbooks_event_handler import PlaybooksEventHandler
 from robusta.integrations.git.git_repo import (
@@ -45,6 +50,16 @@ from robusta.utils.cluster_provider_discovery import cluster_provider
 from robusta.utils.file_system_watcher import FileSystemWatcher
 from robusta.core.exceptions import SupabaseDnsException
 
+config_reload_time = prometheus_client.Summary(
+    "config_reload_time", "Time of each phase of a config reload (seconds)", labelnames=("phase",)
+)
+playbook_package_loads = prometheus_client.Counter(
+    "playbook_package_loads",
+    "Number of playbook packages loaded on config reloads, by whether the package was reused, imported or loaded "
+    "from its actions manifest",
+    labelnames=("result",),
+)
+
 
 class ConfigLoader:
     # the structure on disk is:
@@ -65,6 +80,10 @@ class ConfigLoader:
         self.event_handler = event_handler
         self.root_playbook_path = PLAYBOOKS_ROOT
         self.reload_lock = threading.RLock()
+        # playbook repo url -> (package name, sources hash) of the installed package
+        self.installed_packages: Dict[str, Tuple[str, str]] = {}
+        # package name -> (sources hash, actions) of the imported package
+        self.imported_packages: Dict[str, Tuple[str, List[Callable]]] = {}
         self.watcher = FileSystemWatcher(self.root_playbook_path, self.reload)
         self.conf_watcher = FileSystemWatcher(self.config_file_path, self.reload)
         self.reload("initialization")
@@ -129,9 +148,10 @@ class ConfigLoader:
         actions_registry: ActionsRegistry,
         playbooks_repos: Dict[str, PlaybookRepo],
     ):
-        playbook_packages = []
+        playbook_packages: List[Tuple[str, Optional[str]]] = []
         for playbook_package, playbooks_repo in playbooks_repos.items():
             try:
+                sources_hash = None
                 if playbooks_repo.pip_install:  # skip playbooks that are already in site-packages
                     # Check that the config specifies an external Python package to be downloaded
                     # and installed in Robusta.
@@ -140,32 +160,72 @@ class ConfigLoader:
                         if url.startswith("http://"):
                             logging.warning(f"Downloading a playbook package from non-https source f{url}")
 
-                        playbook_package = self.install_package_remote_tgz(
-                            url=url, headers=playbooks_repo.http_headers, build_isolation=playbooks_repo.build_isolation
-                        )
+                        with self.download_package_remote_tgz(url=url, headers=playbooks_repo.http_headers) as pkg_path:
+                            playbook_package, sources_hash = self.__install_changed_package(playbooks_repo, pkg_path)
                     elif url.startswith((GIT_SSH_PREFIX, GIT_HTTPS_PREFIX)):
                         repo = GitRepo(url, playbooks_repo.key.get_secret_value(), playbooks_repo.branch)
-                        pkg_path = repo.repo_local_path
-                        self.install_package(
-                            pkg_path=repo.repo_local_path, build_isolation=playbooks_repo.build_isolation
+                        playbook_package, sources_hash = self.__install_changed_package(
+                            playbooks_repo, repo.repo_local_path
                         )
-                        playbook_package = self.__get_package_name(local_path=pkg_path)
                     elif url.startswith(LOCAL_PATH_URL_PREFIX):
                         pkg_path = url.replace(LOCAL_PATH_URL_PREFIX, "")
-                        self.install_package(pkg_path=pkg_path, build_isolation=playbooks_repo.build_isolation)
-                        playbook_package = self.__get_package_name(local_path=pkg_path)
+                        playbook_package, sources_hash = self.__install_changed_package(playbooks_repo, pkg_path)
                     else:
                         raise Exception(
                             f"Illegal playbook repo url {url}. "
                             f"Must start with '{GIT_SSH_PREFIX}', '{GIT_HTTPS_PREFIX}' or '{LOCAL_PATH_URL_PREFIX}'"
                         )
+                else:
+                    sources_hash = get_package_hash(playbook_package)
 
-                playbook_packages.append(playbook_package)
+                playbook_packages.append((playbook_package, sources_hash))
             except Exception:
                 logging.error(f"Failed to add playbooks repo {playbook_package}", exc_info=True)
 
-        for package_name in playbook_packages:
-            self.__import_playbooks_package(actions_registry, package_name)
+        for package_name, sources_hash in playbook_packages:
+            manifest = load_manifest(package_name) if LAZY_ACTIONS_LOADING else None
+            if manifest is not None:
+                logging.info(f"Adding the actions of package {package_name} from its actions manifest")
+                playbook_package_loads.labels("manifest").inc()
+                for action_name, action_manifest in manifest.items():
+                    actions_registry.add_lazy_action(action_name, action_manifest["module"])
+                continue
+
+            imported = self.imported_packages.get(package_name)
+            if PLAYBOOKS_INCREMENTAL_RELOAD and sources_hash and imported and imported[0] == sources_hash:
+                logging.info(f"Actions package {package_name} did not change, reusing its actions")
+                playbook_package_loads.labels("reused").inc()
+                playbook_actions = imported[1]
+            else:
+                playbook_package_loads.labels("imported").inc()
+                playbook_actions, imported_all = self.__import_playbooks_package(package_name)
+                # packages with modules that failed to import are imported again on the next reload
+                self.imported_packages[package_name] = (sources_hash if imported_all else None, playbook_actions)
+
+            for action_func in playbook_actions:
+                actions_registry.add_action(action_func)
+
+    @staticmethod
+    def __get_sources_hash(playbooks_repo: PlaybookRepo, pkg_path: str) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(repr((playbooks_repo.url, playbooks_repo.branch, playbooks_repo.build_isolation)).encode())
+        hash_sources(hasher, pkg_path)
+        return hasher.hexdigest()
+
+    def __install_changed_package(self, playbooks_repo: PlaybookRepo, pkg_path: str) -> Tuple[str, str]:
+        """
+        Install the package, unless the same sources were already installed.
+        Returns the package name and the sources hash
+        """
+        sources_hash = self.__get_sources_hash(playbooks_repo, pkg_path)
+        installed = self.installed_packages.get(playbooks_repo.url)
+        if PLAYBOOKS_INCREMENTAL_RELOAD and installed and installed[1] == sources_hash:
+            logging.info(f"Playbooks package {installed[0]} did not change, skipping install")
+            return installed
+
+        self.install_package(pkg_path=pkg_path, build_isolation=playbooks_repo.build_isolation)
+        self.installed_packages[playbooks_repo.url] = (self.__get_package_name(local_path=pkg_path), sources_hash)
+        return self.installed_packages[playbooks_repo.url]
 
     @classmethod
     def install_package(cls, pkg_path: str, build_isolation: bool) -> str:
@@ -182,13 +242,19 @@ class ConfigLoader:
         subprocess.check_call([sys.executable, "-m", "pip", "install"] + extra_pip_args + [pkg_path])
 
     @classmethod
-    def __import_playbooks_package(cls, actions_registry: ActionsRegistry, package_name: str):
+    def __import_playbooks_package(cls, package_name: str) -> Tuple[List[Callable], bool]:
+        """
+        Import, or reload, all the modules of the package.
+        Returns the actions of the package, and whether all the modules were imported
+        """
         logging.info(f"Importing actions package {package_name}")
         # Clear stale FileFinder caches so walk_packages discovers new .py files
         importlib.invalidate_caches()
         # Reload is required for modules that are already loaded
         pkg = importlib.reload(importlib.import_module(package_name))
         playbooks_modules = [name for _, name, _ in pkgutil.walk_packages(path=pkg.__path__)]
+        actions = []
+        imported_all = True
         for playbooks_module in playbooks_modules:
             try:
                 module_name = ".".join([package_name, playbooks_module])
@@ -197,15 +263,18 @@ class ConfigLoader:
                 m = importlib.reload(importlib.import_module(module_name))
                 playbook_actions = getmembers(m, Action.is_action)
                 for action_name, action_func in playbook_actions:
-                    actions_registry.add_action(action_func)
+                    actions.append(action_func)
             except Exception:
+                imported_all = False
                 logging.error(f"failed to module {playbooks_module}", exc_info=True)
+        return actions, imported_all
 
     def __reload_playbook_packages(self, change_name):
         logging.info(f"Reloading playbook packages due to change on {change_name}")
         with self.reload_lock:
             try:
-                runner_config = self.__load_runner_config(self.config_file_path)
+                with config_reload_time.labels("config_parse").time():
+                    runner_config = self.__load_runner_config(self.config_file_path)
                 if runner_config is None:
                     return
                 cluster_provider.init_provider_discovery()
@@ -245,7 +314,8 @@ class ConfigLoader:
                 else:
                     logging.info(f"No custom playbooks defined at {CUSTOM_PLAYBOOKS_ROOT}")
 
-                self.__load_playbooks_repos(action_registry, runner_config.playbook_repos)
+                with config_reload_time.labels("package_import").time():
+                    self.__load_playbooks_repos(action_registry, runner_config.playbook_repos)
 
                 # This needs to be set before the robusta sink is created since a cluster status is sent on creation
                 self.registry.set_light_actions(runner_config.light_actions if runner_config.light_actions else [])
@@ -294,13 +364,14 @@ class ConfigLoader:
         registry: Registry,
     ) -> tuple[SinksRegistry, PlaybooksRegistry]:
         existing_sinks = sinks_registry.get_all() if sinks_registry else {}
-        new_sinks, has_sink_errors = SinksRegistry.construct_new_sinks(
-            runner_config.sinks_config, 
-            existing_sinks, 
-            registry,
-            runner_config.global_config.get("continue_on_sink_errors", False)
-        )
-        sinks_registry = SinksRegistry(new_sinks)
+        with config_reload_time.labels("sink_construction").time():
+            new_sinks, has_sink_errors = SinksRegistry.construct_new_sinks(
+                runner_config.sinks_config,
+                existing_sinks,
+                registry,
+                runner_config.global_config.get("continue_on_sink_errors", False)
+            )
+            sinks_registry = SinksRegistry(new_sinks)
         registry.set_sink_initialization_errors(has_sink_errors)
 
         # TODO we will replace it with a more generic mechanism, as part of the triggers separation task
@@ -323,12 +394,13 @@ class ConfigLoader:
         else:
             logging.warning("No active playbooks configured")
 
-        playbooks_registry = PlaybooksRegistryImpl(
-            active_playbooks,
-            actions_registry,
-            runner_config.global_config,
-            sinks_registry.default_sinks,
-        )
+        with config_reload_time.labels("registry_build").time():
+            playbooks_registry = PlaybooksRegistryImpl(
+                active_playbooks,
+                actions_registry,
+                runner_config.global_config,
+                sinks_registry.default_sinks,
+            )
 
         return sinks_registry, playbooks_registry
 
@@ -343,8 +415,12 @@ class ConfigLoader:
             yaml_content = yaml.safe_load(file)
             return RunnerConfig(**yaml_content)
 
-    @classmethod
-    def install_package_remote_tgz(cls, url: str, headers, build_isolation: bool) -> Optional[str]:
+    @staticmethod
+    @contextmanager
+    def download_package_remote_tgz(url: str, headers) -> Iterator[str]:
+        """
+        Download and extract the package. Yields the path of the extracted package
+        """
         with tempfile.NamedTemporaryFile(suffix=".tgz") as f:
             r = requests.get(url, stream=True, headers=headers)
             r.raise_for_status()
@@ -361,5 +437,4 @@ class ConfigLoader:
                 if len(extracted_items) == 1:
                     pkg_path = os.path.join(temp_dir, extracted_items[0])
 
-                cls.install_package(pkg_path=pkg_path, build_isolation=build_isolation)
-                return cls.__get_package_name(local_path=pkg_path)
+                yield pkg_path
@@ -12,8 +12,14 @@ if add_custom_certificate(ADDITIONAL_CERTIFICATE):
 
 import signal
 
-from robusta.core.model.env_vars import ENABLE_TELEMETRY, ROBUSTA_TELEMETRY_ENDPOINT, TELEMETRY_PERIODIC_SEC
+from robusta.core.model.env_vars import (
+    DEBUGGER_POD_POOL_ENABLED,
+    ENABLE_TELEMETRY,
+    ROBUSTA_TELEMETRY_ENDPOINT,
+    TELEMETRY_PERIODIC_SEC,
+)
 from robusta.core.playbooks.playbooks_event_handler_impl import PlaybooksEventHandlerImpl
+from robusta.integrations.kubernetes.custom_models import debugger_pod_pool
 from robusta.model.config import Registry
 from robusta.patch.patch import create_monkey_patches
 from robusta.runner.config_loader import ConfigLoader
@@ -46,6 +52,9 @@ def main():
     else:
         logging.info("Telemetry is disabled.")
 
+    if DEBUGGER_POD_POOL_ENABLED:
+        debugger_pod_pool.start()
+
     Web.init(event_handler, loader)
 
     signal.signal(signal.SIGINT, event_handler.handle_sigint)
@@ -1,8 +1,9 @@
 import hashlib
 import logging
 import threading
+import time
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from cachetools import TTLCache
 from flask import Flask, abort, jsonify, request
@@ -11,12 +12,14 @@ from werkzeug.middleware.dispatcher import DispatcherMiddleware
 
 from robusta.clients.robusta_client import fetch_runner_info
 from robusta.core.model.env_vars import NUM_EVENT_THREADS, PORT, TRACE_INCOMING_ALERTS, TRACE_INCOMING_REQUESTS, \
-    PROCESSED_ALERTS_CACHE_TTL, PROCESSED_ALERTS_CACHE_MAX_SIZE, RUNNER_VERSION, RUNNER_BIND_ADDR, ENABLE_TELEMETRY
+    PROCESSED_ALERTS_CACHE_TTL, PROCESSED_ALERTS_CACHE_MAX_SIZE, RUNNER_VERSION, RUNNER_BIND_ADDR, ENABLE_TELEMETRY, \
+    INGESTION_SERVER_MODE, COALESCE_K8S_UPDATE_EVENTS, ALERT_RESOURCE_BATCHING
+from robusta.core.model.k8s_operation_type import K8sOperationType
 from robusta.core.playbooks.playbooks_event_handler import PlaybooksEventHandler
 from robusta.core.triggers.helm_releases_triggers import HelmReleasesTriggerEvent, IncomingHelmReleasesEventPayload
 from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload, K8sTriggerEvent
 from robusta.integrations.prometheus.models import AlertManagerEvent, PrometheusAlert
-from robusta.integrations.prometheus.trigger import PrometheusTriggerEvent
+from robusta.integrations.prometheus.trigger import AlertResourceBatch, PrometheusTriggerEvent
 from robusta.model.alert_relabel_config import AlertRelabelOp
 from robusta.runner.config_loader import ConfigLoader
 from robusta.utils.task_queue import QueueMetrics, TaskQueue
@@ -70,6 +73,12 @@ class Web:
 
     @staticmethod
     def run():
+        if INGESTION_SERVER_MODE == "async":
+            from robusta.runner.async_web import AsyncIngestionServer
+
+            AsyncIngestionServer(app).run(host=RUNNER_BIND_ADDR, port=PORT)
+            return
+
         app.run(host=RUNNER_BIND_ADDR, port=PORT, use_reloader=False)
 
     @classmethod
@@ -86,9 +95,15 @@ class Web:
     @staticmethod
     @app.route("/api/alerts", methods=["POST"])
     def handle_alert_event():
-        req_json = request.get_json()
+        Web.process_alert_event(request.get_json())
+        return jsonify(success=True)
+
+    @staticmethod
+    def process_alert_event(req_json: dict):
+        received_at = time.time()
         Web._trace_incoming_alerts(req_json)
         alert_manager_event = AlertManagerEvent(**req_json)
+        alerts: List[PrometheusAlert] = []
         for alert in alert_manager_event.alerts:
             alert = Web._relabel_alert(alert)
             alert_hash = Web.get_compound_hash([
@@ -102,12 +117,16 @@ class Web:
                     continue
                 else:
                     Web.processed_alerts_cache[alert_hash] = True
+            alerts.append(alert)
+
+        resource_batch = AlertResourceBatch(alerts) if ALERT_RESOURCE_BATCHING and alerts else None
+        for alert in alerts:
             Web.alerts_queue.add_task(
-                Web.event_handler.handle_trigger, PrometheusTriggerEvent(alert=alert)
+                Web.event_handler.handle_trigger,
+                PrometheusTriggerEvent(alert=alert, resource_batch=resource_batch, received_at=received_at),
             )
 
         Web.event_handler.get_telemetry().last_alert_at = str(datetime.now())
-        return jsonify(success=True)
 
     @staticmethod
     def get_compound_hash(data: List[bytes]) -> bytes:
@@ -119,7 +138,11 @@ class Web:
     @staticmethod
     @app.route("/api/helm-releases", methods=["POST"])
     def handle_helm_releases():
-        req_json = request.get_json()
+        Web.process_helm_releases(request.get_json())
+        return jsonify(success=True)
+
+    @staticmethod
+    def process_helm_releases(req_json: dict):
         Web._trace_incoming("received helm release trigger events via api", req_json)
         logging.debug("received helm release trigger events via api\n")
         helm_release_payload = IncomingHelmReleasesEventPayload.parse_obj(req_json)
@@ -127,16 +150,43 @@ class Web:
             Web.api_server_queue.add_task(
                 Web.event_handler.handle_trigger, HelmReleasesTriggerEvent(helm_release=helm_release)
             )
-        return jsonify(success=True)
 
     @staticmethod
     @app.route("/api/handle", methods=["POST"])
     def handle_api_server_event():
-        data = request.get_json()["data"]
+        Web.process_api_server_event(request.get_json())
+        return jsonify(success=True)
+
+    @staticmethod
+    def process_api_server_event(req_json: dict):
+        data = req_json["data"]
         Web._trace_incoming("api server", data)
         k8s_payload = IncomingK8sEventPayload(**data)
-        Web.api_server_queue.add_task(Web.event_handler.handle_trigger, K8sTriggerEvent(k8s_payload=k8s_payload))
-        return jsonify(success=True)
+        trigger_event = K8sTriggerEvent(k8s_payload=k8s_payload)
+        metadata = k8s_payload.obj.get("metadata") or {}
+        if COALESCE_K8S_UPDATE_EVENTS and metadata.get("name"):
+            coalesce_key = (k8s_payload.kind, metadata.get("namespace"), metadata["name"])
+            Web.api_server_queue.add_coalescing_task(
+                coalesce_key, Web._merge_k8s_update_events, Web.event_handler.handle_trigger, trigger_event
+            )
+        else:
+            Web.api_server_queue.add_task(Web.event_handler.handle_trigger, trigger_event)
+
+    @staticmethod
+    def _merge_k8s_update_events(queued_args: tuple, new_args: tuple) -> Optional[tuple]:
+        """
+        Merge a new update event into the queued update event of the same object.
+        The merged event has the latest obj, and the oldObj of the queued event, so it describes all the changes.
+        Create and delete events are never merged, to keep their order
+        """
+        queued_payload: IncomingK8sEventPayload = queued_args[0].k8s_payload
+        new_payload: IncomingK8sEventPayload = new_args[0].k8s_payload
+        update = K8sOperationType.UPDATE.value
+        if queued_payload.operation != update or new_payload.operation != update:
+            return None
+
+        merged_payload = new_payload.copy(update={"oldObj": queued_payload.oldObj})
+        return (K8sTriggerEvent(k8s_payload=merged_payload),)
 
     @staticmethod
     @app.route("/api/trigger", methods=["POST"])
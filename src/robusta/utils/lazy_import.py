@@ -0,0 +1,20 @@
+import importlib
+from typing import Any, Callable, Dict
+
+
+def lazy_attributes(module_name: str, attributes: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Returns a module ``__getattr__``, that imports the given attributes from their modules on first access.
+
+    Used so importing a package doesn't import heavy dependencies (sink SDKs, for example) that might not be used:
+
+        __getattr__ = lazy_attributes(__name__, {"DiscordSink": "robusta.core.sinks.discord.discord_sink"})
+    """
+
+    def __getattr__(name: str) -> Any:
+        attribute_module = attributes.get(name)
+        if attribute_module is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        return getattr(importlib.import_module(attribute_module), name)
+
+    return __getattr__
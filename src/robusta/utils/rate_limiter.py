@@ -1,29 +1,134 @@
 import logging
 import threading
-from collections import defaultdict
-from datetime import datetime
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterable, List
+
+import prometheus_client
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from robusta.core.model.env_vars import RATE_LIMITER_MAX_KEYS, RATE_LIMITER_SHARDS
+
+# How often each shard drops its expired keys
+SWEEP_INTERVAL_SEC = 60
+
+
+class RateLimiterShard:
+    def __init__(self, max_keys: int):
+        self.lock = threading.Lock()
+        # The time each key's bucket is full again, ordered by last use, so the least recently used keys are evicted
+        self.full_at: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.max_keys = max_keys
+        self.next_sweep = time.monotonic() + SWEEP_INTERVAL_SEC
+        # counted under the shard lock, rather than with prometheus counters that all the shards would share
+        self.allowed = 0
+        self.limited = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def sweep(self, now: float):
+        # a full bucket is the same as a missing key, so the key can be dropped
+        expired = [key for key, full_at in self.full_at.items() if full_at <= now]
+        for key in expired:
+            del self.full_at[key]
+        self.expired += len(expired)
+        self.next_sweep = now + SWEEP_INTERVAL_SEC
+
+    def __len__(self):
+        return len(self.full_at)
+
+
+class ShardedRateLimiter:
+    """
+    Token bucket rate limiter, of up to max_events events in period_seconds per key.
+
+    Each key only keeps the time its bucket is full again: every allowed event adds period_seconds / max_events to it,
+    and an event is allowed while that time is at most period_seconds ahead.
+    Keys are split between shards, each with its own lock, so concurrent operations of different keys rarely wait for
+    each other. A key is dropped once its bucket is full again, since it no longer limits anything, and the least recently
+    used keys are dropped when a shard has more than its share of max_keys
+    """
+
+    def __init__(self, num_shards: int = RATE_LIMITER_SHARDS, max_keys: int = RATE_LIMITER_MAX_KEYS):
+        num_shards = max(num_shards, 1)
+        self.num_shards = num_shards
+        self.shards: List[RateLimiterShard] = [
+            RateLimiterShard(max(max_keys // num_shards, 1)) for _ in range(num_shards)
+        ]
+
+    def mark_and_test(self, operation: str, id: str, period_seconds: float, max_events: int = 1) -> bool:
+        key = (operation, id)
+        shard = self.shards[hash(key) % self.num_shards]
+        interval = period_seconds / max_events if max_events > 1 else period_seconds
+        now = time.monotonic()
+        with shard.lock:
+            if now >= shard.next_sweep:
+                shard.sweep(now)
+
+            full_at = shard.full_at.get(key, now)
+            if key in shard.full_at:
+                shard.full_at.move_to_end(key)
+            if full_at < now:
+                full_at = now
+            full_at += interval
+            allowed = full_at - now <= period_seconds
+            if allowed:
+                shard.allowed += 1
+                shard.full_at[key] = full_at
+                if len(shard.full_at) > shard.max_keys:
+                    shard.full_at.popitem(last=False)
+                    shard.evicted += 1
+            else:
+                shard.limited += 1
+
+        # formatted only when debug logging is enabled
+        logging.debug("rate limited operation is %sallowed: %s %s", "" if allowed else "NOT ", operation, id)
+        return allowed
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
 
 
 class RateLimiter:
 
-    limiter_lock = threading.Lock()
-    limiter_map = defaultdict(None)
+    limiter = ShardedRateLimiter()
 
     @staticmethod
-    def mark_and_test(operation: str, id: str, period_seconds: int) -> bool:
-        with RateLimiter.limiter_lock:
-            limiter_key = operation + id
-            last_run = RateLimiter.limiter_map.get(limiter_key)
-            curr_seconds = datetime.utcnow().timestamp()
-            if last_run:
-                if curr_seconds - last_run > period_seconds:
-                    RateLimiter.limiter_map[limiter_key] = curr_seconds
-                    logging.debug(f"rate limited operation is allowed because enough time has passed: {limiter_key}")
-                    return True
-                else:
-                    logging.debug(f"rate limited operation is NOT allowed: {limiter_key}")
-                    return False
-            else:
-                logging.debug(f"rate limited operation is allowed because it is the first time: {limiter_key}")
-                RateLimiter.limiter_map[limiter_key] = curr_seconds
-                return True
+    def mark_and_test(operation: str, id: str, period_seconds: int, max_events: int = 1) -> bool:
+        """
+        Mark an event of the operation for id, and return True if it's allowed.
+        Up to max_events events are allowed in period_seconds
+        """
+        return RateLimiter.limiter.mark_and_test(operation, id, period_seconds, max_events)
+
+
+class RateLimiterCollector:
+    """
+    The size and counters of a rate limiter, summed over its shards
+    """
+
+    def __init__(self, limiter: ShardedRateLimiter):
+        self.limiter = limiter
+
+    def collect(self) -> Iterable:
+        shards = self.limiter.shards
+        keys = GaugeMetricFamily("rate_limiter_keys", "Number of keys in the rate limiter")
+        keys.add_metric([], sum(len(shard) for shard in shards))
+        checks = CounterMetricFamily(
+            "rate_limiter_checks",
+            "Number of rate limited operations by the result (allowed/limited)",
+            labels=["result"],
+        )
+        checks.add_metric(["allowed"], sum(shard.allowed for shard in shards))
+        checks.add_metric(["limited"], sum(shard.limited for shard in shards))
+        evictions = CounterMetricFamily(
+            "rate_limiter_evictions",
+            "Number of rate limiter keys evicted by the reason (expired/size)",
+            labels=["reason"],
+        )
+        evictions.add_metric(["expired"], sum(shard.expired for shard in shards))
+        evictions.add_metric(["size"], sum(shard.evicted for shard in shards))
+        return [keys, checks, evictions]
+
+
+prometheus_client.REGISTRY.register(RateLimiterCollector(RateLimiter.limiter))
@@ -2,6 +2,7 @@ import logging
 import time
 from queue import Full, Queue
 from threading import Thread
+from typing import Callable, Dict, Hashable, Optional
 
 import prometheus_client
 
@@ -29,11 +30,29 @@ class QueueMetrics:
     def on_queued(self, queue_name):
         self.queue_event.labels(queue_name, "queued").inc()
 
+    def on_merged(self, queue_name):
+        self.queue_event.labels(queue_name, "merged").inc()
+
     def on_processed(self, queue_name, processing_time: float):
         self.queue_event.labels(queue_name, "processed").inc()
         self.total_process_time.labels(queue_name).observe(processing_time)
 
 
+class QueueItem:
+    __slots__ = ("task", "args", "kwargs", "coalesce_key")
+
+    def __init__(self, task, args: tuple, kwargs: dict, coalesce_key: Optional[Hashable] = None):
+        self.task = task
+        self.args = args
+        self.kwargs = kwargs
+        self.coalesce_key = coalesce_key
+
+
+# Gets the args of the queued task, and the args of the new task.
+# Returns the merged args, or None if the tasks can't be merged
+MergeFunction = Callable[[tuple, tuple], Optional[tuple]]
+
+
 class TaskQueue(Queue):
     def __init__(self, name: str, num_workers, metrics: QueueMetrics):
         Queue.__init__(self, maxsize=INCOMING_EVENTS_QUEUE_MAX_SIZE)
@@ -41,18 +60,49 @@ class TaskQueue(Queue):
         self.name = name
         self.num_workers = num_workers
         self.metrics = metrics
+        # the latest queued item of each coalesce key. Accessed with the queue mutex held
+        self.pending: Dict[Hashable, QueueItem] = {}
         self.metrics.size_callback(self.name, lambda: self._qsize())
         self.__start_workers()
 
     def add_task(self, task, *args, **kwargs):
-        args = args or ()
-        kwargs = kwargs or {}
+        self.__put(QueueItem(task, args or (), kwargs or {}))
+
+    def add_coalescing_task(self, coalesce_key: Hashable, merge: MergeFunction, task, *args):
+        """
+        Add a task that can be merged with the latest queued task of the same key, if it wasn't picked up by a worker yet.
+        Only the latest queued task of each key is merged, so tasks that can't be merged keep their order
+        """
+        with self.mutex:
+            item = self.pending.get(coalesce_key)
+            merged_args = merge(item.args, args) if item else None
+            if merged_args is not None:
+                item.args = merged_args
+                self.metrics.on_merged(self.name)
+                return
+
+        self.__put(QueueItem(task, args, {}, coalesce_key))
+
+    def __put(self, item: QueueItem):
         try:
-            self.put((task, args, kwargs), block=False)
+            self.put(item, block=False)
             self.metrics.on_queued(self.name)
         except Full:
             self.metrics.on_rejected(self.name)
 
+    def _put(self, item: QueueItem):
+        # called by Queue with the mutex held
+        super()._put(item)
+        if item.coalesce_key is not None:
+            self.pending[item.coalesce_key] = item
+
+    def _get(self) -> QueueItem:
+        # called by Queue with the mutex held. Once a worker took the item, it can't be merged anymore
+        item = super()._get()
+        if item.coalesce_key is not None and self.pending.get(item.coalesce_key) is item:
+            del self.pending[item.coalesce_key]
+        return item
+
     def __start_workers(self):
         for i in range(self.num_workers):
             t = Thread(target=self.worker)
@@ -61,11 +111,11 @@ class TaskQueue(Queue):
 
     def worker(self):
         while True:
-            item, args, kwargs = self.get()
+            item: QueueItem = self.get()
             start_time = time.time()
 
             try:
-                item(*args, **kwargs)
+                item.task(*item.args, **item.kwargs)
             except Exception:
                 logging.error("Task worker error", exc_info=True)
 
@@ -0,0 +1,197 @@
+import pickle
+from contextlib import contextmanager
+from typing import List
+from unittest import mock
+
+from kubernetes import client
+from kubernetes.client import (
+    V1Container,
+    V1Deployment,
+    V1DeploymentSpec,
+    V1DeploymentStatus,
+    V1Job,
+    V1JobSpec,
+    V1JobStatus,
+    V1LabelSelector,
+    V1ListMeta,
+    V1Namespace,
+    V1Node,
+    V1NodeSpec,
+    V1NodeStatus,
+    V1ObjectMeta,
+    V1Pod,
+    V1PodSpec,
+    V1PodStatus,
+    V1PodTemplateSpec,
+    V1ResourceRequirements,
+)
+
+from robusta.core.discovery.discovery import Discovery
+from robusta.core.discovery.discovery_stream import DiscoveryChunkKind, ServiceRow
+from robusta.core.model.services import ContainerInfo, Resources, ServiceConfig, ServiceInfo
+
+PODS_COUNT = 25
+PAGE_SIZE = 10
+
+
+def make_container(**requests) -> V1Container:
+    return V1Container(name="main", image="app", resources=V1ResourceRequirements(requests=requests or None))
+
+
+def make_pod(index: int) -> V1Pod:
+    # every 5th pod is unowned, and is reported as a service. pods 0-2 belong to a job
+    labels = {"job-name": "batch"} if index < 3 else {"app": "web"}
+    owners = None if index % 5 == 0 else [mock.MagicMock(kind="ReplicaSet")]
+    return V1Pod(
+        metadata=V1ObjectMeta(
+            name=f"pod-{index}", namespace="default", labels=labels, owner_references=owners, resource_version="1"
+        ),
+        spec=V1PodSpec(node_name=f"node-{index % 2}", containers=[make_container(cpu="100m", memory="64Mi")]),
+        status=V1PodStatus(phase="Running", conditions=[]),
+    )
+
+
+def paged(items: List, limit=None, _continue=None):
+    start = int(_continue or 0)
+    end = start + PAGE_SIZE
+    response = mock.MagicMock()
+    response.items = items[start:end]
+    response.metadata = V1ListMeta(_continue=str(end) if end < len(items) else None)
+    return response
+
+
+def list_pods(self, limit=None, _continue=None, **kwargs):
+    return paged([make_pod(i) for i in range(PODS_COUNT)], limit, _continue)
+
+
+def list_deployments(self, limit=None, _continue=None, **kwargs):
+    deployment = V1Deployment(
+        metadata=V1ObjectMeta(name="web", namespace="default", resource_version="1"),
+        spec=V1DeploymentSpec(
+            replicas=2,
+            selector=V1LabelSelector(match_labels={"app": "web"}),
+            template=V1PodTemplateSpec(spec=V1PodSpec(containers=[make_container()])),
+        ),
+        status=V1DeploymentStatus(ready_replicas=2),
+    )
+    return paged([deployment], limit, _continue)
+
+
+def list_empty(self, limit=None, _continue=None, **kwargs):
+    return paged([], limit, _continue)
+
+
+def list_jobs(self, limit=None, _continue=None, **kwargs):
+    job = V1Job(
+        metadata=V1ObjectMeta(name="batch", namespace="default", resource_version="1"),
+        spec=V1JobSpec(
+            backoff_limit=6,
+            selector=V1LabelSelector(match_labels={"job-name": "batch"}),
+            template=V1PodTemplateSpec(spec=V1PodSpec(containers=[make_container()])),
+        ),
+        status=V1JobStatus(active=3),
+    )
+    return paged([job], limit, _continue)
+
+
+def list_nodes(self, **kwargs):
+    nodes = [
+        V1Node(
+            metadata=V1ObjectMeta(name=f"node-{i}", resource_version="1"),
+            spec=V1NodeSpec(),
+            status=V1NodeStatus(capacity={"cpu": "4", "memory": "8Gi"}, allocatable={"cpu": "4", "memory": "8Gi"}),
+        )
+        for i in range(2)
+    ]
+    return paged(nodes)
+
+
+def list_namespaces(self, **kwargs):
+    return paged([V1Namespace(metadata=V1ObjectMeta(name="default"))])
+
+
+@contextmanager
+def fake_cluster():
+    with mock.patch.object(client.CoreV1Api, "list_pod_for_all_namespaces", list_pods), mock.patch.object(
+        client.AppsV1Api, "list_deployment_for_all_namespaces", list_deployments
+    ), mock.patch.object(client.AppsV1Api, "list_stateful_set_for_all_namespaces", list_empty), mock.patch.object(
+        client.AppsV1Api, "list_daemon_set_for_all_namespaces", list_empty
+    ), mock.patch.object(
+        client.AppsV1Api, "list_replica_set_for_all_namespaces", list_empty
+    ), mock.patch.object(
+        client.BatchV1Api, "list_job_for_all_namespaces", list_jobs
+    ), mock.patch.object(
+        client.CoreV1Api, "list_node", list_nodes
+    ), mock.patch.object(
+        client.CoreV1Api, "list_namespace", list_namespaces
+    ), mock.patch(
+        "robusta.core.discovery.discovery.DISCOVERY_BATCH_SIZE", PAGE_SIZE
+    ), mock.patch(
+        "robusta.core.discovery.discovery.DISABLE_HELM_MONITORING", True
+    ):
+        yield
+
+
+class TestDiscoveryStream:
+    def test_service_row(self):
+        service = ServiceInfo(
+            name="web",
+            namespace="default",
+            service_type="Deployment",
+            resource_version=3,
+            service_config=ServiceConfig(
+                labels={"app": "web"},
+                containers=[
+                    ContainerInfo(
+                        name="main", image="app", env=[], resources=Resources(limits={}, requests={"cpu": "1"})
+                    )
+                ],
+                volumes=[],
+            ),
+            total_pods=2,
+        )
+        row = pickle.loads(pickle.dumps(ServiceRow.from_model(service)))
+        assert row.key == "default/Deployment/web"
+        assert row.to_model() == service
+        assert row.to_model().resource_version == 3
+        assert len(pickle.dumps(row)) < len(pickle.dumps(service))
+
+    def test_chunks_match_full_discovery(self):
+        with fake_cluster():
+            chunks = list(Discovery.discover_in_chunks())
+            results = Discovery.discovery_process()
+
+        pod_chunks = [chunk for kind, chunk in chunks if kind == DiscoveryChunkKind.SERVICES and chunk][1:]
+        assert [len(chunk) for chunk in pod_chunks] == [2, 2, 1]  # one chunk for each pods page
+        assert sorted(service.get_service_key() for service in results.services) == [
+            "default/Deployment/web",
+            "default/Pod/pod-0",
+            "default/Pod/pod-10",
+            "default/Pod/pod-15",
+            "default/Pod/pod-20",
+            "default/Pod/pod-5",
+        ]
+        assert results.pods_running_count == PODS_COUNT
+        assert {node.name: node.pods_count for node in results.nodes} == {"node-0": 13, "node-1": 12}
+        assert results.jobs[0].job_data.pods == ["pod-0", "pod-1", "pod-2"]
+        assert [namespace.name for namespace in results.namespaces] == ["default"]
+
+    def test_stream_resources(self):
+        with fake_cluster():
+            expected = Discovery.discovery_process()
+            Discovery.stream_executor = None
+            try:
+                chunks = list(Discovery.stream_resources())
+            finally:
+                Discovery.stream_executor.shutdown()
+                Discovery.stream_executor = None
+
+        kinds = [kind for kind, _ in chunks]
+        assert DiscoveryChunkKind.NODE_REQUESTS not in kinds
+        services = [row.to_model() for kind, chunk in chunks if kind == DiscoveryChunkKind.SERVICES for row in chunk]
+        assert services == expected.services
+        jobs = [row.to_model() for kind, chunk in chunks if kind == DiscoveryChunkKind.JOBS for row in chunk]
+        assert jobs == expected.jobs
+        nodes = [row.to_model() for kind, chunk in chunks if kind == DiscoveryChunkKind.NODES for row in chunk]
+        assert nodes == expected.nodes
+        assert dict(chunks)[DiscoveryChunkKind.PODS_RUNNING_COUNT] == PODS_COUNT
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+from unittest import mock
+
+from robusta.core.playbooks.actions_manifest import MANIFEST_FILE_NAME, load_manifest, write_manifest
+from robusta.core.playbooks.actions_registry import ActionsRegistry
+from robusta.core.sinks.sink_factory import SinkFactory
+from robusta.core.sinks.webhook.webhook_sink_params import WebhookSinkConfigWrapper, WebhookSinkParams
+from robusta.runner.config_loader import ConfigLoader
+from tests.test_config_loader_reload import ACTION_TEMPLATE, PACKAGE_NAME, package_path  # noqa: F401
+
+MODULE_NAME = f"{PACKAGE_NAME}.actions"
+
+
+def unload_package():
+    for module_name in [name for name in sys.modules if name.startswith(PACKAGE_NAME)]:
+        del sys.modules[module_name]
+
+
+class TestActionsManifest:
+    def test_write_and_load(self, package_path):
+        manifest_path = write_manifest(PACKAGE_NAME)
+        assert manifest_path == os.path.join(package_path, PACKAGE_NAME, MANIFEST_FILE_NAME)
+        with open(manifest_path) as manifest_file:
+            assert json.load(manifest_file)["package"] == PACKAGE_NAME
+
+        assert load_manifest(PACKAGE_NAME) == {
+            "first_action": {
+                "module": MODULE_NAME,
+                "event_type": "robusta.core.model.events.ExecutionBaseEvent",
+                "params_type": None,
+            }
+        }
+
+        (package_path / PACKAGE_NAME / "actions.py").write_text(ACTION_TEMPLATE.format(name="changed_action"))
+        assert load_manifest(PACKAGE_NAME) is None  # outdated
+
+    def test_lazy_actions(self, package_path):
+        write_manifest(PACKAGE_NAME)
+        unload_package()
+
+        loader = ConfigLoader.__new__(ConfigLoader)
+        loader.installed_packages = {}
+        loader.imported_packages = {}
+        actions_registry = ActionsRegistry()
+        repos = {PACKAGE_NAME: mock.Mock(pip_install=False)}
+        with mock.patch("robusta.runner.config_loader.LAZY_ACTIONS_LOADING", True):
+            loader._ConfigLoader__load_playbooks_repos(actions_registry, repos)
+
+        assert MODULE_NAME not in sys.modules
+        action_def = actions_registry.get_action("first_action")
+        assert action_def.func.__module__ == MODULE_NAME
+        assert MODULE_NAME in sys.modules
+        assert actions_registry.get_action("first_action") is action_def
+
+
+class TestLazySinks:
+    def test_sink_classes(self):
+        sink_config = WebhookSinkConfigWrapper(webhook_sink=WebhookSinkParams(name="webhook", url="http://localhost"))
+        sink_class = SinkFactory.get_sink_class(sink_config)
+
+        from robusta.core.sinks.webhook import WebhookSink
+
+        assert sink_class is WebhookSink
@@ -0,0 +1,105 @@
+import threading
+from collections import Counter
+from unittest import mock
+
+from hikaru.model.rel_1_26 import Node, ObjectMeta
+
+from robusta.integrations.kubernetes.custom_models import RobustaPod
+from robusta.integrations.prometheus.models import PrometheusAlert
+from robusta.integrations.prometheus.trigger import AlertEventBuilder, AlertResourceBatch, PrometheusTriggerEvent
+from robusta.runner.web import Web
+from tests.test_task_queue import make_queue
+
+
+def make_alert(index: int, **labels) -> PrometheusAlert:
+    return PrometheusAlert(
+        status="firing",
+        labels={"alertname": "KubePodCrashLooping", "namespace": "default", **labels},
+        annotations={},
+        startsAt="2026-08-03T10:00:00Z",
+        endsAt="0001-01-01T00:00:00Z",
+        generatorURL="",
+        fingerprint=f"fingerprint-{index}",
+    )
+
+
+class FakeCluster:
+    def __init__(self, concurrent_reads: int = 1):
+        self.reads = Counter()
+        # every read waits for the others, so reads that are not concurrent time out
+        self.barrier = threading.Barrier(concurrent_reads, timeout=5)
+
+    def read_pod(self, name: str, namespace: str):
+        self.reads[("pod", name)] += 1
+        self.barrier.wait()
+        return RobustaPod(metadata=ObjectMeta(name=name, namespace=namespace))
+
+    def read_node(self, name: str):
+        self.reads[("node", name)] += 1
+        self.barrier.wait()
+        if name == "missing":
+            raise Exception("not found")
+        return Node(metadata=ObjectMeta(name=name))
+
+
+class TestAlertResourceBatch:
+    def build(self, alerts, cluster: FakeCluster, batched: bool = True):
+        batch = AlertResourceBatch(alerts) if batched else None
+        with mock.patch.object(RobustaPod, "read", cluster.read_pod), mock.patch.object(
+            Node, "read", cluster.read_node
+        ):
+            return [
+                AlertEventBuilder.build_event(PrometheusTriggerEvent(alert=alert, resource_batch=batch), {})
+                for alert in alerts
+            ]
+
+    def test_shared_concurrent_reads(self):
+        alerts = [
+            make_alert(0, pod="api", node="node-1"),
+            make_alert(1, pod="api", node="node-1"),
+            make_alert(2, pod="web", node="node-1"),
+        ]
+        cluster = FakeCluster(concurrent_reads=3)  # the unique pods and node are read together
+        events = self.build(alerts, cluster)
+
+        assert cluster.reads == {("pod", "api"): 1, ("pod", "web"): 1, ("node", "node-1"): 1}
+        assert [event.pod.metadata.name for event in events] == ["api", "api", "web"]
+        assert all(event.node.metadata.name == "node-1" for event in events)
+        assert events[0].pod is not events[1].pod  # each alert has its own copy
+
+    def test_instance_fallback(self):
+        alerts = [make_alert(0, node="missing", instance="node-2"), make_alert(1, node="node-2")]
+        cluster = FakeCluster()
+        events = self.build(alerts, cluster)
+
+        assert cluster.reads == {("node", "missing"): 1, ("node", "node-2"): 1}
+        assert [event.node.metadata.name for event in events] == ["node-2", "node-2"]
+
+    def test_not_batched(self):
+        alerts = [make_alert(0, pod="api"), make_alert(1, pod="api")]
+        cluster = FakeCluster()
+        events = self.build(alerts, cluster, batched=False)
+
+        assert cluster.reads == {("pod", "api"): 2}
+        assert [event.pod.metadata.name for event in events] == ["api", "api"]
+
+    def test_alerts_request_batch(self):
+        queue = make_queue()
+        request = {
+            "receiver": "robusta",
+            "status": "firing",
+            "alerts": [make_alert(i, pod="api").dict() for i in range(3)],
+            "externalURL": "",
+            "groupKey": "",
+            "version": "4",
+        }
+        with mock.patch.object(Web, "alerts_queue", queue, create=True), mock.patch.object(
+            Web, "event_handler", mock.MagicMock(), create=True
+        ):
+            Web.process_alert_event(request)
+
+        events = [queue.get_nowait().args[0] for _ in range(queue.qsize())]
+        assert len(events) == 3
+        assert all(event.resource_batch is events[0].resource_batch for event in events)
+        assert events[0].resource_batch.alerts == [event.alert for event in events]
+        assert all(event.received_at for event in events)
@@ -0,0 +1,60 @@
+from unittest import mock
+
+import numpy as np
+import pygal
+
+from robusta.core.reporting.chart_rendering import CachedXY, chart_render_key, downsample_min_max, plot_values
+
+
+class TestDownsampleMinMax:
+    def test_short_series(self):
+        timestamps, values = np.arange(10.0), np.arange(10.0)
+        assert downsample_min_max(timestamps, values, 10) == (timestamps, values)
+
+    def test_keeps_peaks_and_edges(self):
+        timestamps = np.arange(10_000.0)
+        values = np.sin(timestamps / 100)
+        values[4321] = 50
+        values[6789] = -50
+        sampled_timestamps, sampled_values = downsample_min_max(timestamps, values, 600)
+
+        assert len(sampled_values) <= 602
+        assert sampled_timestamps[0] == 0 and sampled_timestamps[-1] == 9999
+        assert 4321.0 in sampled_timestamps and 6789.0 in sampled_timestamps
+        assert list(sampled_timestamps) == sorted(sampled_timestamps)
+        assert values[sampled_timestamps.astype(int)].tolist() == sampled_values.tolist()
+
+    def test_nan_values(self):
+        timestamps = np.arange(1000.0)
+        values = np.full(1000, np.nan)
+        values[500] = 3
+        _, sampled_values = downsample_min_max(timestamps, values, 100)
+        assert 3 in sampled_values
+
+
+class TestPlotValues:
+    def test_values_and_max(self):
+        series = {"timestamps": [1, 2, 3], "values": ["1.1234567891234", "7", "2"]}
+        values, max_y_value = plot_values(series, 5)
+        assert values == [(1.0, 1.12345678912), (2.0, 7.0), (3.0, 2.0)]
+        assert max_y_value == 7
+
+        _, max_y_value = plot_values({"timestamps": [1], "values": [float("nan")]}, 5)
+        assert max_y_value == 5
+
+
+class TestCachedXY:
+    def make_chart(self, render_key):
+        chart = CachedXY(title="cpu")
+        chart.add("pod", [(1, 1), (2, 3)])
+        chart.render_key = render_key
+        return chart
+
+    def test_render_cache(self):
+        key = chart_render_key("cpu", [(1, 1), (2, 3)])
+        svg = self.make_chart(key).render()
+        with mock.patch.object(pygal.XY, "render") as render:
+            assert self.make_chart(key).render() == svg
+            assert self.make_chart(None).render() is render.return_value
+            assert self.make_chart(chart_render_key("other")).render() is render.return_value
+        assert render.call_count == 2
@@ -0,0 +1,86 @@
+import sys
+from unittest import mock
+
+import pytest
+
+from robusta.core.model.runner_config import PlaybookRepo
+from robusta.core.playbooks.actions_registry import ActionsRegistry
+from robusta.runner.config_loader import ConfigLoader
+
+PACKAGE_NAME = "reload_test_actions"
+ACTION_TEMPLATE = """
+from robusta.api import ExecutionBaseEvent, action
+
+
+@action
+def {name}(event: ExecutionBaseEvent):
+    pass
+"""
+
+
+@pytest.fixture
+def package_path(tmp_path):
+    """
+    Local playbooks package, with one action module
+    """
+    (tmp_path / "pyproject.toml").write_text(f'[tool.poetry]\nname = "{PACKAGE_NAME}"\n')
+    (tmp_path / PACKAGE_NAME).mkdir()
+    (tmp_path / PACKAGE_NAME / "__init__.py").write_text("")
+    (tmp_path / PACKAGE_NAME / "actions.py").write_text(ACTION_TEMPLATE.format(name="first_action"))
+    sys.path.insert(0, str(tmp_path))
+    yield tmp_path
+    sys.path.remove(str(tmp_path))
+    for module_name in [name for name in sys.modules if name.startswith(PACKAGE_NAME)]:
+        del sys.modules[module_name]
+
+
+class TestIncrementalReload:
+    def make_loader(self) -> ConfigLoader:
+        # without the config watchers and the initial reload
+        loader = ConfigLoader.__new__(ConfigLoader)
+        loader.installed_packages = {}
+        loader.imported_packages = {}
+        return loader
+
+    def load(self, loader: ConfigLoader, package_path) -> ActionsRegistry:
+        actions_registry = ActionsRegistry()
+        repos = {PACKAGE_NAME: PlaybookRepo(url=f"file://{package_path}")}
+        loader._ConfigLoader__load_playbooks_repos(actions_registry, repos)
+        return actions_registry
+
+    def test_unchanged_package_is_reused(self, package_path):
+        loader = self.make_loader()
+        import_package = mock.Mock(wraps=ConfigLoader._ConfigLoader__import_playbooks_package)
+        with mock.patch.object(ConfigLoader, "install_package") as install_package, mock.patch.object(
+            ConfigLoader, "_ConfigLoader__import_playbooks_package", import_package
+        ):
+            assert self.load(loader, package_path).get_action("first_action")
+            assert install_package.call_count == 1 and import_package.call_count == 1
+
+            # pycache files, written by the import, are not sources
+            assert self.load(loader, package_path).get_action("first_action")
+            assert install_package.call_count == 1 and import_package.call_count == 1
+
+            (package_path / PACKAGE_NAME / "actions.py").write_text(ACTION_TEMPLATE.format(name="changed_action"))
+            assert self.load(loader, package_path).get_action("changed_action")
+            assert install_package.call_count == 2 and import_package.call_count == 2
+
+    def test_failed_imports_are_retried(self, package_path):
+        loader = self.make_loader()
+        (package_path / PACKAGE_NAME / "broken.py").write_text("import missing_module_for_test\n")
+        import_package = mock.Mock(wraps=ConfigLoader._ConfigLoader__import_playbooks_package)
+        with mock.patch.object(ConfigLoader, "install_package"), mock.patch.object(
+            ConfigLoader, "_ConfigLoader__import_playbooks_package", import_package
+        ):
+            self.load(loader, package_path)
+            self.load(loader, package_path)
+        assert import_package.call_count == 2
+
+    def test_disabled(self, package_path):
+        loader = self.make_loader()
+        with mock.patch.object(ConfigLoader, "install_package") as install_package, mock.patch(
+            "robusta.runner.config_loader.PLAYBOOKS_INCREMENTAL_RELOAD", False
+        ):
+            self.load(loader, package_path)
+            self.load(loader, package_path)
+        assert install_package.call_count == 2
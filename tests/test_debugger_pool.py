@@ -0,0 +1,136 @@
+from unittest import mock
+
+import pytest
+
+from robusta.integrations.kubernetes import custom_models
+from robusta.integrations.kubernetes.custom_models import RobustaPod
+from robusta.integrations.kubernetes.debugger_pool import DebuggerPodPool, PoolKey, debugger_pool_pods
+
+
+class FakeCluster:
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+        self.unhealthy = set()
+        self.leftovers = []
+
+    def create_pod(self, key: PoolKey):
+        pod = mock.MagicMock()
+        pod.metadata.name = f"debug-{key.node_name}-{len(self.created)}"
+        pod.exec.side_effect = lambda cmd: f"{cmd} on {pod.metadata.name}"
+        self.created.append(pod)
+        return pod
+
+    def delete_pod(self, pod):
+        self.deleted.append(pod)
+
+    def is_healthy(self, pod) -> bool:
+        return pod not in self.unhealthy and pod not in self.deleted
+
+    def list_pooled_pods(self):
+        return self.leftovers
+
+    def pool(self, **kwargs) -> DebuggerPodPool:
+        return DebuggerPodPool(self.create_pod, self.delete_pod, self.is_healthy, self.list_pooled_pods, **kwargs)
+
+
+def gauge(state: str) -> float:
+    return debugger_pool_pods.labels(state)._value.get()
+
+
+class TestDebuggerPodPool:
+    def test_pods_are_reused_per_key(self):
+        cluster = FakeCluster()
+        pool = cluster.pool()
+        node_1 = PoolKey("node-1", "debug-toolkit")
+
+        with pool.lease(node_1) as first:
+            assert gauge("leased") == 1
+            # a concurrent lease of the same key gets its own pod
+            with pool.lease(node_1) as second:
+                assert second is not first
+        with pool.lease(node_1) as reused:
+            assert reused in (first, second)
+        with pool.lease(PoolKey("node-2", "debug-toolkit")):
+            pass
+
+        assert len(cluster.created) == 3
+        assert not cluster.deleted
+        assert gauge("idle") == 3
+        assert gauge("leased") == 0
+
+    def test_unhealthy_and_failed_pods_are_replaced(self):
+        cluster = FakeCluster()
+        pool = cluster.pool()
+        key = PoolKey("node-1", "debug-toolkit")
+
+        with pool.lease(key) as first:
+            pass
+        cluster.unhealthy.add(first)
+        with pool.lease(key) as second:
+            assert second is not first
+        assert cluster.deleted == [first]
+
+        with pytest.raises(RuntimeError):
+            with pool.lease(key):
+                raise RuntimeError("exec failed")
+        assert cluster.deleted == [first, second]
+        assert not pool.idle
+
+    def test_max_idle_and_reaping(self):
+        cluster = FakeCluster()
+        pool = cluster.pool(idle_ttl_sec=60, max_idle_per_key=1)
+        key = PoolKey("node-1", "debug-toolkit")
+
+        with pool.lease(key) as first, pool.lease(key) as second:
+            pass
+        assert cluster.deleted == [first]  # released last, when the key already had an idle pod
+
+        pool.reap_idle_pods()
+        assert not cluster.deleted[1:]
+        with mock.patch("robusta.integrations.kubernetes.debugger_pool.time.monotonic", return_value=10**9):
+            pool.reap_idle_pods()
+        assert cluster.deleted == [first, second]
+        assert not pool.idle
+
+    def test_leftover_pods_are_deleted_once(self):
+        cluster = FakeCluster()
+        leftover = mock.MagicMock()
+        cluster.leftovers = [leftover]
+        pool = cluster.pool()
+        key = PoolKey("node-1", "debug-toolkit")
+
+        with pool.lease(key):
+            pass
+        with pool.lease(key):
+            pass
+        assert cluster.deleted == [leftover]
+
+    def test_exec_in_debugger_pod(self):
+        cluster = FakeCluster()
+        with mock.patch.object(custom_models, "DEBUGGER_POD_POOL_ENABLED", True), mock.patch.object(
+            custom_models, "debugger_pod_pool", cluster.pool()
+        ):
+            assert RobustaPod.exec_on_node("api", "node-1", "ls") == 'nsenter -t 1 -a "ls" on debug-node-1-0'
+            assert RobustaPod.exec_in_debugger_pod("web", "node-1", "ps") == "ps on debug-node-1-0"
+            RobustaPod.exec_in_debugger_pod(
+                "web", "node-1", "ps", custom_annotations={"sidecar.istio.io/inject": "false"}
+            )
+        assert [pod.metadata.name for pod in cluster.created] == ["debug-node-1-0", "debug-node-1-1"]
+
+    def test_start_and_stop(self):
+        cluster = FakeCluster()
+        leftover = mock.MagicMock()
+        cluster.leftovers = [leftover]
+        pool = cluster.pool()
+        pool.start()
+        assert cluster.deleted == [leftover]
+
+        key = PoolKey("node-1", "debug-toolkit")
+        with pool.lease(key) as idle:
+            pass
+        with pool.lease(PoolKey("node-2", "debug-toolkit")) as leased:
+            pool.stop()
+            assert cluster.deleted == [leftover, idle]
+        assert cluster.deleted == [leftover, idle, leased]
+        assert not pool.idle
@@ -0,0 +1,280 @@
+import threading
+import time
+from typing import List, Optional
+from unittest import mock
+
+from kubernetes.client import (
+    V1Container,
+    V1Deployment,
+    V1DeploymentSpec,
+    V1DeploymentStatus,
+    V1Job,
+    V1JobSpec,
+    V1JobStatus,
+    V1LabelSelector,
+    V1ListMeta,
+    V1Namespace,
+    V1Node,
+    V1NodeSpec,
+    V1NodeStatus,
+    V1ObjectMeta,
+    V1Pod,
+    V1PodSpec,
+    V1PodStatus,
+    V1PodTemplateSpec,
+    V1ResourceRequirements,
+)
+from kubernetes.client.exceptions import ApiException
+
+from robusta.core.discovery.informer import IncrementalDiscovery, ResourceInformer
+
+
+def wait_until(condition, timeout: float = 5):
+    end_time = time.time() + timeout
+    while not condition() and time.time() < end_time:
+        time.sleep(0.01)
+    return condition()
+
+
+class FakeList:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.items = []
+        self.resource_version = "1"
+        self.page_size: Optional[int] = None
+        self.calls = 0
+
+    def __call__(self, limit=None, _continue=None, **kwargs):
+        self.calls += 1
+        start = int(_continue or 0)
+        end = start + self.page_size if self.page_size else len(self.items)
+        next_page = str(end) if end < len(self.items) else None
+        response = mock.MagicMock()
+        response.items = self.items[start:end]
+        response.metadata = V1ListMeta(resource_version=self.resource_version, _continue=next_page)
+        return response
+
+
+class FakeWatch:
+    """
+    Each stream call replays the next scripted stream: a list of events, or an exception to raise
+    """
+
+    streams: List = []
+    watched_versions: List[str] = []
+
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def stream(self, func, resource_version=None, **kwargs):
+        FakeWatch.watched_versions.append(resource_version)
+        if not FakeWatch.streams:
+            while not self.stopped:
+                time.sleep(0.01)
+            return
+        script = FakeWatch.streams.pop(0)
+        if isinstance(script, Exception):
+            raise script
+        yield from script
+
+
+def make_meta(name: str, resource_version: str, namespace: Optional[str] = "default", labels=None) -> V1ObjectMeta:
+    return V1ObjectMeta(name=name, namespace=namespace, resource_version=resource_version, labels=labels)
+
+
+def make_deployment(name: str, resource_version: str = "1", replicas: int = 1) -> V1Deployment:
+    return V1Deployment(
+        metadata=make_meta(name, resource_version),
+        spec=V1DeploymentSpec(
+            replicas=replicas,
+            selector=V1LabelSelector(match_labels={"app": name}),
+            template=V1PodTemplateSpec(
+                spec=V1PodSpec(containers=[V1Container(name="main", image="app", resources=V1ResourceRequirements())])
+            ),
+        ),
+        status=V1DeploymentStatus(ready_replicas=replicas),
+    )
+
+
+def make_pod(name: str, node_name: str, labels=None, phase: str = "Running") -> V1Pod:
+    container = V1Container(
+        name="main", image="app", resources=V1ResourceRequirements(requests={"cpu": "100m", "memory": "64Mi"})
+    )
+    return V1Pod(
+        metadata=make_meta(name, "1", labels=labels),
+        spec=V1PodSpec(node_name=node_name, containers=[container]),
+        status=V1PodStatus(phase=phase, conditions=[]),
+    )
+
+
+def make_node(name: str) -> V1Node:
+    return V1Node(
+        metadata=make_meta(name, "1", namespace=None),
+        spec=V1NodeSpec(),
+        status=V1NodeStatus(capacity={"cpu": "4", "memory": "8Gi"}, allocatable={"cpu": "4", "memory": "8Gi"}),
+    )
+
+
+def make_job(name: str) -> V1Job:
+    return V1Job(
+        metadata=make_meta(name, "1"),
+        spec=V1JobSpec(
+            backoff_limit=6,
+            selector=V1LabelSelector(match_labels={"job-name": name}),
+            template=V1PodTemplateSpec(
+                spec=V1PodSpec(containers=[V1Container(name="main", image="job", resources=V1ResourceRequirements())])
+            ),
+        ),
+        status=V1JobStatus(active=1),
+    )
+
+
+class Recorder:
+    def __init__(self):
+        self.changes = []
+
+    def __call__(self, key, old, new):
+        self.changes.append((key, old, new))
+
+
+class TestResourceInformer:
+    def make_informer(self, fake_list: FakeList, recorder: Recorder) -> ResourceInformer:
+        return ResourceInformer(
+            "Deployment",
+            fake_list,
+            lambda deployment: (deployment.metadata.name, deployment.spec.replicas),
+            recorder,
+            threading.RLock(),
+        )
+
+    def test_list_then_watch(self):
+        fake_list = FakeList("Deployment")
+        fake_list.items = [make_deployment(f"app-{i}") for i in range(5)]
+        fake_list.page_size = 2
+        fake_list.resource_version = "10"
+        FakeWatch.watched_versions = []
+        FakeWatch.streams = [
+            [
+                {"type": "ADDED", "object": make_deployment("new", "11")},
+                {"type": "MODIFIED", "object": make_deployment("app-0", "12", replicas=3)},
+                {"type": "MODIFIED", "object": make_deployment("app-1", "13")},  # no change in the row
+                {"type": "DELETED", "object": make_deployment("app-2", "14")},
+                {"type": "BOOKMARK", "raw_object": {"metadata": {"resourceVersion": "20"}}},
+            ]
+        ]
+        recorder = Recorder()
+        informer = self.make_informer(fake_list, recorder)
+        with mock.patch("robusta.core.discovery.informer.watch.Watch", FakeWatch):
+            informer.start()
+            assert wait_until(lambda: len(FakeWatch.watched_versions) == 2)
+            informer.stop()
+
+        assert fake_list.calls == 3  # paginated list
+        assert informer.synced.is_set()
+        assert FakeWatch.watched_versions == ["10", "20"]
+        assert sorted(informer.store.keys()) == [
+            "default/app-0",
+            "default/app-1",
+            "default/app-3",
+            "default/app-4",
+            "default/new",
+        ]
+        assert recorder.changes[5:] == [
+            ("default/new", None, ("new", 1)),
+            ("default/app-0", ("app-0", 1), ("app-0", 3)),
+            ("default/app-2", ("app-2", 1), None),
+        ]
+
+    def test_relist_on_gone(self):
+        fake_list = FakeList("Deployment")
+        fake_list.items = [make_deployment("kept"), make_deployment("deleted"), make_deployment("changed")]
+        FakeWatch.watched_versions = []
+        FakeWatch.streams = [ApiException(status=410, reason="Gone")]
+        recorder = Recorder()
+        informer = self.make_informer(fake_list, recorder)
+        informer.relist()
+        recorder.changes = []
+
+        # changes missed while the watch was expired
+        fake_list.items = [
+            make_deployment("kept"),
+            make_deployment("changed", "2", replicas=2),
+            make_deployment("added"),
+        ]
+        fake_list.resource_version = "30"
+        with mock.patch("robusta.core.discovery.informer.watch.Watch", FakeWatch):
+            informer.resource_version = "1"
+            informer.start()
+            assert wait_until(lambda: FakeWatch.watched_versions == ["1", "30"])
+            informer.stop()
+
+        assert sorted(recorder.changes, key=lambda change: change[0]) == [
+            ("default/added", None, ("added", 1)),
+            ("default/changed", ("changed", 1), ("changed", 2)),
+            ("default/deleted", ("deleted", 1), None),
+        ]
+
+
+class TestIncrementalDiscovery:
+    def make_discovery(self) -> (IncrementalDiscovery, dict):
+        discovery = IncrementalDiscovery()
+        lists = {}
+        for informer in discovery.informers():
+            informer.list_func = lists[informer.kind] = FakeList(informer.kind)
+        return discovery, lists
+
+    def relist(self, discovery: IncrementalDiscovery):
+        for informer in discovery.informers():
+            informer.relist()
+
+    def test_collect_changes(self):
+        discovery, lists = self.make_discovery()
+        lists["Deployment"].items = [make_deployment("api")]
+        lists["Node"].items = [make_node("node-1"), make_node("node-2")]
+        lists["Pod"].items = [
+            make_pod("api-1", "node-1"),
+            make_pod("job-a-1", "node-2", labels={"job-name": "job-a"}),
+            make_pod("standalone", "node-2"),
+        ]
+        lists["Job"].items = [make_job("job-a")]
+        lists["Namespace"].items = [V1Namespace(metadata=make_meta("default", "1", namespace=None))]
+        for pod in lists["Pod"].items[:2]:  # owned pods are not reported as services
+            pod.metadata.owner_references = [mock.MagicMock(kind="ReplicaSet")]
+        self.relist(discovery)
+
+        results = discovery.collect(full=True)
+        assert {service.get_service_key() for service in results.services} == {
+            "default/Deployment/api",
+            "default/Pod/standalone",
+        }
+        nodes = {node.name: node for node in results.nodes}
+        assert nodes["node-1"].pods_count == 1
+        assert nodes["node-2"].pods_count == 2
+        assert [job.job_data.pods for job in results.jobs] == [["job-a-1"]]
+        assert [namespace.name for namespace in results.namespaces] == ["default"]
+        assert results.pods_running_count == 3
+
+        # nothing changed
+        results = discovery.collect(full=False)
+        assert not results.services and not results.nodes and not results.jobs
+        assert not results.deleted_services and not results.deleted_nodes and not results.deleted_jobs
+
+        lists["Pod"].items = lists["Pod"].items[:1] + [make_pod("job-a-2", "node-1", labels={"job-name": "job-a"})]
+        lists["Pod"].items[1].metadata.owner_references = [mock.MagicMock(kind="Job")]
+        lists["Node"].items = lists["Node"].items[:1]
+        self.relist(discovery)
+
+        results = discovery.collect(full=False)
+        assert results.services == []
+        assert results.deleted_services == ["default/Pod/standalone"]
+        assert [(node.name, node.pods_count) for node in results.nodes] == [("node-1", 2)]
+        assert results.deleted_nodes == ["node-2"]
+        assert [job.job_data.pods for job in results.jobs] == [["job-a-2"]]
+        assert results.pods_running_count == 2
+
+        lists["Job"].items = []
+        self.relist(discovery)
+        assert discovery.collect(full=False).deleted_jobs == ["default/Job/job-a"]
@@ -0,0 +1,75 @@
+import base64
+import gzip
+from unittest import mock
+
+from robusta.core.reporting.blocks import FileBlock
+from robusta.core.sinks.robusta.dal.model_conversion import ModelConversion
+
+LOG = b"".join(f"line {i} \xc3\xbc\n".encode() for i in range(100))
+
+
+class TestTruncation:
+    def test_keeps_last_whole_lines(self):
+        block = FileBlock("pod.log", LOG)
+        for max_size in [1, 10, 11, 12, 100, 555, len(LOG) - 1]:
+            truncated = block.truncate_content(max_size)
+            assert len(truncated) <= max_size
+            assert LOG.endswith(truncated)
+            assert LOG[: len(LOG) - len(truncated)].endswith(b"\n")
+            # no more whole lines fit
+            previous_line_start = LOG.rfind(b"\n", 0, len(LOG) - len(truncated) - 1) + 1
+            assert len(LOG) - previous_line_start > max_size
+
+    def test_not_truncated(self):
+        block = FileBlock("pod.log", LOG)
+        assert block.truncate_content(len(LOG)) is LOG
+        image = FileBlock("graph.png", LOG)
+        assert image.truncate_content(10) is LOG
+
+    def test_line_longer_than_limit(self):
+        assert FileBlock("pod.log", b"short\n" + b"x" * 100).truncate_content(50) == b""
+        assert FileBlock("pod.log", b"x" * 100 + b"\nshort\n").truncate_content(50) == b"short\n"
+
+    def test_view_shares_the_contents(self):
+        block = FileBlock("pod.log", LOG)
+        view = block.truncated_view(100)
+        assert view.obj is LOG
+        assert view.tobytes() == block.truncate_content(100)
+
+
+class TestSharedRepresentations:
+    def test_zipped_once(self):
+        block = FileBlock("pod.log", LOG)
+        with mock.patch("robusta.core.reporting.blocks.gzip.compress", wraps=gzip.compress) as compress:
+            zipped = block.zipped()
+            assert block.zipped() is zipped
+            assert compress.call_count == 1
+        assert zipped.filename == "pod.log.gz"
+        assert gzip.decompress(zipped.contents) == LOG
+        assert block.contents is LOG  # unchanged
+
+        block.contents = b"new contents"
+        assert gzip.decompress(block.zipped().contents) == b"new contents"
+
+    def test_zip_in_place(self):
+        block = FileBlock("pod.log", LOG)
+        block.zip()
+        assert block.filename == "pod.log.gz"
+        assert gzip.decompress(block.contents) == LOG
+
+    def test_zip_releases_the_original_contents(self):
+        block = FileBlock("pod.log", LOG)
+        block.base64_contents()
+        zipped = block.zipped()
+        assert zipped._base64 is None  # not copied from the block
+        block.zip()
+        assert block.contents is zipped.contents
+        assert block._zipped is None and block._base64 is None
+
+    def test_file_object_base64_is_shared(self):
+        block = FileBlock("pod.log", LOG)
+        with mock.patch("robusta.core.reporting.blocks.base64.b64encode", wraps=base64.b64encode) as b64encode:
+            first = ModelConversion.get_file_object(block.zipped())
+            second = ModelConversion.get_file_object(block.zipped())
+            assert b64encode.call_count == 1
+        assert first == second == {"type": "gz", "data": str(base64.b64encode(block.zipped().contents))}
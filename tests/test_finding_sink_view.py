@@ -0,0 +1,42 @@
+from robusta.api import FileBlock, Finding, MarkdownBlock
+from robusta.core.sinks.robusta.dal.model_conversion import ModelConversion
+
+
+def make_finding() -> Finding:
+    finding = Finding(title="test finding", aggregation_key="TestFinding")
+    finding.add_enrichment(
+        [MarkdownBlock("some text"), FileBlock("pod.log", b"line1\nline2\n")], annotations={"a": "b"}
+    )
+    return finding
+
+
+class TestFindingSinkView:
+    def test_enrichments_changes_not_shared(self):
+        finding = make_finding()
+        view = finding.sink_view()
+        view.enrichments[0].blocks = [MarkdownBlock("replaced")]
+        view.enrichments[0].annotations["c"] = "d"
+        view.enrichments.append(view.enrichments[0])
+
+        assert len(finding.enrichments) == 1
+        assert finding.enrichments[0].blocks[0].text == "some text"
+        assert finding.enrichments[0].annotations == {"a": "b"}
+
+    def test_blocks_shared(self):
+        finding = make_finding()
+        view = finding.sink_view()
+        assert view.id == finding.id
+        assert view.enrichments[0].blocks[1] is finding.enrichments[0].blocks[1]
+
+    def test_evidence_conversion_keeps_file_block(self):
+        finding = make_finding()
+        for _ in range(2):  # same block converted by 2 robusta sinks
+            view = finding.sink_view()
+            evidence = ModelConversion.to_evidence_json(
+                "account", "cluster", "sink", "key", view.id, view.enrichments[0]
+            )
+            assert '"type": "gz"' in evidence["data"]
+
+        file_block = finding.enrichments[0].blocks[1]
+        assert file_block.filename == "pod.log"
+        assert file_block.contents == b"line1\nline2\n"
@@ -0,0 +1,88 @@
+import threading
+from typing import List, Tuple
+
+from robusta.core.sinks.robusta.dal.findings_writer import FindingsWriteBuffer, Row
+
+
+class FakeInsert:
+    def __init__(self, failures: int = 0, invalid_title: str = ""):
+        self.calls: List[Tuple[str, List[Row]]] = []
+        self.failures = failures
+        self.invalid_title = invalid_title
+        self.lock = threading.Lock()
+
+    def __call__(self, table: str, rows: List[Row]):
+        with self.lock:
+            self.calls.append((table, [row["title"] for row in rows]))
+            if self.failures:
+                self.failures -= 1
+                raise Exception("platform unavailable")
+            if any(row["title"] == self.invalid_title for row in rows):
+                raise Exception("invalid row")
+
+
+def make_writer(insert: FakeInsert, **kwargs) -> FindingsWriteBuffer:
+    params = dict(max_rows=10, max_delay_sec=60, max_backlog_rows=100, max_retries=2, retry_backoff_sec=0.001)
+    params.update(kwargs)
+    return FindingsWriteBuffer("test_sink", insert, "Evidence", "Issues", **params)
+
+
+def add_finding(writer: FindingsWriteBuffer, name: str, evidence_count: int):
+    evidence = [{"title": f"{name}-evidence-{i}"} for i in range(evidence_count)]
+    writer.add(evidence, {"title": name})
+
+
+class TestFindingsWriteBuffer:
+    def test_batched_evidence_before_issues(self):
+        insert = FakeInsert()
+        writer = make_writer(insert)
+        add_finding(writer, "a", 2)
+        add_finding(writer, "b", 1)
+        assert writer.flush(5)
+        assert insert.calls == [
+            ("Evidence", ["a-evidence-0", "a-evidence-1", "b-evidence-0"]),
+            ("Issues", ["a", "b"]),
+        ]
+
+    def test_flush_by_size(self):
+        insert = FakeInsert()
+        writer = make_writer(insert, max_rows=4)
+        add_finding(writer, "a", 2)
+        add_finding(writer, "b", 2)  # doesn't fit in the first batch
+        add_finding(writer, "c", 0)
+        writer.stop(5)
+        assert insert.calls == [
+            ("Evidence", ["a-evidence-0", "a-evidence-1"]),
+            ("Issues", ["a"]),
+            ("Evidence", ["b-evidence-0", "b-evidence-1"]),
+            ("Issues", ["b", "c"]),
+        ]
+
+    def test_flush_by_time(self):
+        insert = FakeInsert()
+        writer = make_writer(insert, max_delay_sec=0.05)
+        add_finding(writer, "a", 0)
+        writer.flusher.join(0.5)  # the flusher keeps running, just wait a bit
+        assert insert.calls == [("Issues", ["a"])]
+
+    def test_retry(self):
+        insert = FakeInsert(failures=2)
+        writer = make_writer(insert)
+        add_finding(writer, "a", 0)
+        assert writer.flush(5)
+        assert insert.calls == [("Issues", ["a"])] * 3
+
+    def test_invalid_row_isolated(self):
+        insert = FakeInsert(invalid_title="b")
+        writer = make_writer(insert, max_retries=0)
+        for name in ["a", "b", "c"]:
+            add_finding(writer, name, 0)
+        assert writer.flush(5)
+        assert insert.calls == [("Issues", ["a", "b", "c"]), ("Issues", ["a"]), ("Issues", ["b"]), ("Issues", ["c"])]
+
+    def test_write_after_stop(self):
+        insert = FakeInsert()
+        writer = make_writer(insert)
+        writer.stop(5)
+        add_finding(writer, "a", 1)
+        assert insert.calls == [("Evidence", ["a-evidence-0"]), ("Issues", ["a"])]
@@ -0,0 +1,166 @@
+import os
+import subprocess
+import threading
+from unittest import mock
+
+import pytest
+
+from robusta.integrations.git import git_repo
+from robusta.integrations.git.git_repo import GitRepo, GitRepoManager
+
+
+def git(cwd: str, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def remote(tmp_path) -> str:
+    """
+    Bare repository with one commit, used as the audit repo remote
+    """
+    remote_path = str(tmp_path / "audit.git")
+    seed_path = str(tmp_path / "seed")
+    git(str(tmp_path), "init", "--bare", "-b", "main", remote_path)
+    git(str(tmp_path), "clone", remote_path, seed_path)
+    with open(os.path.join(seed_path, "README.md"), "w") as readme:
+        readme.write("audit\n")
+    git(seed_path, "add", "README.md")
+    git(seed_path, "-c", "user.name=test", "-c", "user.email=test@test", "commit", "-m", "init")
+    git(seed_path, "push", "origin", "main")
+    return remote_path
+
+
+@pytest.fixture
+def local_base_dir(tmp_path):
+    with mock.patch.object(git_repo, "REPO_LOCAL_BASE_DIR", str(tmp_path / "clones")), mock.patch.object(
+        GitRepo, "initialized", False
+    ):
+        yield
+
+
+def remote_log(remote: str):
+    return git(remote, "log", "--format=%B%x00").split("\x00")[:-1]
+
+
+class TestGitAuditWriteBehind:
+    def test_batched_commit_and_push(self, remote, local_base_dir):
+        repo = GitRepo(remote, "", flush_max_changes=3, flush_max_delay_sec=60)
+        pushes = []
+        exec_git_cmd = repo._GitRepo__exec_git_cmd
+
+        def count_pushes(cmd, timeout=None):
+            if cmd[:2] == ["git", "push"]:
+                pushes.append(cmd)
+            return exec_git_cmd(cmd, timeout)
+
+        with mock.patch.object(repo, "_GitRepo__exec_git_cmd", count_pushes):
+            repo.commit_later("spec: 1", "cluster/default", "api.yaml", "Create api", "cluster")
+            repo.commit_later("spec: 2", "cluster/default", "api.yaml", "Update api", "cluster")
+            repo.commit_later("spec: 1", "cluster/default", "web.yaml", "Create web", "cluster")
+            assert repo.flush(timeout=10)  # the batch is full, and flushed without waiting for the delay
+
+            repo.delete_later("cluster/default", "web.yaml", "Delete web", "cluster")
+            repo.delete_later("cluster/default", "missing.yaml", "Delete missing", "cluster")
+            assert repo.flush(timeout=10)
+            repo.stop(timeout=10)
+
+        assert len(pushes) == 2
+        assert [message.strip() for message in remote_log(remote)] == [
+            "Cluster cluster::Delete web",
+            "Cluster cluster::Create api\nCluster cluster::Update api\nCluster cluster::Create web",
+            "init",
+        ]
+        assert git(remote, "show", "main:cluster/default/api.yaml") == "spec: 2"
+        assert "web.yaml" not in git(remote, "ls-tree", "-r", "--name-only", "main")
+
+        changes = repo.cluster_changes()
+        assert [change.commit_message for change in changes["cluster"]] == [
+            "Delete web",
+            "Create api",
+            "Update api",
+            "Create web",
+        ]
+
+    def test_rebase_on_remote_changes(self, remote, local_base_dir, tmp_path):
+        repo = GitRepo(remote, "", flush_max_changes=100, flush_max_delay_sec=60)
+        repo.commit_later("spec: 1", "cluster/default", "api.yaml", "Create api", "cluster")
+
+        other_clone = str(tmp_path / "other")
+        git(str(tmp_path), "clone", remote, other_clone)
+        os.makedirs(os.path.join(other_clone, "other-cluster"))
+        with open(os.path.join(other_clone, "other-cluster", "db.yaml"), "w") as other_file:
+            other_file.write("spec: 1")
+        git(other_clone, "add", "--all")
+        git(other_clone, "-c", "user.name=test", "-c", "user.email=test@test", "commit", "-m", "other")
+        git(other_clone, "push")
+
+        assert repo.flush(timeout=10)
+        repo.stop(timeout=10)
+        assert [message.strip() for message in remote_log(remote)] == ["Cluster cluster::Create api", "other", "init"]
+
+    def test_stop_flushes_pending_changes(self, remote, local_base_dir):
+        repo = GitRepoManager.get_git_repo(remote, "")
+        repo.commit_later("spec: 1", "cluster/default", "api.yaml", "Create api", "cluster")
+        GitRepoManager.clear_git_repos()
+
+        assert not repo.flusher.is_alive()
+        assert remote_log(remote)[0].strip() == "Cluster cluster::Create api"
+
+    def test_stop_with_broken_remote_is_bounded(self, remote, local_base_dir):
+        repo = GitRepoManager.get_git_repo(remote, "")
+        pushes = []
+        exec_git_cmd = repo._GitRepo__exec_git_cmd
+
+        def broken_push(cmd, timeout=None):
+            if cmd[:2] == ["git", "push"]:
+                pushes.append(timeout)
+                raise Exception("remote is down")
+            return exec_git_cmd(cmd, timeout)
+
+        with mock.patch.object(repo, "_GitRepo__exec_git_cmd", broken_push), mock.patch.object(
+            git_repo, "GIT_AUDIT_STOP_MAX_RETRIES", 2
+        ), mock.patch.object(git_repo, "GIT_AUDIT_STOP_TIMEOUT_SEC", 5):
+            repo.commit_later("spec: 1", "cluster/default", "api.yaml", "Create api", "cluster")
+            GitRepoManager.clear_git_repos()
+
+        assert not repo.flusher.is_alive()
+        assert len(pushes) == 2 and all(0 < timeout <= 5 for timeout in pushes)
+
+    def test_new_clone_waits_for_retiring_flusher(self, remote, local_base_dir):
+        repo = GitRepoManager.get_git_repo(remote, "")
+        release = threading.Event()
+        exec_git_cmd = repo._GitRepo__exec_git_cmd
+
+        def stuck_push(cmd, timeout=None):
+            if cmd[:2] == ["git", "push"]:
+                release.wait(10)
+            return exec_git_cmd(cmd, timeout)
+
+        with mock.patch.object(repo, "_GitRepo__exec_git_cmd", stuck_push), mock.patch.object(
+            git_repo, "GIT_AUDIT_STOP_TIMEOUT_SEC", 0.2
+        ):
+            repo.commit_later("spec: 1", "cluster/default", "api.yaml", "Create api", "cluster")
+            GitRepoManager.clear_git_repos()
+            assert repo.flusher.is_alive()
+
+            new_repos = []
+            cloner = threading.Thread(target=lambda: new_repos.append(GitRepoManager.get_git_repo(remote, "")))
+            cloner.start()
+            cloner.join(0.3)
+            assert not new_repos  # the local repo isn't deleted under the running flusher
+            release.set()
+            cloner.join(10)
+
+        assert not repo.flusher.is_alive()
+        assert new_repos and new_repos[0] is not repo
+        GitRepoManager.clear_git_repos()
+
+    def test_changes_after_stop_are_pushed_right_away(self, remote, local_base_dir):
+        repo = GitRepo(remote, "", flush_max_changes=100, flush_max_delay_sec=60)
+        repo.stop(timeout=10)
+
+        repo.commit_later("spec: 1", "cluster/default", "api.yaml", "Create api", "cluster")
+        assert repo.flusher is None
+        assert remote_log(remote)[0].strip() == "Cluster cluster::Create api"
+        repo.delete_later("cluster/default", "api.yaml", "Delete api", "cluster")
+        assert remote_log(remote)[0].strip() == "Cluster cluster::Delete api"
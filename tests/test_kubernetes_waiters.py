@@ -0,0 +1,154 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+from kubernetes.client import V1JobStatus
+
+from robusta.integrations.kubernetes import api_client_utils
+from robusta.integrations.kubernetes.waiters import (
+    DELETED,
+    JOB,
+    POD,
+    KubernetesWaiters,
+    WaitedKind,
+    WatchUnavailable,
+)
+from tests.test_discovery_informer import FakeList, make_job, make_pod
+
+
+class QueueWatch:
+    """
+    Streams the events put in the queue, until stopped. Each test has its own queue
+    """
+
+    events: "queue.Queue[dict]" = queue.Queue()
+
+    def __init__(self):
+        self.stopped = False
+        self.events = QueueWatch.events
+
+    def stop(self):
+        self.stopped = True
+
+    def stream(self, func, resource_version=None, **kwargs):
+        while not self.stopped:
+            try:
+                yield self.events.get(timeout=0.01)
+            except queue.Empty:
+                continue
+
+
+def fake_kind(kind: WaitedKind, fake_list: FakeList) -> WaitedKind:
+    def list_namespaced(namespace, **kwargs):
+        return fake_list(**kwargs)
+
+    return WaitedKind(kind.kind, lambda: list_namespaced, kind.convert)
+
+
+@pytest.fixture
+def watch():
+    QueueWatch.events = queue.Queue()
+    with mock.patch("robusta.core.discovery.informer.watch.Watch", QueueWatch):
+        yield QueueWatch.events
+
+
+class TestKubernetesWaiters:
+    def test_waits_share_one_watch(self, watch):
+        fake_list = FakeList("Pod")
+        fake_list.items = [make_pod("api", "node-1", phase="Pending"), make_pod("web", "node-1", phase="Pending")]
+        pod_kind = fake_kind(POD, fake_list)
+        waiters = KubernetesWaiters()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(waiters.wait, pod_kind, name, "default", lambda phase: phase == "Running", 5)
+                for name in ["api", "web", "db"]
+            ]
+            time.sleep(0.1)
+            watch.put({"type": "MODIFIED", "object": make_pod("web", "node-1", phase="Running")})
+            watch.put({"type": "MODIFIED", "object": make_pod("api", "node-1", phase="Pending")})
+            watch.put({"type": "ADDED", "object": make_pod("db", "node-2", phase="Running")})
+            watch.put({"type": "MODIFIED", "object": make_pod("api", "node-1", phase="Running")})
+            assert [future.result(timeout=5) for future in futures] == ["Running"] * 3
+
+        assert fake_list.calls == 1
+        assert len(waiters.watches) == 1
+        # already reached, without waiting for an event
+        assert waiters.wait(pod_kind, "web", "default", lambda phase: phase == "Running", 0.1) == "Running"
+
+    def test_deleted_and_timeout(self, watch):
+        fake_list = FakeList("Pod")
+        fake_list.items = [make_pod("api", "node-1", phase="Pending")]
+        pod_kind = fake_kind(POD, fake_list)
+        waiters = KubernetesWaiters()
+
+        with pytest.raises(TimeoutError):
+            waiters.wait(pod_kind, "api", "default", lambda phase: phase == "Running", 0.1)
+        assert not waiters.watches[("Pod", "default")].waiters
+
+        watch.put({"type": "DELETED", "object": make_pod("api", "node-1", phase="Pending")})
+        assert waiters.wait(pod_kind, "api", "default", lambda phase: phase == "Running", 5) is DELETED
+
+    def test_idle_watches_are_stopped(self, watch):
+        pod_kind = fake_kind(POD, FakeList("Pod"))
+        waiters = KubernetesWaiters(idle_sec=0)
+        with pytest.raises(TimeoutError):
+            waiters.wait(pod_kind, "api", "default", lambda phase: phase == "Running", 0.1)
+        informer = waiters.watches[("Pod", "default")].informer
+        assert wait_for(lambda: not waiters.watches)
+        assert not informer.active
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    end_time = time.time() + timeout
+    while not condition() and time.time() < end_time:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestWaitFunctions:
+    def test_wait_for_pod_status(self, watch):
+        fake_list = FakeList("Pod")
+        fake_list.items = [make_pod("debugger", "node-1", phase="Pending")]
+        waiters = KubernetesWaiters()
+        with mock.patch("robusta.integrations.kubernetes.waiters.POD", fake_kind(POD, fake_list)), mock.patch(
+            "robusta.integrations.kubernetes.waiters.kubernetes_waiters", waiters
+        ):
+            watch.put({"type": "MODIFIED", "object": make_pod("debugger", "node-1", phase="Succeeded")})
+            assert api_client_utils.wait_for_pod_status("debugger", "default", "Succeeded", 5, 0.2) == "Succeeded"
+            # a completed pod will never be running
+            assert api_client_utils.wait_for_pod_status("debugger", "default", "Running", 5, 0.2) == "FAIL"
+
+    def test_wait_for_pod_status_polls_without_watch(self):
+        core_v1 = mock.MagicMock()
+        core_v1.read_namespaced_pod_status.return_value = make_pod("api", "node-1", phase="Running")
+        with mock.patch.object(KubernetesWaiters, "wait", side_effect=WatchUnavailable()), mock.patch.object(
+            api_client_utils.core_v1_api, "CoreV1Api", return_value=core_v1
+        ):
+            assert api_client_utils.wait_for_pod_status("api", "default", "Running", 5, 0.2) == "Running"
+        core_v1.read_namespaced_pod_status.assert_called_once_with("api", "default")
+
+    def test_wait_until_job_complete(self, watch):
+        fake_list = FakeList("Job")
+        fake_list.items = [make_job("krr"), make_job("popeye")]
+        waiters = KubernetesWaiters()
+        job = mock.MagicMock()
+        job.metadata.name = "krr"
+        job.metadata.namespace = "default"
+        with mock.patch("robusta.integrations.kubernetes.waiters.JOB", fake_kind(JOB, fake_list)), mock.patch(
+            "robusta.integrations.kubernetes.waiters.kubernetes_waiters", waiters
+        ):
+            completed = make_job("krr")
+            completed.status = V1JobStatus(failed=1)
+            watch.put({"type": "MODIFIED", "object": completed})
+            result = api_client_utils.wait_until_job_complete(job, 5)
+            assert result.metadata.name == "krr"
+            assert result.status.failed == 1
+
+            job.metadata.name = "popeye"
+            threading.Timer(0.1, lambda: watch.put({"type": "DELETED", "object": make_job("popeye")})).start()
+            with pytest.raises(Exception, match="Failed to reach wait condition"):
+                api_client_utils.wait_until_job_complete(job, 5)
@@ -0,0 +1,119 @@
+from typing import Dict
+from unittest import mock
+
+from hikaru.model.rel_1_26 import Node, NodeStatus, ObjectMeta
+from kubernetes.client import V1Node, V1NodeAddress, V1NodeStatus, V1ObjectMeta, V1Pod
+
+from robusta.integrations.kubernetes.custom_models import RobustaPod
+from robusta.integrations.kubernetes.object_cache import ObjectCache
+from tests.test_discovery_informer import FakeList
+
+
+def make_v1_pod(name: str, resource_version: str) -> V1Pod:
+    return V1Pod(metadata=V1ObjectMeta(name=name, namespace="default", resource_version=resource_version))
+
+
+def make_v1_node(name: str, resource_version: str, ip: str) -> V1Node:
+    return V1Node(
+        metadata=V1ObjectMeta(name=name, resource_version=resource_version),
+        status=V1NodeStatus(addresses=[V1NodeAddress(address=ip, type="InternalIP")]),
+    )
+
+
+class FakeReader:
+    """
+    Replaces hikaru_class().read, with objects of the current resource versions
+    """
+
+    def __init__(self):
+        self.versions: Dict[str, str] = {}
+        self.reads = 0
+
+    def read(self, name: str, namespace: str = None):
+        self.reads += 1
+        return RobustaPod(
+            metadata=ObjectMeta(name=name, namespace=namespace, resourceVersion=self.versions.get(name, "1"))
+        )
+
+
+class TestObjectCache:
+    def make_cache(self, **kwargs) -> (ObjectCache, Dict[str, FakeList]):
+        cache = ObjectCache(**kwargs)
+        lists = {}
+        for kind, informer in cache.informers.items():
+            informer.list_func = lists[kind] = FakeList(kind)
+        return cache, lists
+
+    def test_read_through(self):
+        cache, lists = self.make_cache()
+        lists["Pod"].items = [make_v1_pod("api", "1")]
+        cache.informers["Pod"].relist()
+        reader = FakeReader()
+        with mock.patch.object(RobustaPod, "read", lambda self, name, namespace=None: reader.read(name, namespace)):
+            pod = cache.read(RobustaPod, "api", "default")
+            pod.metadata.labels = {"changed": "by the caller"}
+            assert cache.read(RobustaPod, "api", "default").metadata.labels == {}  # a copy of the cached pod
+            assert reader.reads == 1
+
+            # the pod was changed, according to the watch
+            reader.versions["api"] = "2"
+            lists["Pod"].items = [make_v1_pod("api", "2")]
+            cache.informers["Pod"].relist()
+            assert cache.read(RobustaPod, "api", "default").metadata.resourceVersion == "2"
+            assert cache.read(RobustaPod, "api", "default").metadata.resourceVersion == "2"
+            assert reader.reads == 2
+
+    def test_deleted_object_is_not_served(self):
+        cache, lists = self.make_cache()
+        lists["Pod"].items = [make_v1_pod("api", "1")]
+        cache.informers["Pod"].relist()
+        reader = FakeReader()
+        with mock.patch.object(RobustaPod, "read", lambda self, name, namespace=None: reader.read(name, namespace)):
+            cache.read(RobustaPod, "api", "default")
+            assert ("Pod", "default/api") in cache.objects
+
+            # the pod was deleted, according to the watch
+            lists["Pod"].items = []
+            cache.informers["Pod"].relist()
+            cache.read(RobustaPod, "api", "default")
+            assert reader.reads == 2
+            assert ("Pod", "default/api") not in cache.objects  # not cached until the watch has the pod again
+
+    def test_ttl_and_max_size(self):
+        reader = FakeReader()
+        with mock.patch.object(RobustaPod, "read", lambda self, name, namespace=None: reader.read(name, namespace)):
+            cache, _ = self.make_cache(ttl_sec=0)
+            cache.read(RobustaPod, "api", "default")
+            cache.read(RobustaPod, "api", "default")
+            assert reader.reads == 2
+
+            reader.reads = 0
+            cache, _ = self.make_cache(max_size=2)
+            for name in ["a", "b", "a", "c", "a", "b"]:
+                cache.read(RobustaPod, name, "default")
+            assert reader.reads == 4  # "b" was evicted by "c", as the least recently used
+            assert [key for _, key in cache.objects.keys()] == ["default/a", "default/b"]
+
+    def test_find_node_by_ip(self):
+        cache, lists = self.make_cache()
+        assert not cache.is_node_index_ready()
+        lists["Node"].items = [make_v1_node("node-1", "1", "10.0.0.1"), make_v1_node("node-2", "1", "10.0.0.2")]
+        cache.informers["Node"].relist()
+        assert cache.is_node_index_ready()
+
+        reads = []
+
+        def read_node(self, name):
+            reads.append(name)
+            return Node(metadata=ObjectMeta(name=name, resourceVersion="1"), status=NodeStatus())
+
+        with mock.patch.object(Node, "read", read_node):
+            assert cache.find_node_by_ip("10.0.0.2").metadata.name == "node-2"
+            assert cache.find_node_by_ip("10.0.0.3") is None
+
+            lists["Node"].items = [make_v1_node("node-1", "2", "10.0.0.3")]
+            cache.informers["Node"].relist()
+            assert cache.find_node_by_ip("10.0.0.1") is None
+            assert cache.find_node_by_ip("10.0.0.2") is None
+            assert cache.find_node_by_ip("10.0.0.3").metadata.name == "node-1"
+        assert reads == ["node-2", "node-1"]
@@ -0,0 +1,79 @@
+import itertools
+
+from robusta.core.playbooks.playbooks_trigger_index import PlaybooksTriggerIndex
+from robusta.integrations.kubernetes.base_triggers import IncomingK8sEventPayload, K8sTriggerEvent
+from robusta.model.playbook_definition import PlaybookDefinition
+
+PLAYBOOKS_CONFIG = [
+    {"triggers": [{"on_pod_update": {}}], "actions": [{"noop": {}}]},
+    {"triggers": [{"on_pod_create": {"namespace_prefix": "kube-"}}], "actions": [{"noop": {}}]},
+    {
+        "triggers": [
+            {"on_deployment_all_changes": {"name_prefix": "api"}},
+            {"on_pod_all_changes": {"namespace_prefix": "prod", "name_prefix": "web"}},
+        ],
+        "actions": [{"noop": {}}],
+    },
+    {"triggers": [{"on_kubernetes_any_resource_delete": {}}], "actions": [{"noop": {}}]},
+    {"triggers": [{"on_kubernetes_resource_operation": {"resources": ["job"]}}], "actions": [{"noop": {}}]},
+    {
+        "triggers": [{"on_schedule": {"fixed_delay_repeat": {"repeat": 1, "seconds_delay": 10}}}],
+        "actions": [{"noop": {}}],
+    },
+    {"triggers": [{"on_pod_crash_loop": {"restart_reason": "CrashLoopBackOff"}}], "actions": [{"noop": {}}]},
+]
+
+
+def make_event(kind: str, operation: str, namespace: str, name: str) -> K8sTriggerEvent:
+    return K8sTriggerEvent(
+        k8s_payload=IncomingK8sEventPayload(
+            operation=operation,
+            kind=kind,
+            clusterUid="test",
+            description="test",
+            obj={"metadata": {"name": name, "namespace": namespace}},
+            oldObj=None,
+        )
+    )
+
+
+def make_index() -> PlaybooksTriggerIndex:
+    playbooks = [PlaybookDefinition(**playbook) for playbook in PLAYBOOKS_CONFIG]
+    return PlaybooksTriggerIndex(playbooks, K8sTriggerEvent.__name__)
+
+
+class TestPlaybooksTriggerIndex:
+    def test_candidates_preserve_order(self):
+        index = make_index()
+        event = make_event("Pod", "create", "prod-eu", "web-1")
+        candidates = index.get_candidates(event)
+        assert [playbook for playbook, _ in candidates] == [index.playbooks[i] for i in [2, 4, 5]]
+        assert candidates[0][1] == [index.playbooks[2].triggers[1]]
+
+    def test_no_false_negatives(self):
+        index = make_index()
+        kinds = ["Pod", "Deployment", "Job"]
+        operations = ["create", "update", "delete"]
+        namespaces = ["", "kube-system", "prod-eu", "prod", "pro", "default"]
+        names = ["", "web-1", "api-server", "we"]
+        for kind, operation, namespace, name in itertools.product(kinds, operations, namespaces, names):
+            event = make_event(kind, operation, namespace, name)
+            candidate_triggers = {id(trigger) for _, triggers in index.get_candidates(event) for trigger in triggers}
+            for playbook in index.playbooks:
+                for trigger in playbook.triggers:
+                    base_trigger = trigger.get()
+                    if type(base_trigger).__name__ == "PodCrashLoopTrigger":
+                        continue  # rate limited should_fire
+                    if base_trigger.should_fire(event, "playbook_id", {}):
+                        assert id(trigger) in candidate_triggers, (kind, operation, namespace, name)
+
+    def test_prefixes_pruned(self):
+        index = make_index()
+        event = make_event("Pod", "create", "default", "db-0")
+        candidate_triggers = [trigger.get() for _, triggers in index.get_candidates(event) for trigger in triggers]
+        trigger_types = [type(trigger).__name__ for trigger in candidate_triggers]
+        assert "PodCreateTrigger" not in trigger_types  # namespace_prefix kube-
+        assert "PodAllChangesTrigger" not in trigger_types  # namespace_prefix prod, name_prefix web
+        assert "PodUpdateTrigger" not in trigger_types  # operation
+        assert "DeploymentAllChangesTrigger" not in trigger_types  # kind
+        assert "FixedDelayRepeatTrigger" in trigger_types  # not a k8s trigger, always evaluated
@@ -0,0 +1,116 @@
+import re
+from unittest import mock
+
+import pytest
+from hikaru.model.rel_1_26 import ObjectMeta, PodSpec
+
+from robusta.core.model.base_params import NamedRegexPattern
+from robusta.integrations.kubernetes import api_client_utils
+from robusta.integrations.kubernetes.custom_models import RegexReplacementStyle, RobustaPod
+from robusta.integrations.kubernetes.pod_logs import LogRedactor, TailBuffer, sanitize_log_chunks
+
+LOGS = "".join(
+    f"2024-01-0{i % 9 + 1} {'ERROR' if i % 3 == 0 else 'INFO'} user=user{i}@example.com card=4111-1111-1111-{i:04d} ü\n"
+    for i in range(200)
+).encode()
+
+PATTERNS = [
+    NamedRegexPattern(name="email", regex=r"[\w.]+@[\w.]+"),
+    NamedRegexPattern(name="card", regex=r"(\d{4}-){3}\d{4}"),
+]
+
+
+def chunked(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def whole_log_sanitize(logs: bytes, filter_regex=None, patterns=None, named=False) -> bytes:
+    """
+    Filtering and redaction of the whole log at once, like get_logs did before streaming
+    """
+    text = logs.decode()
+    if filter_regex:
+        text = "\n".join(re.findall(re.compile(filter_regex), text))
+    for pattern in patterns or []:
+        text = re.sub(pattern.regex, f"[{pattern.name.upper()}]" if named else lambda m: "*" * len(m.group(0)), text)
+    return text.encode()
+
+
+class TestSanitizeLogChunks:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 100, 10**6])
+    @pytest.mark.parametrize("filter_regex", [None, r"ERROR.*"])
+    @pytest.mark.parametrize("named", [False, True])
+    def test_same_as_whole_log(self, chunk_size, filter_regex, named):
+        expected = whole_log_sanitize(LOGS, filter_regex, PATTERNS, named)
+        result = sanitize_log_chunks(chunked(LOGS, chunk_size), filter_regex, PATTERNS, named)
+        assert result == expected
+
+    def test_passthrough(self):
+        assert sanitize_log_chunks(chunked(LOGS, 13)) == LOGS
+        assert sanitize_log_chunks([]) == b""
+        assert sanitize_log_chunks(chunked(LOGS, 13), filter_regex="no such line") == b""
+
+    def test_tail_is_bounded(self):
+        result = sanitize_log_chunks(chunked(LOGS, 64), max_bytes=1000)
+        assert len(result) <= 1000
+        assert LOGS.endswith(result)
+        assert LOGS[: -len(result)].endswith(b"\n")  # starts at a whole line
+
+        lines = [b"a" * 10 + b"\n"] * 10
+        assert sanitize_log_chunks(lines, max_bytes=33) == b"a" * 10 + b"\n" + b"a" * 10 + b"\n" + b"a" * 10 + b"\n"
+        assert sanitize_log_chunks(lines, max_bytes=32) == b"a" * 10 + b"\n" + b"a" * 10 + b"\n"
+
+    def test_tail_buffer_drops_whole_pieces(self):
+        tail = TailBuffer(10)
+        for piece in [b"first\n", b"second\n", b"third\n"]:
+            tail.append(piece)
+        assert len(tail.pieces) == 2
+        assert tail.getvalue() == b"third\n"
+        assert tail.truncated
+
+
+class TestLogRedactor:
+    OVERLAPPING = [
+        NamedRegexPattern(name="card", regex=r"\d{4}-\d{4}-\d{4}-\d{4}"),
+        NamedRegexPattern(name="id", regex=r"id=\d"),
+    ]
+
+    def test_overlapping_patterns_replace_the_whole_span(self):
+        text = "user id=1234-5678-9012-3456 paid"
+        assert LogRedactor(self.OVERLAPPING, False).redact(text) == "user " + "*" * 22 + " paid"
+        assert LogRedactor(self.OVERLAPPING, True).redact(text) == "user [CARD] paid"
+        assert LogRedactor(list(reversed(self.OVERLAPPING)), True).redact(text) == "user [ID] paid"
+
+    def test_patterns_with_backreferences(self):
+        redactor = LogRedactor(
+            [NamedRegexPattern(name="repeated", regex=r"(\w)\1"), NamedRegexPattern(name="digit", regex=r"\d")], True
+        )
+        assert redactor.redact("book 7") == "b[REPEATED]k [DIGIT]"
+
+    def test_adjacent_matches_are_replaced_separately(self):
+        redactor = LogRedactor(
+            [NamedRegexPattern(regex=r"\d+"), NamedRegexPattern(name="secret", regex=r"secret")], True
+        )
+        assert redactor.redact("id 42secret") == "id [REDACTED][SECRET]"
+
+
+class TestGetLogs:
+    def test_get_logs_bytes(self):
+        pod = RobustaPod(metadata=ObjectMeta(name="api", namespace="default"), spec=PodSpec(containers=[]))
+        response = mock.MagicMock()
+        response.stream.return_value = iter(chunked(LOGS, 1000))
+        core_v1 = mock.MagicMock()
+        core_v1.read_namespaced_pod_log.return_value = response
+        with mock.patch.object(api_client_utils.core_v1_api, "CoreV1Api", return_value=core_v1):
+            logs = pod.get_logs_bytes(
+                regex_replacer_patterns=PATTERNS, regex_replacement_style=RegexReplacementStyle.NAMED
+            )
+        assert logs == whole_log_sanitize(LOGS, patterns=PATTERNS, named=True)
+        response.release_conn.assert_called_once()
+
+    def test_missing_pod(self):
+        pod = RobustaPod(metadata=ObjectMeta(name="api", namespace="default"), spec=PodSpec(containers=[]))
+        core_v1 = mock.MagicMock()
+        core_v1.read_namespaced_pod_log.side_effect = api_client_utils.ApiException(status=404)
+        with mock.patch.object(api_client_utils.core_v1_api, "CoreV1Api", return_value=core_v1):
+            assert pod.get_logs() is None
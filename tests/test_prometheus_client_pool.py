@@ -0,0 +1,93 @@
+import time
+from unittest import mock
+
+import pytest
+from prometheus_api_client import PrometheusApiClientException
+from prometrix import PrometheusNotFound
+from prometrix.auth import PrometheusAuthorization
+
+from robusta.core.model.base_params import PrometheusParams
+from robusta.integrations.prometheus.utils import (
+    PrometheusClientPool,
+    check_prometheus_connection,
+    get_prometheus_connect,
+)
+
+
+class TestPrometheusClientPool:
+    def setup_method(self):
+        PrometheusClientPool.clients.clear()
+        self.patches = [
+            mock.patch(
+                "prometrix.get_custom_prometheus_connect",
+                side_effect=lambda config: mock.MagicMock(url=config.url),
+            ),
+            mock.patch.object(PrometheusClientPool, "health_checker", mock.MagicMock()),  # no background checks
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def teardown_method(self):
+        for patch in self.patches:
+            patch.stop()
+        PrometheusClientPool.clients.clear()
+
+    def test_clients_reused(self):
+        prom = get_prometheus_connect(PrometheusParams(prometheus_url="http://prometheus:9090"))
+        assert get_prometheus_connect(PrometheusParams(prometheus_url="http://prometheus:9090")) is prom
+        assert get_prometheus_connect(PrometheusParams(prometheus_url="http://thanos:9090")) is not prom
+        assert (
+            get_prometheus_connect(
+                PrometheusParams(prometheus_url="http://prometheus:9090", prometheus_auth="Bearer token")
+            )
+            is not prom
+        )
+
+    def test_connection_check_cached(self):
+        prom = get_prometheus_connect(PrometheusParams(prometheus_url="http://prometheus:9090"))
+        check_prometheus_connection(prom, {})
+        check_prometheus_connection(prom, {})
+        assert prom.check_prometheus_connection.call_count == 1
+
+        PrometheusClientPool.on_query_error(prom)
+        check_prometheus_connection(prom, {})
+        assert prom.check_prometheus_connection.call_count == 2
+
+        # failed checks are not cached
+        PrometheusClientPool.on_query_error(prom)
+        prom.check_prometheus_connection.side_effect = PrometheusNotFound("down")
+        for _ in range(2):
+            with pytest.raises(PrometheusNotFound):
+                check_prometheus_connection(prom, {})
+        assert prom.check_prometheus_connection.call_count == 4
+
+    def test_health_refresh(self):
+        active = get_prometheus_connect(PrometheusParams(prometheus_url="http://prometheus:9090"))
+        idle = get_prometheus_connect(PrometheusParams(prometheus_url="http://thanos:9090"))
+        PrometheusClientPool.clients[next(reversed(PrometheusClientPool.clients))].last_used = time.time() - 3600
+
+        PrometheusClientPool.check_clients_health()
+        assert [client.prom for client in PrometheusClientPool.clients.values()] == [active]
+        assert active.check_prometheus_connection.call_count == 1
+        assert idle.check_prometheus_connection.call_count == 0
+
+        check_prometheus_connection(active, {})  # checked in the background
+        assert active.check_prometheus_connection.call_count == 1
+
+    def test_unauthorized_query_retried_with_new_token(self):
+        prom = get_prometheus_connect(PrometheusParams(prometheus_url="http://prometheus:9090"))
+        check_prometheus_connection(prom, {})
+        prom.safe_custom_query.side_effect = [PrometheusApiClientException("HTTP Status Code 401 (b'')"), {"a": 1}]
+        with mock.patch.object(PrometheusAuthorization, "request_new_token", return_value=True), mock.patch.object(
+            PrometheusAuthorization, "get_authorization_headers", return_value={"Authorization": "Bearer new"}
+        ):
+            assert PrometheusClientPool.run_query(prom, lambda: prom.safe_custom_query("up")) == {"a": 1}
+        assert prom.headers == {"Authorization": "Bearer new"}
+
+        # other errors, or tokens that can't be renewed, aren't retried
+        prom.safe_custom_query.side_effect = [PrometheusApiClientException("HTTP Status Code 401 (b'')"), {"a": 1}]
+        with mock.patch.object(PrometheusAuthorization, "request_new_token", return_value=False):
+            with pytest.raises(PrometheusApiClientException):
+                PrometheusClientPool.run_query(prom, lambda: prom.safe_custom_query("up"))
+        check_prometheus_connection(prom, {})  # checked again after the failed query
+        assert prom.check_prometheus_connection.call_count == 2
@@ -0,0 +1,101 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from robusta.integrations.prometheus.query_cache import PrometheusQueryCache, align_to_step, normalize_promql
+
+
+def matrix(samples: int) -> dict:
+    return {"resultType": "matrix", "result": [{"metric": {}, "values": [[i, "1"] for i in range(samples)]}]}
+
+
+class TestPrometheusQueryCache:
+    def test_normalize_promql(self):
+        assert (
+            normalize_promql(' sum(rate(x{pod="a  b"}[5m]))\n  by   (pod) ')
+            == normalize_promql('sum(rate(x{pod="a  b"}[5m])) by (pod)')
+            == 'sum(rate(x{pod="a  b"}[5m])) by (pod)'
+        )
+        assert normalize_promql('x{pod="a  b"}') != normalize_promql('x{pod="a b"}')
+
+    def test_align_to_step(self):
+        starts_at = datetime(2026, 1, 1, 10, 0, 7, tzinfo=timezone.utc)
+        ends_at = datetime(2026, 1, 1, 11, 0, 3, tzinfo=timezone.utc)
+        assert align_to_step(starts_at, ends_at, "60") == (
+            datetime(2026, 1, 1, 10, 0, 0, tzinfo=timezone.utc),
+            datetime(2026, 1, 1, 11, 1, 0, tzinfo=timezone.utc),
+        )
+        assert align_to_step(starts_at, ends_at, "1m") == (starts_at, ends_at)
+
+    def test_hit_and_lru_eviction(self):
+        cache = PrometheusQueryCache(ttl_sec=60, max_samples=10)
+        queries = []
+
+        def query(key: str, samples: int):
+            def run():
+                queries.append(key)
+                return matrix(samples)
+
+            return run
+
+        assert cache.get("a", query("a", 4)) == matrix(4)
+        assert cache.get("a", query("a", 4)) == matrix(4)
+        cache.get("b", query("b", 4))
+        cache.get("a", query("a", 4))  # "b" is now the least recently used
+        cache.get("c", query("c", 4))
+        cache.get("a", query("a", 4))
+        cache.get("b", query("b", 4))
+        assert queries == ["a", "b", "c", "b"]
+
+        cache.get("big", query("big", 11))  # larger than the cache, not cached
+        cache.get("big", query("big", 11))
+        assert queries[-2:] == ["big", "big"]
+
+    def test_ttl(self):
+        cache = PrometheusQueryCache(ttl_sec=0.05, max_samples=10)
+        queries = []
+        cache.get("a", lambda: queries.append(1) or matrix(1))
+        time.sleep(0.1)
+        cache.get("a", lambda: queries.append(1) or matrix(1))
+        assert len(queries) == 2
+
+    def test_coalesce_in_flight(self):
+        cache = PrometheusQueryCache(ttl_sec=0, max_samples=10)  # coalescing only
+        started = threading.Event()
+        release = threading.Event()
+        queries = []
+
+        def slow_query():
+            queries.append(1)
+            started.set()
+            release.wait(5)
+            return matrix(1)
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(cache.get("a", slow_query)))
+        first.start()
+        started.wait(5)
+        waiters = [threading.Thread(target=lambda: results.append(cache.get("a", slow_query))) for _ in range(3)]
+        for waiter in waiters:
+            waiter.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [first] + waiters:
+            thread.join(5)
+
+        assert len(queries) == 1
+        assert results == [matrix(1)] * 4
+        cache.get("a", lambda: queries.append(1) or matrix(1))  # nothing cached
+        assert len(queries) == 2
+
+    def test_errors_not_cached(self):
+        cache = PrometheusQueryCache(ttl_sec=60, max_samples=10)
+
+        def failing_query():
+            raise Exception("prometheus is down")
+
+        with pytest.raises(Exception, match="prometheus is down"):
+            cache.get("a", failing_query)
+        assert cache.get("a", lambda: matrix(1)) == matrix(1)
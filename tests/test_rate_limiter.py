@@ -0,0 +1,92 @@
+import threading
+from unittest import mock
+
+from robusta.utils import rate_limiter
+from robusta.utils.rate_limiter import RateLimiter, RateLimiterCollector, ShardedRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestShardedRateLimiter:
+    def test_period(self):
+        clock = FakeClock()
+        with mock.patch.object(rate_limiter.time, "monotonic", clock):
+            limiter = ShardedRateLimiter()
+            assert limiter.mark_and_test("crash_loop", "default:api", 60)
+            assert limiter.mark_and_test("crash_loop", "default:web", 60)
+            assert limiter.mark_and_test("oom", "default:api", 60)
+            clock.now += 30
+            assert not limiter.mark_and_test("crash_loop", "default:api", 60)
+            clock.now += 30
+            assert limiter.mark_and_test("crash_loop", "default:api", 60)
+            assert not limiter.mark_and_test("crash_loop", "default:api", 60)
+
+    def test_token_bucket(self):
+        clock = FakeClock()
+        with mock.patch.object(rate_limiter.time, "monotonic", clock):
+            limiter = ShardedRateLimiter()
+            assert [limiter.mark_and_test("op", "id", 60, max_events=3) for _ in range(4)] == [True] * 3 + [False]
+            clock.now += 20  # a third of the period refills one event
+            assert [limiter.mark_and_test("op", "id", 60, max_events=3) for _ in range(2)] == [True, False]
+
+    def test_eviction(self):
+        clock = FakeClock()
+        with mock.patch.object(rate_limiter.time, "monotonic", clock):
+            limiter = ShardedRateLimiter(num_shards=1, max_keys=3)
+            for name in ["a", "b", "c", "d"]:
+                limiter.mark_and_test("op", name, 60)
+            assert len(limiter) == 3
+            assert limiter.mark_and_test("op", "a", 60)  # the oldest key was dropped
+            assert not limiter.mark_and_test("op", "c", 60)  # used, so "d" is the least recently used key
+            limiter.mark_and_test("op", "f", 60)
+            assert not limiter.mark_and_test("op", "c", 60)
+            assert limiter.mark_and_test("op", "d", 60)
+
+            clock.now += 10
+            limiter.mark_and_test("op", "short", 5)
+            clock.now += rate_limiter.SWEEP_INTERVAL_SEC
+            limiter.mark_and_test("op", "e", 600)
+            # only the keys that are still limiting are kept
+            assert {key[1] for key in limiter.shards[0].full_at} == {"e"}
+
+    def test_concurrent_keys(self):
+        limiter = ShardedRateLimiter(num_shards=4)
+        allowed = []
+
+        def mark():
+            for i in range(100):
+                allowed.append(limiter.mark_and_test("op", f"{i}", 60))
+
+        threads = [threading.Thread(target=mark) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert allowed.count(True) == 100  # each key is allowed once
+
+    def test_rate_limiter_api(self):
+        with mock.patch.object(RateLimiter, "limiter", ShardedRateLimiter()):
+            assert RateLimiter.mark_and_test("op", "id", 60)
+            assert not RateLimiter.mark_and_test("op", "id", 60)
+            assert RateLimiter.mark_and_test("op", "other", 60, max_events=2)
+            assert RateLimiter.mark_and_test("op", "other", 60, max_events=2)
+            assert not RateLimiter.mark_and_test("op", "other", 60, max_events=2)
+
+    def test_metrics(self):
+        limiter = ShardedRateLimiter()
+        limiter.mark_and_test("op", "id", 60)
+        limiter.mark_and_test("op", "id", 60)
+        samples = {
+            (sample.name, tuple(sample.labels.values())): sample.value
+            for metric in RateLimiterCollector(limiter).collect()
+            for sample in metric.samples
+        }
+        assert samples[("rate_limiter_keys", ())] == 1
+        assert samples[("rate_limiter_checks_total", ("allowed",))] == 1
+        assert samples[("rate_limiter_checks_total", ("limited",))] == 1
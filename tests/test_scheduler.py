@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Dict, List
+from unittest import mock
+
+from robusta.core.schedule.dispatcher import TimerDispatcher
+from robusta.core.schedule.model import DynamicDelayRepeat, FixedDelayRepeat, JobState, JobStatus, ScheduledJob
+from robusta.core.schedule.scheduler import Scheduler
+
+
+class FakeSchedulerDal:
+    def __init__(self):
+        self.jobs: Dict[str, ScheduledJob] = {}
+
+    def save_scheduled_job(self, job: ScheduledJob):
+        self.jobs[job.job_id] = job.copy(deep=True)
+
+    def get_scheduled_job(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    def del_scheduled_job(self, job_id: str):
+        self.jobs.pop(job_id, None)
+
+    def list_scheduled_jobs(self) -> List[ScheduledJob]:
+        return list(self.jobs.values())
+
+
+def wait_until(condition, timeout: float = 5):
+    end_time = time.time() + timeout
+    while not condition() and time.time() < end_time:
+        time.sleep(0.01)
+    return condition()
+
+
+class Recorder:
+    def __init__(self):
+        self.runs = []
+
+    def __call__(self, name: str):
+        self.runs.append(name)
+
+
+class TestTimerDispatcher:
+    def test_runs_in_due_time_order(self):
+        dispatcher = TimerDispatcher(max_workers=1)
+        recorder = Recorder()
+        runs = recorder.runs
+        for name, delay in [("c", 0.15), ("a", 0.05), ("b", 0.1)]:
+            dispatcher.schedule(delay, recorder, {"name": name}, name="test")
+        assert wait_until(lambda: len(runs) == 3)
+        assert runs == ["a", "b", "c"]
+
+    def test_cancel(self):
+        dispatcher = TimerDispatcher(max_workers=1)
+        recorder = Recorder()
+        runs = recorder.runs
+        dispatcher.schedule(0.05, recorder, {"name": "cancelled"}).cancel()
+        dispatcher.schedule(0.1, recorder, {"name": "ran"})
+        assert wait_until(lambda: runs)
+        time.sleep(0.1)
+        assert runs == ["ran"]
+
+    def test_bounded_concurrency(self):
+        dispatcher = TimerDispatcher(max_workers=2)
+        lock = threading.Lock()
+        running = {"now": 0, "max": 0, "done": 0}
+
+        def job():
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            time.sleep(0.05)
+            with lock:
+                running["now"] -= 1
+                running["done"] += 1
+
+        for _ in range(6):
+            dispatcher.schedule(0, job)
+        assert wait_until(lambda: running["done"] == 6)
+        assert running["max"] == 2
+
+
+class TestScheduler:
+    def make_scheduler(self) -> Scheduler:
+        scheduler = Scheduler()
+        scheduler.dal = FakeSchedulerDal()
+        scheduler.dispatcher = TimerDispatcher(max_workers=2)
+        return scheduler
+
+    def run_job(self, job_id: str, scheduling_params) -> (Scheduler, List[int]):
+        scheduler = self.make_scheduler()
+        executions = []
+        scheduler.register_task(
+            job_id, lambda runnable_params, schedule_info: executions.append(schedule_info.execution_count)
+        )
+        job = ScheduledJob(
+            job_id=job_id,
+            runnable_name=job_id,
+            runnable_params={},
+            state=JobState(),
+            scheduling_params=scheduling_params,
+        )
+        with mock.patch("robusta.core.schedule.scheduler.INITIAL_SCHEDULE_DELAY_SEC", 0):
+            scheduler.schedule_job(job)
+            assert wait_until(lambda: not scheduler.is_scheduled(job_id))
+        return scheduler, executions
+
+    def test_fixed_delay_repeat(self):
+        scheduler, executions = self.run_job("fixed_delay_job", FixedDelayRepeat(repeat=3, seconds_delay=0))
+        assert executions == [0, 1, 2]
+        saved_job = scheduler.dal.get_scheduled_job("fixed_delay_job")
+        assert saved_job.state.job_status == JobStatus.DONE
+        assert saved_job.state.exec_count == 3
+
+    def test_dynamic_delay_repeat(self):
+        scheduler, executions = self.run_job("dynamic_delay_job", DynamicDelayRepeat(delay_periods=[0, 0]))
+        assert executions == [0, 1]
+        assert scheduler.dal.get_scheduled_job("dynamic_delay_job").state.job_status == JobStatus.DONE
+
+    def test_unschedule(self):
+        scheduler = self.make_scheduler()
+        scheduler.register_task("never", mock.MagicMock())
+        job = ScheduledJob(
+            job_id="unscheduled_job",
+            runnable_name="never",
+            runnable_params={},
+            state=JobState(),
+            scheduling_params=FixedDelayRepeat(seconds_delay=60),
+        )
+        scheduler.schedule_job(job)
+        assert scheduler.is_scheduled("unscheduled_job")
+        scheduler.unschedule_job("unscheduled_job")
+        assert not scheduler.is_scheduled("unscheduled_job")
+        assert scheduler.dal.get_scheduled_job("unscheduled_job") is None
@@ -0,0 +1,110 @@
+from typing import Dict, Optional
+from unittest import mock
+
+import kubernetes
+import pytest
+
+from robusta.core.persistency.scheduled_jobs_states_dal import SchedulerDal
+from robusta.core.schedule.model import FixedDelayRepeat, JobState, ScheduledJob
+
+
+class FakeApiServer:
+    def __init__(self, data: Optional[Dict[str, str]] = None):
+        self.data = data
+        self.resource_version = 1
+        self.reads = 0
+        self.writes = 0
+
+
+class FakeResponse:
+    def __init__(self, obj):
+        self.obj = obj
+
+
+def make_fake_config_map(server: FakeApiServer):
+    class FakeConfigMap:
+        def __init__(self, metadata, data=None):
+            self.metadata = metadata
+            self.data = data
+
+        @staticmethod
+        def readNamespacedConfigMap(name: str, namespace: str):
+            server.reads += 1
+            if server.data is None:
+                raise kubernetes.client.exceptions.ApiException(status=404, reason="Not Found")
+            metadata = mock.MagicMock(resourceVersion=str(server.resource_version))
+            return FakeResponse(FakeConfigMap(metadata, dict(server.data)))
+
+        def createNamespacedConfigMap(self, namespace: str):
+            server.data = {}
+            self.metadata.resourceVersion = str(server.resource_version)
+            return FakeResponse(self)
+
+        def replaceNamespacedConfigMap(self, name: str, namespace: str):
+            if self.metadata.resourceVersion != str(server.resource_version):
+                raise kubernetes.client.exceptions.ApiException(status=409, reason="Conflict")
+            server.writes += 1
+            server.resource_version += 1
+            server.data = dict(self.data)
+            self.metadata.resourceVersion = str(server.resource_version)
+            return FakeResponse(self)
+
+    return FakeConfigMap
+
+
+def make_job(job_id: str, exec_count: int = 0) -> ScheduledJob:
+    return ScheduledJob(
+        job_id=job_id,
+        runnable_name="task",
+        runnable_params={},
+        state=JobState(exec_count=exec_count),
+        scheduling_params=FixedDelayRepeat(seconds_delay=10),
+    )
+
+
+@pytest.fixture
+def server():
+    server = FakeApiServer()
+    with mock.patch("robusta.core.persistency.scheduled_jobs_states_dal.ConfigMap", make_fake_config_map(server)):
+        yield server
+
+
+class TestSchedulerDal:
+    def test_reads_from_mirror(self, server):
+        dal = SchedulerDal(flush_delay_sec=60)
+        dal.save_scheduled_job(make_job("a"))
+        dal.save_scheduled_job(make_job("b"))
+        assert dal.get_scheduled_job("a").job_id == "a"
+        assert {job.job_id for job in dal.list_scheduled_jobs()} == {"a", "b"}
+        assert server.reads == 1  # initial load only
+        assert server.writes == 0
+
+    def test_batched_flush(self, server):
+        dal = SchedulerDal(flush_delay_sec=60)
+        for exec_count in range(5):
+            dal.save_scheduled_job(make_job("a", exec_count))
+        dal.save_scheduled_job(make_job("b"))
+        dal.del_scheduled_job("b")
+        dal.stop()
+        assert server.writes == 1
+        assert set(server.data.keys()) == {"a"}
+        assert SchedulerDal(flush_delay_sec=60).get_scheduled_job("a").state.exec_count == 4
+
+    def test_background_flush(self, server):
+        dal = SchedulerDal(flush_delay_sec=0.01)
+        dal.save_scheduled_job(make_job("a"))
+        dal.flusher.join(0.5)
+        assert "a" in server.data
+
+    def test_conflict_merges_remote_changes(self, server):
+        server.data = {"remote": make_job("remote").json(), "deleted": make_job("deleted").json()}
+        dal = SchedulerDal(flush_delay_sec=60)
+        # another runner changes the ConfigMap
+        server.data = dict(server.data, other=make_job("other").json())
+        server.resource_version += 1
+
+        dal.save_scheduled_job(make_job("local"))
+        dal.del_scheduled_job("deleted")
+        dal.flush()
+        assert set(server.data.keys()) == {"remote", "other", "local"}
+        assert {job.job_id for job in dal.list_scheduled_jobs()} == {"remote", "other", "local"}
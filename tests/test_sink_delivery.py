@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import List
+
+from robusta.core.reporting import Finding
+from robusta.core.sinks.sink_base_params import OverflowPolicy, SinkDeliveryParams
+from robusta.core.sinks.sink_delivery import SinkDeliveryQueue
+
+
+class BlockingDelivery:
+    def __init__(self):
+        self.release = threading.Event()
+        self.delivered: List[str] = []
+
+    def __call__(self, finding: Finding, platform_enabled: bool):
+        self.release.wait(10)
+        self.delivered.append(finding.title)
+
+
+def make_finding(title: str) -> Finding:
+    return Finding(title=title, aggregation_key=title)
+
+
+def make_queue(delivery: BlockingDelivery, **params) -> SinkDeliveryQueue:
+    return SinkDeliveryQueue("test_sink", SinkDeliveryParams(**params), delivery)
+
+
+def fill(queue: SinkDeliveryQueue, count: int):
+    for i in range(count):
+        queue.put(make_finding(f"finding-{i}"), False)
+        if i == 0:  # wait for the worker to take the first finding, so the queue content is deterministic
+            while queue.items:
+                time.sleep(0.01)
+
+
+class TestSinkDeliveryQueue:
+    def test_delivery_order(self):
+        delivery = BlockingDelivery()
+        delivery.release.set()
+        queue = make_queue(delivery)
+        fill(queue, 5)
+        assert queue.join(5)
+        assert delivery.delivered == [f"finding-{i}" for i in range(5)]
+
+    def test_put_does_not_wait_for_slow_sink(self):
+        delivery = BlockingDelivery()
+        queue = make_queue(delivery)
+        start = time.time()
+        fill(queue, 3)
+        assert time.time() - start < 1
+        delivery.release.set()
+        assert queue.join(5)
+        assert len(delivery.delivered) == 3
+
+    def test_drop_oldest(self):
+        delivery = BlockingDelivery()
+        queue = make_queue(delivery, queue_size=2, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        fill(queue, 5)  # first one is being delivered, 1 and 2 are dropped
+        delivery.release.set()
+        assert queue.join(5)
+        assert delivery.delivered == ["finding-0", "finding-3", "finding-4"]
+
+    def test_block_timeout(self):
+        delivery = BlockingDelivery()
+        queue = make_queue(delivery, queue_size=1, overflow_policy=OverflowPolicy.BLOCK, block_timeout_sec=0.1)
+        fill(queue, 3)  # last one waits for room, and is dropped
+        delivery.release.set()
+        assert queue.join(5)
+        assert delivery.delivered == ["finding-0", "finding-1"]
+
+    def test_spill_to_disk(self, tmp_path):
+        delivery = BlockingDelivery()
+        queue = make_queue(
+            delivery, queue_size=1, overflow_policy=OverflowPolicy.SPILL_TO_DISK, spill_dir=str(tmp_path)
+        )
+        fill(queue, 4)
+        assert len(queue.spilled) == 2
+        delivery.release.set()
+        assert queue.join(5)
+        assert delivery.delivered == [f"finding-{i}" for i in range(4)]
+        assert not list((tmp_path / "test_sink").iterdir())
+
+    def test_stop_delivers_queued(self):
+        delivery = BlockingDelivery()
+        queue = make_queue(delivery)
+        fill(queue, 2)
+        queue.stop()
+        queue.put(make_finding("after-stop"), False)
+        delivery.release.set()
+        for worker in queue.workers:
+            worker.join(5)
+        assert delivery.delivered == ["finding-0", "finding-1"]
+
+    def test_reload_hands_over_spilled(self, tmp_path):
+        delivery = BlockingDelivery()
+        params = dict(queue_size=1, overflow_policy=OverflowPolicy.SPILL_TO_DISK, spill_dir=str(tmp_path))
+        queue = make_queue(delivery, **params)
+        fill(queue, 4)
+        queue.stop()
+        new_delivery = BlockingDelivery()
+        new_delivery.release.set()
+        new_queue = make_queue(new_delivery, **params)
+        assert not queue.spilled
+        assert new_queue.join(5)
+        assert new_delivery.delivered == ["finding-2", "finding-3"]
+        delivery.release.set()
+        assert queue.join(5)
+        assert delivery.delivered == ["finding-0", "finding-1"]
+        assert not list((tmp_path / "test_sink").iterdir())
+
+    def test_on_delivered_per_finding(self):
+        delivered = []
+
+        def delivery(finding: Finding, platform_enabled: bool):
+            if finding.title == "broken":
+                raise Exception("sink is down")
+
+        queue = make_queue(delivery)
+        for title in ["first", "broken", "second"]:
+            queue.put(make_finding(title), False, on_delivered=lambda title=title: delivered.append(title))
+        assert queue.join(5)
+        assert delivered == ["first", "second"]
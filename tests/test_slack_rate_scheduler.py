@@ -0,0 +1,157 @@
+import threading
+import time
+from unittest import mock
+
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+from robusta.integrations.slack import rate_scheduler
+from robusta.integrations.slack.rate_scheduler import SlackRateScheduler, TokenBucket
+
+
+def rate_limited_error(retry_after: str) -> SlackApiError:
+    response = SlackResponse(
+        client=None,
+        http_verb="POST",
+        api_url="https://slack.com/api/chat.postMessage",
+        req_args={},
+        data={"ok": False, "error": "ratelimited"},
+        headers={"Retry-After": retry_after},
+        status_code=429,
+    )
+    return SlackApiError("ratelimited", response)
+
+
+class FakeClient:
+    def __init__(self, errors=()):
+        self.lock = threading.Lock()
+        self.sent = []
+        self.errors = list(errors)
+        self.release = threading.Event()
+        self.release.set()
+
+    def chat_postMessage(self, **kwargs):
+        self.release.wait(5)
+        with self.lock:
+            self.sent.append(kwargs)
+            if self.errors:
+                raise self.errors.pop(0)
+        return {"ok": True, "channel": f"id-{kwargs['channel']}", "ts": str(len(self.sent))}
+
+
+class TestTokenBucket:
+    def test_burst_and_rate(self):
+        bucket = TokenBucket(rate_per_sec=2, burst=2)
+        now = bucket.updated
+        bucket.take(now)
+        bucket.take(now)
+        assert bucket.delay(now) == 0.5
+        assert bucket.delay(now + 0.5) == 0
+
+        bucket.block(now + 0.5, 3)
+        assert bucket.delay(now + 1) == 2.5
+
+
+class TestSlackRateScheduler:
+    def test_busy_channel_does_not_delay_other_channels(self):
+        client = FakeClient()
+        scheduler = SlackRateScheduler(num_workers=2)
+        with mock.patch.dict(rate_scheduler.CHANNEL_METHOD_LIMITS, {"chat_postMessage": (5.0, 1)}):
+            busy = [scheduler.submit(client, "chat_postMessage", "busy", {"channel": "busy"}) for _ in range(5)]
+            start = time.time()
+            other = scheduler.submit(client, "chat_postMessage", "other", {"channel": "other"})
+            assert other.result(timeout=5)["channel"] == "id-other"
+            assert time.time() - start < 0.5
+            assert not busy[-1].done()  # the busy channel is sent at 5 per second
+
+            for future in busy:
+                future.result(timeout=5)
+        assert [kwargs["channel"] for kwargs in client.sent].count("busy") == 5
+
+    def test_rate_limited_requests_are_retried(self):
+        client = FakeClient(errors=[rate_limited_error("0.1")])
+        scheduler = SlackRateScheduler(num_workers=1, max_retries=2)
+        rate_limited = rate_scheduler.slack_outbound_rate_limited.labels("chan")
+        before = rate_limited._value.get()
+
+        start = time.time()
+        response = scheduler.submit(client, "chat_postMessage", "chan", {"channel": "chan"}).result(timeout=5)
+        assert response["ok"]
+        assert time.time() - start >= 0.1  # waited for Retry-After
+        assert len(client.sent) == 2
+        assert rate_limited._value.get() == before + 1
+
+        client.errors = [rate_limited_error("0"), rate_limited_error("0")]
+        scheduler.max_retries = 1
+        future = scheduler.submit(client, "chat_postMessage", "chan", {"channel": "chan"})
+        assert isinstance(future.exception(timeout=5), SlackApiError)
+
+    def test_collapse_bursts(self):
+        client = FakeClient()
+        scheduler = SlackRateScheduler(num_workers=1, collapse_bursts=True)
+        client.release.clear()  # the first message is in flight while the others are queued
+        first = scheduler.submit(client, "chat_postMessage", "chan", {"channel": "chan", "text": "first"})
+        queued = [
+            scheduler.submit(
+                client,
+                "chat_postMessage",
+                "chan",
+                {"channel": "chan", "text": f"alert {i}", "blocks": [{"type": "section"}]},
+                collapsible=True,
+            )
+            for i in range(3)
+        ]
+        threaded = scheduler.submit(
+            client, "chat_postMessage", "chan", {"channel": "chan", "text": "reply", "thread_ts": "1"}
+        )
+        client.release.set()
+
+        assert first.result(timeout=5)["ts"] == "1"
+        assert {future.result(timeout=5)["ts"] for future in queued} == {"2"}
+        assert threaded.result(timeout=5)["ts"] == "3"
+
+        digest = client.sent[1]
+        assert digest["text"] == "alert 0\nalert 1\nalert 2"
+        assert [block["type"] for block in digest["blocks"]] == ["section"] + ["divider", "section"] * 3
+
+    def test_findings_are_sent_by_the_scheduler(self):
+        with mock.patch("robusta.integrations.slack.sender.WebClient") as web_client:
+            from robusta.core.reporting.base import Finding
+            from robusta.core.sinks.slack.slack_sink_params import SlackSinkParams
+            from robusta.integrations.slack.sender import SlackSender
+
+            client = web_client.return_value
+            client.release = threading.Event()
+            sent = threading.Event()
+
+            def post(**kwargs):
+                client.release.wait(5)
+                sent.set()
+                return {"ok": True, "channel": "C1", "ts": "1.1"}
+
+            client.chat_postMessage.side_effect = post
+            sender = SlackSender("xoxb-scheduler", "account", "cluster", "key", "chan", registry=None)
+            params = SlackSinkParams(name="test", slack_channel="chan", api_key="")
+            sender.send_finding_to_slack(Finding(title="test", aggregation_key="test"), params, False)
+
+            assert not sent.is_set()  # the event worker doesn't wait for Slack
+            client.release.set()
+            assert sent.wait(5)
+            for _ in range(50):
+                if "chan" in sender.channel_name_to_id:
+                    break
+                time.sleep(0.01)
+            assert sender.channel_name_to_id["chan"] == "C1"
+
+    def test_calls_outside_messages_are_retried_by_the_scheduler(self):
+        with mock.patch("robusta.integrations.slack.sender.WebClient") as web_client:
+            from robusta.integrations.slack.sender import SlackSender
+
+            client = web_client.return_value
+            client.auth_test.side_effect = [rate_limited_error("0"), {"ok": True}]
+            client.files_delete.side_effect = [rate_limited_error("0"), {"ok": True}]
+            sender = SlackSender("xoxb-retries", "account", "cluster", "key", "chan", registry=None)
+            assert client.auth_test.call_count == 2
+
+            sender._SlackSender__delete_superseded_attachment("F1")
+            assert client.files_delete.call_count == 2
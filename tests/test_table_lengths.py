@@ -0,0 +1,94 @@
+import random
+from unittest import mock
+
+from tabulate import tabulate
+
+from robusta.core.reporting.blocks import TableBlock
+from robusta.core.reporting.table_lengths import PrestoTableLengths
+
+VALUES = ["", " ", "1", "-3", " 7 ", "2.5", "1e5", "0.001", "12.", "True", "abc", "1,000", "nan", "a\nb", "x" * 30]
+VALUES += ["hello world foo bar", "ats.betting.betcatcher.validation.impl.Validator001Foo"]
+
+
+def presto_length(rows, headers, max_widths) -> int:
+    if not rows:
+        return len(tabulate(rows, headers=headers, tablefmt="presto"))
+    return len(tabulate(rows, headers=headers, tablefmt="presto", maxcolwidths=max_widths))
+
+
+def random_table(rand: random.Random, num_rows: int):
+    num_columns = rand.randint(1, 5)
+    headers = [rand.choice(["a", "label:site", "Fired", "", "x y"]) for _ in range(num_columns)]
+    rows = [[rand.choice(VALUES) for _ in range(num_columns)] for _ in range(num_rows)]
+    return rows, headers
+
+
+class TestPrestoTableLengths:
+    def test_lengths_of_every_row_count(self):
+        rand = random.Random(0)
+        checked = 0
+        while checked < 100:
+            rows, headers = random_table(rand, rand.randint(1, 15))
+            max_widths = [rand.randint(1, 40) for _ in headers]
+            lengths = PrestoTableLengths.of(rows, headers, max_widths, max_length=10**6)
+            if lengths is None:  # e.g. a float column with "True", that tabulate can't render
+                continue
+            for count in range(len(rows) + 1):
+                assert lengths.length(count) == presto_length(rows[:count], headers, max_widths), (rows, headers)
+            checked += 1
+
+    def test_numeric_last_column(self):
+        rows = [["a", "1"], ["b", " 22.5 "], ["c", "-3"], ["d", "1e3"]]
+        lengths = PrestoTableLengths.of(rows, ["name", "count"], [10, 10], max_length=10**6)
+        for count in range(len(rows) + 1):
+            assert lengths.length(count) == presto_length(rows[:count], ["name", "count"], [10, 10])
+
+    def test_only_lengths_up_to_max_length_are_computed(self):
+        rows = [["a", "1"], ["", ""], ["", ""], ["b", "2"], ["c", "3"], ["d", "4"]] * 5
+        for max_length in [0, 30, 100, 150]:
+            lengths = PrestoTableLengths.of(rows, ["name", "count"], [10, 10], max_length)
+            assert lengths.measured_rows < len(rows)
+            for count in range(len(rows) + 1):
+                length = presto_length(rows[:count], ["name", "count"], [10, 10])
+                assert lengths.length(count) == length or (lengths.length(count) > max_length and length > max_length)
+
+    def test_unsupported_tables(self):
+        assert PrestoTableLengths.of([["a", "b"]], [], [1, 1], 100) is None
+        assert PrestoTableLengths.of([["a", "b"], ["a"]], ["x", "y"], [1, 1], 100) is None
+        assert PrestoTableLengths.of([["ü", "b"]], ["x", "y"], [1, 1], 100) is None
+        assert PrestoTableLengths.of([["\x1b[31ma\x1b[0m", "b"]], ["x", "y"], [1, 1], 100) is None
+
+
+class TestTableBlockBudget:
+    def table_block(self, num_rows: int) -> TableBlock:
+        rows = [
+            [f"ats.betting.betcatcher.validation.impl.Validator{i:05d}Foo", "nj", str(i), str(i % 7)]
+            for i in range(num_rows)
+        ]
+        return TableBlock(rows=rows, headers=["label:site", "label:component", "Fired", "Resolved"])
+
+    def test_same_markdown_as_rendering_every_row_count(self):
+        for num_rows in [0, 1, 5, 30, 500]:
+            table_block = self.table_block(num_rows)
+            for max_chars in [None, 60, 400, 1500]:
+                computed = table_block.to_markdown(max_chars=max_chars).text
+                with mock.patch.object(PrestoTableLengths, "of", return_value=None):
+                    rendered = table_block.to_markdown(max_chars=max_chars).text
+                assert computed == rendered
+
+    def test_wrong_lengths_fall_back_to_rendering(self):
+        table_block = self.table_block(500)
+        expected = table_block.to_markdown().text
+        with mock.patch.object(PrestoTableLengths, "length", return_value=0):
+            assert table_block.to_markdown().text == expected
+
+    def test_omission_note_gets_the_dropped_rows_last(self):
+        table_block = self.table_block(500)
+        omitted = []
+
+        def omission_note(omitted_rows):
+            omitted.append(len(omitted_rows))
+            return TableBlock.default_omission_note(omitted_rows)
+
+        markdown = table_block.to_markdown(omission_note=omission_note).text
+        assert f"... {omitted[-1]} more rows not shown" in markdown
@@ -0,0 +1,100 @@
+from typing import List
+from unittest import mock
+
+from robusta.runner.web import Web
+from robusta.utils.task_queue import QueueItem, TaskQueue
+
+
+def make_queue(maxsize: int = 10) -> TaskQueue:
+    with mock.patch("robusta.utils.task_queue.INCOMING_EVENTS_QUEUE_MAX_SIZE", maxsize):
+        return TaskQueue(name="test_queue", num_workers=0, metrics=mock.MagicMock())
+
+
+def k8s_event(operation: str, name: str, version: int) -> dict:
+    def obj(obj_version: int) -> dict:
+        return {"metadata": {"name": name, "namespace": "default", "resourceVersion": str(obj_version)}}
+
+    return {
+        "data": {
+            "operation": operation,
+            "kind": "Deployment",
+            "clusterUid": "test",
+            "description": "test",
+            "obj": obj(version),
+            "oldObj": obj(version - 1) if operation == "update" else None,
+        }
+    }
+
+
+def queued_events(queue: TaskQueue) -> List[tuple]:
+    events = []
+    while not queue.empty():
+        item: QueueItem = queue.get_nowait()
+        payload = item.args[0].k8s_payload
+        old_version = payload.oldObj["metadata"]["resourceVersion"] if payload.oldObj else None
+        events.append(
+            (
+                payload.operation,
+                payload.obj["metadata"]["name"],
+                old_version,
+                payload.obj["metadata"]["resourceVersion"],
+            )
+        )
+    return events
+
+
+class TestCoalescingTaskQueue:
+    def setup_method(self):
+        self.queue = make_queue()
+        self.patches = [
+            mock.patch.object(Web, "api_server_queue", self.queue, create=True),
+            mock.patch.object(Web, "event_handler", mock.MagicMock(), create=True),
+            mock.patch("robusta.runner.web.COALESCE_K8S_UPDATE_EVENTS", True),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def teardown_method(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_updates_merged(self):
+        for version in range(2, 6):
+            Web.process_api_server_event(k8s_event("update", "api", version))
+        Web.process_api_server_event(k8s_event("update", "web", 8))
+        assert queued_events(self.queue) == [("update", "api", "1", "5"), ("update", "web", "7", "8")]
+        assert self.queue.metrics.on_merged.call_count == 3
+        assert not self.queue.pending
+
+    def test_create_and_delete_order(self):
+        Web.process_api_server_event(k8s_event("update", "api", 2))
+        Web.process_api_server_event(k8s_event("delete", "api", 3))
+        Web.process_api_server_event(k8s_event("create", "api", 4))
+        Web.process_api_server_event(k8s_event("update", "api", 5))
+        Web.process_api_server_event(k8s_event("update", "api", 6))
+        assert queued_events(self.queue) == [
+            ("update", "api", "1", "2"),
+            ("delete", "api", None, "3"),
+            ("create", "api", None, "4"),
+            ("update", "api", "4", "6"),
+        ]
+
+    def test_no_merge_after_worker_took_event(self):
+        Web.process_api_server_event(k8s_event("update", "api", 2))
+        self.queue.get_nowait()
+        Web.process_api_server_event(k8s_event("update", "api", 3))
+        assert queued_events(self.queue) == [("update", "api", "2", "3")]
+
+    def test_bounded(self):
+        queue = make_queue(maxsize=2)
+        with mock.patch.object(Web, "api_server_queue", queue):
+            for name in ["a", "b", "c"]:
+                Web.process_api_server_event(k8s_event("update", name, 2))
+            Web.process_api_server_event(k8s_event("update", "a", 3))  # merged even when the queue is full
+        assert queued_events(queue) == [("update", "a", "1", "3"), ("update", "b", "1", "2")]
+        assert queue.metrics.on_rejected.call_count == 1
+
+    def test_plain_tasks(self):
+        self.queue.add_task(print, "x", sep="")
+        item = self.queue.get_nowait()
+        assert (item.task, item.args, item.kwargs, item.coalesce_key) == (print, ("x",), {"sep": ""}, None)
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+from typing import List, Tuple
+from unittest import mock
+
+from robusta.runner.async_web import AsyncIngestionServer
+from robusta.runner.web import Web, app
+
+K8S_EVENT = {
+    "data": {
+        "operation": "update",
+        "kind": "Pod",
+        "clusterUid": "test",
+        "description": "test",
+        "obj": {"metadata": {"name": "web-1", "namespace": "default"}},
+        "oldObj": None,
+    }
+}
+
+
+class FakeQueue:
+    def __init__(self):
+        self.tasks = []
+
+    def add_task(self, func, *args, **kwargs):
+        self.tasks.append(args)
+
+
+def post(path: str, body: bytes, headers: str = "") -> bytes:
+    return f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n{headers}\r\n".encode() + body
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, dict, bytes]:
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return int(status_line.split()[1]), headers, body
+
+
+async def exchange(raw_requests: bytes, responses_count: int) -> List[Tuple[int, dict, bytes]]:
+    server = await AsyncIngestionServer(app, parser_threads=2, wsgi_threads=2).start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw_requests)
+        await writer.drain()
+        responses = [await read_response(reader) for _ in range(responses_count)]
+        writer.close()
+        return responses
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+class TestAsyncIngestionServer:
+    def setup_method(self):
+        self.queue = FakeQueue()
+        self.patches = [
+            mock.patch.object(Web, "api_server_queue", self.queue, create=True),
+            mock.patch.object(Web, "event_handler", mock.MagicMock(), create=True),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def teardown_method(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_pipelined_keep_alive_requests(self):
+        body = json.dumps(K8S_EVENT).encode()
+        responses = asyncio.run(exchange(post("/api/handle", body) * 3, 3))
+        assert [status for status, _, _ in responses] == [200, 200, 200]
+        assert all(headers["connection"] == "keep-alive" for _, headers, _ in responses)
+        assert json.loads(responses[0][2]) == {"success": True}
+        assert len(self.queue.tasks) == 3
+        assert self.queue.tasks[0][0].k8s_payload.obj["metadata"]["name"] == "web-1"
+
+    def test_chunked_body(self):
+        body = json.dumps(K8S_EVENT).encode()
+        chunked = b"%x\r\n%s\r\n0\r\n\r\n" % (len(body), body)
+        raw = b"POST /api/handle HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked
+        [(status, _, _)] = asyncio.run(exchange(raw, 1))
+        assert status == 200
+        assert len(self.queue.tasks) == 1
+
+    def test_invalid_json(self):
+        [(status, _, _)] = asyncio.run(exchange(post("/api/handle", b"{not json", "Connection: close\r\n"), 1))
+        assert status == 400
+        assert not self.queue.tasks
+
+    def test_body_too_large(self):
+        with mock.patch("robusta.runner.async_web.INGESTION_MAX_BODY_BYTES", 10):
+            [(status, headers, _)] = asyncio.run(exchange(post("/api/handle", b"x" * 11), 1))
+        assert status == 413
+        assert headers["connection"] == "close"
+
+    def test_wsgi_fallback(self):
+        Web.event_handler.is_healthy.return_value = True
+        raw = b"GET /healthz HTTP/1.1\r\n\r\n" + post("/api/handle", json.dumps(K8S_EVENT).encode())
+        responses = asyncio.run(exchange(raw, 2))
+        assert [status for status, _, _ in responses] == [200, 200]
+        assert len(self.queue.tasks) == 1
+
+    def test_pipelined_requests_are_ingested_in_order(self):
+        ingested = []
+
+        def process_api_server_event(req_json: dict):
+            operation = req_json["data"]["operation"]
+            if operation == "update":  # a slow parse shouldn't let the delete overtake it
+                time.sleep(0.2)
+            ingested.append(operation)
+
+        raw = b"".join(
+            post("/api/handle", json.dumps({"data": {**K8S_EVENT["data"], "operation": operation}}).encode())
+            for operation in ["update", "delete", "create"]
+        )
+        with mock.patch.object(Web, "process_api_server_event", side_effect=process_api_server_event):
+            responses = asyncio.run(exchange(raw, 3))
+        assert [status for status, _, _ in responses] == [200, 200, 200]
+        assert ingested == ["update", "delete", "create"]